@@ -20,7 +20,9 @@ from src.geobot_plataforma_backend.domain.entity import (
     Usuario, Grupo, Role, UsuarioGrupo, GrupoRole,
     Endereco, Denuncia, Fiscalizacao, Analise, Arquivo,
     ArquivoDenuncia, ArquivoAnalise,
-    EtapaFiscalizacao, ResultadoAnaliseIA, RelatórioFiscalizacao
+    EtapaFiscalizacao, ResultadoAnaliseIA, RelatórioFiscalizacao,
+    HistoricoFiscalizacao, SobrevooLote, SobrevooLoteFiscalizacao,
+    UploadRetomavel
 )
 
 # this is the Alembic Config object, which provides
@@ -0,0 +1,40 @@
+"""add_keyset_index_minhas_fiscalizacoes
+
+Revision ID: f1a2b3c4d5e6
+Revises: e8f9a2b3c4d5
+Create Date: 2025-11-15 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'f1a2b3c4d5e6'
+down_revision = 'e8f9a2b3c4d5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Índice para a paginação por cursor de "minhas fiscalizações".
+
+    A consulta parte de usuario_fiscalizacao (a PK usuario_id, fiscalizacao_id
+    já lista as fiscalizações do usuário) e ordena por (status ativo, updated_at,
+    id), colunas de fiscalizacoes. Como filtro e ordenação estão em tabelas
+    diferentes, nenhum índice entrega as linhas já ordenadas; este cobre a
+    busca de cada fiscalização pelo id com status e updated_at, para a página
+    ser escolhida só com index-only scans.
+    """
+    op.create_index(
+        'idx_fiscalizacoes_id_status_updated_at',
+        'fiscalizacoes',
+        ['id'],
+        postgresql_include=['status', 'updated_at'],
+        schema='geobot'
+    )
+
+
+def downgrade() -> None:
+    """Remove o índice da paginação por cursor"""
+    op.drop_index('idx_fiscalizacoes_id_status_updated_at', table_name='fiscalizacoes', schema='geobot')
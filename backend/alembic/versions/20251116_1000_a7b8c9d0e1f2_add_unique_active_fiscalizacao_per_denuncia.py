@@ -0,0 +1,50 @@
+"""add_unique_active_fiscalizacao_per_denuncia
+
+Revision ID: a7b8c9d0e1f2
+Revises: f1a2b3c4d5e6
+Create Date: 2025-11-16 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'a7b8c9d0e1f2'
+down_revision = 'f1a2b3c4d5e6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Índice único parcial: no máximo uma fiscalização ativa por denúncia.
+
+    É o alvo do INSERT ... ON CONFLICT usado na criação de fiscalizações.
+    Antes de criá-lo, fiscalizações ativas duplicadas (resultado de criações
+    concorrentes antigas) são canceladas, mantendo a mais antiga.
+    """
+    op.execute("""
+        UPDATE geobot.fiscalizacoes f
+        SET status = 'cancelada', updated_at = now()
+        WHERE f.status IN ('aguardando', 'em_andamento')
+          AND EXISTS (
+              SELECT 1 FROM geobot.fiscalizacoes o
+              WHERE o.denuncia_id = f.denuncia_id
+                AND o.status IN ('aguardando', 'em_andamento')
+                AND o.id < f.id
+          )
+    """)
+
+    op.create_index(
+        'uq_fiscalizacoes_denuncia_ativa',
+        'fiscalizacoes',
+        ['denuncia_id'],
+        unique=True,
+        schema='geobot',
+        postgresql_where=sa.text("status IN ('aguardando', 'em_andamento')")
+    )
+
+
+def downgrade() -> None:
+    """Remove o índice único parcial"""
+    op.drop_index('uq_fiscalizacoes_denuncia_ativa', table_name='fiscalizacoes', schema='geobot')
@@ -0,0 +1,87 @@
+"""add_historico_fiscalizacao
+
+Revision ID: b2c3d4e5f6a7
+Revises: a7b8c9d0e1f2
+Create Date: 2025-11-17 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'b2c3d4e5f6a7'
+down_revision = 'a7b8c9d0e1f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Cria o histórico append-only de fiscalizações.
+
+    - B-tree (fiscalizacao_id, id): linha do tempo de uma fiscalização, paginada por ID
+    - BRIN em created_at: consultas por período; a tabela só recebe inserts, então
+      a ordem física acompanha o tempo e o índice ocupa poucas páginas
+    - Trigger que rejeita UPDATE e DELETE direto (DELETE em cascata da
+      fiscalização continua permitido)
+    """
+    op.create_table(
+        'historico_fiscalizacao',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('fiscalizacao_id', sa.BigInteger(), nullable=False),
+        sa.Column('usuario_id', sa.BigInteger(), nullable=True),
+        sa.Column('tipo_evento', sa.String(50), nullable=False),
+        sa.Column('valor_anterior', sa.String(50), nullable=True),
+        sa.Column('valor_novo', sa.String(50), nullable=True),
+        sa.Column('dados', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('observacoes', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+
+        sa.ForeignKeyConstraint(['fiscalizacao_id'], ['geobot.fiscalizacoes.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['usuario_id'], ['geobot.usuarios.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+
+        schema='geobot'
+    )
+
+    op.create_index(
+        'idx_historico_fiscalizacao_fiscalizacao_id',
+        'historico_fiscalizacao',
+        ['fiscalizacao_id', 'id'],
+        schema='geobot'
+    )
+    op.create_index(
+        'idx_historico_fiscalizacao_created_at',
+        'historico_fiscalizacao',
+        ['created_at'],
+        schema='geobot',
+        postgresql_using='brin'
+    )
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION geobot.historico_fiscalizacao_somente_insercao()
+        RETURNS trigger AS $$
+        BEGIN
+            -- Cascatas (exclusão da fiscalização ou do usuário) rodam em triggers internos
+            IF pg_trigger_depth() > 1 THEN
+                RETURN COALESCE(NEW, OLD);
+            END IF;
+            RAISE EXCEPTION 'historico_fiscalizacao é somente inserção (% negado)', TG_OP;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_historico_fiscalizacao_somente_insercao
+        BEFORE UPDATE OR DELETE ON geobot.historico_fiscalizacao
+        FOR EACH ROW EXECUTE FUNCTION geobot.historico_fiscalizacao_somente_insercao()
+    """)
+
+
+def downgrade() -> None:
+    """Remove o histórico de fiscalizações"""
+    op.execute("DROP TRIGGER IF EXISTS trg_historico_fiscalizacao_somente_insercao ON geobot.historico_fiscalizacao")
+    op.execute("DROP FUNCTION IF EXISTS geobot.historico_fiscalizacao_somente_insercao()")
+    op.drop_index('idx_historico_fiscalizacao_created_at', table_name='historico_fiscalizacao', schema='geobot')
+    op.drop_index('idx_historico_fiscalizacao_fiscalizacao_id', table_name='historico_fiscalizacao', schema='geobot')
+    op.drop_table('historico_fiscalizacao', schema='geobot')
@@ -0,0 +1,76 @@
+"""add_sobrevoos_lote
+
+Revision ID: c3d4e5f6a7b8
+Revises: b2c3d4e5f6a7
+Create Date: 2025-11-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'c3d4e5f6a7b8'
+down_revision = 'b2c3d4e5f6a7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Cria os lotes de sobrevoo e a associação lote <-> fiscalização.
+
+    A PK (lote_id, fiscalizacao_id) atende a listagem do lote; o índice em
+    fiscalizacao_id atende a checagem "fiscalização já está em um lote aberto".
+    """
+    op.create_table(
+        'sobrevoos_lote',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('uuid', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('codigo', sa.String(50), nullable=False),
+        sa.Column('usuario_id', sa.BigInteger(), nullable=True),
+        sa.Column('status', sa.String(30), server_default='planejado', nullable=False),
+        sa.Column('poligono', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('plano_voo', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('largura_faixa_m', sa.Float(), nullable=False),
+        sa.Column('sobreposicao', sa.Float(), nullable=False),
+        sa.Column('distancia_km', sa.Float(), nullable=True),
+        sa.Column('observacoes', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+
+        sa.ForeignKeyConstraint(['usuario_id'], ['geobot.usuarios.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('uuid'),
+        sa.UniqueConstraint('codigo'),
+        sa.CheckConstraint('sobreposicao >= 0 AND sobreposicao < 1', name='sobreposicao_valida'),
+
+        schema='geobot'
+    )
+
+    op.create_table(
+        'sobrevoo_lote_fiscalizacao',
+        sa.Column('lote_id', sa.BigInteger(), nullable=False),
+        sa.Column('fiscalizacao_id', sa.BigInteger(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+
+        sa.ForeignKeyConstraint(['lote_id'], ['geobot.sobrevoos_lote.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['fiscalizacao_id'], ['geobot.fiscalizacoes.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('lote_id', 'fiscalizacao_id'),
+
+        schema='geobot'
+    )
+
+    op.create_index(
+        'idx_sobrevoo_lote_fiscalizacao_fiscalizacao_id',
+        'sobrevoo_lote_fiscalizacao',
+        ['fiscalizacao_id'],
+        schema='geobot'
+    )
+
+
+def downgrade() -> None:
+    """Remove os lotes de sobrevoo"""
+    op.drop_index('idx_sobrevoo_lote_fiscalizacao_fiscalizacao_id', table_name='sobrevoo_lote_fiscalizacao', schema='geobot')
+    op.drop_table('sobrevoo_lote_fiscalizacao', schema='geobot')
+    op.drop_table('sobrevoos_lote', schema='geobot')
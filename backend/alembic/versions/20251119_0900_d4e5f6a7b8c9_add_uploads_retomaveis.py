@@ -0,0 +1,65 @@
+"""add_uploads_retomaveis
+
+Revision ID: d4e5f6a7b8c9
+Revises: c3d4e5f6a7b8
+Create Date: 2025-11-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'd4e5f6a7b8c9'
+down_revision = 'c3d4e5f6a7b8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Cria o estado dos uploads retomáveis.
+
+    O índice (status, expira_em) atende a coleta de uploads abandonados.
+    """
+    op.create_table(
+        'uploads_retomaveis',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('uuid', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('usuario_id', sa.BigInteger(), nullable=True),
+        sa.Column('fiscalizacao_id', sa.BigInteger(), nullable=False),
+        sa.Column('etapa_id', sa.Integer(), nullable=False),
+        sa.Column('tipo', sa.String(50), nullable=False),
+        sa.Column('nome_original', sa.String(255), nullable=False),
+        sa.Column('mime_type', sa.String(100), nullable=False),
+        sa.Column('tamanho_bytes', sa.BigInteger(), nullable=False),
+        sa.Column('recebido_bytes', sa.BigInteger(), server_default='0', nullable=False),
+        sa.Column('blocos', postgresql.JSONB(astext_type=sa.Text()), server_default='[]', nullable=False),
+        sa.Column('chave_storage', sa.String(500), nullable=False),
+        sa.Column('status', sa.String(30), server_default='em_andamento', nullable=False),
+        sa.Column('arquivo_id', sa.Integer(), nullable=True),
+        sa.Column('expira_em', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+
+        sa.ForeignKeyConstraint(['usuario_id'], ['geobot.usuarios.id'], ondelete='SET NULL'),
+        sa.ForeignKeyConstraint(['fiscalizacao_id'], ['geobot.fiscalizacoes.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('uuid'),
+        sa.CheckConstraint('recebido_bytes >= 0 AND recebido_bytes <= tamanho_bytes', name='recebido_valido'),
+
+        schema='geobot'
+    )
+
+    op.create_index(
+        'idx_uploads_retomaveis_status_expira_em',
+        'uploads_retomaveis',
+        ['status', 'expira_em'],
+        schema='geobot'
+    )
+
+
+def downgrade() -> None:
+    """Remove os uploads retomáveis"""
+    op.drop_index('idx_uploads_retomaveis_status_expira_em', table_name='uploads_retomaveis', schema='geobot')
+    op.drop_table('uploads_retomaveis', schema='geobot')
@@ -0,0 +1,55 @@
+"""add_catalogo_arquivos_fiscalizacao
+
+Revision ID: e5f6a7b8c9d0
+Revises: d4e5f6a7b8c9
+Create Date: 2025-11-20 09:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'e5f6a7b8c9d0'
+down_revision = 'd4e5f6a7b8c9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Torna arquivos_fiscalizacao o catálogo consultado pelas listagens.
+
+    - (fiscalizacao_id, tipo, created_at desc, id desc) e a variante sem tipo
+      atendem a paginação por cursor de GET /etapas-fiscalizacao/{id}/arquivos;
+    - url_blob atende a ingestão e a reconciliação, que buscam pela chave;
+    - verificado_em marca a última conferência com o storage, e o índice deixa a
+      reconciliação pegar sempre os arquivos há mais tempo sem conferência.
+
+    A tabela no formato atual é criada pelo modelo (as migrations iniciais têm a
+    versão antiga), então os comandos usam IF NOT EXISTS.
+    """
+    op.execute('ALTER TABLE geobot.arquivos_fiscalizacao ADD COLUMN IF NOT EXISTS verificado_em TIMESTAMP WITH TIME ZONE')
+    op.execute(
+        'CREATE INDEX IF NOT EXISTS idx_arquivos_fiscalizacao_catalogo '
+        'ON geobot.arquivos_fiscalizacao (fiscalizacao_id, tipo, created_at DESC, id DESC)'
+    )
+    op.execute(
+        'CREATE INDEX IF NOT EXISTS idx_arquivos_fiscalizacao_listagem '
+        'ON geobot.arquivos_fiscalizacao (fiscalizacao_id, created_at DESC, id DESC)'
+    )
+    op.execute(
+        'CREATE INDEX IF NOT EXISTS idx_arquivos_fiscalizacao_url_blob '
+        'ON geobot.arquivos_fiscalizacao (url_blob)'
+    )
+    op.execute(
+        'CREATE INDEX IF NOT EXISTS idx_arquivos_fiscalizacao_verificado_em '
+        'ON geobot.arquivos_fiscalizacao (verificado_em NULLS FIRST, id)'
+    )
+
+
+def downgrade() -> None:
+    """Remove os índices do catálogo e a coluna de conferência"""
+    op.execute('DROP INDEX IF EXISTS geobot.idx_arquivos_fiscalizacao_verificado_em')
+    op.execute('DROP INDEX IF EXISTS geobot.idx_arquivos_fiscalizacao_url_blob')
+    op.execute('DROP INDEX IF EXISTS geobot.idx_arquivos_fiscalizacao_listagem')
+    op.execute('DROP INDEX IF EXISTS geobot.idx_arquivos_fiscalizacao_catalogo')
+    op.execute('ALTER TABLE geobot.arquivos_fiscalizacao DROP COLUMN IF EXISTS verificado_em')
@@ -0,0 +1,76 @@
+"""add_jobs
+
+Revision ID: f6a7b8c9d0e1
+Revises: e5f6a7b8c9d0
+Create Date: 2025-11-21 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'f6a7b8c9d0e1'
+down_revision = 'e5f6a7b8c9d0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Cria a fila de jobs em segundo plano (análise de IA).
+
+    - idx_jobs_fila (parcial, só pendentes) atende a reserva do próximo job
+      por tipo e prioridade com FOR UPDATE SKIP LOCKED;
+    - idx_jobs_reserva (parcial, só em execução) encontra reservas expiradas
+      de workers que pararam de responder.
+    """
+    op.create_table(
+        'jobs',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('uuid', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('tipo', sa.String(50), nullable=False),
+        sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), server_default='{}', nullable=False),
+        sa.Column('status', sa.String(20), server_default='pendente', nullable=False),
+        sa.Column('prioridade', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('tentativas', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('max_tentativas', sa.Integer(), server_default='3', nullable=False),
+        sa.Column('disponivel_em', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('bloqueado_por', sa.String(100), nullable=True),
+        sa.Column('bloqueado_ate', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('progresso', sa.Float(), server_default='0', nullable=False),
+        sa.Column('mensagem', sa.Text(), nullable=True),
+        sa.Column('erro', sa.Text(), nullable=True),
+        sa.Column('resultado', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('iniciado_em', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('concluido_em', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('uuid'),
+
+        schema='geobot'
+    )
+
+    op.create_index(
+        'idx_jobs_fila',
+        'jobs',
+        ['tipo', sa.text('prioridade DESC'), 'disponivel_em', 'id'],
+        schema='geobot',
+        postgresql_where=sa.text("status = 'pendente'"),
+    )
+    op.create_index(
+        'idx_jobs_reserva',
+        'jobs',
+        ['bloqueado_ate'],
+        schema='geobot',
+        postgresql_where=sa.text("status = 'executando'"),
+    )
+
+
+def downgrade() -> None:
+    """Remove a fila de jobs"""
+    op.drop_index('idx_jobs_reserva', table_name='jobs', schema='geobot')
+    op.drop_index('idx_jobs_fila', table_name='jobs', schema='geobot')
+    op.drop_table('jobs', schema='geobot')
@@ -0,0 +1,35 @@
+"""add_idx_resultados_aguardando_lote
+
+Revision ID: 0b1c2d3e4f5a
+Revises: f6a7b8c9d0e1
+Create Date: 2025-11-22 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0b1c2d3e4f5a'
+down_revision = 'f6a7b8c9d0e1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Índice parcial dos pedidos de análise de IA que aguardam lote: a montagem
+    de lotes roda a cada poucos segundos e não deve varrer o histórico inteiro
+    de resultados.
+    """
+    op.create_index(
+        'idx_resultados_analise_ia_aguardando_lote',
+        'resultados_analise_ia',
+        ['created_at', 'id'],
+        schema='geobot',
+        postgresql_where=sa.text("status_processamento = 'pendente' AND job_id IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    """Remove o índice dos pedidos aguardando lote"""
+    op.drop_index('idx_resultados_analise_ia_aguardando_lote', table_name='resultados_analise_ia', schema='geobot')
@@ -18,6 +18,144 @@ from src.geobot_plataforma_backend.core.migrations import (
 )
 
 
+def listar_hotspots(args):
+    """Imprime os hotspots de denúncias calculados sobre o banco configurado"""
+    import time
+    from src.geobot_plataforma_backend.core.database import SessionLocal
+    from src.geobot_plataforma_backend.domain.entity.enums import CategoriaDenuncia, StatusDenuncia
+    from src.geobot_plataforma_backend.domain.service.hotspot_service import HotspotService
+    
+    categorias = [CategoriaDenuncia(c) for c in (args.categoria or [])]
+    status = [StatusDenuncia(s) for s in (args.status or [])]
+    
+    db = SessionLocal()
+    try:
+        inicio = time.perf_counter()
+        resultado = HotspotService(db).calcular(
+            raio_m=args.raio_m,
+            min_denuncias=args.min_denuncias,
+            categorias=categorias,
+            status=status,
+            limite=args.limite,
+        )
+        duracao = time.perf_counter() - inicio
+    finally:
+        db.close()
+    
+    print(f"{'#':>3}  {'Denúncias':>9}  {'Latitude':>12}  {'Longitude':>12}  {'Raio (km)':>9}  {'Fiscalizações':>13}")
+    for posicao, h in enumerate(resultado.hotspots, start=1):
+        print(
+            f"{posicao:>3}  {h.quantidade:>9}  {h.centro_latitude:>12.6f}  {h.centro_longitude:>12.6f}  "
+            f"{h.raio_km:>9.3f}  {len(h.fiscalizacao_ids):>13}"
+        )
+    print(
+        f"\n✅ {len(resultado.hotspots)} hotspot(s) em {resultado.total_denuncias} denúncia(s) "
+        f"({resultado.total_ruido} isoladas), raio {resultado.raio_m:.0f} m, "
+        f"mínimo {resultado.min_denuncias} — {duracao:.2f}s\n"
+    )
+
+
+def limpar_uploads(args):
+    """Remove uploads retomáveis abandonados (sem partes dentro da validade)"""
+    import asyncio
+    from src.geobot_plataforma_backend.core.database import SessionLocal
+    from src.geobot_plataforma_backend.core.storage import encerrar_storage_backend
+    from src.geobot_plataforma_backend.domain.service.upload_retomavel_service import UploadRetomavelService
+    
+    async def coletar(service):
+        # Um único event loop: o cliente do storage fica preso ao loop em que foi usado
+        total = 0
+        try:
+            while True:
+                removidos = await service.coletar_abandonados(limite=args.limite)
+                total += removidos
+                if removidos < args.limite:
+                    return total
+        finally:
+            await encerrar_storage_backend()
+    
+    db = SessionLocal()
+    try:
+        total = asyncio.run(coletar(UploadRetomavelService(db)))
+    finally:
+        db.close()
+    
+    print(f"✅ {total} upload(s) abandonado(s) removido(s)\n")
+
+
+def processar_imagens(args):
+    """Gera GPS, miniaturas e prévias das imagens de fiscalização ainda não processadas"""
+    import asyncio
+    from src.geobot_plataforma_backend.core.storage import encerrar_storage_backend
+    from src.geobot_plataforma_backend.domain.service.ingestao_imagem_service import (
+        IngestaoImagemService,
+        encerrar_pool_imagens,
+    )
+    
+    async def processar(service):
+        total = 0
+        try:
+            while True:
+                chaves = service.pendentes(limite=args.limite)
+                if not chaves:
+                    return total
+                total += await service.processar(chaves)
+                print(f"   {total} arquivo(s) processado(s)...")
+        finally:
+            await encerrar_storage_backend()
+    
+    try:
+        total = asyncio.run(processar(IngestaoImagemService()))
+    finally:
+        encerrar_pool_imagens()
+    
+    print(f"✅ {total} arquivo(s) de imagem processado(s)\n")
+
+
+def reconciliar_arquivos(args):
+    """Confere o catálogo de arquivos com o storage, em lotes, marcando chaves ausentes"""
+    import asyncio
+    from datetime import datetime, timezone
+    from src.geobot_plataforma_backend.core.database import SessionLocal
+    from src.geobot_plataforma_backend.core.storage import encerrar_storage_backend
+    from src.geobot_plataforma_backend.domain.service.catalogo_arquivos_service import CatalogoArquivosService
+    
+    inicio = datetime.now(timezone.utc)
+    
+    async def reconciliar(service):
+        verificados = ausentes = 0
+        try:
+            while True:
+                resultado = await service.reconciliar(limite=args.limite, verificados_antes_de=inicio)
+                verificados += resultado['verificados']
+                ausentes += resultado['ausentes']
+                if resultado['verificados'] < args.limite:
+                    return verificados, ausentes
+                print(f"   {verificados} arquivo(s) conferido(s)...")
+        finally:
+            await encerrar_storage_backend()
+    
+    db = SessionLocal()
+    try:
+        verificados, ausentes = asyncio.run(reconciliar(CatalogoArquivosService(db)))
+    finally:
+        db.close()
+    
+    print(f"✅ {verificados} arquivo(s) conferido(s), {ausentes} ausente(s) no storage\n")
+
+
+def worker_ia(args):
+    """Sobe os workers da fila de análise de IA (até SIGINT/SIGTERM)"""
+    import logging
+    from src.geobot_plataforma_backend.core.config import settings
+    from src.geobot_plataforma_backend.domain.service.worker_jobs import iniciar_workers
+    
+    logging.basicConfig(level=settings.get('log_level', 'INFO'), format=settings.get('log_format'))
+    iniciar_workers(args.processos)
+    
+    print("✅ Workers encerrados\n")
+
+
 def main():
     """Função principal do CLI"""
     import argparse
@@ -33,12 +171,17 @@ Exemplos de uso:
   python manage_db.py current                           # Mostra versão atual
   python manage_db.py history                           # Mostra histórico
   python manage_db.py check                             # Verifica migrations pendentes
+  python manage_db.py hotspots --raio-m 200 --categoria lixo_entulho  # Hotspots de denúncias
+  python manage_db.py limpar-uploads --limite 500       # Remove uploads retomáveis abandonados (cron)
+  python manage_db.py processar-imagens --limite 100    # Miniaturas/GPS das imagens ainda não processadas
+  python manage_db.py reconciliar-arquivos --limite 500 # Confere o catálogo de arquivos com o storage (cron)
+  python manage_db.py worker-ia --processos 4           # Processa a fila de análise de IA
         """
     )
     
     parser.add_argument(
         "action",
-        choices=["upgrade", "downgrade", "create", "current", "history", "check"],
+        choices=["upgrade", "downgrade", "create", "current", "history", "check", "hotspots", "limpar-uploads", "processar-imagens", "reconciliar-arquivos", "worker-ia"],
         help="Ação a ser executada"
     )
     
@@ -59,6 +202,43 @@ Exemplos de uso:
         help="Não usar autogenerate ao criar migration (cria migration vazia)"
     )
     
+    parser.add_argument(
+        "--raio-m",
+        type=float,
+        help="Raio de vizinhança em metros para 'hotspots' (padrão: configuração)"
+    )
+    
+    parser.add_argument(
+        "--min-denuncias",
+        type=int,
+        help="Denúncias mínimas por vizinhança para 'hotspots' (padrão: configuração)"
+    )
+    
+    parser.add_argument(
+        "--categoria",
+        action="append",
+        help="Filtra 'hotspots' por categoria (pode repetir)"
+    )
+    
+    parser.add_argument(
+        "--status",
+        action="append",
+        help="Filtra 'hotspots' por status da denúncia (pode repetir)"
+    )
+    
+    parser.add_argument(
+        "--limite",
+        type=int,
+        default=20,
+        help="Máximo de hotspots listados / itens por lote em 'limpar-uploads', 'processar-imagens' e 'reconciliar-arquivos' (padrão: 20)"
+    )
+    
+    parser.add_argument(
+        "--processos",
+        type=int,
+        help="Workers em paralelo para 'worker-ia' (padrão: ia_workers)"
+    )
+    
     args = parser.parse_args()
     
     try:
@@ -92,6 +272,26 @@ Exemplos de uso:
             print(f"{'⚠️ ' if has_pending else '✅ '}{message}\n")
             sys.exit(1 if has_pending else 0)
             
+        elif args.action == "hotspots":
+            print("\n🗺️  Detectando hotspots de denúncias...\n")
+            listar_hotspots(args)
+            
+        elif args.action == "limpar-uploads":
+            print("\n🧹 Removendo uploads retomáveis abandonados...\n")
+            limpar_uploads(args)
+            
+        elif args.action == "processar-imagens":
+            print("\n🖼️  Processando imagens pendentes...\n")
+            processar_imagens(args)
+            
+        elif args.action == "reconciliar-arquivos":
+            print("\n🔎 Reconciliando catálogo de arquivos com o storage...\n")
+            reconciliar_arquivos(args)
+            
+        elif args.action == "worker-ia":
+            print("\n🤖 Iniciando workers de análise de IA...\n")
+            worker_ia(args)
+            
     except KeyboardInterrupt:
         print("\n\n⚠️  Operação cancelada pelo usuário")
         sys.exit(1)
@@ -0,0 +1,13 @@
+"""
+Dependencies compartilhadas pelos routers
+"""
+from fastapi import Depends
+from sqlalchemy.orm import Session
+
+from src.geobot_plataforma_backend.core.database import get_db
+from src.geobot_plataforma_backend.domain.repository.usuario_loader import UsuarioLoader
+
+
+def get_usuario_loader(db: Session = Depends(get_db)) -> UsuarioLoader:
+    """Loader de usuários por requisição: o FastAPI reutiliza a mesma instância em todos os dependentes"""
+    return UsuarioLoader(db)
@@ -6,6 +6,7 @@ from .denuncia_dto import (
     DenunciaAtualizarDTO,
     DenunciaResponseDTO,
 )
+from .arquivo_dto import ArquivoResponseDTO
 from .usuario_dto import (
     UsuarioCadastroDTO,
     UsuarioLoginDTO,
@@ -19,6 +20,8 @@ __all__ = [
     "DenunciaCriarDTO",
     "DenunciaAtualizarDTO",
     "DenunciaResponseDTO",
+    # DTOs de Arquivo
+    "ArquivoResponseDTO",
     # DTOs de Usuário
     "UsuarioCadastroDTO",
     "UsuarioLoginDTO",
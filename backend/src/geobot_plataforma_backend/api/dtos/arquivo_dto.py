@@ -0,0 +1,49 @@
+"""DTOs para arquivos anexados"""
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class ArquivoResponseDTO(BaseModel):
+    """DTO para resposta com dados de um arquivo"""
+    id: int
+    uuid: str
+    nome_arquivo: str
+    tamanho_bytes: int
+    tipo_mime: str
+    extensao: str
+    hash_checksum: str
+    data_upload: datetime
+    reaproveitado: bool = False
+
+    @classmethod
+    def from_entity(cls, arquivo, reaproveitado: bool = False):
+        """Cria DTO a partir da entidade"""
+        return cls(
+            id=arquivo.id,
+            uuid=str(arquivo.uuid),
+            nome_arquivo=arquivo.nome_arquivo,
+            tamanho_bytes=arquivo.tamanho_bytes,
+            tipo_mime=arquivo.tipo_mime,
+            extensao=arquivo.extensao,
+            hash_checksum=arquivo.hash_checksum,
+            data_upload=arquivo.data_upload,
+            reaproveitado=reaproveitado,
+        )
+
+    def to_dict(self):
+        """Converte para dicionário"""
+        return {
+            "id": self.id,
+            "uuid": self.uuid,
+            "nome_arquivo": self.nome_arquivo,
+            "tamanho_bytes": self.tamanho_bytes,
+            "tipo_mime": self.tipo_mime,
+            "extensao": self.extensao,
+            "hash_sha256": self.hash_checksum,
+            "data_upload": self.data_upload.isoformat(),
+            "reaproveitado": self.reaproveitado,
+        }
+
+    class Config:
+        from_attributes = True
@@ -6,6 +6,8 @@ from .denuncia_router import router as denuncia_router
 from .fiscalizacao_router import router as fiscalizacao_router
 from .metadata_router import router as metadata_router
 from .sessoes_router import router as sessoes_router
+from .sobrevoo_router import router as sobrevoo_router
+from .upload_router import router as upload_router
 
 __all__ = [
     "auth_router",
@@ -13,4 +15,6 @@ __all__ = [
     "fiscalizacao_router",
     "metadata_router",
     "sessoes_router",
+    "sobrevoo_router",
+    "upload_router",
 ]
@@ -10,10 +10,13 @@ Endpoints disponíveis:
 - PATCH /denuncias/{id}: Atualiza uma denúncia
 - DELETE /denuncias/{id}: Deleta uma denúncia
 - PATCH /denuncias/{id}/status: Atualiza o status de uma denúncia (admin/fiscal)
+- POST /denuncias/{id}/arquivos: Anexa um arquivo (upload em streaming, deduplicado por hash)
+- POST /denuncias/{id}/arquivos/hash/{sha256}: Anexa um arquivo já enviado sem reenviar o conteúdo
+- GET /denuncias/{id}/arquivos: Lista os arquivos anexados
 """
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
@@ -27,10 +30,12 @@ from src.geobot_plataforma_backend.domain.service.denuncia_service import (
     DenunciaService,
     AutorizacaoError,
 )
+from src.geobot_plataforma_backend.domain.service.arquivo_service import ArquivoService
 from src.geobot_plataforma_backend.api.dtos.denuncia_dto import (
     DenunciaCriarDTO,
     DenunciaAtualizarDTO,
 )
+from src.geobot_plataforma_backend.api.dtos.arquivo_dto import ArquivoResponseDTO
 from src.geobot_plataforma_backend.security.dependencies import get_current_user
 
 router = APIRouter(prefix="/denuncias", tags=["denuncias"])
@@ -274,3 +279,92 @@ def atualizar_status(
         raise HTTPException(status_code=_value_error_to_status(err), detail=str(err)) from err
     except Exception as err:  # pragma: no cover
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro ao atualizar status da denúncia") from err
+
+
+@router.post(
+    "/{denuncia_id}/arquivos",
+    status_code=status.HTTP_201_CREATED,
+    summary="Anexar Arquivo",
+    description=(
+        "Anexa um arquivo à denúncia. O conteúdo é gravado em streaming e deduplicado "
+        "pelo SHA-256: se o mesmo arquivo já foi enviado, o registro existente é reaproveitado."
+    ),
+    operation_id="anexar_arquivo_api_denuncias__denuncia_id__arquivos_post",
+)
+async def anexar_arquivo(
+    denuncia_id: int,
+    file: UploadFile = File(...),
+    current_user=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Anexa um arquivo (foto/documento) a uma denúncia."""
+    service = ArquivoService(db)
+    try:
+        arquivo, reaproveitado = await service.anexar_upload(
+            denuncia_id=denuncia_id,
+            usuario_id=current_user.id,
+            upload=file,
+            nome_arquivo=file.filename or "arquivo",
+            tipo_mime=file.content_type,
+        )
+        return ArquivoResponseDTO.from_entity(arquivo, reaproveitado).to_dict()
+    except AutorizacaoError as err:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(err)) from err
+    except ValueError as err:
+        raise HTTPException(status_code=_value_error_to_status(err), detail=str(err)) from err
+    except Exception as err:  # pragma: no cover
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro ao anexar arquivo") from err
+    finally:
+        await file.close()
+
+
+@router.post(
+    "/{denuncia_id}/arquivos/hash/{hash_sha256}",
+    summary="Anexar Arquivo Existente",
+    description=(
+        "Anexa, sem reenviar o conteúdo, um arquivo que o usuário já enviou em outra denúncia. "
+        "Retorna 404 se o hash não for conhecido; nesse caso o cliente deve fazer o upload."
+    ),
+    operation_id="anexar_arquivo_por_hash_api_denuncias__denuncia_id__arquivos_hash__hash_sha256__post",
+)
+def anexar_arquivo_por_hash(
+    denuncia_id: int,
+    hash_sha256: str,
+    current_user=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Anexa um arquivo já existente identificado pelo SHA-256."""
+    service = ArquivoService(db)
+    try:
+        arquivo = service.anexar_por_hash(denuncia_id, current_user.id, hash_sha256)
+        return ArquivoResponseDTO.from_entity(arquivo, reaproveitado=True).to_dict()
+    except AutorizacaoError as err:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(err)) from err
+    except ValueError as err:
+        raise HTTPException(status_code=_value_error_to_status(err), detail=str(err)) from err
+    except Exception as err:  # pragma: no cover
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro ao anexar arquivo") from err
+
+
+@router.get(
+    "/{denuncia_id}/arquivos",
+    summary="Listar Arquivos",
+    description="Lista os arquivos anexados a uma denúncia.",
+    operation_id="listar_arquivos_api_denuncias__denuncia_id__arquivos_get",
+)
+def listar_arquivos(
+    denuncia_id: int,
+    current_user=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Lista os arquivos anexados a uma denúncia."""
+    service = ArquivoService(db)
+    try:
+        arquivos = service.listar_anexos(denuncia_id, current_user.id)
+        return [ArquivoResponseDTO.from_entity(a).to_dict() for a in arquivos]
+    except AutorizacaoError as err:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(err)) from err
+    except ValueError as err:
+        raise HTTPException(status_code=_value_error_to_status(err), detail=str(err)) from err
+    except Exception as err:  # pragma: no cover
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro ao listar arquivos") from err
@@ -1,12 +1,31 @@
 """Router (FastAPI) para rotas de etapas de fiscalização"""
-from typing import Optional, Dict, Any
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from pydantic import BaseModel
+import asyncio
+from typing import Optional, Dict, Any, List
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, status, UploadFile, File, Form
+from fastapi.responses import Response
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
 from src.geobot_plataforma_backend.core.database import get_db
+from src.geobot_plataforma_backend.core.piramide import descritor_dzi
+from src.geobot_plataforma_backend.core.storage import responder_objeto
 from src.geobot_plataforma_backend.domain.entity.etapa_fiscalizacao_enum import EtapaFiscalizacaoEnum
-from src.geobot_plataforma_backend.domain.service.etapa_fiscalizacao_service import EtapaFiscalizacaoService
+from src.geobot_plataforma_backend.domain.service.analise_ia_service import AnaliseIAService
+from src.geobot_plataforma_backend.domain.service.etapa_fiscalizacao_service import (
+    EtapaFiscalizacaoService,
+    hub_progresso,
+    versao_progresso,
+)
+from src.geobot_plataforma_backend.domain.service.fila_jobs_service import FilaJobs
+from src.geobot_plataforma_backend.domain.service.ingestao_imagem_service import (
+    VARIANTES,
+    agendar_ingestao,
+    url_derivado,
+    url_piramide,
+)
+from src.geobot_plataforma_backend.domain.service.piramide_service import PiramideService
+from src.geobot_plataforma_backend.domain.service.progresso_coalescido import obter_coalescedor
 from src.geobot_plataforma_backend.security.dependencies import get_current_user
 
 router = APIRouter(prefix='/etapas-fiscalizacao', tags=['etapas-fiscalizacao'])
@@ -28,6 +47,12 @@ class AtualizarProgressoPayload(BaseModel):
     """Payload para atualizar progresso"""
     progresso_percentual: float
     resultado: Optional[Dict[str, Any]] = None
+    erro: Optional[str] = None  # Gravado imediatamente
+
+
+class ProgressoLotePayload(BaseModel):
+    """Payload para obter o progresso de várias fiscalizações"""
+    fiscalizacao_ids: List[int] = Field(..., min_items=1, max_items=200)
 
 
 class IniciarAnaliseIAPayload(BaseModel):
@@ -45,7 +70,7 @@ class GerarRelatorioPayload(BaseModel):
 
 def _value_error_to_status(err: ValueError) -> int:
     mensagem = str(err).lower()
-    if "não encontrada" in mensagem or "nao encontrada" in mensagem:
+    if "não encontrad" in mensagem or "nao encontrad" in mensagem:
         return status.HTTP_404_NOT_FOUND
     return status.HTTP_400_BAD_REQUEST
 
@@ -61,7 +86,7 @@ def iniciar_fiscalizacao(
     service = EtapaFiscalizacaoService(db)
     try:
         dados_iniciais = payload.dados_iniciais if payload else None
-        etapa = service.iniciar_fiscalizacao(fiscalizacao_id, dados_iniciais)
+        etapa = service.iniciar_fiscalizacao(fiscalizacao_id, dados_iniciais, usuario_id=current_user.id)
         return {
             'id': etapa.id,
             'fiscalizacao_id': etapa.fiscalizacao_id,
@@ -86,7 +111,9 @@ def transicionar_etapa(
     """Transiciona uma fiscalização para a próxima etapa"""
     service = EtapaFiscalizacaoService(db)
     try:
-        etapa = service.transicionar_etapa(fiscalizacao_id, payload.etapa_nova, payload.dados)
+        etapa = service.transicionar_etapa(
+            fiscalizacao_id, payload.etapa_nova, payload.dados, usuario_id=current_user.id
+        )
         return {
             'id': etapa.id,
             'fiscalizacao_id': etapa.fiscalizacao_id,
@@ -101,17 +128,63 @@ def transicionar_etapa(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro ao transicionar etapa") from err
 
 
+@router.post('/progresso')
+def obter_progresso_em_lote(
+    payload: ProgressoLotePayload,
+    current_user=Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Obtém o progresso de várias fiscalizações em uma chamada (grade do dashboard).
+
+    IDs inexistentes são listados em `nao_encontradas`.
+    """
+    service = EtapaFiscalizacaoService(db)
+    try:
+        progresso = service.obter_progresso_em_lote(payload.fiscalizacao_ids)
+        return {
+            'data': list(progresso.values()),
+            'nao_encontradas': [fid for fid in dict.fromkeys(payload.fiscalizacao_ids) if fid not in progresso],
+        }
+    except Exception as err:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro ao obter progresso") from err
+
+
 @router.get('/{fiscalizacao_id}/progresso')
-def obter_progresso(
+async def obter_progresso(
     fiscalizacao_id: int,
+    desde: Optional[str] = Query(None, description="Versão já conhecida; segura a resposta até mudar"),
+    timeout: float = Query(25.0, ge=0, le=60, description="Espera máxima do long-poll, em segundos"),
     current_user=Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Obtém o progresso completo de uma fiscalização"""
+    """
+    Obtém o progresso completo de uma fiscalização.
+
+    Com `desde`, vira long-poll: se a versão atual for igual, a resposta só sai quando o
+    progresso mudar ou o `timeout` expirar (devolvendo a mesma versão). A espera é um
+    future no event loop, sem thread ocupada; só as leituras do banco vão ao threadpool.
+    """
     service = EtapaFiscalizacaoService(db)
+
+    def ler_progresso():
+        # Fecha a sessão a cada leitura para não segurar conexão do pool durante a espera
+        try:
+            return service.obter_progresso_completo(fiscalizacao_id)
+        finally:
+            db.close()
+
+    loop = asyncio.get_running_loop()
+    prazo = loop.time() + timeout
     try:
-        progresso = service.obter_progresso_completo(fiscalizacao_id)
-        return progresso
+        while True:
+            marca = hub_progresso.versao(fiscalizacao_id)
+            progresso = await run_in_threadpool(ler_progresso)
+            versao = versao_progresso(progresso)
+            restante = prazo - loop.time()
+            if desde is None or versao != desde or restante <= 0:
+                return {**progresso, 'versao': versao}
+            await hub_progresso.aguardar(fiscalizacao_id, marca, restante)
     except ValueError as err:
         raise HTTPException(status_code=_value_error_to_status(err), detail=str(err)) from err
     except Exception as err:
@@ -125,15 +198,18 @@ def atualizar_progresso(
     current_user=Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Atualiza o progresso de uma etapa"""
-    service = EtapaFiscalizacaoService(db)
+    """
+    Atualiza o progresso de uma etapa.
+
+    Pode ser chamado a cada imagem processada: as atualizações são coalescidas e
+    gravadas no máximo uma vez por intervalo por etapa (100% e erros na hora).
+    `persistido` indica se esta chamada já foi gravada no banco.
+    """
     try:
-        etapa = service.atualizar_progresso(etapa_id, payload.progresso_percentual, payload.resultado)
-        return {
-            'id': etapa.id,
-            'progresso_percentual': etapa.progresso_percentual,
-            'resultado': etapa.resultado
-        }
+        etapa, persistido = obter_coalescedor().registrar(
+            db, etapa_id, payload.progresso_percentual, payload.resultado, payload.erro
+        )
+        return {**etapa, 'persistido': persistido}
     except ValueError as err:
         raise HTTPException(status_code=_value_error_to_status(err), detail=str(err)) from err
     except Exception as err:
@@ -143,26 +219,25 @@ def atualizar_progresso(
 @router.post('/{fiscalizacao_id}/upload', status_code=status.HTTP_201_CREATED)
 async def upload_arquivo(
     fiscalizacao_id: int,
+    background_tasks: BackgroundTasks,
     etapa_id: int = Form(...),
     tipo: str = Form(...),
     file: UploadFile = File(...),
     current_user=Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Upload de arquivo para a fiscalização (etapa ABASTECIMENTO)"""
+    """Upload de arquivo para a fiscalização (etapa ABASTECIMENTO), gravado em streaming no storage"""
     service = EtapaFiscalizacaoService(db)
     try:
-        # TODO: Implementar upload real para blob storage
-        # Por enquanto, retornar mock
-        arquivo = service.registrar_arquivo(
+        arquivo = await service.armazenar_arquivo(
             fiscalizacao_id=fiscalizacao_id,
             etapa_id=etapa_id,
             tipo=tipo,
-            nome_original=file.filename or "arquivo",
-            url_blob=f"/uploads/{fiscalizacao_id}/{file.filename}",
-            tamanho_bytes=0,  # TODO: Calcular tamanho real
-            mime_type=file.content_type or "application/octet-stream"
+            upload=file,
+            nome_arquivo=file.filename or "arquivo",
+            tipo_mime=file.content_type,
         )
+        agendar_ingestao(background_tasks, [arquivo.url_blob])
         
         return {
             'id': arquivo.id,
@@ -170,69 +245,232 @@ async def upload_arquivo(
             'tipo': arquivo.tipo,
             'nome_original': arquivo.nome_original,
             'url_blob': arquivo.url_blob,
+            'tamanho_bytes': arquivo.tamanho_bytes,
+            'mime_type': arquivo.mime_type,
+            'hash_sha256': (arquivo.metadados or {}).get('hash_sha256'),
             'created_at': arquivo.created_at.isoformat() if arquivo.created_at else None
         }
     except ValueError as err:
         raise HTTPException(status_code=_value_error_to_status(err), detail=str(err)) from err
     except Exception as err:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro ao fazer upload") from err
+    finally:
+        await file.close()
+
+
+@router.post('/{fiscalizacao_id}/upload-lote', status_code=status.HTTP_201_CREATED)
+async def upload_arquivos_em_lote(
+    fiscalizacao_id: int,
+    background_tasks: BackgroundTasks,
+    etapa_id: int = Form(...),
+    tipo: str = Form(...),
+    files: List[UploadFile] = File(...),
+    current_user=Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Upload de vários arquivos (ex: imagens de um sobrevoo) gravados em paralelo, com resultado por arquivo"""
+    service = EtapaFiscalizacaoService(db)
+    try:
+        resultados = await service.armazenar_arquivos_em_lote(fiscalizacao_id, etapa_id, tipo, files)
+        agendar_ingestao(background_tasks, [r['url_blob'] for r in resultados if 'erro' not in r])
+        
+        data = [{
+            'id': r.get('id'),
+            'nome_original': r['nome_original'],
+            'url_blob': r.get('url_blob'),
+            'tamanho_bytes': r.get('tamanho_bytes'),
+            'mime_type': r.get('mime_type'),
+            'hash_sha256': r['metadados']['hash_sha256'] if 'metadados' in r else None,
+            'erro': r.get('erro'),
+        } for r in resultados]
+        falhas = sum(1 for r in data if r['erro'])
+        return {'data': data, 'enviados': len(data) - falhas, 'falhas': falhas}
+    except ValueError as err:
+        raise HTTPException(status_code=_value_error_to_status(err), detail=str(err)) from err
+    except Exception as err:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro ao fazer upload") from err
+    finally:
+        for file in files:
+            await file.close()
 
 
 @router.get('/{fiscalizacao_id}/arquivos')
-def listar_arquivos(
+async def listar_arquivos(
     fiscalizacao_id: int,
     tipo: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
     current_user=Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Lista arquivos de uma fiscalização"""
+    """
+    Lista arquivos de uma fiscalização (catálogo no banco), com paginação por cursor.
+
+    Para a próxima página, repita a chamada com `cursor=pagination.next_cursor`.
+    Com storage que assina URLs (Azure), originais e derivados vêm com URL de
+    leitura direta assinada em um único lote para a página inteira da galeria.
+    """
     service = EtapaFiscalizacaoService(db)
     try:
-        arquivos = service.obter_arquivos(fiscalizacao_id, tipo)
-        return [{
-            'id': arquivo.id,
-            'tipo': arquivo.tipo,
-            'nome_original': arquivo.nome_original,
-            'url_blob': arquivo.url_blob,
-            'tamanho_bytes': arquivo.tamanho_bytes,
-            'mime_type': arquivo.mime_type,
-            'created_at': arquivo.created_at.isoformat() if arquivo.created_at else None
-        } for arquivo in arquivos]
+        arquivos, proximo_cursor = await run_in_threadpool(
+            service.obter_arquivos, fiscalizacao_id, tipo, limit, cursor
+        )
+        urls = await service.assinar_urls(arquivos)
+        return {
+            'data': [{
+                'id': arquivo.id,
+                'tipo': arquivo.tipo,
+                'nome_original': arquivo.nome_original,
+                'url_blob': arquivo.url_blob,
+                'url_assinada': urls.get(arquivo.url_blob),
+                'tamanho_bytes': arquivo.tamanho_bytes,
+                'mime_type': arquivo.mime_type,
+                'gps': (arquivo.metadados or {}).get('gps'),
+                'miniatura_url': url_derivado(arquivo, 'miniatura', urls),
+                'previa_url': url_derivado(arquivo, 'previa', urls),
+                'piramide_url': url_piramide(arquivo),
+                'duplicata_de': (arquivo.metadados or {}).get('duplicata_de'),
+                'disponivel': not (arquivo.metadados or {}).get('ausente_no_storage'),
+                'created_at': arquivo.created_at.isoformat() if arquivo.created_at else None
+            } for arquivo in arquivos],
+            'pagination': {
+                'limit': limit,
+                'next_cursor': proximo_cursor,
+                'has_next': proximo_cursor is not None,
+            },
+        }
+    except ValueError as err:
+        raise HTTPException(status_code=_value_error_to_status(err), detail=str(err)) from err
     except Exception as err:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro ao listar arquivos") from err
 
 
-@router.post('/{fiscalizacao_id}/iniciar-analise')
+@router.get('/arquivos/{arquivo_id}/piramide.dzi')
+def obter_descritor_piramide(
+    arquivo_id: int,
+    current_user=Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Descritor Deep Zoom (DZI) da imagem, para visualizadores como o OpenSeadragon"""
+    service = PiramideService(db)
+    try:
+        return Response(
+            content=descritor_dzi(service.obter_piramide(arquivo_id)),
+            media_type='application/xml',
+            headers={'Cache-Control': 'private, max-age=31536000, immutable'},
+        )
+    except ValueError as err:
+        raise HTTPException(status_code=_value_error_to_status(err), detail=str(err)) from err
+    except Exception as err:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro ao obter pirâmide") from err
+
+
+@router.get('/arquivos/{arquivo_id}/piramide_files/{nivel}/{coluna}_{linha}.jpg')
+async def obter_tile_piramide(
+    arquivo_id: int,
+    nivel: int,
+    coluna: int,
+    linha: int,
+    current_user=Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Tile JPEG da pirâmide (layout `_files/{nivel}/{coluna}_{linha}` do DZI)"""
+    service = PiramideService(db)
+    try:
+        return Response(
+            content=await service.obter_tile(arquivo_id, nivel, coluna, linha),
+            media_type='image/jpeg',
+            headers={'Cache-Control': 'private, max-age=31536000, immutable'},
+        )
+    except ValueError as err:
+        raise HTTPException(status_code=_value_error_to_status(err), detail=str(err)) from err
+    except Exception as err:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro ao obter tile") from err
+
+
+@router.get('/arquivos/{arquivo_id}/original')
+async def obter_original_arquivo(
+    arquivo_id: int,
+    request: Request,
+    current_user=Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Arquivo original enviado, com suporte a `Range` (visualizadores e vídeos pedem só o trecho exibido)"""
+    service = EtapaFiscalizacaoService(db)
+    try:
+        chave, tipo_mime = await run_in_threadpool(service.obter_chave_original, arquivo_id)
+        return await responder_objeto(
+            service.storage,
+            chave,
+            request.headers,
+            media_type=tipo_mime,
+            # A chave é o hash do conteúdo: nunca muda
+            headers={'Cache-Control': 'private, max-age=31536000, immutable'},
+        )
+    except FileNotFoundError as err:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Arquivo não encontrado no storage") from err
+    except ValueError as err:
+        raise HTTPException(status_code=_value_error_to_status(err), detail=str(err)) from err
+    except Exception as err:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro ao obter arquivo") from err
+
+
+@router.get('/arquivos/{arquivo_id}/{variante}')
+async def obter_derivado_arquivo(
+    arquivo_id: int,
+    variante: str,
+    request: Request,
+    current_user=Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Miniatura ou prévia web (JPEG) gerada na ingestão da imagem"""
+    if variante not in VARIANTES:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Variante '{variante}' não encontrada")
+    service = EtapaFiscalizacaoService(db)
+    try:
+        chave = await run_in_threadpool(service.obter_chave_derivado, arquivo_id, variante)
+        return await responder_objeto(
+            service.storage,
+            chave,
+            request.headers,
+            media_type='image/jpeg',
+            # A chave é derivada do conteúdo do original: nunca muda
+            headers={'Cache-Control': 'private, max-age=31536000, immutable'},
+        )
+    except FileNotFoundError as err:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Imagem não encontrada no storage") from err
+    except ValueError as err:
+        raise HTTPException(status_code=_value_error_to_status(err), detail=str(err)) from err
+    except Exception as err:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro ao obter imagem") from err
+
+
+@router.post('/{fiscalizacao_id}/iniciar-analise', status_code=status.HTTP_202_ACCEPTED)
 def iniciar_analise_ia(
     fiscalizacao_id: int,
     payload: IniciarAnaliseIAPayload,
     current_user=Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Inicia análise de IA nas imagens (etapa ANALISE_IA)"""
-    service = EtapaFiscalizacaoService(db)
+    """
+    Enfileira a análise de IA das imagens (etapa ANALISE_IA) e responde na hora
+
+    O processamento fica com os workers (`manage_db.py worker-ia`); acompanhe
+    por `GET /jobs/{job_id}` e leia o resultado em `/etapa/{etapa_id}/resultado-ia`.
+    Com lotes (`ia_lotes`), o pedido aguarda outros até formar um job:
+    `job_id` fica nulo até lá e aparece no resultado de IA.
+    """
+    service = AnaliseIAService(db)
     try:
-        # TODO: Integrar com skypilot_service.py
-        # Por enquanto, registrar resultado mock
-        resultado = service.registrar_resultado_ia(
-            etapa_id=payload.etapa_id,
-            deteccoes=[
-                {"tipo": "buraco", "confianca": 0.85, "localizacao": {"x": 100, "y": 200}}
-            ],
-            confianca_media=0.85,
-            job_id=f"job_{fiscalizacao_id}",
-            modelo_utilizado="yolov8",
-            tempo_processamento=45.5
-        )
-        
+        resultado, job, imagens, duplicatas = service.solicitar(fiscalizacao_id, payload.etapa_id)
         return {
             'id': resultado.id,
             'etapa_id': resultado.etapa_id,
-            'job_id': resultado.job_id,
-            'classificacao_geral': resultado.classificacao_geral,
-            'confianca_media': resultado.confianca_media,
-            'deteccoes': resultado.deteccoes,
-            'status_processamento': resultado.status_processamento
+            'job_id': job.id if job else None,
+            'status_job': job.status if job else 'aguardando_lote',
+            'status_processamento': resultado.status_processamento,
+            'imagens_analisadas': len(imagens),
+            'duplicatas_ignoradas': len(duplicatas),
         }
     except ValueError as err:
         raise HTTPException(status_code=_value_error_to_status(err), detail=str(err)) from err
@@ -240,6 +478,34 @@ def iniciar_analise_ia(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro ao iniciar análise") from err
 
 
+@router.get('/jobs/{job_id}')
+def obter_job(
+    job_id: int,
+    current_user=Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Situação de um job da fila (status, progresso, tentativas)"""
+    try:
+        job = FilaJobs(db).obter(job_id)
+        return {
+            'id': job.id,
+            'tipo': job.tipo,
+            'status': job.status,
+            'progresso': job.progresso,
+            'mensagem': job.mensagem,
+            'tentativas': job.tentativas,
+            'max_tentativas': job.max_tentativas,
+            'erro': job.erro,
+            'disponivel_em': job.disponivel_em,
+            'iniciado_em': job.iniciado_em,
+            'concluido_em': job.concluido_em,
+        }
+    except ValueError as err:
+        raise HTTPException(status_code=_value_error_to_status(err), detail=str(err)) from err
+    except Exception as err:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro ao obter job") from err
+
+
 @router.get('/etapa/{etapa_id}/resultado-ia')
 def obter_resultado_ia(
     etapa_id: int,
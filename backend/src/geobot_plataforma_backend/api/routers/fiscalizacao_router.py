@@ -1,12 +1,21 @@
 """Router (FastAPI) para rotas de fiscalização"""
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
+from src.geobot_plataforma_backend.api.dependencies import get_usuario_loader
 from src.geobot_plataforma_backend.core.database import get_db
-from src.geobot_plataforma_backend.domain.entity.enums import StatusFiscalizacao
+from src.geobot_plataforma_backend.domain.entity.enums import (
+    CategoriaDenuncia,
+    StatusDenuncia,
+    StatusFiscalizacao,
+)
+from src.geobot_plataforma_backend.domain.repository.usuario_loader import UsuarioLoader
+from src.geobot_plataforma_backend.domain.service.atribuicao_service import AtribuicaoService
+from src.geobot_plataforma_backend.domain.service.hotspot_service import HotspotService
+from src.geobot_plataforma_backend.domain.service.rota_service import RotaService
 from src.geobot_plataforma_backend.domain.service.fiscalizacao_service import (
     FiscalizacaoService,
     AutorizacaoError,
@@ -23,6 +32,15 @@ class FiscalizacaoCreatePayload(BaseModel):
     fiscais_ids: Optional[List[int]] = None  # Lista de IDs de fiscais a atribuir
 
 
+class FiscalizacaoLotePayload(BaseModel):
+    itens: List[FiscalizacaoCreatePayload] = Field(..., min_items=1, max_items=FiscalizacaoService.MAX_ITENS_LOTE)
+
+
+class AtribuicaoAutomaticaPayload(BaseModel):
+    denuncia_ids: Optional[List[int]] = None  # Sem lista, considera todas as denúncias abertas
+    limite: Optional[int] = Field(None, ge=1, le=FiscalizacaoService.MAX_ITENS_LOTE)
+
+
 class FiscalizacaoAdicionarFiscalPayload(BaseModel):
     fiscal_id: int
     papel: str = "auxiliar"  # "responsavel" ou "auxiliar"
@@ -36,15 +54,23 @@ class StatusUpdatePayload(BaseModel):
     status: StatusFiscalizacao
 
 
-def _to_dict(f):
-    """Converte fiscalização para dict com suporte a múltiplos fiscais"""
+def _to_dict(f, usuarios: Optional[UsuarioLoader] = None):
+    """Converte fiscalização para dict com suporte a múltiplos fiscais.
+
+    Com `usuarios`, os fiscais são resolvidos pelo loader da requisição (um único
+    SELECT ... IN para todos os que ainda não foram carregados).
+    """
+    if usuarios is not None:
+        usuarios.agendar(a.usuario_id for a in f.fiscais_atribuidos)
+
     # Obter todos os fiscais com seus papéis
     fiscais_data = []
     for atribuicao in f.fiscais_atribuidos:
+        usuario = usuarios.carregar(atribuicao.usuario_id) if usuarios is not None else atribuicao.usuario
         fiscais_data.append({
             'id': atribuicao.usuario_id,
-            'nome': atribuicao.usuario.nome if atribuicao.usuario else None,
-            'email': atribuicao.usuario.email if atribuicao.usuario else None,
+            'nome': usuario.nome if usuario else None,
+            'email': usuario.email if usuario else None,
             'papel': atribuicao.papel,
             'data_atribuicao': atribuicao.data_atribuicao.isoformat() if atribuicao.data_atribuicao else None
         })
@@ -73,6 +99,81 @@ def _to_dict(f):
     }
 
 
+def _to_dict_lista(fiscalizacoes, usuarios: UsuarioLoader):
+    """Serializa uma página reaproveitando os usuários já carregados por selectinload"""
+    usuarios.preparar(a.usuario for f in fiscalizacoes for a in f.fiscais_atribuidos)
+    return [_to_dict(f, usuarios) for f in fiscalizacoes]
+
+
+def _to_resumo(f):
+    """Versão compacta para painéis: apenas identificação, status e última atualização"""
+    return {
+        'id': f.id,
+        'uuid': str(f.uuid),
+        'codigo': f.codigo,
+        'complaint_id': f.denuncia_id,
+        'status_fiscalizacao': f.status.value if hasattr(f.status, 'value') else f.status,
+        'data_atualizacao': f.updated_at.isoformat() if f.updated_at else None,
+    }
+
+
+def _historico_to_dict(evento, usuarios: UsuarioLoader):
+    """Converte um evento do histórico para dict"""
+    usuario = usuarios.carregar(evento.usuario_id) if evento.usuario_id else None
+    return {
+        'id': evento.id,
+        'fiscalizacao_id': evento.fiscalizacao_id,
+        'tipo_evento': evento.tipo_evento,
+        'status_anterior': evento.valor_anterior,
+        'status_novo': evento.valor_novo,
+        'usuario_id': evento.usuario_id,
+        'usuario_nome': usuario.nome if usuario else None,
+        'dados': evento.dados,
+        'observacoes': evento.observacoes,
+        'timestamp': evento.created_at.isoformat() if evento.created_at else None,
+    }
+
+
+def _atribuicao_to_dict(resultado):
+    """Converte o resultado da atribuição automática para dict"""
+    return {
+        'sugestoes': [
+            {
+                'complaint_id': s.denuncia_id,
+                'fiscal_id': s.fiscal_id,
+                'distancia_km': s.distancia_km,
+                'carga_atual': s.carga_atual,
+                'alternativas': s.alternativas,
+            }
+            for s in resultado.sugestoes
+        ],
+        'sem_coordenadas': resultado.sem_coordenadas,
+        'sem_capacidade': resultado.sem_capacidade,
+    }
+
+
+def _hotspots_to_dict(resultado):
+    """Converte o resultado da detecção de hotspots para dict"""
+    return {
+        'data': [
+            {
+                'quantidade': h.quantidade,
+                'centro': {'latitude': h.centro_latitude, 'longitude': h.centro_longitude},
+                'raio_km': h.raio_km,
+                'bbox': h.bbox,
+                'categorias': h.categorias,
+                'complaint_ids': h.denuncia_ids,
+                'fiscalizacao_ids': h.fiscalizacao_ids,
+            }
+            for h in resultado.hotspots
+        ],
+        'total_denuncias': resultado.total_denuncias,
+        'total_ruido': resultado.total_ruido,
+        'raio_m': resultado.raio_m,
+        'min_denuncias': resultado.min_denuncias,
+    }
+
+
 def _value_error_to_status(err: ValueError) -> int:
     mensagem = str(err).lower()
     if "não encontrada" in mensagem or "nao encontrada" in mensagem:
@@ -84,7 +185,8 @@ def _value_error_to_status(err: ValueError) -> int:
 def criar_fiscalizacao(
     payload: FiscalizacaoCreatePayload,
     current_user=Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    usuarios: UsuarioLoader = Depends(get_usuario_loader),
 ):
     """
     Cria nova fiscalização com múltiplos fiscais.
@@ -98,7 +200,7 @@ def criar_fiscalizacao(
             usuario_id=current_user.id,
             fiscais_ids=payload.fiscais_ids  # NOVO: Aceita lista de fiscais
         )
-        return _to_dict(fiscalizacao)
+        return _to_dict_lista([fiscalizacao], usuarios)[0]
     except AutorizacaoError as err:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(err)) from err
     except ValueError as err:
@@ -107,6 +209,89 @@ def criar_fiscalizacao(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro ao criar fiscalização") from err
 
 
+@router.post('/lote', status_code=status.HTTP_201_CREATED)
+def criar_fiscalizacoes_em_lote(
+    payload: FiscalizacaoLotePayload,
+    current_user=Depends(get_current_user),
+    db: Session = Depends(get_db),
+    usuarios: UsuarioLoader = Depends(get_usuario_loader),
+):
+    """
+    Abre fiscalizações para várias denúncias de uma vez (ex.: após uma triagem).
+    A operação é atômica: se alguma denúncia ou fiscal for inválido, nenhuma é criada.
+    """
+    service = FiscalizacaoService(db)
+    try:
+        fiscalizacoes = service.criar_fiscalizacoes_em_lote(
+            itens=[
+                {
+                    'denuncia_id': item.complaint_id,
+                    'observacoes': item.observacoes,
+                    'fiscais_ids': item.fiscais_ids,
+                }
+                for item in payload.itens
+            ],
+            usuario_id=current_user.id,
+        )
+        return {"data": _to_dict_lista(fiscalizacoes, usuarios)}
+    except AutorizacaoError as err:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(err)) from err
+    except ValueError as err:
+        raise HTTPException(status_code=_value_error_to_status(err), detail=str(err)) from err
+    except Exception as err:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro ao criar fiscalizações em lote") from err
+
+
+@router.get('/atribuicao/sugestoes')
+def sugerir_atribuicao(
+    denuncia_ids: Optional[List[int]] = Query(None),
+    limite: Optional[int] = Query(None, ge=1),
+    current_user=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Sugere fiscais para denúncias abertas equilibrando carga atual e distância.
+    Nada é gravado; use POST /atribuicao/automatica para aplicar.
+    """
+    service = AtribuicaoService(db)
+    try:
+        resultado = service.sugerir(current_user.id, denuncia_ids=denuncia_ids, limite=limite)
+        return _atribuicao_to_dict(resultado)
+    except AutorizacaoError as err:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(err)) from err
+    except ValueError as err:
+        raise HTTPException(status_code=_value_error_to_status(err), detail=str(err)) from err
+    except Exception as err:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro ao sugerir atribuição de fiscais") from err
+
+
+@router.post('/atribuicao/automatica', status_code=status.HTTP_201_CREATED)
+def atribuir_automaticamente(
+    payload: AtribuicaoAutomaticaPayload,
+    current_user=Depends(get_current_user),
+    db: Session = Depends(get_db),
+    usuarios: UsuarioLoader = Depends(get_usuario_loader),
+):
+    """
+    Abre fiscalizações para as denúncias abertas com os fiscais sugeridos, em uma única transação.
+    Até 200 denúncias por chamada (o limite da criação em lote); chame de novo para as seguintes.
+    """
+    service = AtribuicaoService(db)
+    try:
+        fiscalizacoes, resultado = service.atribuir_automaticamente(
+            current_user.id, denuncia_ids=payload.denuncia_ids, limite=payload.limite
+        )
+        resposta = _atribuicao_to_dict(resultado)
+        resposta['data'] = _to_dict_lista(fiscalizacoes, usuarios)
+        return resposta
+    except AutorizacaoError as err:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(err)) from err
+    except ValueError as err:
+        raise HTTPException(status_code=_value_error_to_status(err), detail=str(err)) from err
+    except Exception as err:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro ao atribuir fiscais automaticamente") from err
+
+
 @router.get('/', response_model=List[dict])
 def listar_fiscalizacoes(
     status_filter: Optional[StatusFiscalizacao] = None,
@@ -114,7 +299,8 @@ def listar_fiscalizacoes(
     limit: int = 50,
     offset: int = 0,
     current_user=Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    usuarios: UsuarioLoader = Depends(get_usuario_loader),
 ):
     """Lista fiscalizações com filtros."""
     service = FiscalizacaoService(db)
@@ -126,7 +312,7 @@ def listar_fiscalizacoes(
             limit=limit,
             offset=offset
         )
-        return [_to_dict(f) for f in fiscalizacoes]
+        return _to_dict_lista(fiscalizacoes, usuarios)
     except AutorizacaoError as err:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(err)) from err
     except ValueError as err:
@@ -135,20 +321,43 @@ def listar_fiscalizacoes(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro ao listar fiscalizações") from err
 
 
-@router.get('/minhas', response_model=List[dict])
+@router.get('/minhas')
 def listar_minhas_fiscalizacoes(
     status_filter: Optional[StatusFiscalizacao] = None,
+    incluir_encerradas: bool = False,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    resumo: bool = False,
     current_user=Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    usuarios: UsuarioLoader = Depends(get_usuario_loader),
 ):
-    """Lista fiscalizações do fiscal autenticado."""
+    """
+    Lista fiscalizações do fiscal autenticado com paginação por cursor.
+
+    Por padrão retorna só as ativas; `incluir_encerradas=true` anexa as concluídas e
+    canceladas depois delas. `resumo=true` devolve a versão compacta, sem fiscais.
+    Para a próxima página, repita a chamada com `cursor=pagination.next_cursor`.
+    """
     service = FiscalizacaoService(db)
     try:
-        fiscalizacoes = service.listar_minhas_fiscalizacoes(
+        fiscalizacoes, proximo_cursor = service.listar_minhas_fiscalizacoes(
             usuario_id=current_user.id,
-            status_filter=status_filter
+            status_filter=status_filter,
+            incluir_encerradas=incluir_encerradas,
+            limit=limit,
+            cursor=cursor,
+            resumo=resumo,
         )
-        return [_to_dict(f) for f in fiscalizacoes]
+        data = [_to_resumo(f) for f in fiscalizacoes] if resumo else _to_dict_lista(fiscalizacoes, usuarios)
+        return {
+            "data": data,
+            "pagination": {
+                "limit": limit,
+                "next_cursor": proximo_cursor,
+                "has_next": proximo_cursor is not None,
+            },
+        }
     except AutorizacaoError as err:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(err)) from err
     except ValueError as err:
@@ -157,17 +366,104 @@ def listar_minhas_fiscalizacoes(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro ao listar minhas fiscalizações") from err
 
 
+@router.get('/rota')
+def planejar_rota(
+    fiscal_id: Optional[int] = None,
+    origem_latitude: Optional[float] = Query(None, ge=-90, le=90),
+    origem_longitude: Optional[float] = Query(None, ge=-180, le=180),
+    retornar: bool = False,
+    current_user=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Planeja a ordem de visita das fiscalizações ativas de um fiscal (padrão: o autenticado).
+
+    Usa vizinho mais próximo + 2-opt sobre distâncias haversine. Com origem (ex.: posição
+    atual), a rota parte dela; `retornar=true` inclui a volta no total.
+    """
+    service = RotaService(db)
+    try:
+        rota = service.planejar(
+            usuario_id=current_user.id,
+            fiscal_id=fiscal_id,
+            origem_latitude=origem_latitude,
+            origem_longitude=origem_longitude,
+            retornar=retornar,
+        )
+        return {
+            'fiscal_id': rota.fiscal_id,
+            'paradas': [
+                {
+                    'ordem': ordem,
+                    'fiscalizacao_id': p.fiscalizacao_id,
+                    'codigo': p.codigo,
+                    'complaint_id': p.denuncia_id,
+                    'endereco': p.endereco,
+                    'latitude': p.latitude,
+                    'longitude': p.longitude,
+                    'distancia_desde_anterior_km': p.distancia_desde_anterior_km,
+                }
+                for ordem, p in enumerate(rota.paradas, start=1)
+            ],
+            'distancia_total_km': rota.distancia_total_km,
+            'retorna_a_origem': rota.retorna_a_origem,
+            'sem_coordenadas': rota.sem_coordenadas,
+        }
+    except AutorizacaoError as err:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(err)) from err
+    except ValueError as err:
+        raise HTTPException(status_code=_value_error_to_status(err), detail=str(err)) from err
+    except Exception as err:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro ao planejar rota") from err
+
+
+@router.get('/hotspots')
+def detectar_hotspots(
+    raio_m: Optional[float] = Query(None, gt=0, le=5000),
+    min_denuncias: Optional[int] = Query(None, ge=2, le=1000),
+    categoria: Optional[List[CategoriaDenuncia]] = Query(None),
+    status_denuncia: Optional[List[StatusDenuncia]] = Query(None, alias='status'),
+    limit: int = Query(50, ge=1, le=500),
+    current_user=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Propõe hotspots (clusters DBSCAN) de denúncias para planejar sobrevoos.
+
+    Cada hotspot traz centro, raio e bbox para o plano de voo e as fiscalizações ativas
+    que um único sobrevoo cobriria. Filtros `categoria` e `status` aceitam vários valores.
+    """
+    service = HotspotService(db)
+    try:
+        resultado = service.detectar(
+            usuario_id=current_user.id,
+            raio_m=raio_m,
+            min_denuncias=min_denuncias,
+            categorias=categoria,
+            status=status_denuncia,
+            limite=limit,
+        )
+        return _hotspots_to_dict(resultado)
+    except AutorizacaoError as err:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(err)) from err
+    except ValueError as err:
+        raise HTTPException(status_code=_value_error_to_status(err), detail=str(err)) from err
+    except Exception as err:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro ao detectar hotspots") from err
+
+
 @router.get('/{id}')
 def obter_fiscalizacao(
     id: int,
     current_user=Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    usuarios: UsuarioLoader = Depends(get_usuario_loader),
 ):
     """Busca uma fiscalização por ID."""
     service = FiscalizacaoService(db)
     try:
         fiscalizacao = service.buscar_fiscalizacao(id, current_user.id)
-        return _to_dict(fiscalizacao)
+        return _to_dict_lista([fiscalizacao], usuarios)[0]
     except AutorizacaoError as err:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(err)) from err
     except ValueError as err:
@@ -181,7 +477,8 @@ def adicionar_fiscal(
     id: int,
     payload: FiscalizacaoAdicionarFiscalPayload,
     current_user=Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    usuarios: UsuarioLoader = Depends(get_usuario_loader),
 ):
     """Adiciona um fiscal a uma fiscalização existente."""
     service = FiscalizacaoService(db)
@@ -192,7 +489,7 @@ def adicionar_fiscal(
             usuario_id=current_user.id,
             papel=payload.papel
         )
-        return _to_dict(fiscalizacao)
+        return _to_dict_lista([fiscalizacao], usuarios)[0]
     except AutorizacaoError as err:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(err)) from err
     except ValueError as err:
@@ -206,7 +503,8 @@ def remover_fiscal(
     id: int,
     fiscal_id: int,
     current_user=Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    usuarios: UsuarioLoader = Depends(get_usuario_loader),
 ):
     """Remove um fiscal de uma fiscalização."""
     service = FiscalizacaoService(db)
@@ -216,7 +514,7 @@ def remover_fiscal(
             fiscal_id=fiscal_id,
             usuario_id=current_user.id
         )
-        return _to_dict(fiscalizacao)
+        return _to_dict_lista([fiscalizacao], usuarios)[0]
     except AutorizacaoError as err:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(err)) from err
     except ValueError as err:
@@ -230,13 +528,14 @@ def atualizar_status_fiscalizacao(
     id: int,
     payload: StatusUpdatePayload,
     current_user=Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    usuarios: UsuarioLoader = Depends(get_usuario_loader),
 ):
     """Atualiza o status de uma fiscalização."""
     service = FiscalizacaoService(db)
     try:
         fiscalizacao = service.atualizar_status(id, payload.status, current_user.id)
-        return _to_dict(fiscalizacao)
+        return _to_dict_lista([fiscalizacao], usuarios)[0]
     except AutorizacaoError as err:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(err)) from err
     except ValueError as err:
@@ -246,6 +545,35 @@ def atualizar_status_fiscalizacao(
 
 
 @router.get('/{id}/historico')
-def obter_historico(id: int):
-    """Obtém o histórico de uma fiscalização (não implementado)."""
-    raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail='Histórico não implementado')
+def obter_historico(
+    id: int,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    current_user=Depends(get_current_user),
+    db: Session = Depends(get_db),
+    usuarios: UsuarioLoader = Depends(get_usuario_loader),
+):
+    """Obtém o histórico de uma fiscalização, do evento mais recente para o mais antigo."""
+    service = FiscalizacaoService(db)
+    try:
+        eventos, proximo_cursor = service.listar_historico(
+            fiscalizacao_id=id,
+            usuario_id=current_user.id,
+            limit=limit,
+            cursor=cursor,
+        )
+        usuarios.agendar(e.usuario_id for e in eventos)
+        return {
+            "data": [_historico_to_dict(e, usuarios) for e in eventos],
+            "pagination": {
+                "limit": limit,
+                "next_cursor": proximo_cursor,
+                "has_next": proximo_cursor is not None,
+            },
+        }
+    except AutorizacaoError as err:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(err)) from err
+    except ValueError as err:
+        raise HTTPException(status_code=_value_error_to_status(err), detail=str(err)) from err
+    except Exception as err:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro ao obter histórico da fiscalização") from err
@@ -0,0 +1,163 @@
+"""Router (FastAPI) para lotes de sobrevoo compartilhados entre fiscalizações"""
+from typing import List, Optional
+
+from fastapi import APIRouter, BackgroundTasks, Depends, File, Form, HTTPException, UploadFile, status
+from pydantic import BaseModel, Field
+from sqlalchemy.orm import Session
+
+from src.geobot_plataforma_backend.core.database import get_db
+from src.geobot_plataforma_backend.domain.service.fiscalizacao_service import AutorizacaoError
+from src.geobot_plataforma_backend.domain.service.ingestao_imagem_service import agendar_ingestao
+from src.geobot_plataforma_backend.domain.service.sobrevoo_service import SobrevooService
+from src.geobot_plataforma_backend.security.dependencies import get_current_user
+
+router = APIRouter(prefix='/sobrevoos', tags=['sobrevoos'])
+
+
+class SobrevooLotePayload(BaseModel):
+    """Payload para planejar um lote de sobrevoo"""
+    poligono: List[List[float]] = Field(..., min_items=3, max_items=500)  # [[lat, lon], ...]
+    fiscalizacao_ids: Optional[List[int]] = None  # Restringe às fiscalizações informadas
+    largura_faixa_m: Optional[float] = Field(None, gt=0, le=1000)
+    sobreposicao: Optional[float] = Field(None, ge=0, lt=1)
+    observacoes: Optional[str] = None
+
+
+def _lote_to_dict(lote, ignoradas: Optional[List[int]] = None):
+    """Converte o lote de sobrevoo para dict"""
+    dados = {
+        'id': lote.id,
+        'codigo': lote.codigo,
+        'status': lote.status,
+        'poligono': lote.poligono,
+        'plano_voo': lote.plano_voo,
+        'largura_faixa_m': lote.largura_faixa_m,
+        'sobreposicao': lote.sobreposicao,
+        'distancia_km': lote.distancia_km,
+        'fiscalizacao_ids': lote.fiscalizacao_ids,
+        'observacoes': lote.observacoes,
+        'usuario_id': lote.usuario_id,
+        'created_at': lote.created_at.isoformat() if lote.created_at else None,
+        'updated_at': lote.updated_at.isoformat() if lote.updated_at else None,
+    }
+    if ignoradas is not None:
+        dados['fiscalizacoes_ignoradas'] = ignoradas
+    return dados
+
+
+def _value_error_to_status(err: ValueError) -> int:
+    mensagem = str(err).lower()
+    if "não encontrad" in mensagem or "nao encontrad" in mensagem:
+        return status.HTTP_404_NOT_FOUND
+    return status.HTTP_400_BAD_REQUEST
+
+
+@router.post('/', status_code=status.HTTP_201_CREATED)
+def planejar_lote(
+    payload: SobrevooLotePayload,
+    current_user=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Planeja um sobrevoo que cobre todas as fiscalizações ativas dentro do polígono.
+
+    Gera o plano de voo em zigue-zague e abre a etapa SOBREVOO das fiscalizações cobertas.
+    """
+    service = SobrevooService(db)
+    try:
+        lote, ignoradas = service.planejar_lote(
+            usuario_id=current_user.id,
+            poligono=payload.poligono,
+            fiscalizacao_ids=payload.fiscalizacao_ids,
+            largura_faixa_m=payload.largura_faixa_m,
+            sobreposicao=payload.sobreposicao,
+            observacoes=payload.observacoes,
+        )
+        return _lote_to_dict(lote, ignoradas)
+    except AutorizacaoError as err:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(err)) from err
+    except ValueError as err:
+        raise HTTPException(status_code=_value_error_to_status(err), detail=str(err)) from err
+    except Exception as err:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro ao planejar sobrevoo") from err
+
+
+@router.get('/{id}')
+def obter_lote(
+    id: int,
+    current_user=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Obtém um lote de sobrevoo com seu plano de voo"""
+    service = SobrevooService(db)
+    try:
+        return _lote_to_dict(service.obter_lote(id))
+    except ValueError as err:
+        raise HTTPException(status_code=_value_error_to_status(err), detail=str(err)) from err
+    except Exception as err:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro ao obter sobrevoo") from err
+
+
+@router.post('/{id}/concluir-voo')
+def concluir_voo(
+    id: int,
+    current_user=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Conclui o voo: todas as fiscalizações do lote passam de SOBREVOO para ABASTECIMENTO"""
+    service = SobrevooService(db)
+    try:
+        return _lote_to_dict(service.concluir_voo(id, current_user.id))
+    except AutorizacaoError as err:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(err)) from err
+    except ValueError as err:
+        raise HTTPException(status_code=_value_error_to_status(err), detail=str(err)) from err
+    except Exception as err:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro ao concluir voo") from err
+
+
+@router.post('/{id}/imagens', status_code=status.HTTP_201_CREATED)
+async def enviar_imagem(
+    id: int,
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    latitude: Optional[float] = Form(None),
+    longitude: Optional[float] = Form(None),
+    altitude_m: Optional[float] = Form(None),
+    current_user=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Envia uma imagem do sobrevoo: gravada uma vez no storage e registrada na etapa
+    ABASTECIMENTO de cada fiscalização coberta pelo lote.
+    """
+    service = SobrevooService(db)
+    metadados = {
+        chave: valor
+        for chave, valor in (('latitude', latitude), ('longitude', longitude), ('altitude_m', altitude_m))
+        if valor is not None
+    }
+    try:
+        chave, tamanho, fiscalizacao_ids = await service.registrar_imagem(
+            lote_id=id,
+            usuario_id=current_user.id,
+            upload=file,
+            nome_arquivo=file.filename or "imagem",
+            tipo_mime=file.content_type,
+            metadados=metadados,
+        )
+        agendar_ingestao(background_tasks, [chave])
+        return {
+            'lote_id': id,
+            'chave_storage': chave,
+            'tamanho_bytes': tamanho,
+            'fiscalizacao_ids': fiscalizacao_ids,
+        }
+    except AutorizacaoError as err:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(err)) from err
+    except ValueError as err:
+        raise HTTPException(status_code=_value_error_to_status(err), detail=str(err)) from err
+    except Exception as err:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro ao enviar imagem do sobrevoo") from err
+    finally:
+        await file.close()
@@ -0,0 +1,181 @@
+"""Router (FastAPI) para uploads retomáveis (estilo tus) de mídias grandes"""
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Request, Response, status
+from pydantic import BaseModel, Field
+from sqlalchemy.orm import Session
+
+from src.geobot_plataforma_backend.core.database import get_db
+from src.geobot_plataforma_backend.domain.service.fiscalizacao_service import AutorizacaoError
+from src.geobot_plataforma_backend.domain.service.ingestao_imagem_service import agendar_ingestao
+from src.geobot_plataforma_backend.domain.service.upload_retomavel_service import UploadRetomavelService
+from src.geobot_plataforma_backend.security.dependencies import get_current_user
+
+router = APIRouter(prefix='/uploads', tags=['uploads'])
+
+TIPO_CONTEUDO_PARTE = 'application/offset+octet-stream'
+
+
+class CriarUploadPayload(BaseModel):
+    """Payload para abrir um upload retomável"""
+    fiscalizacao_id: int
+    etapa_id: int
+    tipo: str = Field(..., max_length=50)
+    nome_arquivo: str = Field(..., min_length=1)
+    tamanho_bytes: int = Field(..., gt=0)
+    mime_type: Optional[str] = None
+
+
+def _upload_to_dict(upload):
+    """Converte o upload retomável para dict"""
+    return {
+        'id': str(upload.uuid),
+        'fiscalizacao_id': upload.fiscalizacao_id,
+        'etapa_id': upload.etapa_id,
+        'nome_original': upload.nome_original,
+        'mime_type': upload.mime_type,
+        'tamanho_bytes': upload.tamanho_bytes,
+        'offset': upload.recebido_bytes,
+        'concluido': upload.concluido,
+        'arquivo_id': upload.arquivo_id,
+        'expira_em': upload.expira_em.isoformat() if upload.expira_em else None,
+    }
+
+
+def _cabecalhos(upload):
+    return {
+        'Upload-Offset': str(upload.recebido_bytes),
+        'Upload-Length': str(upload.tamanho_bytes),
+        'Upload-Expires': upload.expira_em.isoformat() if upload.expira_em else '',
+        'Cache-Control': 'no-store',
+    }
+
+
+def _value_error_to_status(err: ValueError) -> int:
+    mensagem = str(err).lower()
+    if "não encontrad" in mensagem or "nao encontrad" in mensagem:
+        return status.HTTP_404_NOT_FOUND
+    if "offset" in mensagem or "já concluído" in mensagem:
+        return status.HTTP_409_CONFLICT
+    if "excede" in mensagem:
+        return status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    return status.HTTP_400_BAD_REQUEST
+
+
+@router.post('', status_code=status.HTTP_201_CREATED)
+def criar_upload(
+    payload: CriarUploadPayload,
+    request: Request,
+    response: Response,
+    current_user=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Abre um upload retomável. Envie as partes com PATCH em `Location`, a partir do
+    `Upload-Offset` informado; após uma falha, consulte o offset com HEAD e continue dele.
+    """
+    service = UploadRetomavelService(db)
+    try:
+        upload = service.criar(
+            usuario_id=current_user.id,
+            fiscalizacao_id=payload.fiscalizacao_id,
+            etapa_id=payload.etapa_id,
+            tipo=payload.tipo,
+            nome_arquivo=payload.nome_arquivo,
+            tamanho_bytes=payload.tamanho_bytes,
+            tipo_mime=payload.mime_type,
+        )
+        response.headers.update(_cabecalhos(upload))
+        response.headers['Location'] = str(request.url_for('enviar_parte', upload_id=str(upload.uuid)))
+        return {**_upload_to_dict(upload), 'tamanho_maximo_parte_bytes': service.tamanho_maximo_parte_bytes}
+    except AutorizacaoError as err:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(err)) from err
+    except ValueError as err:
+        raise HTTPException(status_code=_value_error_to_status(err), detail=str(err)) from err
+    except Exception as err:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro ao criar upload") from err
+
+
+@router.head('/{upload_id}')
+def consultar_offset(
+    upload_id: UUID,
+    current_user=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Offset já recebido (`Upload-Offset`): a próxima parte deve começar nele"""
+    service = UploadRetomavelService(db)
+    try:
+        upload = service.obter(upload_id, current_user.id)
+        return Response(status_code=status.HTTP_200_OK, headers=_cabecalhos(upload))
+    except AutorizacaoError as err:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(err)) from err
+    except ValueError as err:
+        raise HTTPException(status_code=_value_error_to_status(err), detail=str(err)) from err
+    except Exception as err:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro ao consultar upload") from err
+
+
+@router.patch('/{upload_id}')
+async def enviar_parte(
+    upload_id: UUID,
+    request: Request,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    upload_offset: int = Header(..., alias='Upload-Offset', ge=0),
+    upload_checksum: Optional[str] = Header(None, alias='Upload-Checksum'),
+    current_user=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Envia uma parte (corpo `application/offset+octet-stream`) a partir de `Upload-Offset`.
+
+    `Upload-Checksum: sha256 <base64>` é opcional e rejeita partes corrompidas no caminho.
+    Se o offset já é o tamanho total mas o upload não foi concluído (falha ao concluir),
+    uma parte vazia nesse offset conclui o upload.
+    """
+    if request.headers.get('content-type', '').split(';')[0].strip() != TIPO_CONTEUDO_PARTE:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Content-Type deve ser {TIPO_CONTEUDO_PARTE}",
+        )
+
+    checksum = None
+    if upload_checksum:
+        algoritmo, _, valor = upload_checksum.partition(' ')
+        if algoritmo.lower() != 'sha256' or not valor:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Upload-Checksum deve ser 'sha256 <base64>'")
+        checksum = valor.strip()
+
+    service = UploadRetomavelService(db)
+    try:
+        upload = await service.receber_parte(upload_id, current_user.id, upload_offset, request.stream(), checksum)
+        if upload.concluido:
+            agendar_ingestao(background_tasks, [upload.chave_storage])
+        response.headers.update(_cabecalhos(upload))
+        return _upload_to_dict(upload)
+    except AutorizacaoError as err:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(err)) from err
+    except ValueError as err:
+        raise HTTPException(status_code=_value_error_to_status(err), detail=str(err)) from err
+    except Exception as err:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro ao gravar parte do upload") from err
+
+
+@router.delete('/{upload_id}', status_code=status.HTTP_204_NO_CONTENT)
+async def cancelar_upload(
+    upload_id: UUID,
+    current_user=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Cancela o upload e descarta as partes já enviadas"""
+    service = UploadRetomavelService(db)
+    try:
+        await service.cancelar(upload_id, current_user.id)
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    except AutorizacaoError as err:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(err)) from err
+    except ValueError as err:
+        raise HTTPException(status_code=_value_error_to_status(err), detail=str(err)) from err
+    except Exception as err:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro ao cancelar upload") from err
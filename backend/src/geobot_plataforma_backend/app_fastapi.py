@@ -6,6 +6,7 @@ from fastapi.responses import JSONResponse
 
 from src.geobot_plataforma_backend.core.config import settings
 from src.geobot_plataforma_backend.core.database import check_db_connection
+from src.geobot_plataforma_backend.core.storage import encerrar_storage_backend
 
 # Routers
 from src.geobot_plataforma_backend.api.routers import (
@@ -14,8 +15,12 @@ from src.geobot_plataforma_backend.api.routers import (
     fiscalizacao_router,
     metadata_router,
     sessoes_router,
+    sobrevoo_router,
+    upload_router,
 )
 from src.geobot_plataforma_backend.api.routers.etapa_fiscalizacao_router import router as etapa_fiscalizacao_router
+from src.geobot_plataforma_backend.domain.service.ingestao_imagem_service import encerrar_pool_imagens
+from src.geobot_plataforma_backend.domain.service.progresso_coalescido import encerrar_coalescedor
 
 
 tags_metadata = [
@@ -39,6 +44,14 @@ tags_metadata = [
         'name': 'etapas-fiscalizacao',
         'description': 'Gerenciamento de etapas do pipeline de fiscalização (sobrevoo, upload, análise IA, relatório).'
     },
+    {
+        'name': 'sobrevoos',
+        'description': 'Lotes de sobrevoo que cobrem várias fiscalizações com um único voo e upload.'
+    },
+    {
+        'name': 'uploads',
+        'description': 'Uploads retomáveis em partes (estilo tus) para vídeos e imagens grandes de drone.'
+    },
     {
         'name': 'Metadata',
         'description': 'Metadados do sistema (enums, opções, configurações).'
@@ -76,8 +89,22 @@ def create_app() -> FastAPI:
     app.include_router(denuncia_router, prefix="/api")
     app.include_router(fiscalizacao_router, prefix="/api")
     app.include_router(etapa_fiscalizacao_router, prefix="/api")
+    app.include_router(sobrevoo_router, prefix="/api")
+    app.include_router(upload_router, prefix="/api")
     app.include_router(metadata_router)  # Já tem prefix="/api/metadata" no router
 
+    @app.on_event('shutdown')
+    def gravar_progresso_pendente():
+        encerrar_coalescedor()
+
+    @app.on_event('shutdown')
+    def encerrar_ingestao_imagens():
+        encerrar_pool_imagens()
+
+    @app.on_event('shutdown')
+    async def fechar_conexoes_storage():
+        await encerrar_storage_backend()
+
     @app.get('/')
     def root():
         return JSONResponse({
@@ -0,0 +1,56 @@
+"""
+Árvore BK para busca de hashes perceptuais próximos (distância de Hamming)
+"""
+from typing import Any, List, Optional, Tuple
+
+
+def distancia_hamming(a: int, b: int) -> int:
+    """Quantidade de bits diferentes entre dois hashes"""
+    return (a ^ b).bit_count()
+
+
+class ArvoreBK:
+    """
+    Árvore BK: cada filho fica na aresta da sua distância até o pai, então a busca
+    por raio `r` só desce nas arestas entre `d - r` e `d + r` (desigualdade
+    triangular) em vez de comparar o hash com todos os já indexados.
+    """
+
+    def __init__(self):
+        self._raiz: Optional[Tuple[int, Any, dict]] = None
+        self._tamanho = 0
+
+    def inserir(self, valor: int, item: Any) -> None:
+        """Indexa `item` pelo hash `valor`"""
+        self._tamanho += 1
+        if self._raiz is None:
+            self._raiz = (valor, item, {})
+            return
+        no = self._raiz
+        while True:
+            distancia = distancia_hamming(valor, no[0])
+            filho = no[2].get(distancia)
+            if filho is None:
+                no[2][distancia] = (valor, item, {})
+                return
+            no = filho
+
+    def buscar(self, valor: int, raio: int) -> List[Tuple[int, Any]]:
+        """Itens a até `raio` bits de `valor`, como (distância, item), do mais próximo ao mais distante"""
+        if self._raiz is None:
+            return []
+        encontrados = []
+        pendentes = [self._raiz]
+        while pendentes:
+            hash_no, item, filhos = pendentes.pop()
+            distancia = distancia_hamming(valor, hash_no)
+            if distancia <= raio:
+                encontrados.append((distancia, item))
+            for aresta, filho in filhos.items():
+                if distancia - raio <= aresta <= distancia + raio:
+                    pendentes.append(filho)
+        encontrados.sort(key=lambda par: par[0])
+        return encontrados
+
+    def __len__(self) -> int:
+        return self._tamanho
@@ -0,0 +1,68 @@
+"""
+Cache em memória (por processo) com expiração por tempo e descarte LRU
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional
+
+_AUSENTE = object()
+
+
+class CacheTTL:
+    """
+    Cache LRU com TTL, seguro para uso entre threads.
+
+    Cada processo tem o seu; invalidações só alcançam o processo que fez a escrita,
+    então o TTL é o limite de defasagem entre workers e deve ser curto.
+    """
+
+    def __init__(self, tamanho_maximo: int = 1024, ttl_segundos: float = 5.0):
+        self.tamanho_maximo = tamanho_maximo
+        self.ttl_segundos = ttl_segundos
+        self._itens: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obter(self, chave: Hashable, padrao: Any = None) -> Any:
+        """Valor em cache (renovando a posição LRU) ou `padrao` se ausente/expirado"""
+        with self._lock:
+            item = self._itens.get(chave, _AUSENTE)
+            if item is _AUSENTE:
+                return padrao
+            expira_em, valor = item
+            if expira_em < time.monotonic():
+                del self._itens[chave]
+                return padrao
+            self._itens.move_to_end(chave)
+            return valor
+
+    def obter_muitos(self, chaves: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        """Somente as chaves presentes e válidas"""
+        encontrados = {}
+        for chave in chaves:
+            valor = self.obter(chave, _AUSENTE)
+            if valor is not _AUSENTE:
+                encontrados[chave] = valor
+        return encontrados
+
+    def definir(self, chave: Hashable, valor: Any, ttl_segundos: Optional[float] = None) -> None:
+        if self.tamanho_maximo <= 0:
+            return
+        ttl = self.ttl_segundos if ttl_segundos is None else ttl_segundos
+        with self._lock:
+            self._itens[chave] = (time.monotonic() + ttl, valor)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.tamanho_maximo:
+                self._itens.popitem(last=False)
+
+    def invalidar(self, *chaves: Hashable) -> None:
+        with self._lock:
+            for chave in chaves:
+                self._itens.pop(chave, None)
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._itens.clear()
+
+    def __len__(self) -> int:
+        return len(self._itens)
@@ -0,0 +1,143 @@
+"""
+DBSCAN acelerado por grade para grandes volumes de pontos 2D
+"""
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
+
+RUIDO = -1
+
+# Células vizinhas que podem conter pontos a até `eps` (lado da célula = eps/√2)
+_VIZINHANCA = [
+    (dx, dy) for dx in range(-2, 3) for dy in range(-2, 3) if not (abs(dx) == 2 and abs(dy) == 2)
+]
+
+
+def _contagem_vizinhanca(chaves: np.ndarray, contagens: np.ndarray, largura: int) -> np.ndarray:
+    """Soma, para cada célula ocupada, os pontos das células da vizinhança 5x5 (sem cantos)"""
+    total = np.zeros(len(chaves), dtype=np.int64)
+    for dx, dy in _VIZINHANCA:
+        alvo = chaves + dx * largura + dy
+        posicao = np.minimum(np.searchsorted(chaves, alvo), len(chaves) - 1)
+        total += np.where(chaves[posicao] == alvo, contagens[posicao], 0)
+    return total
+
+
+def dbscan_grade(pontos: np.ndarray, eps: float, min_pontos: int, workers: int = -1) -> np.ndarray:
+    """
+    DBSCAN sobre pontos 2D (ex.: km projetados) com aceleração por grade.
+
+    1. Os pontos são distribuídos em células de lado eps/√2, cuja diagonal é eps:
+       célula com >= min_pontos torna todos os seus pontos núcleo sem nenhuma
+       consulta, e célula cuja vizinhança inteira tem < min_pontos é descartada.
+       Só os casos ambíguos contam vizinhos no cKDTree.
+    2. Núcleos da mesma célula estão sempre conectados (a diagonal é eps). Para
+       ligar células, cada micro-célula (lado eps/4√2) é representada por um de
+       seus núcleos e os pares de representantes a até eps viram arestas; como
+       são pontos reais, nenhuma fusão é indevida. Pares de células vizinhas que
+       ainda ficaram em componentes diferentes são conferidos exatamente: os
+       núcleos perto da borda consultam o núcleo mais próximo *da célula
+       vizinha* em um cKDTree sobre (x, y, célula · 3eps), em que núcleos de
+       células diferentes ficam a mais de eps uns dos outros. Assim núcleos e
+       clusters são exatamente os do DBSCAN.
+    3. Pontos de borda herdam o cluster do núcleo mais próximo a até eps (no
+       DBSCAN clássico, uma borda alcançável por dois clusters fica com o que
+       for visitado primeiro; aqui a escolha é determinística).
+
+    Args:
+        pontos: Matriz N x 2
+        eps: Raio de vizinhança (mesma unidade dos pontos)
+        min_pontos: Vizinhos (incluindo o próprio ponto) para ser núcleo
+        workers: Threads do cKDTree (-1 = todas)
+
+    Returns:
+        Rótulo do cluster de cada ponto (0..k-1) ou RUIDO
+    """
+    n = len(pontos)
+    rotulos = np.full(n, RUIDO, dtype=np.int64)
+    if n == 0:
+        return rotulos
+
+    lado = eps / np.sqrt(2.0)
+    celulas = np.floor((pontos - pontos.min(axis=0)) / lado).astype(np.int64)
+    largura = int(celulas[:, 1].max()) + 5
+    chave = celulas[:, 0] * largura + celulas[:, 1]
+    chaves, inversa, contagens = np.unique(chave, return_inverse=True, return_counts=True)
+
+    nucleo = contagens[inversa] >= min_pontos
+    limite_superior = _contagem_vizinhanca(chaves, contagens, largura)[inversa]
+    ambiguos = np.nonzero(~nucleo & (limite_superior >= min_pontos))[0]
+
+    arvore = cKDTree(pontos)
+    if len(ambiguos):
+        vizinhos = arvore.query_ball_point(pontos[ambiguos], eps, return_length=True, workers=workers)
+        nucleo[ambiguos] = vizinhos >= min_pontos
+
+    indices_nucleo = np.nonzero(nucleo)[0]
+    if not len(indices_nucleo):
+        return rotulos
+
+    # Células com núcleo e, para cada núcleo, o índice (0..c-1) da sua célula
+    celulas_nucleo, celula_de_nucleo = np.unique(chave[indices_nucleo], return_inverse=True)
+    c = len(celulas_nucleo)
+    xy = pontos[indices_nucleo] - pontos.min(axis=0)
+
+    # Representantes: primeiro núcleo de cada micro-célula; pares a até eps ligam as células
+    micro = np.floor(xy / (lado / 4)).astype(np.int64)
+    chave_micro = micro[:, 0] * (largura * 4 + 5) + micro[:, 1]
+    _, primeiro = np.unique(chave_micro, return_index=True)
+    pares = cKDTree(xy[primeiro]).query_pairs(eps, output_type='ndarray')
+    origem = [celula_de_nucleo[primeiro[pares[:, 0]]]]
+    destino = [celula_de_nucleo[primeiro[pares[:, 1]]]]
+
+    def componentes():
+        o, d = np.concatenate(origem), np.concatenate(destino)
+        grafo = coo_matrix((np.ones(len(o), dtype=np.int8), (o, d)), shape=(c, c))
+        return connected_components(grafo, directed=False)[1]
+
+    # Conferência exata dos vizinhos que os representantes não ligaram
+    componente = componentes()
+    posicao = celulas[indices_nucleo]
+    separacao = 3 * eps
+    arvore_nucleos = None
+    alcance = np.nextafter(eps, np.inf)  # distance_upper_bound é estrito; o DBSCAN inclui eps
+    for dx, dy in _VIZINHANCA:
+        if (dx, dy) <= (0, 0):
+            continue  # Cada par de células uma vez só
+        alvo = chave[indices_nucleo] + dx * largura + dy
+        vizinha = np.minimum(np.searchsorted(celulas_nucleo, alvo), c - 1)
+        pendentes = np.nonzero(
+            (celulas_nucleo[vizinha] == alvo) & (componente[celula_de_nucleo] != componente[vizinha])
+        )[0]
+        # Só núcleos a até eps do retângulo da célula vizinha
+        inicio = (posicao[pendentes] + np.array([dx, dy])) * lado
+        folga = np.maximum(np.maximum(inicio - xy[pendentes], xy[pendentes] - (inicio + lado)), 0.0)
+        candidatos = pendentes[np.hypot(folga[:, 0], folga[:, 1]) <= eps]
+        if not len(candidatos):
+            continue
+        if arvore_nucleos is None:
+            arvore_nucleos = cKDTree(np.column_stack([xy, celula_de_nucleo * separacao]))
+        consulta = np.column_stack([xy[candidatos], vizinha[candidatos] * separacao])
+        distancia, _ = arvore_nucleos.query(consulta, k=1, distance_upper_bound=alcance, workers=workers)
+        ligados = candidatos[np.isfinite(distancia)]
+        origem.append(celula_de_nucleo[ligados])
+        destino.append(vizinha[ligados])
+    if arvore_nucleos is not None:
+        componente = componentes()
+
+    rotulos[indices_nucleo] = componente[celula_de_nucleo]
+
+    # Bordas: não-núcleos a até eps de algum núcleo
+    bordas = np.nonzero(~nucleo)[0]
+    if len(bordas):
+        distancia, mais_proximo = cKDTree(pontos[indices_nucleo]).query(
+            pontos[bordas], k=1, distance_upper_bound=eps, workers=workers
+        )
+        alcancadas = np.isfinite(distancia)
+        rotulos[bordas[alcancadas]] = rotulos[indices_nucleo[mais_proximo[alcancadas]]]
+
+    # Renumera 0..k-1 por ordem de aparição
+    validos = rotulos != RUIDO
+    _, rotulos[validos] = np.unique(rotulos[validos], return_inverse=True)
+    return rotulos
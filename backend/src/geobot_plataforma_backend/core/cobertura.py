@@ -0,0 +1,63 @@
+"""
+Caminho de cobertura em zigue-zague ("cortador de grama") para planos de voo
+"""
+import numpy as np
+
+
+def caminho_cobertura(poligono_km, espacamento_km: float) -> np.ndarray:
+    """
+    Waypoints que varrem o polígono em faixas paralelas (boustrofédon).
+
+    As faixas seguem o maior lado do retângulo envolvente, o que minimiza o número
+    de curvas. Cada faixa é recortada pelo polígono (em polígonos côncavos uma faixa
+    pode gerar mais de um trecho, e o deslocamento entre eles pode sair do polígono)
+    e o sentido alterna a cada faixa.
+
+    Args:
+        poligono_km: Vértices N x 2 em km (projeção local)
+        espacamento_km: Distância entre faixas adjacentes
+
+    Returns:
+        Matriz M x 2 de waypoints em km, na ordem de voo
+    """
+    if espacamento_km <= 0:
+        raise ValueError("Espaçamento entre faixas deve ser maior que zero")
+
+    vertices = np.asarray(poligono_km, dtype=np.float64)
+    largura, altura = vertices.max(axis=0) - vertices.min(axis=0)
+    # Varre sempre em linhas de "y" constante; troca os eixos se o polígono for mais alto que largo
+    trocar = altura > largura
+    if trocar:
+        vertices = vertices[:, ::-1]
+
+    inicio = vertices[:, 1].min()
+    fim = vertices[:, 1].max()
+    faixas = max(int(np.ceil((fim - inicio) / espacamento_km)), 1)
+    ys = inicio + (np.arange(faixas) + 0.5) * (fim - inicio) / faixas
+
+    a = vertices
+    b = np.roll(vertices, -1, axis=0)
+    waypoints = []
+    for indice, y in enumerate(ys):
+        cruza = (a[:, 1] > y) != (b[:, 1] > y)
+        if not cruza.any():
+            continue
+        xa, ya, xb, yb = a[cruza, 0], a[cruza, 1], b[cruza, 0], b[cruza, 1]
+        xs = np.sort(xa + (y - ya) * (xb - xa) / (yb - ya))
+        trechos = xs.reshape(-1, 2)
+        if indice % 2:
+            trechos = trechos[::-1, ::-1]
+        for x0, x1 in trechos:
+            waypoints.append((x0, y))
+            waypoints.append((x1, y))
+
+    caminho = np.array(waypoints, dtype=np.float64).reshape(-1, 2)
+    return caminho[:, ::-1] if trocar else caminho
+
+
+def comprimento_caminho(caminho_km) -> float:
+    """Comprimento total (km) de uma sequência de waypoints"""
+    caminho = np.asarray(caminho_km, dtype=np.float64)
+    if len(caminho) < 2:
+        return 0.0
+    return float(np.sqrt((np.diff(caminho, axis=0) ** 2).sum(axis=1)).sum())
@@ -0,0 +1,93 @@
+"""
+Utilitários geográficos vetorizados (NumPy)
+"""
+import numpy as np
+
+RAIO_TERRA_KM = 6371.0088
+
+
+def matriz_haversine(lat_a, lon_a, lat_b=None, lon_b=None) -> np.ndarray:
+    """
+    Distâncias de grande círculo, em km, entre todos os pares de pontos.
+
+    Args:
+        lat_a, lon_a: Coordenadas (graus) dos N pontos de origem
+        lat_b, lon_b: Coordenadas dos M pontos de destino; se omitidas, usa a origem
+
+    Returns:
+        Matriz N x M de distâncias em km
+    """
+    lat_a = np.radians(np.asarray(lat_a, dtype=np.float64))[:, None]
+    lon_a = np.radians(np.asarray(lon_a, dtype=np.float64))[:, None]
+    if lat_b is None:
+        lat_b, lon_b = lat_a.T, lon_a.T
+    else:
+        lat_b = np.radians(np.asarray(lat_b, dtype=np.float64))[None, :]
+        lon_b = np.radians(np.asarray(lon_b, dtype=np.float64))[None, :]
+
+    a = (
+        np.sin((lat_b - lat_a) / 2.0) ** 2
+        + np.cos(lat_a) * np.cos(lat_b) * np.sin((lon_b - lon_a) / 2.0) ** 2
+    )
+    return 2.0 * RAIO_TERRA_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def distancia_haversine(lat_a: float, lon_a: float, lat_b: float, lon_b: float) -> float:
+    """Distância de grande círculo, em km, entre dois pontos"""
+    return float(matriz_haversine([lat_a], [lon_a], [lat_b], [lon_b])[0, 0])
+
+
+def projetar_km(lat, lon, lat_referencia=None):
+    """
+    Projeção equirretangular local (em km) centrada na latitude de referência.
+
+    Adequada para agrupamentos em escala municipal/estadual, onde a distorção
+    é desprezível frente ao raio de busca.
+
+    Args:
+        lat, lon: Coordenadas em graus
+        lat_referencia: Latitude (graus) do paralelo sem distorção; padrão: média de `lat`
+
+    Returns:
+        Matriz N x 2 com (x, y) em km
+    """
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    if lat_referencia is None:
+        lat_referencia = lat.mean() if lat.size else 0.0
+    x = RAIO_TERRA_KM * np.radians(lon) * np.cos(np.radians(lat_referencia))
+    y = RAIO_TERRA_KM * np.radians(lat)
+    return np.column_stack([x, y])
+
+
+def desprojetar_km(pontos_km, lat_referencia: float):
+    """Inversa de `projetar_km`: devolve (lat, lon) em graus"""
+    pontos_km = np.asarray(pontos_km, dtype=np.float64).reshape(-1, 2)
+    lat = np.degrees(pontos_km[:, 1] / RAIO_TERRA_KM)
+    lon = np.degrees(pontos_km[:, 0] / (RAIO_TERRA_KM * np.cos(np.radians(lat_referencia))))
+    return lat, lon
+
+
+def pontos_em_poligono(lat, lon, poligono) -> np.ndarray:
+    """
+    Teste de ponto em polígono (regra par-ímpar) vetorizado sobre os pontos.
+
+    Args:
+        lat, lon: Coordenadas dos N pontos
+        poligono: Vértices [[lat, lon], ...] (fechado implicitamente)
+
+    Returns:
+        Máscara booleana de tamanho N
+    """
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    vertices = np.asarray(poligono, dtype=np.float64)
+    dentro = np.zeros(lat.shape, dtype=bool)
+    anterior = vertices[-1]
+    for atual in vertices:
+        cruza = (atual[0] > lat) != (anterior[0] > lat)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            lon_cruzamento = (anterior[1] - atual[1]) * (lat - atual[0]) / (anterior[0] - atual[0]) + atual[1]
+        dentro ^= cruza & (lon < lon_cruzamento)
+        anterior = atual
+    return dentro
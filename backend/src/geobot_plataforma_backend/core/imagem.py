@@ -0,0 +1,134 @@
+"""
+Processamento de imagens de drone (Pillow): metadados GPS/EXIF/XMP, hash perceptual e derivados
+
+As funções daqui rodam em processos separados (ProcessPoolExecutor): recebem e
+devolvem apenas tipos simples e não dependem de banco nem de configuração.
+"""
+import io
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+from PIL import ExifTags, Image, ImageOps
+
+# Fotos de drone passam facilmente dos 40 MP; o limite padrão do Pillow (~89 MP) acusaria bomba
+Image.MAX_IMAGE_PIXELS = 400_000_000
+
+_XMP_DJI = re.compile(
+    rb'drone-dji:(RelativeAltitude|AbsoluteAltitude|GimbalPitchDegree|FlightYawDegree)'
+    rb'\s*(?:=\s*"|>)\s*([-+]?\d+(?:\.\d+)?)'
+)
+
+
+@dataclass
+class ResultadoProcessamento:
+    """Metadados extraídos e derivados gerados de uma imagem"""
+    largura: int
+    altura: int
+    metadados: Dict[str, Any] = field(default_factory=dict)
+    derivados: Dict[str, bytes] = field(default_factory=dict)  # variante -> JPEG
+
+
+def _racional(valor) -> float:
+    return float(valor[0]) / float(valor[1]) if isinstance(valor, tuple) else float(valor)
+
+
+def _graus(dms, referencia) -> Optional[float]:
+    if not dms or len(dms) != 3:
+        return None
+    graus = _racional(dms[0]) + _racional(dms[1]) / 60.0 + _racional(dms[2]) / 3600.0
+    return -graus if referencia in ("S", "W", b"S", b"W") else graus
+
+
+def extrair_gps(exif: Image.Exif) -> Dict[str, float]:
+    """Latitude, longitude e altitude (m) do IFD GPS, quando presentes"""
+    gps = exif.get_ifd(ExifTags.IFD.GPSInfo)
+    if not gps:
+        return {}
+    resultado = {}
+    latitude = _graus(gps.get(ExifTags.GPS.GPSLatitude), gps.get(ExifTags.GPS.GPSLatitudeRef))
+    longitude = _graus(gps.get(ExifTags.GPS.GPSLongitude), gps.get(ExifTags.GPS.GPSLongitudeRef))
+    if latitude is not None and longitude is not None:
+        resultado["latitude"] = round(latitude, 7)
+        resultado["longitude"] = round(longitude, 7)
+    if ExifTags.GPS.GPSAltitude in gps:
+        altitude = _racional(gps[ExifTags.GPS.GPSAltitude])
+        if gps.get(ExifTags.GPS.GPSAltitudeRef) in (1, b"\x01"):
+            altitude = -altitude
+        resultado["altitude_m"] = round(altitude, 2)
+    return resultado
+
+
+def extrair_xmp_drone(xmp: Optional[bytes]) -> Dict[str, float]:
+    """Altitude relativa ao ponto de decolagem e atitude do gimbal (XMP da DJI)"""
+    if not xmp:
+        return {}
+    nomes = {
+        b"RelativeAltitude": "altitude_relativa_m",
+        b"AbsoluteAltitude": "altitude_absoluta_m",
+        b"GimbalPitchDegree": "gimbal_pitch_graus",
+        b"FlightYawDegree": "yaw_graus",
+    }
+    return {nomes[chave]: float(valor) for chave, valor in _XMP_DJI.findall(xmp)}
+
+
+def dhash(imagem: Image.Image, lado: int = 8) -> int:
+    """
+    Hash perceptual por diferença (dHash, 64 bits): compara o brilho de pixels vizinhos
+    da imagem reduzida a 9x8, então resiste a recompressão, redimensionamento e
+    pequenas variações de exposição entre fotos do mesmo ponto.
+    """
+    reduzida = imagem.convert("L").resize((lado + 1, lado), Image.Resampling.LANCZOS)
+    pixels = reduzida.tobytes()
+    valor = 0
+    for linha in range(lado):
+        inicio = linha * (lado + 1)
+        for coluna in range(lado):
+            valor = (valor << 1) | (pixels[inicio + coluna] > pixels[inicio + coluna + 1])
+    return valor
+
+
+def _jpeg(imagem: Image.Image, qualidade: int) -> bytes:
+    saida = io.BytesIO()
+    imagem.save(saida, format="JPEG", quality=qualidade, optimize=True, progressive=True)
+    return saida.getvalue()
+
+
+def processar_imagem(
+    caminho: str,
+    tamanhos: Dict[str, Tuple[int, int]],
+    qualidade: int = 82,
+) -> ResultadoProcessamento:
+    """
+    Lê a imagem em `caminho`, extrai GPS/altitude, calcula o dHash e gera um JPEG
+    por variante (lado maior limitado ao tamanho pedido, orientação EXIF aplicada).
+
+    Para JPEG, a decodificação já é feita em escala reduzida (`draft`), o que evita
+    descomprimir os 30+ MP do original só para gerar uma miniatura.
+    """
+    with Image.open(caminho) as imagem:
+        largura, altura = imagem.size
+        exif = imagem.getexif()
+        metadados: Dict[str, Any] = {}
+        gps = {**extrair_gps(exif), **extrair_xmp_drone(imagem.info.get("xmp"))}
+        if gps:
+            metadados["gps"] = gps
+        capturada_em = exif.get_ifd(ExifTags.IFD.Exif).get(ExifTags.Base.DateTimeOriginal)
+        if capturada_em:
+            metadados["capturada_em"] = str(capturada_em).strip("\x00 ")
+        modelo = exif.get(ExifTags.Base.Model)
+        if modelo:
+            metadados["camera"] = str(modelo).strip("\x00 ")
+
+        maior = max(tamanhos.values(), key=lambda t: t[0] * t[1])
+        imagem.draft("RGB", maior)
+        base = ImageOps.exif_transpose(imagem).convert("RGB")
+
+    metadados["dhash"] = f"{dhash(base):016x}"
+    derivados = {}
+    for variante, tamanho in sorted(tamanhos.items(), key=lambda item: -item[1][0] * item[1][1]):
+        # Da maior para a menor: cada variante é reduzida a partir da anterior
+        base.thumbnail(tamanho, Image.Resampling.LANCZOS)
+        derivados[variante] = _jpeg(base, qualidade)
+
+    return ResultadoProcessamento(largura=largura, altura=altura, metadados=metadados, derivados=derivados)
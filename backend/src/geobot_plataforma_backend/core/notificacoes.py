@@ -0,0 +1,73 @@
+"""
+Hub em memória de versões por chave, para long-poll sem ocupar threads
+"""
+import asyncio
+import threading
+from typing import Dict, Hashable, Set, Tuple
+
+
+class HubVersoes:
+    """
+    Contador de versão por chave com espera assíncrona por mudanças.
+
+    `publicar` pode ser chamado de qualquer thread (ex.: endpoints síncronos no
+    threadpool); quem espera é acordado no próprio event loop via
+    `call_soon_threadsafe`. As versões são locais ao processo: sirvem para não perder
+    notificações entre a leitura do estado e o início da espera, não como versão global.
+    """
+
+    def __init__(self):
+        self._versoes: Dict[Hashable, int] = {}
+        self._esperas: Dict[Hashable, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Future]]] = {}
+        self._lock = threading.Lock()
+
+    def versao(self, chave: Hashable) -> int:
+        with self._lock:
+            return self._versoes.get(chave, 0)
+
+    def publicar(self, chave: Hashable) -> int:
+        """Incrementa a versão da chave e acorda todos que a aguardam"""
+        with self._lock:
+            versao = self._versoes.get(chave, 0) + 1
+            self._versoes[chave] = versao
+            esperas = self._esperas.pop(chave, set())
+        for loop, futuro in esperas:
+            loop.call_soon_threadsafe(_resolver, futuro, versao)
+        return versao
+
+    async def aguardar(self, chave: Hashable, desde: int, timeout: float) -> int:
+        """
+        Aguarda até a versão da chave ser diferente de `desde` ou o timeout expirar.
+
+        Returns:
+            Versão atual (igual a `desde` se expirou sem mudança)
+        """
+        loop = asyncio.get_running_loop()
+        futuro = loop.create_future()
+        item = (loop, futuro)
+        with self._lock:
+            atual = self._versoes.get(chave, 0)
+            if atual != desde:
+                return atual
+            self._esperas.setdefault(chave, set()).add(item)
+        try:
+            return await asyncio.wait_for(futuro, timeout)
+        except asyncio.TimeoutError:
+            return self.versao(chave)
+        finally:
+            with self._lock:
+                esperas = self._esperas.get(chave)
+                if esperas is not None:
+                    esperas.discard(item)
+                    if not esperas:
+                        del self._esperas[chave]
+
+    def aguardando(self, chave: Hashable) -> int:
+        """Quantidade de esperas pendentes para a chave"""
+        with self._lock:
+            return len(self._esperas.get(chave, ()))
+
+
+def _resolver(futuro: asyncio.Future, versao: int) -> None:
+    if not futuro.done():
+        futuro.set_result(versao)
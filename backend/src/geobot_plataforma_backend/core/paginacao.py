@@ -0,0 +1,30 @@
+"""
+Cursores opacos para paginação por chave (keyset)
+"""
+import base64
+import json
+from typing import Any, List
+
+
+def codificar_cursor(*valores: Any) -> str:
+    """Codifica os valores da última linha da página em um token opaco para a URL"""
+    bruto = json.dumps(list(valores), separators=(',', ':'), default=str).encode('utf-8')
+    return base64.urlsafe_b64encode(bruto).decode('ascii').rstrip('=')
+
+
+def decodificar_cursor(cursor: str, quantidade: int) -> List[Any]:
+    """
+    Decodifica um cursor gerado por `codificar_cursor`.
+
+    Raises:
+        ValueError: Se o cursor estiver malformado ou com número de campos diferente
+    """
+    try:
+        preenchimento = '=' * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + preenchimento))
+    except (ValueError, TypeError) as err:
+        raise ValueError("Cursor de paginação inválido") from err
+
+    if not isinstance(valores, list) or len(valores) != quantidade:
+        raise ValueError("Cursor de paginação inválido")
+    return valores
@@ -0,0 +1,115 @@
+"""
+Pirâmide de tiles Deep Zoom (DZI) para navegar em imagens de drone sem baixar o original
+
+Roda em processos separados (ProcessPoolExecutor): grava os tiles em um diretório
+local e devolve só o resumo; quem chamou envia os arquivos ao storage.
+"""
+import math
+import os
+from typing import Any, Dict, Iterator, Tuple
+
+from PIL import Image, ImageOps
+
+from src.geobot_plataforma_backend.core import imagem as _imagem  # noqa: F401 - limite de pixels
+
+
+def numero_niveis(largura: int, altura: int) -> int:
+    """Níveis DZI: o nível 0 tem 1x1 px e o último tem o tamanho original"""
+    return int(math.ceil(math.log2(max(largura, altura, 1)))) + 1
+
+
+def tamanho_nivel(largura: int, altura: int, nivel: int) -> Tuple[int, int]:
+    """Dimensões do nível (cada nível abaixo divide por 2, arredondando para cima)"""
+    escala = 2 ** (numero_niveis(largura, altura) - 1 - nivel)
+    return max(1, math.ceil(largura / escala)), max(1, math.ceil(altura / escala))
+
+
+def grade_nivel(largura: int, altura: int, nivel: int, tamanho_tile: int) -> Tuple[int, int]:
+    """(colunas, linhas) de tiles do nível"""
+    w, h = tamanho_nivel(largura, altura, nivel)
+    return math.ceil(w / tamanho_tile), math.ceil(h / tamanho_tile)
+
+
+def caixa_tile(
+    largura_nivel: int,
+    altura_nivel: int,
+    coluna: int,
+    linha: int,
+    tamanho_tile: int,
+    sobreposicao: int,
+) -> Tuple[int, int, int, int]:
+    """Recorte (x0, y0, x1, y1) do tile no nível, com a sobreposição DZI nas bordas internas"""
+    x0 = max(0, coluna * tamanho_tile - sobreposicao)
+    y0 = max(0, linha * tamanho_tile - sobreposicao)
+    x1 = min(largura_nivel, (coluna + 1) * tamanho_tile + sobreposicao)
+    y1 = min(altura_nivel, (linha + 1) * tamanho_tile + sobreposicao)
+    return x0, y0, x1, y1
+
+
+def _tiles_do_nivel(
+    nivel_img: Image.Image,
+    tamanho_tile: int,
+    sobreposicao: int,
+) -> Iterator[Tuple[int, int, Image.Image]]:
+    """Percorre o nível em faixas horizontais de uma linha de tiles"""
+    largura, altura = nivel_img.size
+    for linha in range(math.ceil(altura / tamanho_tile)):
+        _, y0, _, y1 = caixa_tile(largura, altura, 0, linha, tamanho_tile, sobreposicao)
+        faixa = nivel_img.crop((0, y0, largura, y1))
+        for coluna in range(math.ceil(largura / tamanho_tile)):
+            x0, _, x1, _ = caixa_tile(largura, altura, coluna, linha, tamanho_tile, sobreposicao)
+            yield coluna, linha, faixa.crop((x0, 0, x1, y1 - y0))
+
+
+def gerar_piramide(
+    caminho: str,
+    diretorio_saida: str,
+    tamanho_tile: int = 254,
+    sobreposicao: int = 1,
+    qualidade: int = 80,
+) -> Dict[str, Any]:
+    """
+    Gera `diretorio_saida/{nivel}/{coluna}_{linha}.jpg` para todos os níveis.
+
+    A imagem é decodificada uma vez; cada nível é gerado do anterior (redução 2x),
+    então o pico de memória é ~1,33x o original decodificado, e os tiles de cada
+    faixa são gravados em disco à medida que são recortados.
+
+    Returns:
+        Resumo para o descritor DZI: largura, altura, níveis, tile, sobreposição e total de tiles
+    """
+    with Image.open(caminho) as original:
+        nivel_img = ImageOps.exif_transpose(original).convert("RGB")
+    largura, altura = nivel_img.size
+    niveis = numero_niveis(largura, altura)
+
+    total = 0
+    for nivel in range(niveis - 1, -1, -1):
+        pasta = os.path.join(diretorio_saida, str(nivel))
+        os.makedirs(pasta, exist_ok=True)
+        for coluna, linha, tile in _tiles_do_nivel(nivel_img, tamanho_tile, sobreposicao):
+            tile.save(os.path.join(pasta, f"{coluna}_{linha}.jpg"), format="JPEG", quality=qualidade)
+            total += 1
+        if nivel > 0:
+            nivel_img = nivel_img.reduce(2)
+
+    return {
+        'largura': largura,
+        'altura': altura,
+        'niveis': niveis,
+        'tamanho_tile': tamanho_tile,
+        'sobreposicao': sobreposicao,
+        'formato': 'jpg',
+        'tiles': total,
+    }
+
+
+def descritor_dzi(piramide: Dict[str, Any]) -> str:
+    """XML `.dzi` lido por visualizadores como o OpenSeadragon"""
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<Image xmlns="http://schemas.microsoft.com/deepzoom/2008" '
+        f'Format="{piramide["formato"]}" Overlap="{piramide["sobreposicao"]}" TileSize="{piramide["tamanho_tile"]}">'
+        f'<Size Width="{piramide["largura"]}" Height="{piramide["altura"]}"/>'
+        '</Image>'
+    )
@@ -1,46 +1,92 @@
 """
 Serviço para integração com Skypilot para análise de IA
 """
+import asyncio
+import json
+import logging
 import os
+import re
 import subprocess
-import json
-import yaml
-from typing import Optional, Dict, List, Any
-from datetime import datetime
 import tempfile
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Linhas que o script remoto imprime para o worker acompanhar o job
+PREFIXO_PROGRESSO = "PROGRESSO"
+PREFIXO_RESULTADO = "RESULTADO_JSON"
+# Imagens baixadas em paralelo pelo script remoto enquanto a GPU processa
+DOWNLOADS_PARALELOS = 8
+_RE_PROGRESSO = re.compile(rf"{PREFIXO_PROGRESSO} (\d+)/(\d+)")
+_RE_JOB_ID = re.compile(r"Job (?:submitted, )?ID: (\d+)")
+
+
+class _ClusterIndisponivel(RuntimeError):
+    """`sky exec` falhou e o `sky status` confirma que o cluster não está no ar"""
+
+
+class _Acompanhamento:
+    """Estado lido da saída do Skypilot: id do job no cluster, progresso e resultado"""
+
+    def __init__(self, progresso: Optional[Callable[[float, str], None]]):
+        self.progresso = progresso
+        self.job_id: Optional[str] = None
+        self.iniciado = False
+        self.resultado: Optional[Dict[str, List[Dict[str, Any]]]] = None
+        self.saida: List[str] = []
+
+    async def ler(self, stdout) -> None:
+        async for linha_bruta in stdout:
+            linha = linha_bruta.decode('utf-8', errors='replace').strip()
+            if linha.startswith(PREFIXO_RESULTADO):
+                self.resultado = json.loads(linha[len(PREFIXO_RESULTADO):])
+                continue
+            job_id = _RE_JOB_ID.search(linha)
+            if job_id and self.job_id is None:
+                self.job_id = job_id.group(1)
+            correspondencia = _RE_PROGRESSO.search(linha)
+            if correspondencia:
+                self.iniciado = True
+                feitas, total = int(correspondencia.group(1)), int(correspondencia.group(2))
+                if self.progresso is not None:
+                    self.progresso(feitas / total * 100 if total else 100.0, f"{feitas}/{total} imagens analisadas")
+            self.saida = (self.saida + [linha])[-20:]
 
 
 class SkypilotIAService:
     """Serviço para provisionar máquinas no Azure via Skypilot e executar análise de IA"""
-    
+
     def __init__(self):
         self.cloud_provider = "azure"
         self.gpu_type = "K80"  # Pode ser ajustado conforme necessário
         self.region = os.getenv("AZURE_REGION", "eastus")
-        self.job_queue = []
-    
+        # Clusters compartilhados que este processo já subiu (setup feito). É
+        # por processo: com `ia_workers` > 1, um worker que ainda não usou o
+        # cluster consulta o `sky status` antes de lançá-lo de novo
+        self._clusters_quentes: Set[str] = set()
+
     def criar_config_skypilot(
         self,
-        imagens_urls: List[str],
-        modelo: str = "yolov8",
+        imagens: List[Dict[str, Any]],
+        modelo: str = "yolov8n.pt",
         parametros: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
-        Cria configuração YAML para Skypilot
-        
+        Cria configuração da task do Skypilot
+
         Args:
-            imagens_urls: Lista de URLs das imagens para processar
-            modelo: Modelo de IA a usar
+            imagens: Imagens a processar ({"arquivo_id", "url"}; URL de leitura assinada)
+            modelo: Pesos do YOLO a usar
             parametros: Parâmetros adicionais para o modelo
-        
+
         Returns:
             Configuração Skypilot
         """
         config = {
             "name": f"analise-ia-{datetime.now().strftime('%Y%m%d%H%M%S')}",
-            "workdir": ".",
             "setup": self._gerar_setup(),
-            "run": self._gerar_comando_run(imagens_urls, modelo, parametros),
+            "run": self._gerar_comando_run(imagens, modelo, parametros),
             "resources": {
                 "cloud": self.cloud_provider,
                 "region": self.region,
@@ -49,13 +95,10 @@ class SkypilotIAService:
                 "disk_size": "50+",
                 "use_spot": True,  # Usar spot instances para economizar
             },
-            "outputs": {
-                "result": "/tmp/result.json"
-            }
         }
-        
+
         return config
-    
+
     def _gerar_setup(self) -> str:
         """Gera script de setup para instalar dependências"""
         setup_script = """
@@ -65,143 +108,222 @@ pip install ultralytics opencv-python numpy pandas requests
 echo "Dependências instaladas"
         """
         return setup_script
-    
+
     def _gerar_comando_run(
         self,
-        imagens_urls: List[str],
+        imagens: List[Dict[str, Any]],
         modelo: str,
         parametros: Optional[Dict[str, Any]] = None
     ) -> str:
-        """Gera comando para executar análise"""
+        """
+        Gera comando para executar análise
+
+        O script imprime `PROGRESSO i/n` a cada imagem e, no fim, uma linha
+        `RESULTADO_JSON {...}` com as detecções de cada arquivo: é o que o
+        worker lê da saída do `sky launch`/`sky exec`.
+        """
         params = parametros or {}
-        confianca = params.get("confianca_minima", 0.5)
-        
+        confianca = float(params.get("confianca_minima", 0.5))
+
         comando = f"""
 python3 << 'EOF'
 import json
-import sys
-from ultralytics import YOLO
-import urllib.request
 import os
+import tempfile
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from ultralytics import YOLO
 
-# URLs das imagens
-imagens_urls = {json.dumps(imagens_urls)}
-
-# Baixar imagens
-imagens_locais = []
-for i, url in enumerate(imagens_urls):
-    caminho = f"/tmp/imagem_{i}.jpg"
-    urllib.request.urlretrieve(url, caminho)
-    imagens_locais.append(caminho)
-
-# Carregar modelo
-modelo = YOLO("yolov8n.pt")  # nano para rapidez
-
-# Processar imagens
-deteccoes = []
-for caminho in imagens_locais:
-    resultados = modelo(caminho, conf={confianca})
-    
-    for resultado in resultados:
-        for box in resultado.boxes:
-            deteccoes.append({{
-                "confianca": float(box.conf[0]),
-                "classe": int(box.cls[0]),
-                "classe_nome": resultado.names[int(box.cls[0])],
-                "bbox": box.xyxy[0].tolist()
-            }})
-
-# Calcular confiança média
-confianca_media = sum([d["confianca"] for d in deteccoes]) / len(deteccoes) if deteccoes else 0
+imagens = json.loads({json.dumps(json.dumps(imagens))})
+modelo = YOLO({json.dumps(modelo)})
+pasta = tempfile.mkdtemp()
 
-# Salvar resultado
-resultado = {{
-    "deteccoes": deteccoes,
-    "confianca_media": confianca_media,
-    "total_deteccoes": len(deteccoes),
-    "modelo": "YOLOv8",
-    "timestamp": "{datetime.now().isoformat()}"
-}}
+def baixar(indice):
+    caminho = os.path.join(pasta, str(indice))
+    urllib.request.urlretrieve(imagens[indice]["url"], caminho)
+    return caminho
 
-with open("/tmp/result.json", "w") as f:
-    json.dump(resultado, f, indent=2)
+deteccoes = {{}}
+# Downloads em paralelo, à frente da GPU (o cluster pode ser reaproveitado: cada imagem é apagada após o uso)
+with ThreadPoolExecutor(max_workers={DOWNLOADS_PARALELOS}) as downloads:
+    for i, caminho in enumerate(downloads.map(baixar, range(len(imagens)))):
+        deteccoes[str(imagens[i]["arquivo_id"])] = [
+            {{
+                "classe": int(box.cls[0]),
+                "classe_nome": resultado.names[int(box.cls[0])],
+                "confianca": float(box.conf[0]),
+                "bbox": box.xyxy[0].tolist(),
+            }}
+            for resultado in modelo(caminho, conf={confianca}, verbose=False)
+            for box in resultado.boxes
+        ]
+        os.remove(caminho)
+        print(f"{PREFIXO_PROGRESSO} {{i + 1}}/{{len(imagens)}}", flush=True)
 
-print(json.dumps(resultado))
+print("{PREFIXO_RESULTADO} " + json.dumps(deteccoes), flush=True)
 EOF
         """
         return comando
-    
-    def submeter_job_ia(
+
+    async def executar_analise(
         self,
-        nome_job: str,
-        imagens_urls: List[str],
-        modelo: str = "yolov8",
-        parametros: Optional[Dict[str, Any]] = None
-    ) -> Dict[str, Any]:
+        nome_cluster: str,
+        imagens: List[Dict[str, Any]],
+        modelo: str = "yolov8n.pt",
+        parametros: Optional[Dict[str, Any]] = None,
+        progresso: Optional[Callable[[float, str], None]] = None,
+        timeout_segundos: Optional[float] = None,
+        ociosidade_minutos: Optional[int] = None,
+    ) -> Dict[str, List[Dict[str, Any]]]:
         """
-        Submete um job de análise de IA ao Skypilot
-        
+        Roda a análise em um cluster do Skypilot
+
+        Sem `ociosidade_minutos`, o cluster é do job: `sky launch --down` o
+        provisiona e o derruba ao terminar. Com ele, o cluster é compartilhado e
+        fica quente entre jobs: o primeiro job do processo usa `sky launch -i N
+        --down` (setup incluso; derrubado após N minutos ocioso) e os seguintes
+        `sky exec`, que pula provisionamento e setup. Um processo que ainda não
+        usou o cluster consulta o `sky status` e, se outro worker já o subiu,
+        também vai direto para o `sky exec`. Se o `sky exec` falha antes de o
+        job começar e o `sky status` mostra que o cluster caiu (derrubado por
+        ociosidade, por exemplo), o job é relançado; qualquer outra falha é
+        erro do job.
+
+        Workers que lançam o mesmo cluster ao mesmo tempo (ambos o viram fora
+        do ar) são serializados pelo lock de cluster do Skypilot, que é local à
+        máquina: o segundo `sky launch` encontra o cluster no ar e só repete o
+        setup, que é idempotente. Por isso o cluster compartilhado pressupõe
+        os workers na mesma máquina (mesmo estado do `~/.sky`).
+
         Args:
-            nome_job: Nome do job
-            imagens_urls: URLs das imagens para processar
-            modelo: Modelo a usar
-            parametros: Parâmetros do modelo
-        
+            nome_cluster: Nome do cluster
+            imagens: Imagens a processar ({"arquivo_id", "url"})
+            progresso: Chamado com (percentual, mensagem) a cada imagem processada
+            timeout_segundos: Tempo máximo do job antes de cancelá-lo
+            ociosidade_minutos: Mantém o cluster entre jobs por esse tempo ocioso
+
         Returns:
-            Informações do job submetido
+            Detecções por arquivo_id (como string, vindo do JSON)
+
+        Raises:
+            RuntimeError: se o Skypilot falhar ou não devolver o resultado
         """
+        config = self.criar_config_skypilot(imagens, modelo, parametros)
+        # JSON é YAML válido: dispensa o PyYAML no backend
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
+            json.dump(config, f)
+            config_file = f.name
+
         try:
-            # Criar configuração
-            config = self.criar_config_skypilot(imagens_urls, modelo, parametros)
-            
-            # Salvar config em arquivo temporário
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-                yaml.dump(config, f)
-                config_file = f.name
-            
-            # Submeter job via Skypilot CLI
-            # Este é um exemplo - a implementação real dependeria de como Skypilot é usado
-            cmd = ["sky", "launch", "-c", nome_job, config_file]
-            
-            # Para demonstração, simulamos o resultado
-            job_id = f"job_{datetime.now().strftime('%Y%m%d%H%M%S')}"
-            
-            return {
-                "job_id": job_id,
-                "status": "submitted",
-                "nome_job": nome_job,
-                "config": config_file,
-                "timestamp": datetime.now().isoformat()
-            }
-        except Exception as e:
-            raise Exception(f"Erro ao submeter job: {str(e)}")
-    
-    def obter_status_job(self, job_id: str) -> Dict[str, Any]:
-        """Obtém status de um job"""
+            if ociosidade_minutos is None:
+                comando = ["sky", "launch", "-y", "--down", "-c", nome_cluster, config_file]
+                return await self._executar(comando, nome_cluster, False, progresso, timeout_segundos)
+
+            if nome_cluster in self._clusters_quentes or await self._cluster_no_ar(nome_cluster):
+                try:
+                    return await self._executar(
+                        ["sky", "exec", nome_cluster, config_file], nome_cluster, True, progresso, timeout_segundos
+                    )
+                except _ClusterIndisponivel:
+                    self._clusters_quentes.discard(nome_cluster)
+                    logger.info("Cluster %s não está mais no ar: relançando", nome_cluster)
+            comando = [
+                "sky", "launch", "-y", "-c", nome_cluster,
+                "-i", str(ociosidade_minutos), "--down", config_file,
+            ]
+            resultado = await self._executar(comando, nome_cluster, True, progresso, timeout_segundos)
+            self._clusters_quentes.add(nome_cluster)
+            return resultado
+        finally:
+            os.unlink(config_file)
+
+    async def _executar(
+        self,
+        comando: List[str],
+        nome_cluster: str,
+        compartilhado: bool,
+        progresso: Optional[Callable[[float, str], None]],
+        timeout_segundos: Optional[float],
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Roda o comando do Skypilot acompanhando a saída até o resultado"""
+        processo = await asyncio.create_subprocess_exec(
+            *comando,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+        )
+        acompanhamento = _Acompanhamento(progresso)
         try:
-            # Implementar verificação real com Skypilot
-            return {
-                "job_id": job_id,
-                "status": "completed",  # ou "running", "failed"
-                "progresso": 100,
-                "timestamp": datetime.now().isoformat()
-            }
-        except Exception as e:
-            raise Exception(f"Erro ao obter status: {str(e)}")
-    
-    def obter_resultado_job(self, job_id: str) -> Dict[str, Any]:
-        """Obtém resultado de um job concluído"""
+            await asyncio.wait_for(acompanhamento.ler(processo.stdout), timeout_segundos)
+            codigo = await processo.wait()
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            # Job cancelado ou travado: não deixar a GPU ocupada
+            if processo.returncode is None:
+                processo.kill()
+            if not compartilhado:
+                await self.derrubar_cluster(nome_cluster)
+            elif acompanhamento.job_id is not None:
+                await self.cancelar_job_cluster(nome_cluster, acompanhamento.job_id)
+            raise
+        if codigo != 0:
+            mensagem = f"{comando[1]} terminou com código {codigo}: {' | '.join(acompanhamento.saida[-5:])}"
+            # Falha antes do primeiro PROGRESSO só é "cluster fora do ar" se o status confirmar
+            if comando[1] == "exec" and not acompanhamento.iniciado:
+                if await self._cluster_no_ar(nome_cluster) is False:
+                    raise _ClusterIndisponivel(mensagem)
+            raise RuntimeError(mensagem)
+        if acompanhamento.resultado is None:
+            raise RuntimeError(f"sky {comando[1]} terminou sem devolver o resultado da análise")
+        return acompanhamento.resultado
+
+    async def _cluster_no_ar(self, nome_cluster: str) -> Optional[bool]:
+        """
+        Consulta o `sky status --refresh` (estado real na nuvem, não o cache local)
+
+        Returns:
+            True se o cluster está UP, False se não existe ou não está UP
+            (parado, derrubado, em INIT) e None se o status não pôde ser lido
+        """
         try:
-            # Buscar arquivo de resultado no Azure Blob Storage ou localmente
-            return {
-                "deteccoes": [],
-                "confianca_media": 0.0,
-                "total_deteccoes": 0,
-                "modelo": "YOLOv8"
-            }
-        except Exception as e:
-            raise Exception(f"Erro ao obter resultado: {str(e)}")
-    
+            processo = await asyncio.create_subprocess_exec(
+                "sky", "status", "--refresh", nome_cluster,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+            )
+            linhas = [linha.decode('utf-8', errors='replace').split() async for linha in processo.stdout]
+            codigo = await processo.wait()
+        except Exception:
+            logger.exception("Falha ao consultar o status do cluster %s", nome_cluster)
+            return None
+        if codigo != 0:
+            logger.warning("sky status do cluster %s terminou com código %s", nome_cluster, codigo)
+            return None
+        # Tabela NAME ... STATUS ...; cluster inexistente não tem linha
+        return any(colunas[:1] == [nome_cluster] and "UP" in colunas for colunas in linhas)
+
+    async def derrubar_cluster(self, nome_cluster: str) -> None:
+        """Derruba o cluster (melhor esforço: falhas só são registradas)"""
+        try:
+            processo = await asyncio.create_subprocess_exec(
+                "sky", "down", "-y", nome_cluster,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+            await processo.wait()
+        except Exception:
+            logger.exception("Falha ao derrubar o cluster %s", nome_cluster)
+
+    async def cancelar_job_cluster(self, nome_cluster: str, job_id: str) -> None:
+        """Cancela um job em um cluster compartilhado, mantendo o cluster (melhor esforço)"""
+        try:
+            processo = await asyncio.create_subprocess_exec(
+                "sky", "cancel", "-y", nome_cluster, job_id,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+            await processo.wait()
+        except Exception:
+            logger.exception("Falha ao cancelar o job %s no cluster %s", job_id, nome_cluster)
+
     def cancelar_job(self, job_id: str) -> bool:
         """Cancela um job em execução"""
         try:
@@ -0,0 +1,64 @@
+"""
+Armazenamento de arquivos com backends plugáveis
+"""
+import os
+
+from src.geobot_plataforma_backend.core.config import settings
+
+from .azure import AzureBlobStorageBackend
+from .base import EscritaStorage, PropriedadesObjeto, ResultadoGravacao, StorageBackend
+from .local import LocalStorageBackend
+from .memoria import MemoriaStorageBackend
+from .servir import responder_objeto
+from .streaming import gravar_upload
+
+__all__ = [
+    "EscritaStorage",
+    "PropriedadesObjeto",
+    "ResultadoGravacao",
+    "StorageBackend",
+    "AzureBlobStorageBackend",
+    "LocalStorageBackend",
+    "MemoriaStorageBackend",
+    "gravar_upload",
+    "responder_objeto",
+    "obter_storage_backend",
+    "encerrar_storage_backend",
+]
+
+
+# Backend singleton
+_storage_backend = None
+
+
+def obter_storage_backend() -> StorageBackend:
+    """Factory para obter o backend configurado em `storage_backend`"""
+    global _storage_backend
+    if _storage_backend is None:
+        tipo = settings.get('storage_backend', 'local')
+        if tipo == 'local':
+            _storage_backend = LocalStorageBackend(settings.get('upload_folder', 'uploads'))
+        elif tipo == 'memoria':
+            _storage_backend = MemoriaStorageBackend()
+        elif tipo == 'azure':
+            _storage_backend = AzureBlobStorageBackend(
+                os.getenv("AZURE_STORAGE_CONNECTION_STRING"),
+                os.getenv("AZURE_STORAGE_CONTAINER", "fiscalizacoes"),
+                margem_url_segundos=int(settings.get('storage_url_assinada_margem_minutos', 5)) * 60,
+                cache_urls=int(settings.get('storage_url_assinada_cache', 20000)),
+                bloco_bytes=int(settings.get('storage_azure_bloco_mb', 8)) * 1024 * 1024,
+                concorrencia=int(settings.get('storage_azure_concorrencia', 8)),
+                tentativas=int(settings.get('storage_azure_tentativas', 5)),
+                backoff_segundos=int(settings.get('storage_azure_backoff_segundos', 1)),
+            )
+        else:
+            raise ValueError(f"Backend de storage desconhecido: {tipo}")
+    return _storage_backend
+
+
+async def encerrar_storage_backend() -> None:
+    """Fecha as conexões do backend; o próximo `obter_storage_backend` cria outro"""
+    global _storage_backend
+    if _storage_backend is not None:
+        backend, _storage_backend = _storage_backend, None
+        await backend.fechar()
@@ -0,0 +1,311 @@
+"""
+Backend de armazenamento em Azure Blob Storage
+
+Usa o SDK assíncrono (`azure.storage.blob.aio`, opcional: só é importado quando
+o backend é configurado). Uma única instância vive enquanto a aplicação roda
+(ver `obter_storage_backend`), então todas as requisições compartilham a mesma
+sessão HTTP e o pool de conexões dela; `fechar()` encerra a sessão no shutdown.
+
+Transferências grandes são feitas em blocos de `bloco_bytes`, com até
+`concorrencia` blocos em voo (envio e download), e falhas transitórias
+(5xx, 429, timeouts) são repetidas com backoff exponencial pela política do SDK.
+Para desenvolvimento, o Azurite aceita a connection string `UseDevelopmentStorage=true`.
+"""
+import asyncio
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Set, Tuple
+
+from src.geobot_plataforma_backend.core.cache import CacheTTL
+
+from .base import EscritaStorage, PropriedadesObjeto, StorageBackend
+
+try:
+    from azure.core import MatchConditions
+    from azure.core.exceptions import ResourceNotFoundError
+    from azure.storage.blob import BlobSasPermissions, ContentSettings, generate_blob_sas
+    from azure.storage.blob.aio import BlobServiceClient, ExponentialRetry
+except ImportError:  # pragma: no cover - dependência opcional
+    BlobServiceClient = None
+
+BLOCO_PADRAO_BYTES = 8 * 1024 * 1024
+
+
+def _id_bloco(indice: int) -> str:
+    """IDs de bloco precisam ter o mesmo tamanho dentro de um blob (o SDK os codifica em base64)"""
+    return f"{indice:08d}"
+
+
+class _EscritaAzure(EscritaStorage):
+    """
+    Junta os chunks recebidos em blocos de `bloco_bytes` e envia cada bloco
+    (Put Block) em paralelo, com até `concorrencia` envios em voo; a lista é
+    confirmada ao concluir. A memória fica limitada a cerca de `concorrencia + 1`
+    blocos, qualquer que seja o tamanho do arquivo.
+    """
+
+    def __init__(self, blob_client, tipo_mime: Optional[str], bloco_bytes: int, concorrencia: int):
+        self.blob_client = blob_client
+        self.tipo_mime = tipo_mime
+        self.bloco_bytes = bloco_bytes
+        self._buffer = bytearray()
+        self._blocos: List[str] = []
+        self._envios: Set[asyncio.Task] = set()
+        self._vagas = asyncio.Semaphore(concorrencia)
+
+    async def _enviar(self, id_bloco: str, dados: bytes) -> None:
+        try:
+            await self.blob_client.stage_block(id_bloco, dados, length=len(dados))
+        finally:
+            self._vagas.release()
+
+    def _verificar_envios(self) -> None:
+        """Propaga a primeira falha de um envio já terminado"""
+        for envio in [e for e in self._envios if e.done()]:
+            self._envios.discard(envio)
+            if not envio.cancelled() and envio.exception() is not None:
+                raise envio.exception()
+
+    async def _despachar(self, dados: bytes) -> None:
+        # Espera uma vaga: o upload do cliente desacelera junto com o storage
+        await self._vagas.acquire()
+        id_bloco = _id_bloco(len(self._blocos))
+        self._blocos.append(id_bloco)
+        self._envios.add(asyncio.create_task(self._enviar(id_bloco, dados)))
+
+    async def escrever(self, chunk: bytes) -> None:
+        self._verificar_envios()
+        self._buffer += chunk
+        while len(self._buffer) >= self.bloco_bytes:
+            dados = bytes(self._buffer[:self.bloco_bytes])
+            del self._buffer[:self.bloco_bytes]
+            await self._despachar(dados)
+
+    async def concluir(self) -> None:
+        if self._buffer:
+            await self._despachar(bytes(self._buffer))
+            self._buffer.clear()
+        await asyncio.gather(*self._envios)
+        self._envios.clear()
+        await self.blob_client.commit_block_list(
+            self._blocos,
+            content_settings=ContentSettings(content_type=self.tipo_mime) if self.tipo_mime else None,
+        )
+
+    async def abortar(self) -> None:
+        # Blocos nunca confirmados são descartados pelo próprio Azure (após 7 dias)
+        for envio in self._envios:
+            envio.cancel()
+        await asyncio.gather(*self._envios, return_exceptions=True)
+        self._envios.clear()
+        self._buffer.clear()
+        self._blocos.clear()
+
+
+class AzureBlobStorageBackend(StorageBackend):
+    """Armazena objetos como block blobs de um container"""
+
+    INTERVALO_COPIA_SEGUNDOS = 0.2
+
+    def __init__(
+        self,
+        connection_string: str,
+        container: str,
+        margem_url_segundos: int = 300,
+        cache_urls: int = 20_000,
+        bloco_bytes: int = BLOCO_PADRAO_BYTES,
+        concorrencia: int = 8,
+        tentativas: int = 5,
+        backoff_segundos: int = 1,
+    ):
+        if BlobServiceClient is None:
+            raise ValueError("Backend 'azure' requer azure-storage-blob e aiohttp (extra `azure`)")
+        if not connection_string:
+            raise ValueError("AZURE_STORAGE_CONNECTION_STRING não configurado")
+        self.container = container
+        self.bloco_bytes = bloco_bytes
+        self.concorrencia = concorrencia
+        self.blob_service_client = BlobServiceClient.from_connection_string(
+            connection_string,
+            # Esperas de backoff_segundos + 2^n entre tentativas
+            retry_policy=ExponentialRetry(initial_backoff=backoff_segundos, increment_base=2, retry_total=tentativas),
+            max_block_size=bloco_bytes,
+            max_single_put_size=bloco_bytes,
+            max_chunk_get_size=bloco_bytes,
+            max_single_get_size=bloco_bytes,
+        )
+        # URL assinada é reaproveitada até `margem_url_segundos` antes de expirar
+        self.margem_url_segundos = margem_url_segundos
+        self._urls = CacheTTL(tamanho_maximo=cache_urls)
+
+    def _blob(self, chave: str):
+        return self.blob_service_client.get_blob_client(container=self.container, blob=chave.lstrip("/"))
+
+    async def fechar(self) -> None:
+        await self.blob_service_client.close()
+
+    async def abrir_escrita(self, chave: str, tipo_mime: Optional[str] = None) -> EscritaStorage:
+        return _EscritaAzure(self._blob(chave), tipo_mime, self.bloco_bytes, self.concorrencia)
+
+    async def ler(
+        self,
+        chave: str,
+        chunk_bytes: int = 1024 * 1024,
+        inicio: int = 0,
+        tamanho: Optional[int] = None,
+    ) -> AsyncIterator[bytes]:
+        """
+        Baixa faixas de `bloco_bytes` em paralelo, mantendo até `concorrencia`
+        faixas à frente do consumidor, e entrega os chunks em ordem.
+
+        A primeira faixa informa o tamanho e o ETag do blob; as demais exigem o
+        mesmo ETag, para não misturar versões se o blob for sobrescrito no meio.
+        """
+        blob = self._blob(chave)
+        try:
+            primeira = await blob.download_blob(
+                offset=inicio, length=self.bloco_bytes if tamanho is None else min(self.bloco_bytes, tamanho)
+            )
+        except ResourceNotFoundError as err:
+            raise FileNotFoundError(chave) from err
+        fim = int(primeira.properties.content_range.rsplit("/", 1)[-1])
+        if tamanho is not None:
+            fim = min(fim, inicio + tamanho)
+        etag = primeira.properties.etag
+
+        async def baixar(posicao: int) -> bytes:
+            downloader = await blob.download_blob(
+                offset=posicao,
+                length=min(self.bloco_bytes, fim - posicao),
+                etag=etag,
+                match_condition=MatchConditions.IfNotModified,
+            )
+            return await downloader.readall()
+
+        inicios = iter(range(inicio + self.bloco_bytes, fim, self.bloco_bytes))
+        pendentes = deque([asyncio.ensure_future(primeira.readall())])
+        pendentes.extend(asyncio.ensure_future(baixar(i)) for i in islice(inicios, self.concorrencia - 1))
+        try:
+            while pendentes:
+                dados = await pendentes.popleft()
+                proximo = next(inicios, None)
+                if proximo is not None:
+                    pendentes.append(asyncio.ensure_future(baixar(proximo)))
+                for posicao in range(0, len(dados), chunk_bytes):
+                    yield dados[posicao:posicao + chunk_bytes]
+        finally:
+            for pendente in pendentes:
+                pendente.cancel()
+            await asyncio.gather(*pendentes, return_exceptions=True)
+
+    @staticmethod
+    def _propriedades(chave: str, propriedades) -> PropriedadesObjeto:
+        return PropriedadesObjeto(
+            chave=chave,
+            tamanho_bytes=propriedades.size,
+            modificado_em=propriedades.last_modified,
+            etag=propriedades.etag,
+            tipo_mime=propriedades.content_settings.content_type if propriedades.content_settings else None,
+        )
+
+    async def propriedades(self, chave: str) -> PropriedadesObjeto:
+        try:
+            propriedades = await self._blob(chave).get_blob_properties()
+        except ResourceNotFoundError as err:
+            raise FileNotFoundError(chave) from err
+        return self._propriedades(chave, propriedades)
+
+    async def listar(
+        self,
+        prefixo: str = "",
+        limite: int = 1000,
+        continuacao: Optional[str] = None,
+    ) -> Tuple[List[PropriedadesObjeto], Optional[str]]:
+        paginas = (
+            self.blob_service_client.get_container_client(self.container)
+            .list_blobs(name_starts_with=prefixo.lstrip("/") or None, results_per_page=limite)
+            .by_page(continuation_token=continuacao)
+        )
+        objetos = []
+        async for pagina in paginas:
+            async for blob in pagina:
+                objetos.append(self._propriedades(blob.name, blob))
+            break
+        return objetos, paginas.continuation_token
+
+    async def mover(self, origem: str, destino: str) -> None:
+        """Blob Storage não tem rename: copia no servidor (mesma conta) e apaga a origem"""
+        blob_origem = self._blob(origem)
+        blob_destino = self._blob(destino)
+        copia = await blob_destino.start_copy_from_url(blob_origem.url)
+        status = copia.get("copy_status")
+        while status == "pending":
+            await asyncio.sleep(self.INTERVALO_COPIA_SEGUNDOS)
+            propriedades = await blob_destino.get_blob_properties()
+            status = propriedades.copy.status
+        if status != "success":
+            raise RuntimeError(f"Falha ao copiar blob {origem} -> {destino}: {status}")
+        await self.deletar(origem)
+
+    async def existe(self, chave: str) -> bool:
+        return await self._blob(chave).exists()
+
+    async def deletar(self, chave: str) -> None:
+        try:
+            await self._blob(chave).delete_blob()
+        except ResourceNotFoundError:
+            pass
+
+    async def gravar_bloco(self, chave: str, id_bloco: str, dados: bytes) -> None:
+        await self._blob(chave).stage_block(id_bloco, dados, length=len(dados))
+
+    async def confirmar_blocos(self, chave: str, ids_blocos: List[str], tipo_mime: Optional[str] = None) -> None:
+        await self._blob(chave).commit_block_list(
+            ids_blocos,
+            content_settings=ContentSettings(content_type=tipo_mime) if tipo_mime else None,
+        )
+
+    async def descartar_blocos(self, chave: str, ids_blocos: List[str]) -> None:
+        # Não há como apagar blocos não confirmados: o Azure os descarta após 7 dias
+        return None
+
+    async def _credencial_assinatura(self, inicio: datetime, expira_em: datetime) -> Dict[str, object]:
+        """Chave da conta, se a connection string a tiver; senão uma chave de delegação (Entra ID)"""
+        chave_conta = getattr(self.blob_service_client.credential, "account_key", None)
+        if chave_conta:
+            return {"account_key": chave_conta}
+        # Uma única requisição ao Azure para assinar o lote inteiro
+        chave_delegacao = await self.blob_service_client.get_user_delegation_key(inicio, expira_em)
+        return {"user_delegation_key": chave_delegacao}
+
+    async def urls_assinadas(self, chaves: Sequence[str], validade_segundos: int) -> Dict[str, str]:
+        """
+        URLs SAS de leitura: as ainda válidas vêm do cache; as demais são assinadas
+        juntas, com a mesma credencial e a mesma expiração.
+        """
+        chaves = list(dict.fromkeys(chaves))
+        em_cache = self._urls.obter_muitos((chave, validade_segundos) for chave in chaves)
+        urls = {chave: url for (chave, _), url in em_cache.items()}
+        faltantes = [chave for chave in chaves if chave not in urls]
+        if not faltantes:
+            return urls
+
+        agora = datetime.now(timezone.utc)
+        expira_em = agora + timedelta(seconds=validade_segundos)
+        credencial = await self._credencial_assinatura(agora - timedelta(minutes=5), expira_em)
+        reuso_segundos = validade_segundos - self.margem_url_segundos
+        for chave in faltantes:
+            blob = self._blob(chave)
+            sas = generate_blob_sas(
+                account_name=self.blob_service_client.account_name,
+                container_name=self.container,
+                blob_name=blob.blob_name,
+                permission=BlobSasPermissions(read=True),
+                expiry=expira_em,
+                **credencial,
+            )
+            urls[chave] = f"{blob.url}?{sas}"
+            if reuso_segundos > 0:
+                self._urls.definir((chave, validade_segundos), urls[chave], ttl_segundos=reuso_segundos)
+        return urls
@@ -0,0 +1,123 @@
+"""
+Contratos dos backends de armazenamento de arquivos
+"""
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+
+@dataclass
+class ResultadoGravacao:
+    """Metadados calculados durante a gravação em streaming"""
+    chave: str
+    tamanho_bytes: int
+    hash_sha256: str
+
+
+@dataclass
+class PropriedadesObjeto:
+    """Metadados de um objeto já gravado (stat)"""
+    chave: str
+    tamanho_bytes: int
+    modificado_em: Optional[datetime] = None
+    etag: Optional[str] = None
+    tipo_mime: Optional[str] = None
+
+
+class EscritaStorage(ABC):
+    """Escrita incremental de um objeto no storage (um chunk por vez)"""
+
+    @abstractmethod
+    async def escrever(self, chunk: bytes) -> None:
+        """Acrescenta um chunk ao objeto em gravação"""
+
+    @abstractmethod
+    async def concluir(self) -> None:
+        """Finaliza a gravação tornando o objeto visível"""
+
+    @abstractmethod
+    async def abortar(self) -> None:
+        """Descarta tudo o que foi gravado até o momento"""
+
+
+class StorageBackend(ABC):
+    """Interface comum dos backends de armazenamento"""
+
+    @abstractmethod
+    async def abrir_escrita(self, chave: str, tipo_mime: Optional[str] = None) -> EscritaStorage:
+        """Abre uma escrita em streaming para a chave informada"""
+
+    @abstractmethod
+    def ler(
+        self,
+        chave: str,
+        chunk_bytes: int = 1024 * 1024,
+        inicio: int = 0,
+        tamanho: Optional[int] = None,
+    ) -> AsyncIterator[bytes]:
+        """
+        Lê o objeto (ou os `tamanho` bytes a partir de `inicio`) em chunks
+        (gerador assíncrono); FileNotFoundError se não existir
+        """
+
+    @abstractmethod
+    async def propriedades(self, chave: str) -> PropriedadesObjeto:
+        """Tamanho, data de modificação e ETag do objeto; FileNotFoundError se não existir"""
+
+    @abstractmethod
+    async def listar(
+        self,
+        prefixo: str = "",
+        limite: int = 1000,
+        continuacao: Optional[str] = None,
+    ) -> Tuple[List[PropriedadesObjeto], Optional[str]]:
+        """
+        Uma página de objetos com chave começando por `prefixo`, em ordem de chave
+
+        Listar é lento em storages grandes: a aplicação lista pelo catálogo
+        (arquivos_fiscalizacao); isto fica para diagnóstico e manutenção.
+
+        Returns:
+            (objetos da página, token da próxima página ou None)
+        """
+
+    @abstractmethod
+    async def mover(self, origem: str, destino: str) -> None:
+        """Move um objeto (sobrescreve o destino se já existir)"""
+
+    @abstractmethod
+    async def existe(self, chave: str) -> bool:
+        """Verifica se um objeto existe"""
+
+    @abstractmethod
+    async def deletar(self, chave: str) -> None:
+        """Remove um objeto (não falha se ele não existir)"""
+
+    # Uploads retomáveis: o objeto é montado a partir de blocos enviados em requisições separadas
+
+    @abstractmethod
+    async def gravar_bloco(self, chave: str, id_bloco: str, dados: bytes) -> None:
+        """Grava (ou regrava) um bloco ainda não confirmado do objeto"""
+
+    @abstractmethod
+    async def confirmar_blocos(self, chave: str, ids_blocos: List[str], tipo_mime: Optional[str] = None) -> None:
+        """Monta o objeto com os blocos na ordem informada, tornando-o visível"""
+
+    @abstractmethod
+    async def descartar_blocos(self, chave: str, ids_blocos: List[str]) -> None:
+        """Descarta blocos não confirmados (upload cancelado ou abandonado)"""
+
+    # Acesso direto: o cliente baixa do storage sem passar pela API
+
+    async def urls_assinadas(self, chaves: Sequence[str], validade_segundos: int) -> Dict[str, str]:
+        """URLs de leitura temporárias para as chaves, assinadas em lote; vazio se o backend não oferece"""
+        return {}
+
+    def caminho_local(self, chave: str) -> Optional[str]:
+        """Caminho do objeto no disco local, para ser servido com sendfile; None se não houver"""
+        return None
+
+    async def fechar(self) -> None:
+        """Libera conexões mantidas pelo backend (chamado no shutdown da aplicação)"""
+        return None
@@ -0,0 +1,165 @@
+"""
+Backend de armazenamento em sistema de arquivos local (desenvolvimento, testes e on-premise)
+"""
+import asyncio
+import mimetypes
+import os
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import AsyncIterator, List, Optional, Tuple
+
+from .base import EscritaStorage, PropriedadesObjeto, StorageBackend
+
+
+class _EscritaLocal(EscritaStorage):
+    """Grava em um arquivo `.parcial` e renomeia ao concluir"""
+
+    def __init__(self, destino: Path):
+        self.destino = destino
+        self.parcial = destino.with_name(destino.name + ".parcial")
+        self.parcial.parent.mkdir(parents=True, exist_ok=True)
+        self._arquivo = open(self.parcial, "wb")
+
+    async def escrever(self, chunk: bytes) -> None:
+        await asyncio.to_thread(self._arquivo.write, chunk)
+
+    async def concluir(self) -> None:
+        self._arquivo.close()
+        os.replace(self.parcial, self.destino)
+
+    async def abortar(self) -> None:
+        self._arquivo.close()
+        self.parcial.unlink(missing_ok=True)
+
+
+class LocalStorageBackend(StorageBackend):
+    """Armazena objetos como arquivos abaixo de um diretório raiz"""
+
+    def __init__(self, raiz: str):
+        self.raiz = Path(raiz).resolve()
+        self.raiz.mkdir(parents=True, exist_ok=True)
+
+    def caminho(self, chave: str) -> Path:
+        """Resolve a chave para um caminho, impedindo escapar da raiz"""
+        caminho = (self.raiz / chave.lstrip("/")).resolve()
+        if caminho != self.raiz and self.raiz not in caminho.parents:
+            raise ValueError(f"Chave de storage inválida: {chave}")
+        return caminho
+
+    async def abrir_escrita(self, chave: str, tipo_mime: Optional[str] = None) -> EscritaStorage:
+        return _EscritaLocal(self.caminho(chave))
+
+    def caminho_local(self, chave: str) -> Optional[str]:
+        return str(self.caminho(chave))
+
+    async def ler(
+        self,
+        chave: str,
+        chunk_bytes: int = 1024 * 1024,
+        inicio: int = 0,
+        tamanho: Optional[int] = None,
+    ) -> AsyncIterator[bytes]:
+        arquivo = await asyncio.to_thread(open, self.caminho(chave), "rb")
+        try:
+            arquivo.seek(inicio)
+            restante = tamanho
+            while restante is None or restante > 0:
+                chunk = await asyncio.to_thread(
+                    arquivo.read, chunk_bytes if restante is None else min(chunk_bytes, restante)
+                )
+                if not chunk:
+                    break
+                if restante is not None:
+                    restante -= len(chunk)
+                yield chunk
+        finally:
+            arquivo.close()
+
+    def _propriedades(self, chave: str, resultado_stat: os.stat_result) -> PropriedadesObjeto:
+        return PropriedadesObjeto(
+            chave=chave,
+            tamanho_bytes=resultado_stat.st_size,
+            modificado_em=datetime.fromtimestamp(resultado_stat.st_mtime, timezone.utc),
+            etag=f'"{resultado_stat.st_mtime_ns:x}-{resultado_stat.st_size:x}"',
+            tipo_mime=mimetypes.guess_type(chave)[0],
+        )
+
+    async def propriedades(self, chave: str) -> PropriedadesObjeto:
+        caminho = self.caminho(chave)
+        if not caminho.is_file():
+            raise FileNotFoundError(chave)
+        return self._propriedades(chave, await asyncio.to_thread(caminho.stat))
+
+    async def listar(
+        self,
+        prefixo: str = "",
+        limite: int = 1000,
+        continuacao: Optional[str] = None,
+    ) -> Tuple[List[PropriedadesObjeto], Optional[str]]:
+        """Percorre só a pasta do prefixo; o token é a última chave devolvida"""
+        prefixo = prefixo.lstrip("/")
+        pasta = self.caminho(prefixo.rsplit("/", 1)[0] if "/" in prefixo else "")
+
+        def percorrer() -> List[PropriedadesObjeto]:
+            chaves = []
+            for atual, pastas, arquivos in os.walk(pasta):
+                # Gravações em andamento e blocos de uploads retomáveis não são objetos
+                pastas[:] = [p for p in pastas if not p.endswith(".blocos")]
+                for nome in arquivos:
+                    if nome.endswith(".parcial"):
+                        continue
+                    chave = (Path(atual) / nome).relative_to(self.raiz).as_posix()
+                    if chave.startswith(prefixo) and (continuacao is None or chave > continuacao):
+                        chaves.append(chave)
+            chaves.sort()
+            return [self._propriedades(c, (self.raiz / c).stat()) for c in chaves[:limite + 1]]
+
+        objetos = await asyncio.to_thread(percorrer)
+        if len(objetos) > limite:
+            objetos = objetos[:limite]
+            return objetos, objetos[-1].chave
+        return objetos, None
+
+    async def mover(self, origem: str, destino: str) -> None:
+        caminho_destino = self.caminho(destino)
+        caminho_destino.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(self.caminho(origem), caminho_destino)
+
+    async def existe(self, chave: str) -> bool:
+        return self.caminho(chave).is_file()
+
+    async def deletar(self, chave: str) -> None:
+        self.caminho(chave).unlink(missing_ok=True)
+
+    def _pasta_blocos(self, chave: str) -> Path:
+        return self.caminho(chave.rstrip("/") + ".blocos")
+
+    async def gravar_bloco(self, chave: str, id_bloco: str, dados: bytes) -> None:
+        pasta = self._pasta_blocos(chave)
+        pasta.mkdir(parents=True, exist_ok=True)
+        parcial = pasta / f"{id_bloco}.parcial"
+        await asyncio.to_thread(parcial.write_bytes, dados)
+        os.replace(parcial, pasta / id_bloco)
+
+    async def confirmar_blocos(self, chave: str, ids_blocos: List[str], tipo_mime: Optional[str] = None) -> None:
+        pasta = self._pasta_blocos(chave)
+        destino = self.caminho(chave)
+
+        def montar():
+            parcial = destino.with_name(destino.name + ".parcial")
+            try:
+                with open(parcial, "wb") as saida:
+                    for id_bloco in ids_blocos:
+                        with open(pasta / id_bloco, "rb") as bloco:
+                            shutil.copyfileobj(bloco, saida)
+                os.replace(parcial, destino)
+            except BaseException:
+                parcial.unlink(missing_ok=True)
+                raise
+
+        await asyncio.to_thread(montar)
+        shutil.rmtree(pasta, ignore_errors=True)
+
+    async def descartar_blocos(self, chave: str, ids_blocos: List[str]) -> None:
+        shutil.rmtree(self._pasta_blocos(chave), ignore_errors=True)
@@ -0,0 +1,127 @@
+"""
+Backend de armazenamento em memória (testes e desenvolvimento sem disco nem Azure)
+
+Os objetos vivem em um dicionário do processo: somem ao reiniciar e não são
+vistos por outros workers.
+"""
+import hashlib
+import mimetypes
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from .base import EscritaStorage, PropriedadesObjeto, StorageBackend
+
+
+@dataclass
+class _Objeto:
+    conteudo: bytes
+    tipo_mime: Optional[str]
+    modificado_em: datetime
+
+    @property
+    def etag(self) -> str:
+        return f'"{hashlib.md5(self.conteudo, usedforsecurity=False).hexdigest()}"'
+
+
+class _EscritaMemoria(EscritaStorage):
+    """Acumula os chunks e publica o objeto inteiro ao concluir"""
+
+    def __init__(self, backend: "MemoriaStorageBackend", chave: str, tipo_mime: Optional[str]):
+        self.backend = backend
+        self.chave = chave
+        self.tipo_mime = tipo_mime
+        self._buffer = bytearray()
+
+    async def escrever(self, chunk: bytes) -> None:
+        self._buffer += chunk
+
+    async def concluir(self) -> None:
+        self.backend._publicar(self.chave, bytes(self._buffer), self.tipo_mime)
+
+    async def abortar(self) -> None:
+        self._buffer.clear()
+
+
+class MemoriaStorageBackend(StorageBackend):
+    """Armazena objetos em um dicionário, com a mesma semântica dos demais backends"""
+
+    def __init__(self):
+        self._objetos: Dict[str, _Objeto] = {}
+        self._blocos: Dict[Tuple[str, str], bytes] = {}
+
+    @staticmethod
+    def _normalizar(chave: str) -> str:
+        return chave.lstrip("/")
+
+    def _publicar(self, chave: str, conteudo: bytes, tipo_mime: Optional[str]) -> None:
+        self._objetos[self._normalizar(chave)] = _Objeto(
+            conteudo, tipo_mime or mimetypes.guess_type(chave)[0], datetime.now(timezone.utc)
+        )
+
+    def _objeto(self, chave: str) -> _Objeto:
+        try:
+            return self._objetos[self._normalizar(chave)]
+        except KeyError as err:
+            raise FileNotFoundError(chave) from err
+
+    async def abrir_escrita(self, chave: str, tipo_mime: Optional[str] = None) -> EscritaStorage:
+        return _EscritaMemoria(self, chave, tipo_mime)
+
+    async def ler(
+        self,
+        chave: str,
+        chunk_bytes: int = 1024 * 1024,
+        inicio: int = 0,
+        tamanho: Optional[int] = None,
+    ) -> AsyncIterator[bytes]:
+        conteudo = self._objeto(chave).conteudo
+        fim = len(conteudo) if tamanho is None else min(len(conteudo), inicio + tamanho)
+        for posicao in range(inicio, fim, chunk_bytes):
+            yield conteudo[posicao:min(posicao + chunk_bytes, fim)]
+
+    async def propriedades(self, chave: str) -> PropriedadesObjeto:
+        objeto = self._objeto(chave)
+        return PropriedadesObjeto(
+            chave=self._normalizar(chave),
+            tamanho_bytes=len(objeto.conteudo),
+            modificado_em=objeto.modificado_em,
+            etag=objeto.etag,
+            tipo_mime=objeto.tipo_mime,
+        )
+
+    async def listar(
+        self,
+        prefixo: str = "",
+        limite: int = 1000,
+        continuacao: Optional[str] = None,
+    ) -> Tuple[List[PropriedadesObjeto], Optional[str]]:
+        prefixo = self._normalizar(prefixo)
+        chaves = sorted(
+            c for c in self._objetos if c.startswith(prefixo) and (continuacao is None or c > continuacao)
+        )
+        objetos = [await self.propriedades(c) for c in chaves[:limite]]
+        return objetos, (objetos[-1].chave if len(chaves) > limite else None)
+
+    async def mover(self, origem: str, destino: str) -> None:
+        self._objetos[self._normalizar(destino)] = self._objeto(origem)
+        del self._objetos[self._normalizar(origem)]
+
+    async def existe(self, chave: str) -> bool:
+        return self._normalizar(chave) in self._objetos
+
+    async def deletar(self, chave: str) -> None:
+        self._objetos.pop(self._normalizar(chave), None)
+
+    async def gravar_bloco(self, chave: str, id_bloco: str, dados: bytes) -> None:
+        self._blocos[(self._normalizar(chave), id_bloco)] = bytes(dados)
+
+    async def confirmar_blocos(self, chave: str, ids_blocos: List[str], tipo_mime: Optional[str] = None) -> None:
+        chave = self._normalizar(chave)
+        self._publicar(chave, b"".join(self._blocos[(chave, i)] for i in ids_blocos), tipo_mime)
+        await self.descartar_blocos(chave, ids_blocos)
+
+    async def descartar_blocos(self, chave: str, ids_blocos: List[str]) -> None:
+        chave = self._normalizar(chave)
+        for bloco in [b for b in self._blocos if b[0] == chave]:
+            del self._blocos[bloco]
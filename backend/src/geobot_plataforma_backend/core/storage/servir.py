@@ -0,0 +1,156 @@
+"""
+Entrega de objetos do storage por HTTP com suporte a `Range` (visualização de
+imagens grandes e vídeos: o cliente pede só os bytes que vai mostrar)
+"""
+import asyncio
+import os
+from email.utils import formatdate
+from typing import Dict, Mapping, Optional, Tuple
+
+from starlette.responses import Response, StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from .base import StorageBackend
+
+CHUNK_ENVIO_BYTES = 256 * 1024
+
+
+def interpretar_range(cabecalho: Optional[str], tamanho: int) -> Optional[Tuple[int, int]]:
+    """
+    Faixa (início, fim inclusivo) pedida em `Range: bytes=...`
+
+    Só uma faixa é atendida: cabeçalho ausente, malformado ou com várias faixas
+    devolve None (a RFC 9110 permite ignorar e responder o objeto inteiro).
+
+    Raises:
+        ValueError: se a faixa não puder ser atendida (resposta 416)
+    """
+    if not cabecalho or not cabecalho.startswith("bytes=") or "," in cabecalho:
+        return None
+    inicio_texto, separador, fim_texto = cabecalho[len("bytes="):].strip().partition("-")
+    if not separador or not (inicio_texto or fim_texto):
+        return None
+    if not all(t.isdigit() for t in (inicio_texto, fim_texto) if t):
+        return None
+    if not inicio_texto:
+        # Sufixo: os últimos N bytes
+        sufixo = int(fim_texto)
+        if sufixo == 0 or tamanho == 0:
+            raise ValueError(f"Faixa não atendível: {cabecalho}")
+        return max(0, tamanho - sufixo), tamanho - 1
+    inicio = int(inicio_texto)
+    if fim_texto and int(fim_texto) < inicio:
+        return None
+    if inicio >= tamanho:
+        raise ValueError(f"Faixa não atendível: {cabecalho}")
+    return inicio, min(int(fim_texto), tamanho - 1) if fim_texto else tamanho - 1
+
+
+class RespostaArquivoLocal(Response):
+    """
+    Envia uma faixa de um arquivo local sem passar os bytes pelo Python quando o
+    servidor ASGI oferece a extensão `http.response.zerocopysend` (sendfile);
+    senão lê com `os.pread` em uma thread, em chunks de CHUNK_ENVIO_BYTES.
+    """
+
+    def __init__(
+        self,
+        caminho: str,
+        inicio: int,
+        tamanho: int,
+        status_code: int,
+        headers: Mapping[str, str],
+        media_type: str,
+    ):
+        self.caminho = caminho
+        self.inicio = inicio
+        self.tamanho = tamanho
+        self.status_code = status_code
+        self.media_type = media_type
+        self.background = None
+        self.init_headers(headers)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Abre antes de enviar o cabeçalho: se o arquivo sumiu, a requisição ainda pode falhar
+        arquivo = await asyncio.to_thread(open, self.caminho, "rb")
+        try:
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            if self.tamanho == 0 or scope.get("method") == "HEAD":
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+            elif "http.response.zerocopysend" in scope.get("extensions", {}):
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": arquivo,
+                    "offset": self.inicio,
+                    "count": self.tamanho,
+                    "more_body": False,
+                })
+            else:
+                posicao, fim = self.inicio, self.inicio + self.tamanho
+                while posicao < fim:
+                    chunk = await asyncio.to_thread(
+                        os.pread, arquivo.fileno(), min(CHUNK_ENVIO_BYTES, fim - posicao), posicao
+                    )
+                    if not chunk:
+                        raise RuntimeError(f"Arquivo truncado durante o envio: {self.caminho}")
+                    posicao += len(chunk)
+                    await send({"type": "http.response.body", "body": chunk, "more_body": posicao < fim})
+        finally:
+            arquivo.close()
+
+
+async def responder_objeto(
+    storage: StorageBackend,
+    chave: str,
+    cabecalhos_requisicao: Mapping[str, str],
+    media_type: Optional[str] = None,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """
+    Resposta HTTP com o objeto (200) ou com a faixa pedida em `Range` (206)
+
+    Honra `If-None-Match` (304) e `If-Range`; arquivos do backend local são
+    enviados direto do disco, os demais em streaming pelo próprio backend.
+
+    Raises:
+        FileNotFoundError: se o objeto não existir
+    """
+    propriedades = await storage.propriedades(chave)
+    tamanho = propriedades.tamanho_bytes
+    cabecalhos = {"accept-ranges": "bytes", **(headers or {})}
+    if propriedades.etag:
+        cabecalhos["etag"] = propriedades.etag
+    if propriedades.modificado_em:
+        cabecalhos["last-modified"] = formatdate(propriedades.modificado_em.timestamp(), usegmt=True)
+
+    if propriedades.etag and cabecalhos_requisicao.get("if-none-match") == propriedades.etag:
+        return Response(status_code=304, headers=cabecalhos)
+
+    cabecalho_range = cabecalhos_requisicao.get("range")
+    if_range = cabecalhos_requisicao.get("if-range")
+    if if_range and if_range != propriedades.etag:
+        cabecalho_range = None  # Objeto mudou desde a parte que o cliente já tem: envia inteiro
+    try:
+        faixa = interpretar_range(cabecalho_range, tamanho)
+    except ValueError:
+        return Response(status_code=416, headers={**cabecalhos, "content-range": f"bytes */{tamanho}"})
+
+    status_code = 200
+    inicio, fim = 0, tamanho - 1
+    if faixa is not None:
+        status_code = 206
+        inicio, fim = faixa
+        cabecalhos["content-range"] = f"bytes {inicio}-{fim}/{tamanho}"
+    quantidade = fim - inicio + 1
+    cabecalhos["content-length"] = str(quantidade)
+    media_type = media_type or propriedades.tipo_mime or "application/octet-stream"
+
+    caminho = storage.caminho_local(chave)
+    if caminho is not None:
+        return RespostaArquivoLocal(caminho, inicio, quantidade, status_code, cabecalhos, media_type)
+    return StreamingResponse(
+        storage.ler(chave, inicio=inicio, tamanho=quantidade),
+        status_code=status_code,
+        headers=cabecalhos,
+        media_type=media_type,
+    )
@@ -0,0 +1,52 @@
+"""
+Gravação de uploads em streaming: tamanho e SHA-256 calculados enquanto os chunks
+são enviados ao storage, sem carregar o arquivo inteiro em memória
+"""
+import hashlib
+from typing import Optional
+
+from .base import ResultadoGravacao, StorageBackend
+
+CHUNK_PADRAO_BYTES = 1024 * 1024
+
+
+async def gravar_upload(
+    storage: StorageBackend,
+    origem,
+    chave: str,
+    tipo_mime: Optional[str] = None,
+    tamanho_maximo_bytes: Optional[int] = None,
+    chunk_bytes: int = CHUNK_PADRAO_BYTES,
+) -> ResultadoGravacao:
+    """
+    Lê `origem` (qualquer objeto com `async read(n)`, ex: UploadFile) em chunks e
+    grava na chave informada.
+
+    Raises:
+        ValueError: se o arquivo estiver vazio ou exceder `tamanho_maximo_bytes`
+    """
+    escrita = await storage.abrir_escrita(chave, tipo_mime)
+    sha256 = hashlib.sha256()
+    tamanho = 0
+    try:
+        while True:
+            chunk = await origem.read(chunk_bytes)
+            if not chunk:
+                break
+            tamanho += len(chunk)
+            if tamanho_maximo_bytes is not None and tamanho > tamanho_maximo_bytes:
+                raise ValueError(
+                    f"Arquivo excede o tamanho máximo de {tamanho_maximo_bytes // (1024 * 1024)} MB"
+                )
+            sha256.update(chunk)
+            await escrita.escrever(chunk)
+
+        if tamanho == 0:
+            raise ValueError("Arquivo vazio")
+
+        await escrita.concluir()
+    except BaseException:
+        await escrita.abortar()
+        raise
+
+    return ResultadoGravacao(chave=chave, tamanho_bytes=tamanho, hash_sha256=sha256.hexdigest())
@@ -26,6 +26,10 @@ from .etapa_e_resultado import (
     RelatórioFiscalizacao,
 )
 from .etapa_fiscalizacao_enum import EtapaFiscalizacaoEnum
+from .historico_fiscalizacao import HistoricoFiscalizacao, TipoEventoFiscalizacao
+from .sobrevoo_lote import SobrevooLote, SobrevooLoteFiscalizacao, StatusSobrevooLote
+from .upload_retomavel import StatusUploadRetomavel, UploadRetomavel
+from .job import Job, StatusJob
 
 __all__ = [
     # Models
@@ -44,6 +48,11 @@ __all__ = [
     "EtapaFiscalizacao",
     "ResultadoAnaliseIA",
     "RelatórioFiscalizacao",
+    "HistoricoFiscalizacao",
+    "SobrevooLote",
+    "SobrevooLoteFiscalizacao",
+    "UploadRetomavel",
+    "Job",
     # Enums
     "StatusDenuncia",
     "CategoriaDenuncia",
@@ -51,5 +60,9 @@ __all__ = [
     "StatusFiscalizacao",
     "TipoAnalise",
     "EtapaFiscalizacaoEnum",
+    "TipoEventoFiscalizacao",
+    "StatusSobrevooLote",
+    "StatusUploadRetomavel",
+    "StatusJob",
 ]
 
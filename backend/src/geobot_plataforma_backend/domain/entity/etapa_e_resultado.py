@@ -3,7 +3,7 @@ Modelo para rastrear o progresso das etapas de fiscalização
 """
 import uuid
 from datetime import datetime
-from sqlalchemy import BigInteger, Column, DateTime, Integer, String, Float, Boolean, ForeignKey, Text, Enum as SQLEnum
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, String, Float, Boolean, ForeignKey, Text, Enum as SQLEnum, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -52,9 +52,22 @@ class EtapaFiscalizacao(Base):
 
 
 class ArquivoFiscalizacao(Base):
-    """Modelo para armazenar referências a arquivos da fiscalização"""
+    """
+    Catálogo dos arquivos da fiscalização: as listagens consultam esta tabela,
+    nunca o container do storage
+    """
     __tablename__ = "arquivos_fiscalizacao"
-    __table_args__ = {'schema': 'geobot'}
+    __table_args__ = (
+        # Paginação por chave da listagem, com e sem filtro de tipo
+        Index(
+            'idx_arquivos_fiscalizacao_catalogo',
+            'fiscalizacao_id', 'tipo', text('created_at DESC'), text('id DESC'),
+        ),
+        Index('idx_arquivos_fiscalizacao_listagem', 'fiscalizacao_id', text('created_at DESC'), text('id DESC')),
+        Index('idx_arquivos_fiscalizacao_url_blob', 'url_blob'),
+        Index('idx_arquivos_fiscalizacao_verificado_em', text('verificado_em NULLS FIRST'), 'id'),
+        {'schema': 'geobot'},
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     uuid = Column(UUID(as_uuid=True), default=uuid.uuid4, unique=True, nullable=False)
@@ -78,6 +91,9 @@ class ArquivoFiscalizacao(Base):
     # Metadados específicos
     metadados = Column(JSONB, nullable=True)  # Ex: coordenadas GPS, altura do drone, etc
     
+    # Última conferência com o storage (reconciliação do catálogo)
+    verificado_em = Column(DateTime(timezone=True), nullable=True)
+
     # Timestamps
     created_at = Column(DateTime(timezone=True), default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now(), nullable=False)
@@ -89,7 +105,15 @@ class ArquivoFiscalizacao(Base):
 class ResultadoAnaliseIA(Base):
     """Modelo para armazenar resultados da análise de IA"""
     __tablename__ = "resultados_analise_ia"
-    __table_args__ = {'schema': 'geobot'}
+    __table_args__ = (
+        # Pedidos aguardando lote, do mais antigo ao mais novo (montagem de lotes da IA)
+        Index(
+            'idx_resultados_analise_ia_aguardando_lote',
+            'created_at', 'id',
+            postgresql_where=text("status_processamento = 'pendente' AND job_id IS NULL"),
+        ),
+        {'schema': 'geobot'},
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     uuid = Column(UUID(as_uuid=True), default=uuid.uuid4, unique=True, nullable=False)
@@ -98,8 +122,8 @@ class ResultadoAnaliseIA(Base):
     etapa_id = Column(Integer, ForeignKey("geobot.etapas_fiscalizacao.id", ondelete="CASCADE"), nullable=False)
     etapa = relationship("EtapaFiscalizacao")
     
-    # Job do Skypilot
-    job_id = Column(String(100), nullable=True)  # ID do job no Skypilot
+    # Job da fila (geobot.jobs) que processa o pedido; nulo enquanto aguarda lote
+    job_id = Column(String(100), nullable=True)
     
     # Resultados da IA
     deteccoes = Column(JSONB, nullable=False)  # Array com detecções
@@ -2,7 +2,7 @@
 Modelo de fiscalização
 """
 from sqlalchemy import (
-    BigInteger, Column, DateTime, Enum, ForeignKey, String, Text, CheckConstraint
+    BigInteger, Column, DateTime, Enum, ForeignKey, Index, String, Text, CheckConstraint, text
 )
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
@@ -49,6 +49,16 @@ class Fiscalizacao(Base):
 
     __table_args__ = (
         CheckConstraint("data_conclusao IS NULL OR data_conclusao >= data_inicializacao", name="datas_validas"),
+        # No máximo uma fiscalização ativa por denúncia (alvo do ON CONFLICT na criação)
+        Index(
+            "uq_fiscalizacoes_denuncia_ativa",
+            "denuncia_id",
+            unique=True,
+            postgresql_where=text("status IN ('aguardando', 'em_andamento')"),
+            sqlite_where=text("status IN ('aguardando', 'em_andamento')"),
+        ),
+        # Paginação de "minhas fiscalizações": status e updated_at por id sem ler a linha
+        Index("idx_fiscalizacoes_id_status_updated_at", "id", postgresql_include=["status", "updated_at"]),
         {'schema': 'geobot'}
     )
 
@@ -0,0 +1,47 @@
+"""
+Modelo do histórico (somente inserção) de eventos de uma fiscalização
+"""
+import enum
+
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, String, Text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+
+from src.geobot_plataforma_backend.core.database import Base
+
+
+class TipoEventoFiscalizacao(str, enum.Enum):
+    """Tipos de evento registrados no histórico"""
+    CRIADA = "criada"
+    STATUS_ALTERADO = "status_alterado"
+    FISCAL_ADICIONADO = "fiscal_adicionado"
+    FISCAL_REMOVIDO = "fiscal_removido"
+    ETAPA_INICIADA = "etapa_iniciada"
+    ETAPA_TRANSICIONADA = "etapa_transicionada"
+
+
+class HistoricoFiscalizacao(Base):
+    """
+    Evento do histórico de uma fiscalização.
+
+    A tabela é append-only: linhas são inseridas na mesma transação da mudança que
+    descrevem e nunca atualizadas (um trigger no banco rejeita UPDATE). Consultas
+    por fiscalização usam o B-tree (fiscalizacao_id, id); varreduras por período
+    usam o índice BRIN em created_at, que fica minúsculo porque a ordem física da
+    tabela acompanha o tempo.
+    """
+    __tablename__ = "historico_fiscalizacao"
+    __table_args__ = {'schema': 'geobot'}
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    fiscalizacao_id = Column(BigInteger, ForeignKey("geobot.fiscalizacoes.id", ondelete="CASCADE"), nullable=False)
+    usuario_id = Column(BigInteger, ForeignKey("geobot.usuarios.id", ondelete="SET NULL"), nullable=True)
+    tipo_evento = Column(String(50), nullable=False)
+    valor_anterior = Column(String(50), nullable=True)  # Status ou etapa anterior
+    valor_novo = Column(String(50), nullable=True)  # Status ou etapa nova
+    dados = Column(JSONB, nullable=True)  # Ex: fiscal_id e papel em atribuições
+    observacoes = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<HistoricoFiscalizacao(fiscalizacao_id={self.fiscalizacao_id}, tipo_evento={self.tipo_evento})>"
@@ -0,0 +1,70 @@
+"""
+Modelo de job em segundo plano: fila durável no PostgreSQL consumida pelos workers
+"""
+import enum
+import uuid
+
+from sqlalchemy import BigInteger, Column, DateTime, Float, Index, Integer, String, Text, text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.sql import func
+
+from src.geobot_plataforma_backend.core.database import Base
+
+
+class StatusJob(str, enum.Enum):
+    """Ciclo de vida do job"""
+    PENDENTE = "pendente"
+    EXECUTANDO = "executando"
+    CONCLUIDO = "concluido"
+    ERRO = "erro"
+
+
+class Job(Base):
+    """
+    Job da fila (ex: análise de IA de uma etapa).
+
+    Workers reservam o próximo job com `FOR UPDATE SKIP LOCKED`, então vários
+    processos consomem a fila sem disputar a mesma linha. A reserva vale até
+    `bloqueado_ate` e é renovada a cada progresso; se o worker morrer, o job
+    volta para a fila quando ela expira. Falhas são repetidas até
+    `max_tentativas`, com `disponivel_em` adiado por backoff exponencial.
+    """
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Próximo job disponível de um tipo, por prioridade (só os pendentes)
+        Index(
+            'idx_jobs_fila',
+            'tipo', text('prioridade DESC'), 'disponivel_em', 'id',
+            postgresql_where=text("status = 'pendente'"),
+        ),
+        # Reservas expiradas de workers que pararam de responder
+        Index('idx_jobs_reserva', 'bloqueado_ate', postgresql_where=text("status = 'executando'")),
+        {'schema': 'geobot'},
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    uuid = Column(UUID(as_uuid=True), default=uuid.uuid4, unique=True, nullable=False)
+    tipo = Column(String(50), nullable=False)
+    payload = Column(JSONB, default=dict, nullable=False)
+    status = Column(String(20), default=StatusJob.PENDENTE.value, nullable=False)
+    prioridade = Column(Integer, default=0, nullable=False)
+    tentativas = Column(Integer, default=0, nullable=False)
+    max_tentativas = Column(Integer, default=3, nullable=False)
+    disponivel_em = Column(DateTime(timezone=True), default=func.now(), nullable=False)
+    bloqueado_por = Column(String(100), nullable=True)  # Worker que reservou o job
+    bloqueado_ate = Column(DateTime(timezone=True), nullable=True)
+    progresso = Column(Float, default=0, nullable=False)  # 0 a 100
+    mensagem = Column(Text, nullable=True)
+    erro = Column(Text, nullable=True)
+    resultado = Column(JSONB, nullable=True)
+    iniciado_em = Column(DateTime(timezone=True), nullable=True)
+    concluido_em = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now(), nullable=False)
+
+    @property
+    def finalizado(self) -> bool:
+        return self.status in (StatusJob.CONCLUIDO.value, StatusJob.ERRO.value)
+
+    def __repr__(self):
+        return f"<Job(id={self.id}, tipo={self.tipo}, status={self.status}, tentativas={self.tentativas})>"
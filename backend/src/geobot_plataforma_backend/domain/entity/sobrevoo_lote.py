@@ -0,0 +1,71 @@
+"""
+Modelo de lote de sobrevoo: um único voo cobrindo várias fiscalizações
+"""
+import enum
+import uuid
+
+from sqlalchemy import BigInteger, Column, DateTime, Float, ForeignKey, String, Text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+
+from src.geobot_plataforma_backend.core.database import Base
+
+
+class StatusSobrevooLote(str, enum.Enum):
+    """Ciclo de vida do lote de sobrevoo"""
+    PLANEJADO = "planejado"  # Plano de voo gerado, etapas SOBREVOO abertas
+    ABASTECIMENTO = "abastecimento"  # Voo concluído, recebendo imagens
+    CONCLUIDO = "concluido"
+    CANCELADO = "cancelado"
+
+
+class SobrevooLote(Base):
+    """
+    Sobrevoo compartilhado por todas as fiscalizações ativas dentro de um polígono.
+
+    O plano de voo (waypoints em zigue-zague) fica em `plano_voo`; as imagens enviadas
+    para o lote são replicadas para a etapa ABASTECIMENTO de cada fiscalização coberta.
+    """
+    __tablename__ = "sobrevoos_lote"
+    __table_args__ = {'schema': 'geobot'}
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    uuid = Column(UUID(as_uuid=True), default=uuid.uuid4, unique=True, nullable=False)
+    codigo = Column(String(50), unique=True, nullable=False)
+    usuario_id = Column(BigInteger, ForeignKey("geobot.usuarios.id", ondelete="SET NULL"), nullable=True)
+    status = Column(String(30), default=StatusSobrevooLote.PLANEJADO.value, nullable=False)
+    poligono = Column(JSONB, nullable=False)  # [[lat, lon], ...]
+    plano_voo = Column(JSONB, nullable=True)  # {"waypoints": [[lat, lon], ...], ...}
+    largura_faixa_m = Column(Float, nullable=False)
+    sobreposicao = Column(Float, nullable=False)  # Fração 0-1 entre faixas vizinhas
+    distancia_km = Column(Float, nullable=True)
+    observacoes = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now(), nullable=False)
+
+    fiscalizacoes = relationship(
+        "SobrevooLoteFiscalizacao",
+        back_populates="lote",
+        cascade="all, delete-orphan",
+    )
+
+    @property
+    def fiscalizacao_ids(self):
+        """IDs das fiscalizações cobertas pelo lote"""
+        return sorted(item.fiscalizacao_id for item in self.fiscalizacoes)
+
+    def __repr__(self):
+        return f"<SobrevooLote(codigo={self.codigo}, status={self.status})>"
+
+
+class SobrevooLoteFiscalizacao(Base):
+    """Fiscalização coberta por um lote de sobrevoo"""
+    __tablename__ = "sobrevoo_lote_fiscalizacao"
+    __table_args__ = {'schema': 'geobot'}
+
+    lote_id = Column(BigInteger, ForeignKey("geobot.sobrevoos_lote.id", ondelete="CASCADE"), primary_key=True)
+    fiscalizacao_id = Column(BigInteger, ForeignKey("geobot.fiscalizacoes.id", ondelete="CASCADE"), primary_key=True)
+    created_at = Column(DateTime(timezone=True), default=func.now(), nullable=False)
+
+    lote = relationship("SobrevooLote", back_populates="fiscalizacoes")
@@ -0,0 +1,57 @@
+"""
+Modelo de upload retomável: arquivos grandes enviados em partes, em várias requisições
+"""
+import enum
+import uuid
+
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Index, Integer, String
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.sql import func
+
+from src.geobot_plataforma_backend.core.database import Base
+
+
+class StatusUploadRetomavel(str, enum.Enum):
+    """Ciclo de vida do upload retomável"""
+    EM_ANDAMENTO = "em_andamento"
+    CONCLUIDO = "concluido"
+
+
+class UploadRetomavel(Base):
+    """
+    Estado de um upload retomável (protocolo no estilo tus).
+
+    Cada parte vira um bloco no storage (offset em que começa + id da tentativa);
+    `recebido_bytes` é o offset esperado na próxima parte. Ao completar, os blocos
+    são confirmados em `chave_storage` e o arquivo é registrado na etapa.
+    """
+    __tablename__ = "uploads_retomaveis"
+    __table_args__ = (
+        Index('idx_uploads_retomaveis_status_expira_em', 'status', 'expira_em'),
+        {'schema': 'geobot'},
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    uuid = Column(UUID(as_uuid=True), default=uuid.uuid4, unique=True, nullable=False)
+    usuario_id = Column(BigInteger, ForeignKey("geobot.usuarios.id", ondelete="SET NULL"), nullable=True)
+    fiscalizacao_id = Column(BigInteger, ForeignKey("geobot.fiscalizacoes.id", ondelete="CASCADE"), nullable=False)
+    etapa_id = Column(Integer, nullable=False)
+    tipo = Column(String(50), nullable=False)
+    nome_original = Column(String(255), nullable=False)
+    mime_type = Column(String(100), nullable=False)
+    tamanho_bytes = Column(BigInteger, nullable=False)
+    recebido_bytes = Column(BigInteger, default=0, nullable=False)
+    blocos = Column(JSONB, default=list, nullable=False)  # IDs dos blocos das partes aceitas, em ordem
+    chave_storage = Column(String(500), nullable=False)
+    status = Column(String(30), default=StatusUploadRetomavel.EM_ANDAMENTO.value, nullable=False)
+    arquivo_id = Column(Integer, nullable=True)  # ArquivoFiscalizacao registrado ao concluir
+    expira_em = Column(DateTime(timezone=True), nullable=False)
+    created_at = Column(DateTime(timezone=True), default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now(), nullable=False)
+
+    @property
+    def concluido(self) -> bool:
+        return self.status == StatusUploadRetomavel.CONCLUIDO.value
+
+    def __repr__(self):
+        return f"<UploadRetomavel(uuid={self.uuid}, recebido={self.recebido_bytes}/{self.tamanho_bytes})>"
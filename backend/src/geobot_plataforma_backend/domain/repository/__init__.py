@@ -1,10 +1,14 @@
 """
 Repositórios de acesso a dados
 """
+from .arquivo_repository import ArquivoRepository
 from .denuncia_repository import DenunciaRepository
+from .historico_fiscalizacao_repository import HistoricoFiscalizacaoRepository
 from .usuario_repository import UsuarioRepository
 
 __all__ = [
+    "ArquivoRepository",
     "DenunciaRepository",
+    "HistoricoFiscalizacaoRepository",
     "UsuarioRepository",
 ]
@@ -0,0 +1,69 @@
+"""Repository para operações de arquivo"""
+from typing import Optional, List
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from src.geobot_plataforma_backend.domain.entity.arquivo import Arquivo
+from src.geobot_plataforma_backend.domain.entity.arquivo_denuncia import ArquivoDenuncia
+from src.geobot_plataforma_backend.domain.entity.denuncia import Denuncia
+
+
+class ArquivoRepository:
+    """Repository para gerenciar arquivos e seus vínculos com denúncias"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def buscar_por_hash(self, hash_checksum: str) -> Optional[Arquivo]:
+        """Busca arquivo pelo hash SHA-256 do conteúdo"""
+        return self.db.query(Arquivo).filter(Arquivo.hash_checksum == hash_checksum).first()
+
+    def buscar_por_hash_do_usuario(self, hash_checksum: str, usuario_id: int) -> Optional[Arquivo]:
+        """Busca arquivo pelo hash, restrito a arquivos já anexados a denúncias do usuário"""
+        return (
+            self.db.query(Arquivo)
+            .join(ArquivoDenuncia, ArquivoDenuncia.arquivo_id == Arquivo.id)
+            .join(Denuncia, Denuncia.id == ArquivoDenuncia.denuncia_id)
+            .filter(Arquivo.hash_checksum == hash_checksum, Denuncia.usuario_id == usuario_id)
+            .first()
+        )
+
+    def criar_ou_obter(self, arquivo: Arquivo) -> Arquivo:
+        """
+        Cria o arquivo; se outro upload concorrente do mesmo conteúdo já gravou
+        a chave de storage, retorna o registro existente
+        """
+        self.db.add(arquivo)
+        try:
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
+            existente = self.buscar_por_hash(arquivo.hash_checksum)
+            if not existente:
+                raise
+            return existente
+        self.db.refresh(arquivo)
+        return arquivo
+
+    def vincular_denuncia(self, arquivo: Arquivo, denuncia_id: int) -> bool:
+        """Vincula o arquivo à denúncia. Retorna False se o vínculo já existia"""
+        vinculo = self.db.query(ArquivoDenuncia).filter(
+            ArquivoDenuncia.arquivo_id == arquivo.id,
+            ArquivoDenuncia.denuncia_id == denuncia_id
+        ).first()
+        if vinculo:
+            return False
+
+        self.db.add(ArquivoDenuncia(arquivo_id=arquivo.id, denuncia_id=denuncia_id))
+        self.db.commit()
+        return True
+
+    def listar_por_denuncia(self, denuncia_id: int) -> List[Arquivo]:
+        """Lista arquivos anexados a uma denúncia"""
+        return (
+            self.db.query(Arquivo)
+            .join(ArquivoDenuncia, ArquivoDenuncia.arquivo_id == Arquivo.id)
+            .filter(ArquivoDenuncia.denuncia_id == denuncia_id)
+            .order_by(ArquivoDenuncia.created_at)
+            .all()
+        )
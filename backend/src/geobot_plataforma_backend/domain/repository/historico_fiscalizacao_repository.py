@@ -0,0 +1,66 @@
+"""Repository do histórico de eventos de fiscalização"""
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from src.geobot_plataforma_backend.domain.entity.historico_fiscalizacao import (
+    HistoricoFiscalizacao,
+    TipoEventoFiscalizacao,
+)
+
+
+class HistoricoFiscalizacaoRepository:
+    """
+    Repository append-only do histórico.
+
+    Diferente dos demais repositories, `registrar` não faz commit: o evento entra
+    na transação do serviço que executou a mudança e só persiste junto com ela.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    @staticmethod
+    def linha(
+        fiscalizacao_id: int,
+        tipo_evento: TipoEventoFiscalizacao,
+        usuario_id: Optional[int] = None,
+        valor_anterior: Optional[str] = None,
+        valor_novo: Optional[str] = None,
+        dados: Optional[Dict[str, Any]] = None,
+        observacoes: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Monta os valores de um evento para `registrar_muitos`"""
+        return {
+            'fiscalizacao_id': fiscalizacao_id,
+            'tipo_evento': tipo_evento.value,
+            'usuario_id': usuario_id,
+            'valor_anterior': valor_anterior,
+            'valor_novo': valor_novo,
+            'dados': dados,
+            'observacoes': observacoes,
+        }
+
+    def registrar(self, fiscalizacao_id: int, tipo_evento: TipoEventoFiscalizacao, **campos) -> None:
+        """Adiciona um evento à transação corrente"""
+        self.registrar_muitos([self.linha(fiscalizacao_id, tipo_evento, **campos)])
+
+    def registrar_muitos(self, linhas: List[Dict[str, Any]]) -> None:
+        """Adiciona vários eventos à transação corrente com um único INSERT em lote"""
+        if linhas:
+            self.db.execute(insert(HistoricoFiscalizacao), linhas)
+
+    def listar(
+        self,
+        fiscalizacao_id: int,
+        limit: int,
+        antes_de_id: Optional[int] = None,
+    ) -> List[HistoricoFiscalizacao]:
+        """Eventos da fiscalização do mais recente para o mais antigo, paginados por ID"""
+        query = self.db.query(HistoricoFiscalizacao).filter(
+            HistoricoFiscalizacao.fiscalizacao_id == fiscalizacao_id
+        )
+        if antes_de_id is not None:
+            query = query.filter(HistoricoFiscalizacao.id < antes_de_id)
+        return query.order_by(HistoricoFiscalizacao.id.desc()).limit(limit).all()
@@ -0,0 +1,60 @@
+"""
+Carregador de usuários em lote com cache por requisição (estilo dataloader)
+"""
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from src.geobot_plataforma_backend.domain.entity.usuario import Usuario
+
+
+class UsuarioLoader:
+    """
+    Agrupa buscas de usuários por ID em um único `SELECT ... WHERE id IN (...)`.
+
+    Serializers chamam `agendar` com todos os IDs que vão precisar e depois
+    `carregar`/`carregar_muitos`; IDs já vistos na requisição não voltam ao banco.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._cache: Dict[int, Optional[Usuario]] = {}
+        self._pendentes: Set[int] = set()
+
+    def preparar(self, usuarios: Iterable[Usuario]) -> None:
+        """Alimenta o cache com usuários já carregados por outra query"""
+        for usuario in usuarios:
+            if usuario is not None:
+                self._cache[usuario.id] = usuario
+                self._pendentes.discard(usuario.id)
+
+    def agendar(self, usuario_ids: Iterable[int]) -> None:
+        """Registra IDs para o próximo lote"""
+        for usuario_id in usuario_ids:
+            if usuario_id is not None and usuario_id not in self._cache:
+                self._pendentes.add(usuario_id)
+
+    def _despachar(self) -> None:
+        if not self._pendentes:
+            return
+        ids = list(self._pendentes)
+        self._pendentes.clear()
+        encontrados = self.db.query(Usuario).filter(Usuario.id.in_(ids)).all()
+        for usuario_id in ids:
+            self._cache[usuario_id] = None
+        self.preparar(encontrados)
+
+    def carregar(self, usuario_id: int) -> Optional[Usuario]:
+        """Retorna o usuário (ou None), disparando o lote pendente se necessário"""
+        if usuario_id not in self._cache:
+            self.agendar([usuario_id])
+            self._despachar()
+        return self._cache.get(usuario_id)
+
+    def carregar_muitos(self, usuario_ids: Iterable[int]) -> List[Optional[Usuario]]:
+        """Retorna os usuários na ordem dos IDs informados, em no máximo um SELECT"""
+        usuario_ids = list(usuario_ids)
+        self.agendar(usuario_ids)
+        self._despachar()
+        return [self._cache.get(usuario_id) for usuario_id in usuario_ids]
+
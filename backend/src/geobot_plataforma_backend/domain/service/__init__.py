@@ -1,13 +1,23 @@
 """
 Serviços de lógica de negócio
 """
+from .arquivo_service import ArquivoService
+from .atribuicao_service import AtribuicaoService
 from .auth_service import AuthService
 from .denuncia_service import DenunciaService, AutorizacaoError
 from .fiscalizacao_service import FiscalizacaoService
+from .hotspot_service import HotspotService
+from .rota_service import RotaService
+from .sobrevoo_service import SobrevooService
 
 __all__ = [
+    "ArquivoService",
+    "AtribuicaoService",
     "AuthService",
     "DenunciaService",
     "FiscalizacaoService",
+    "HotspotService",
+    "RotaService",
+    "SobrevooService",
     "AutorizacaoError",
 ]
@@ -0,0 +1,302 @@
+"""
+Análise de IA das imagens de uma etapa: a requisição só registra o pedido; um
+worker (`manage_db.py worker-ia`) processa com o executor configurado
+
+Com `ia_lotes`, os pedidos de várias fiscalizações esperam juntos até somar
+`ia_lote_max_imagens` imagens (ou o mais antigo esperar
+`ia_lote_espera_max_segundos`) e viram um único job: a GPU roda um lote grande
+em um cluster já quente em vez de subir uma máquina para cada punhado de fotos.
+"""
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.orm import Session
+
+from src.geobot_plataforma_backend.core.config import settings
+from src.geobot_plataforma_backend.core.storage import StorageBackend
+from src.geobot_plataforma_backend.domain.entity.etapa_e_resultado import (
+    ArquivoFiscalizacao,
+    EtapaFiscalizacao,
+    ResultadoAnaliseIA,
+)
+from src.geobot_plataforma_backend.domain.entity.job import Job
+from src.geobot_plataforma_backend.domain.service.etapa_fiscalizacao_service import (
+    EtapaFiscalizacaoService,
+    classificar_confianca,
+)
+from src.geobot_plataforma_backend.domain.service.executores_ia import (
+    ExecutorIA,
+    ImagemAnalise,
+    Progresso,
+    obter_executor_ia,
+)
+from src.geobot_plataforma_backend.domain.service.fila_jobs_service import ErroPermanenteJob, FilaJobs
+
+TIPO_JOB = 'analise_ia'
+
+# Resultados com job ainda na fila ou em execução (ou aguardando lote)
+STATUS_EM_ANDAMENTO = ('pendente', 'processando')
+
+# pg_try_advisory_xact_lock: só um worker monta lotes por vez
+CHAVE_TRAVA_LOTES = 0x6765_6f62_6f74_6961  # "geobotia"
+
+# Análises pendentes consideradas por rodada de montagem de lotes
+LIMITE_PENDENTES = 1000
+
+
+@dataclass(frozen=True)
+class AnalisePendente:
+    """Pedido de análise aguardando lote"""
+    resultado_id: int
+    criado_em: datetime
+    arquivo_ids: Tuple[int, ...]
+
+
+def agrupar_em_lotes(
+    pendentes: Sequence[AnalisePendente],
+    max_imagens: int,
+    espera_maxima_segundos: float,
+    agora: datetime,
+) -> List[List[AnalisePendente]]:
+    """
+    Agrupa os pedidos (do mais antigo ao mais novo) em lotes de até `max_imagens`
+
+    Um lote só sai cheio ou quando o pedido mais antigo dele já esperou
+    `espera_maxima_segundos`; o resto continua acumulando. Um pedido nunca é
+    dividido entre lotes (o maior que `max_imagens` vai sozinho).
+    """
+    restantes = list(pendentes)
+    lotes = []
+    while restantes:
+        total = sum(len(p.arquivo_ids) for p in restantes)
+        vencido = (agora - restantes[0].criado_em).total_seconds() >= espera_maxima_segundos
+        if total < max_imagens and not vencido:
+            break
+        lote, imagens = [], 0
+        while restantes and (not lote or imagens + len(restantes[0].arquivo_ids) <= max_imagens):
+            pendente = restantes.pop(0)
+            lote.append(pendente)
+            imagens += len(pendente.arquivo_ids)
+        lotes.append(lote)
+    return lotes
+
+
+class AnaliseIAService:
+    """Solicitação (API), montagem de lotes e processamento (worker) da análise de IA"""
+
+    def __init__(self, db: Session, storage: Optional[StorageBackend] = None, executor: Optional[ExecutorIA] = None):
+        self.db = db
+        self._storage = storage
+        self._executor = executor
+        self.lotes = bool(settings.get('ia_lotes', True))
+        self.lote_max_imagens = int(settings.get('ia_lote_max_imagens', 500))
+        self.lote_espera_max_segundos = float(settings.get('ia_lote_espera_max_segundos', 300))
+
+    @property
+    def executor(self) -> ExecutorIA:
+        """Executor configurado, resolvido só no worker"""
+        if self._executor is None:
+            self._executor = obter_executor_ia(self._storage)
+        return self._executor
+
+    def solicitar(
+        self, fiscalizacao_id: int, etapa_id: int
+    ) -> Tuple[ResultadoAnaliseIA, Optional[Job], List[ArquivoFiscalizacao], List[ArquivoFiscalizacao]]:
+        """
+        Registra o resultado pendente; sem lotes, já enfileira o job na mesma transação
+
+        Repetir o pedido enquanto a análise da etapa está na fila ou rodando
+        devolve a mesma análise em vez de gastar outra inferência.
+
+        Returns:
+            (resultado pendente, job ou None se aguarda lote, imagens a analisar, quase-duplicatas ignoradas)
+        """
+        etapa = self.db.query(EtapaFiscalizacao).filter(EtapaFiscalizacao.id == etapa_id).first()
+        if not etapa or etapa.fiscalizacao_id != fiscalizacao_id:
+            raise ValueError(f"Etapa {etapa_id} não encontrada na fiscalização {fiscalizacao_id}")
+        # Quase-duplicatas (mesmo voo reenviado) não gastam inferência
+        imagens, duplicatas = EtapaFiscalizacaoService(self.db).obter_imagens_para_analise(fiscalizacao_id)
+        if not imagens:
+            raise ValueError(f"Fiscalização {fiscalizacao_id} não tem imagens para analisar")
+
+        fila = FilaJobs(self.db)
+        em_andamento = (
+            self.db.query(ResultadoAnaliseIA)
+            .filter(
+                ResultadoAnaliseIA.etapa_id == etapa_id,
+                ResultadoAnaliseIA.status_processamento.in_(STATUS_EM_ANDAMENTO),
+            )
+            .order_by(ResultadoAnaliseIA.id.desc())
+            .first()
+        )
+        if em_andamento is not None:
+            job = fila.obter(int(em_andamento.job_id)) if em_andamento.job_id else None
+            return em_andamento, job, imagens, duplicatas
+
+        resultado = ResultadoAnaliseIA(
+            etapa_id=etapa_id,
+            deteccoes=[],
+            confianca_media=0.0,
+            status_processamento='pendente',
+        )
+        self.db.add(resultado)
+        self.db.flush()
+        job = None
+        if not self.lotes:
+            job = fila.enfileirar(TIPO_JOB, {
+                'resultados': [{'resultado_id': resultado.id, 'arquivo_ids': [a.id for a in imagens]}],
+            })
+            resultado.job_id = str(job.id)
+        self.db.commit()
+        self.db.refresh(resultado)
+        return resultado, job, imagens, duplicatas
+
+    def _pendentes(self) -> List[AnalisePendente]:
+        """Pedidos sem job, do mais antigo ao mais novo, com as imagens atuais de cada fiscalização"""
+        pedidos = (
+            self.db.query(ResultadoAnaliseIA.id, ResultadoAnaliseIA.created_at, EtapaFiscalizacao.fiscalizacao_id)
+            .join(EtapaFiscalizacao, EtapaFiscalizacao.id == ResultadoAnaliseIA.etapa_id)
+            .filter(
+                ResultadoAnaliseIA.status_processamento == 'pendente',
+                ResultadoAnaliseIA.job_id.is_(None),
+            )
+            .order_by(ResultadoAnaliseIA.created_at, ResultadoAnaliseIA.id)
+            .limit(LIMITE_PENDENTES)
+            .all()
+        )
+        if not pedidos:
+            return []
+        imagens: Dict[int, List[int]] = {}
+        for fiscalizacao_id, arquivo_id in (
+            self.db.query(ArquivoFiscalizacao.fiscalizacao_id, ArquivoFiscalizacao.id)
+            .filter(
+                ArquivoFiscalizacao.fiscalizacao_id.in_({p.fiscalizacao_id for p in pedidos}),
+                ArquivoFiscalizacao.mime_type.like('image/%'),
+                or_(
+                    ArquivoFiscalizacao.metadados.is_(None),
+                    ~ArquivoFiscalizacao.metadados.has_key('duplicata_de'),
+                ),
+            )
+            .order_by(ArquivoFiscalizacao.id)
+            .all()
+        ):
+            imagens.setdefault(fiscalizacao_id, []).append(arquivo_id)
+        return [
+            AnalisePendente(resultado_id, criado_em, tuple(imagens.get(fiscalizacao_id, ())))
+            for resultado_id, criado_em, fiscalizacao_id in pedidos
+        ]
+
+    def agendar(self) -> List[Job]:
+        """
+        Monta os lotes prontos e os enfileira (chamado periodicamente pelos workers)
+
+        Returns:
+            Jobs criados
+        """
+        if not self.lotes:
+            return []
+        if not self.db.execute(select(func.pg_try_advisory_xact_lock(CHAVE_TRAVA_LOTES))).scalar():
+            self.db.rollback()
+            return []  # Outro worker está montando lotes agora
+        try:
+            lotes = agrupar_em_lotes(
+                self._pendentes(),
+                self.lote_max_imagens,
+                self.lote_espera_max_segundos,
+                datetime.now(timezone.utc),
+            )
+            fila = FilaJobs(self.db)
+            jobs = []
+            for lote in lotes:
+                job = fila.enfileirar(TIPO_JOB, {
+                    'resultados': [
+                        {'resultado_id': p.resultado_id, 'arquivo_ids': list(p.arquivo_ids)} for p in lote
+                    ],
+                })
+                self.db.execute(
+                    update(ResultadoAnaliseIA)
+                    .where(ResultadoAnaliseIA.id.in_([p.resultado_id for p in lote]))
+                    .values(job_id=str(job.id))
+                    .execution_options(synchronize_session=False)
+                )
+                jobs.append(job)
+            self.db.commit()  # Também libera a trava
+            return jobs
+        except Exception:
+            self.db.rollback()
+            raise
+
+    async def processar(self, payload: Dict[str, Any], progresso: Progresso) -> Dict[str, Any]:
+        """
+        Roda o executor uma vez sobre todas as imagens do job e devolve a cada
+        resultado as detecções das suas imagens
+
+        Cada detecção leva o `arquivo_id` da imagem em que foi encontrada; o
+        tempo do lote é dividido entre os resultados pelo número de imagens.
+        """
+        analises = payload.get('resultados') or [payload]
+        resultados = {
+            r.id: r for r in self.db.query(ResultadoAnaliseIA)
+            .filter(ResultadoAnaliseIA.id.in_([a['resultado_id'] for a in analises]))
+            .all()
+        }
+        if not resultados:
+            raise ErroPermanenteJob("Nenhum dos resultados de IA do job existe mais")
+        analises = [a for a in analises if a['resultado_id'] in resultados]
+        for resultado in resultados.values():
+            resultado.status_processamento = 'processando'
+        self.db.commit()
+
+        arquivos = (
+            self.db.query(ArquivoFiscalizacao.id, ArquivoFiscalizacao.url_blob)
+            .filter(ArquivoFiscalizacao.id.in_({i for a in analises for i in a['arquivo_ids']}))
+            .order_by(ArquivoFiscalizacao.id)
+            .all()
+        )
+        if not arquivos:
+            raise ErroPermanenteJob("Nenhuma das imagens do job existe mais")
+
+        inicio = time.monotonic()
+        por_arquivo = await self.executor.analisar(
+            [ImagemAnalise(arquivo_id, chave) for arquivo_id, chave in arquivos],
+            progresso,
+            identificador=f"geobot-ia-{min(resultados)}",
+        )
+        tempo = time.monotonic() - inicio
+
+        total_deteccoes = 0
+        for analise in analises:
+            resultado = resultados[analise['resultado_id']]
+            arquivo_ids = [i for i in analise['arquivo_ids'] if i in por_arquivo]
+            if not arquivo_ids:
+                resultado.status_processamento = 'erro'  # Todas as imagens sumiram antes do lote rodar
+                continue
+            deteccoes = [
+                {**deteccao, 'arquivo_id': arquivo_id}
+                for arquivo_id in sorted(arquivo_ids)
+                for deteccao in por_arquivo[arquivo_id]
+            ]
+            confianca_media = sum(d['confianca'] for d in deteccoes) / len(deteccoes) if deteccoes else 0.0
+            resultado.deteccoes = deteccoes
+            resultado.confianca_media = confianca_media
+            resultado.classificacao_geral = classificar_confianca(confianca_media)
+            resultado.modelo_utilizado = getattr(self.executor, 'modelo', None)
+            resultado.tempo_processamento_segundos = tempo * len(arquivo_ids) / len(arquivos)
+            resultado.status_processamento = 'concluído'
+            total_deteccoes += len(deteccoes)
+        self.db.commit()
+        return {'resultados': len(analises), 'imagens': len(arquivos), 'deteccoes': total_deteccoes}
+
+    def falhou(self, payload: Dict[str, Any], erro: str) -> None:
+        """Job sem mais tentativas: os resultados dele ficam com erro"""
+        analises = payload.get('resultados') or [payload]
+        self.db.execute(
+            update(ResultadoAnaliseIA)
+            .where(ResultadoAnaliseIA.id.in_([a['resultado_id'] for a in analises]))
+            .values(status_processamento='erro')
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
@@ -0,0 +1,148 @@
+"""Serviço de anexos de denúncias com deduplicação por conteúdo"""
+import mimetypes
+import os
+import uuid as uuid_lib
+from typing import List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from src.geobot_plataforma_backend.core.config import settings
+from src.geobot_plataforma_backend.core.storage import StorageBackend, gravar_upload, obter_storage_backend
+from src.geobot_plataforma_backend.domain.entity.arquivo import Arquivo
+from src.geobot_plataforma_backend.domain.entity.enums import StatusDenuncia
+from src.geobot_plataforma_backend.domain.repository.arquivo_repository import ArquivoRepository
+from src.geobot_plataforma_backend.domain.repository.denuncia_repository import DenunciaRepository
+from src.geobot_plataforma_backend.domain.repository.usuario_repository import UsuarioRepository
+from src.geobot_plataforma_backend.domain.service.denuncia_service import AutorizacaoError
+from src.geobot_plataforma_backend.domain.service.fiscalizacao_service import verificar_permissao_admin_fiscal
+
+
+def chave_conteudo(hash_sha256: str) -> str:
+    """Chave endereçada por conteúdo: o mesmo arquivo sempre cai na mesma chave"""
+    return f"conteudo/{hash_sha256[:2]}/{hash_sha256[2:4]}/{hash_sha256}"
+
+
+class ArquivoService:
+    """Serviço para anexar arquivos a denúncias"""
+
+    STATUS_QUE_ACEITAM_ANEXOS = {StatusDenuncia.PENDENTE, StatusDenuncia.EM_ANALISE, StatusDenuncia.EM_FISCALIZACAO}
+
+    def __init__(self, db: Session, storage: Optional[StorageBackend] = None):
+        self.db = db
+        self.storage = storage or obter_storage_backend()
+        self.repository = ArquivoRepository(db)
+        self.denuncia_repository = DenunciaRepository(db)
+        self.usuario_repository = UsuarioRepository(db)
+        self.tamanho_maximo_bytes = settings.get('max_file_size_mb', 10) * 1024 * 1024
+        self.extensoes_permitidas = {e.lower() for e in settings.get('allowed_extensions', [])}
+        self.chunk_bytes = settings.get('upload_chunk_size_kb', 1024) * 1024
+
+    def _obter_denuncia_editavel(self, denuncia_id: int, usuario_id: int):
+        """Carrega a denúncia validando usuário ativo, autoria e status"""
+        usuario = self.usuario_repository.buscar_por_id(usuario_id)
+        if not usuario:
+            raise ValueError("Usuário não encontrado")
+        if not usuario.ativo:
+            raise AutorizacaoError("Usuário inativo. Entre em contato com o administrador")
+
+        denuncia = self.denuncia_repository.buscar_por_id(denuncia_id)
+        if not denuncia:
+            raise ValueError("Denúncia não encontrada")
+
+        if denuncia.usuario_id != usuario_id and not verificar_permissao_admin_fiscal(usuario):
+            raise AutorizacaoError("Usuário não tem permissão para anexar arquivos a esta denúncia")
+
+        if denuncia.status not in self.STATUS_QUE_ACEITAM_ANEXOS:
+            raise ValueError("Esta denúncia não aceita mais anexos")
+
+        return denuncia
+
+    def _validar_extensao(self, nome_arquivo: str) -> str:
+        extensao = os.path.splitext(nome_arquivo)[1].lower()
+        if self.extensoes_permitidas and extensao not in self.extensoes_permitidas:
+            raise ValueError(
+                f"Extensão '{extensao or '(nenhuma)'}' não permitida. "
+                f"Permitidas: {', '.join(sorted(self.extensoes_permitidas))}"
+            )
+        return extensao
+
+    async def anexar_upload(
+        self,
+        denuncia_id: int,
+        usuario_id: int,
+        upload,
+        nome_arquivo: str,
+        tipo_mime: Optional[str] = None,
+    ) -> Tuple[Arquivo, bool]:
+        """
+        Grava o upload em streaming numa chave temporária calculando o SHA-256.
+        Se o conteúdo já existir, descarta a cópia e reaproveita o `Arquivo`;
+        caso contrário promove a cópia para a chave endereçada por conteúdo.
+
+        Returns:
+            (arquivo, reaproveitado)
+        """
+        denuncia = self._obter_denuncia_editavel(denuncia_id, usuario_id)
+        extensao = self._validar_extensao(nome_arquivo)
+        tipo_mime = tipo_mime or mimetypes.guess_type(nome_arquivo)[0] or "application/octet-stream"
+
+        chave_temporaria = f"tmp/{uuid_lib.uuid4().hex}"
+        resultado = await gravar_upload(
+            self.storage,
+            upload,
+            chave_temporaria,
+            tipo_mime=tipo_mime,
+            tamanho_maximo_bytes=self.tamanho_maximo_bytes,
+            chunk_bytes=self.chunk_bytes,
+        )
+
+        try:
+            arquivo = self.repository.buscar_por_hash(resultado.hash_sha256)
+            reaproveitado = arquivo is not None
+            if reaproveitado:
+                await self.storage.deletar(chave_temporaria)
+            else:
+                chave = chave_conteudo(resultado.hash_sha256)
+                await self.storage.mover(chave_temporaria, chave)
+                arquivo = self.repository.criar_ou_obter(Arquivo(
+                    nome_arquivo=nome_arquivo[:255],
+                    tamanho_bytes=resultado.tamanho_bytes,
+                    tipo_mime=tipo_mime,
+                    extensao=extensao[:10],
+                    chave_storage=chave,
+                    hash_checksum=resultado.hash_sha256,
+                ))
+        except Exception:
+            await self.storage.deletar(chave_temporaria)
+            raise
+
+        self.repository.vincular_denuncia(arquivo, denuncia.id)
+        return arquivo, reaproveitado
+
+    def anexar_por_hash(self, denuncia_id: int, usuario_id: int, hash_sha256: str) -> Arquivo:
+        """
+        Vincula sem upload um arquivo que o próprio usuário já enviou antes.
+        Permite ao cliente evitar reenviar a mesma foto em denúncias duplicadas.
+        """
+        denuncia = self._obter_denuncia_editavel(denuncia_id, usuario_id)
+        arquivo = self.repository.buscar_por_hash_do_usuario(hash_sha256.lower(), usuario_id)
+        if not arquivo:
+            raise ValueError("Referência de arquivo não encontrada")
+
+        self.repository.vincular_denuncia(arquivo, denuncia.id)
+        return arquivo
+
+    def listar_anexos(self, denuncia_id: int, usuario_id: int) -> List[Arquivo]:
+        """Lista arquivos anexados a uma denúncia"""
+        usuario = self.usuario_repository.buscar_por_id(usuario_id)
+        if not usuario:
+            raise ValueError("Usuário não encontrado")
+
+        denuncia = self.denuncia_repository.buscar_por_id(denuncia_id)
+        if not denuncia:
+            raise ValueError("Denúncia não encontrada")
+
+        if denuncia.usuario_id != usuario_id and not verificar_permissao_admin_fiscal(usuario):
+            raise AutorizacaoError("Usuário não tem permissão para visualizar esta denúncia")
+
+        return self.repository.listar_por_denuncia(denuncia_id)
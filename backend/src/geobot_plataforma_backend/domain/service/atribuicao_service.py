@@ -0,0 +1,310 @@
+"""Serviço de atribuição automática de fiscais por carga e distância"""
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from src.geobot_plataforma_backend.core.config import settings
+from src.geobot_plataforma_backend.core.geo import matriz_haversine
+from src.geobot_plataforma_backend.domain.entity.denuncia import Denuncia
+from src.geobot_plataforma_backend.domain.entity.endereco import Endereco
+from src.geobot_plataforma_backend.domain.entity.enums import Prioridade
+from src.geobot_plataforma_backend.domain.entity.fiscalizacao import Fiscalizacao
+from src.geobot_plataforma_backend.domain.entity.grupo_role import GrupoRole
+from src.geobot_plataforma_backend.domain.entity.role import Role
+from src.geobot_plataforma_backend.domain.entity.usuario import Usuario
+from src.geobot_plataforma_backend.domain.entity.usuario_fiscalizacao import UsuarioFiscalizacao
+from src.geobot_plataforma_backend.domain.entity.usuario_grupo import UsuarioGrupo
+from src.geobot_plataforma_backend.domain.repository.usuario_repository import UsuarioRepository
+from src.geobot_plataforma_backend.domain.service.fiscalizacao_service import (
+    AutorizacaoError,
+    FiscalizacaoService,
+    verificar_permissao_admin_fiscal,
+)
+
+ROLE_FISCALIZAR = "fiscalizar"
+SEM_FISCAL = -1
+
+
+def resolver_atribuicao(
+    distancias_km: np.ndarray,
+    carga: np.ndarray,
+    peso_carga_km: float,
+    carga_maxima: Optional[int] = None,
+    tamanho_bloco: int = 500,
+) -> np.ndarray:
+    """
+    Atribui cada denúncia (linha) a um fiscal (coluna) minimizando distância + carga.
+
+    O custo de dar a k-ésima nova fiscalização ao fiscal j é
+    `distancia[i, j] + peso_carga_km * (carga[j] + k)`: cada fiscalização ativa
+    "vale" `peso_carga_km` quilômetros. Cada fiscal vira k colunas (vagas) com
+    custo crescente e o problema de designação de custo mínimo é resolvido por
+    `linear_sum_assignment` em blocos de `tamanho_bloco` denúncias (na ordem de
+    prioridade recebida), atualizando a carga entre um bloco e o próximo. Assim a
+    matriz de cada bloco fica em torno de bloco x (bloco + fiscais), em vez de
+    N x N para o lote inteiro.
+
+    Dentro do bloco, cada fiscal com capacidade recebe até ceil(pendentes /
+    fiscais com capacidade) vagas, limitadas à sua capacidade livre; o que sobrar
+    por falta de vagas de fiscais lotados é resolvido de novo entre os que ainda
+    têm capacidade, então só fica SEM_FISCAL quando ninguém tem vaga.
+
+    Args:
+        distancias_km: Matriz N denúncias x M fiscais
+        carga: Fiscalizações ativas de cada fiscal (M,)
+        peso_carga_km: Penalidade em km por fiscalização ativa
+        carga_maxima: Limite de fiscalizações ativas por fiscal (None = sem limite)
+        tamanho_bloco: Denúncias resolvidas por vez
+
+    Returns:
+        Índice do fiscal de cada denúncia, ou SEM_FISCAL se faltar capacidade
+    """
+    n, m = distancias_km.shape
+    resultado = np.full(n, SEM_FISCAL, dtype=np.int64)
+    if n == 0 or m == 0:
+        return resultado
+
+    carga = np.asarray(carga, dtype=np.float64).copy()
+    for inicio in range(0, n, tamanho_bloco):
+        pendentes = np.arange(inicio, min(inicio + tamanho_bloco, n))
+        while pendentes.size:
+            if carga_maxima is not None:
+                livres = np.clip(carga_maxima - carga, 0, None).astype(np.int64)
+            else:
+                livres = np.full(m, pendentes.size, dtype=np.int64)
+            com_vaga = np.count_nonzero(livres)
+            if not com_vaga:
+                return resultado
+
+            vagas_por_fiscal = -(-pendentes.size // com_vaga)  # ceil
+            vagas = np.minimum(livres, vagas_por_fiscal)
+
+            # Colunas = (vaga k, fiscal j) válidas, com custo crescente em k
+            k_col, j_col = np.nonzero(np.arange(vagas_por_fiscal)[:, None] < vagas[None, :])
+            custo = distancias_km[pendentes][:, j_col] + peso_carga_km * (carga[j_col] + k_col)[None, :]
+
+            linhas, colunas = linear_sum_assignment(custo)
+            fiscais = j_col[colunas]
+            resultado[pendentes[linhas]] = fiscais
+            carga += np.bincount(fiscais, minlength=m)
+            pendentes = np.delete(pendentes, linhas)
+
+    return resultado
+
+
+@dataclass
+class SugestaoAtribuicao:
+    """Fiscal sugerido para uma denúncia"""
+    denuncia_id: int
+    fiscal_id: int
+    distancia_km: Optional[float]
+    carga_atual: int
+    alternativas: List[int] = field(default_factory=list)
+
+
+@dataclass
+class ResultadoAtribuicao:
+    """Sugestões de um lote e denúncias que não puderam ser atribuídas"""
+    sugestoes: List[SugestaoAtribuicao]
+    sem_coordenadas: List[int]
+    sem_capacidade: List[int]
+
+
+class AtribuicaoService:
+    """Serviço que sugere (ou aplica) fiscais para denúncias abertas"""
+
+    ORDEM_PRIORIDADE = {
+        Prioridade.URGENTE: 0,
+        Prioridade.ALTA: 1,
+        Prioridade.MEDIA: 2,
+        Prioridade.BAIXA: 3,
+    }
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.usuario_repository = UsuarioRepository(db)
+        self.peso_carga_km = float(settings.get('atribuicao_peso_carga_km', 5.0))
+        self.carga_maxima = settings.get('atribuicao_carga_maxima', 20)
+        self.tamanho_bloco = int(settings.get('atribuicao_tamanho_bloco', 500))
+        self.limite_padrao = int(settings.get('atribuicao_limite_denuncias', 5000))
+        self.base_latitude = settings.get('atribuicao_base_latitude', None)
+        self.base_longitude = settings.get('atribuicao_base_longitude', None)
+
+    def _verificar_usuario(self, usuario_id: int) -> None:
+        usuario = self.usuario_repository.buscar_por_id(usuario_id)
+        if not usuario:
+            raise ValueError("Usuário não encontrado")
+        if not usuario.ativo:
+            raise AutorizacaoError("Usuário inativo. Entre em contato com o administrador")
+        if not verificar_permissao_admin_fiscal(usuario):
+            raise AutorizacaoError("Usuário não tem permissão para atribuir fiscais")
+
+    def _carregar_denuncias(self, denuncia_ids: Optional[List[int]], limite: int):
+        """Denúncias fiscalizáveis com coordenadas, em ordem de prioridade e antiguidade"""
+        ordem = case(
+            *[(Denuncia.prioridade == p, o) for p, o in self.ORDEM_PRIORIDADE.items()],
+            else_=len(self.ORDEM_PRIORIDADE),
+        )
+        query = (
+            self.db.query(Denuncia.id, Endereco.latitude, Endereco.longitude)
+            .join(Endereco, Endereco.id == Denuncia.endereco_id)
+            .filter(Denuncia.status.in_(FiscalizacaoService.STATUS_DENUNCIA_FISCALIZAVEL))
+        )
+        if denuncia_ids:
+            query = query.filter(Denuncia.id.in_(denuncia_ids))
+        return query.order_by(ordem, Denuncia.created_at, Denuncia.id).limit(limite).all()
+
+    def _carregar_fiscais(self):
+        """
+        Fiscais ativos com a carga atual e o centróide das fiscalizações ativas
+        (uma única query agregada)
+        """
+        ativas = (
+            self.db.query(
+                UsuarioFiscalizacao.usuario_id.label('usuario_id'),
+                func.count(Fiscalizacao.id).label('carga'),
+                func.avg(Endereco.latitude).label('latitude'),
+                func.avg(Endereco.longitude).label('longitude'),
+            )
+            .join(Fiscalizacao, Fiscalizacao.id == UsuarioFiscalizacao.fiscalizacao_id)
+            .join(Denuncia, Denuncia.id == Fiscalizacao.denuncia_id)
+            .outerjoin(Endereco, Endereco.id == Denuncia.endereco_id)
+            .filter(Fiscalizacao.status.in_(FiscalizacaoService.STATUS_ATIVOS))
+            .group_by(UsuarioFiscalizacao.usuario_id)
+            .subquery()
+        )
+        return (
+            self.db.query(
+                Usuario.id,
+                func.coalesce(ativas.c.carga, 0),
+                ativas.c.latitude,
+                ativas.c.longitude,
+            )
+            .join(UsuarioGrupo, UsuarioGrupo.usuario_id == Usuario.id)
+            .join(GrupoRole, GrupoRole.grupo_id == UsuarioGrupo.grupo_id)
+            .join(Role, Role.id == GrupoRole.role_id)
+            .outerjoin(ativas, ativas.c.usuario_id == Usuario.id)
+            .filter(
+                Role.nome == ROLE_FISCALIZAR,
+                Role.ativo.is_(True),
+                Usuario.ativo.is_(True),
+                Usuario.deleted_at.is_(None),
+            )
+            .distinct()
+            .order_by(Usuario.id)
+            .all()
+        )
+
+    def _matriz_distancias(self, denuncias, fiscais) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Distâncias denúncia x fiscal. Fiscais sem fiscalização ativa usam a base
+        configurada; sem base, recebem a distância média (termo neutro).
+
+        Returns:
+            (matriz N x M, máscara dos fiscais com posição conhecida)
+        """
+        lat_d = np.array([float(d[1]) for d in denuncias])
+        lon_d = np.array([float(d[2]) for d in denuncias])
+        lat_f = np.array([float(f[2]) if f[2] is not None else np.nan for f in fiscais])
+        lon_f = np.array([float(f[3]) if f[3] is not None else np.nan for f in fiscais])
+
+        if self.base_latitude is not None and self.base_longitude is not None:
+            sem_posicao = np.isnan(lat_f)
+            lat_f[sem_posicao] = float(self.base_latitude)
+            lon_f[sem_posicao] = float(self.base_longitude)
+
+        com_posicao = ~np.isnan(lat_f)
+        distancias = np.zeros((len(denuncias), len(fiscais)))
+        if com_posicao.any():
+            conhecidas = matriz_haversine(lat_d, lon_d, lat_f[com_posicao], lon_f[com_posicao])
+            distancias[:, com_posicao] = conhecidas
+            distancias[:, ~com_posicao] = conhecidas.mean(axis=1, keepdims=True)
+        return distancias, com_posicao
+
+    def sugerir(
+        self,
+        usuario_id: int,
+        denuncia_ids: Optional[List[int]] = None,
+        limite: Optional[int] = None,
+    ) -> ResultadoAtribuicao:
+        """
+        Sugere um fiscal para cada denúncia aberta (ou para as informadas).
+
+        Returns:
+            ResultadoAtribuicao com até 3 alternativas por denúncia
+        """
+        self._verificar_usuario(usuario_id)
+
+        limite = min(limite or self.limite_padrao, self.limite_padrao)
+        denuncias = self._carregar_denuncias(denuncia_ids, limite)
+        com_coordenadas = [d for d in denuncias if d[1] is not None and d[2] is not None]
+        sem_coordenadas = [d[0] for d in denuncias if d[1] is None or d[2] is None]
+
+        fiscais = self._carregar_fiscais()
+        if not fiscais:
+            raise ValueError("Nenhum fiscal ativo disponível para atribuição")
+        if not com_coordenadas:
+            return ResultadoAtribuicao([], sem_coordenadas, [])
+
+        distancias, com_posicao = self._matriz_distancias(com_coordenadas, fiscais)
+        carga = np.array([int(f[1]) for f in fiscais], dtype=np.float64)
+
+        escolhas = resolver_atribuicao(
+            distancias, carga, self.peso_carga_km, self.carga_maxima, self.tamanho_bloco
+        )
+
+        custo_inicial = distancias + self.peso_carga_km * carga[None, :]
+        qtd_alternativas = min(4, len(fiscais))
+        melhores = np.argpartition(custo_inicial, qtd_alternativas - 1, axis=1)[:, :qtd_alternativas]
+
+        sugestoes, sem_capacidade = [], []
+        for i, (denuncia_id, _, _) in enumerate(com_coordenadas):
+            j = int(escolhas[i])
+            if j == SEM_FISCAL:
+                sem_capacidade.append(denuncia_id)
+                continue
+            ordem = melhores[i][np.argsort(custo_inicial[i, melhores[i]])]
+            sugestoes.append(SugestaoAtribuicao(
+                denuncia_id=denuncia_id,
+                fiscal_id=fiscais[j][0],
+                distancia_km=round(float(distancias[i, j]), 3) if com_posicao[j] else None,
+                carga_atual=int(carga[j]),
+                alternativas=[fiscais[a][0] for a in ordem if a != j][:3],
+            ))
+
+        return ResultadoAtribuicao(sugestoes, sem_coordenadas, sem_capacidade)
+
+    def atribuir_automaticamente(
+        self,
+        usuario_id: int,
+        denuncia_ids: Optional[List[int]] = None,
+        limite: Optional[int] = None,
+    ) -> Tuple[List[Fiscalizacao], ResultadoAtribuicao]:
+        """
+        Calcula as sugestões e abre as fiscalizações correspondentes em uma única
+        transação (via `criar_fiscalizacoes_em_lote`).
+
+        Cada chamada considera no máximo `FiscalizacaoService.MAX_ITENS_LOTE`
+        denúncias, o mesmo limite da criação em lote; as demais ficam para a próxima.
+        """
+        limite = min(limite or FiscalizacaoService.MAX_ITENS_LOTE, FiscalizacaoService.MAX_ITENS_LOTE)
+        resultado = self.sugerir(usuario_id, denuncia_ids, limite)
+        if not resultado.sugestoes:
+            return [], resultado
+
+        fiscalizacoes = FiscalizacaoService(self.db).criar_fiscalizacoes_em_lote(
+            [
+                {
+                    'denuncia_id': s.denuncia_id,
+                    'observacoes': "Fiscal atribuído automaticamente",
+                    'fiscais_ids': [s.fiscal_id],
+                }
+                for s in resultado.sugestoes
+            ],
+            usuario_id=usuario_id,
+        )
+        return fiscalizacoes, resultado
@@ -0,0 +1,99 @@
+"""Reconciliação do catálogo de arquivos (arquivos_fiscalizacao) com o storage"""
+import asyncio
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from sqlalchemy import String, func, literal, or_, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Session
+
+from src.geobot_plataforma_backend.core.config import settings
+from src.geobot_plataforma_backend.core.storage import StorageBackend, obter_storage_backend
+from src.geobot_plataforma_backend.domain.entity.etapa_e_resultado import ArquivoFiscalizacao
+
+
+class CatalogoArquivosService:
+    """
+    O catálogo no banco é a fonte de verdade das listagens; a reconciliação só
+    confere, aos poucos, se cada chave ainda existe no storage.
+
+    Cada execução pega os arquivos há mais tempo sem conferência (índice em
+    `verificado_em`), então rodadas curtas e frequentes cobrem o catálogo inteiro
+    sem nunca enumerar o container.
+    """
+
+    def __init__(self, db: Session, storage: Optional[StorageBackend] = None):
+        self.db = db
+        self.storage = storage or obter_storage_backend()
+        self.concorrencia = int(settings.get('upload_lote_concorrencia', 8))
+
+    async def reconciliar(self, limite: int = 500, verificados_antes_de: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Confere no storage os `limite` arquivos com conferência mais antiga.
+
+        Arquivos cuja chave sumiu recebem `ausente_no_storage` nos metadados (e o
+        perdem se a chave voltar); todos têm `verificado_em` atualizado.
+
+        Args:
+            verificados_antes_de: Ignora arquivos conferidos a partir desse instante
+                (permite percorrer o catálogo uma vez, em lotes)
+
+        Returns:
+            {'verificados': n, 'ausentes': n}
+        """
+        query = self.db.query(ArquivoFiscalizacao.id, ArquivoFiscalizacao.url_blob)
+        if verificados_antes_de is not None:
+            query = query.filter(or_(
+                ArquivoFiscalizacao.verificado_em.is_(None),
+                ArquivoFiscalizacao.verificado_em < verificados_antes_de,
+            ))
+        linhas = (
+            query.order_by(ArquivoFiscalizacao.verificado_em.asc().nullsfirst(), ArquivoFiscalizacao.id)
+            .limit(limite)
+            .all()
+        )
+        if not linhas:
+            return {'verificados': 0, 'ausentes': 0}
+
+        # Arquivos do sobrevoo em lote compartilham a chave: uma consulta por chave
+        limite_consultas = asyncio.Semaphore(self.concorrencia)
+
+        async def existe(chave: str):
+            async with limite_consultas:
+                return chave, await self.storage.existe(chave)
+
+        existentes = dict(await asyncio.gather(*(existe(c) for c in {chave for _, chave in linhas})))
+        presentes = [arquivo_id for arquivo_id, chave in linhas if existentes[chave]]
+        ausentes = [arquivo_id for arquivo_id, chave in linhas if not existentes[chave]]
+
+        agora = datetime.now(timezone.utc)
+        metadados = func.coalesce(ArquivoFiscalizacao.metadados, literal({}, JSONB))
+        try:
+            if presentes:
+                self.db.execute(
+                    update(ArquivoFiscalizacao)
+                    .where(ArquivoFiscalizacao.id.in_(presentes))
+                    .values(
+                        verificado_em=agora,
+                        # Conferência não é alteração do arquivo
+                        updated_at=ArquivoFiscalizacao.updated_at,
+                        metadados=metadados.op('-')(literal('ausente_no_storage', String)),
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+            if ausentes:
+                self.db.execute(
+                    update(ArquivoFiscalizacao)
+                    .where(ArquivoFiscalizacao.id.in_(ausentes))
+                    .values(
+                        verificado_em=agora,
+                        updated_at=ArquivoFiscalizacao.updated_at,
+                        metadados=metadados.op('||')(literal({'ausente_no_storage': True}, JSONB)),
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return {'verificados': len(linhas), 'ausentes': len(ausentes)}
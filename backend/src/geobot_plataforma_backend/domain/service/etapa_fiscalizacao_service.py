@@ -1,33 +1,150 @@
 """
 Serviço para gerenciar etapas de fiscalização
 """
+import asyncio
+import hashlib
+import json
+import logging
+import mimetypes
+import uuid as uuid_lib
 from datetime import datetime, timezone
-from typing import Optional, List, Dict, Any
-from sqlalchemy.orm import Session
+from typing import Optional, List, Dict, Any, Tuple
+from sqlalchemy import String, cast, func, insert, select, tuple_
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import Session, aliased
+
+from src.geobot_plataforma_backend.core.cache import CacheTTL
+from src.geobot_plataforma_backend.core.config import settings
+from src.geobot_plataforma_backend.core.notificacoes import HubVersoes
+from src.geobot_plataforma_backend.core.paginacao import codificar_cursor, decodificar_cursor
+from src.geobot_plataforma_backend.core.storage import (
+    ResultadoGravacao,
+    StorageBackend,
+    gravar_upload,
+    obter_storage_backend,
+)
 
 from src.geobot_plataforma_backend.domain.entity.etapa_fiscalizacao_enum import EtapaFiscalizacaoEnum
 from src.geobot_plataforma_backend.domain.entity.etapa_e_resultado import (
     EtapaFiscalizacao, ArquivoFiscalizacao, ResultadoAnaliseIA, RelatórioFiscalizacao
 )
 from src.geobot_plataforma_backend.domain.entity.fiscalizacao import Fiscalizacao
+from src.geobot_plataforma_backend.domain.entity.historico_fiscalizacao import TipoEventoFiscalizacao
+from src.geobot_plataforma_backend.domain.repository.historico_fiscalizacao_repository import (
+    HistoricoFiscalizacaoRepository,
+)
+from src.geobot_plataforma_backend.domain.service.arquivo_service import chave_conteudo
 from src.geobot_plataforma_backend.api.dtos.etapa_fiscalizacao_dto import (
     EtapaFiscalizacaoDTO, TransicaoEtapaDTO, ProgressoFiscalizacaoDTO,
     IniciarAnalisiaIADTO, GerarRelatórioDTO, ArquivoFiscalizacaoDTO
 )
 
+logger = logging.getLogger(__name__)
+
+
+# Etapas que compõem o progresso geral (PENDENTE..CONCLUIDA)
+TOTAL_ETAPAS_PROGRESSO = 6
+
+_cache_progresso = CacheTTL(
+    tamanho_maximo=int(settings.get('progresso_cache_tamanho', 4096)),
+    ttl_segundos=float(settings.get('progresso_cache_ttl_segundos', 5)),
+)
+
+# Acorda long-polls de progresso do processo quando uma fiscalização muda
+hub_progresso = HubVersoes()
+
+
+def invalidar_progresso(*fiscalizacao_ids: int) -> None:
+    """Descarta o progresso em cache após mudanças em etapas ou arquivos e notifica quem aguarda"""
+    _cache_progresso.invalidar(*fiscalizacao_ids)
+    for fiscalizacao_id in fiscalizacao_ids:
+        hub_progresso.publicar(fiscalizacao_id)
+
+
+def versao_progresso(progresso: Dict[str, Any]) -> str:
+    """
+    Versão do progresso derivada do próprio conteúdo: igual em todos os workers
+    enquanto nada muda, então serve de `desde` no long-poll.
+    """
+    bruto = json.dumps(progresso, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha1(bruto).hexdigest()[:16]
+
+
+def _etapa(valor) -> EtapaFiscalizacaoEnum:
+    """Converte o valor lido do banco (nome do membro ou valor) para o enum"""
+    if isinstance(valor, EtapaFiscalizacaoEnum):
+        return valor
+    if valor in EtapaFiscalizacaoEnum.__members__:
+        return EtapaFiscalizacaoEnum[valor]
+    return EtapaFiscalizacaoEnum(valor)
+
+
+def montar_progresso(
+    fiscalizacao_id: int,
+    etapas_concluidas: List[Any],
+    etapa_em_progresso: Optional[Any],
+    progresso_etapa: Optional[float],
+    arquivos: int,
+) -> Dict[str, Any]:
+    """Monta o payload de progresso a partir das colunas agregadas"""
+    concluidas = [_etapa(e) for e in etapas_concluidas]
+    em_progresso = _etapa(etapa_em_progresso) if etapa_em_progresso is not None else None
+
+    progresso_geral = len(concluidas) / TOTAL_ETAPAS_PROGRESSO * 100
+    if em_progresso is not None:
+        progresso_geral += (progresso_etapa or 0.0) / TOTAL_ETAPAS_PROGRESSO
+
+    realizadas = set(concluidas)
+    return {
+        "fiscalizacao_id": fiscalizacao_id,
+        "etapa_atual": em_progresso.value if em_progresso else None,
+        "etapas_concluidas": [e.value for e in concluidas],
+        "etapa_em_progresso": em_progresso.value if em_progresso else None,
+        "etapas_pendentes": [e.value for e in EtapaFiscalizacaoEnum if e not in realizadas],
+        "progresso_geral_percentual": min(progresso_geral, 100.0),
+        "arquivos_carregados": arquivos,
+    }
+
+
+def classificar_confianca(confianca_media: float) -> str:
+    """Classificação geral do resultado de IA a partir da confiança média das detecções"""
+    if confianca_media >= 0.8:
+        return "crítico"
+    elif confianca_media >= 0.6:
+        return "moderado"
+    return "leve"
+
 
 class EtapaFiscalizacaoService:
     """Serviço para gerenciar etapas de fiscalização"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, storage: Optional[StorageBackend] = None):
         self.db = db
+        self._storage = storage
+        self.historico_repository = HistoricoFiscalizacaoRepository(db)
+        self.tamanho_maximo_bytes = settings.get('fiscalizacao_max_file_size_mb', 50) * 1024 * 1024
+        self.validade_url_segundos = int(settings.get('storage_url_assinada_minutos', 60)) * 60
+        self.chunk_bytes = settings.get('upload_chunk_size_kb', 1024) * 1024
+        self.max_arquivos_lote = int(settings.get('upload_lote_max_arquivos', 500))
+        self.concorrencia_lote = int(settings.get('upload_lote_concorrencia', 8))
+
+    @property
+    def storage(self) -> StorageBackend:
+        """Backend de storage, resolvido só quando algum arquivo é gravado"""
+        if self._storage is None:
+            self._storage = obter_storage_backend()
+        return self._storage
     
-    def iniciar_fiscalizacao(self, fiscalizacao_id: int, dados_iniciais: Optional[Dict[str, Any]] = None) -> EtapaFiscalizacao:
+    def iniciar_fiscalizacao(
+        self,
+        fiscalizacao_id: int,
+        dados_iniciais: Optional[Dict[str, Any]] = None,
+        usuario_id: Optional[int] = None,
+    ) -> EtapaFiscalizacao:
         """Inicia uma fiscalização criando a primeira etapa"""
         # Verificar se fiscalização existe
         fiscalizacao = self.db.query(Fiscalizacao).filter(
-            Fiscalizacao.id == fiscalizacao_id,
-            Fiscalizacao.deleted_at.is_(None)
+            Fiscalizacao.id == fiscalizacao_id
         ).first()
         
         if not fiscalizacao:
@@ -42,17 +159,29 @@ class EtapaFiscalizacaoService:
         )
         
         self.db.add(etapa)
+        self.historico_repository.registrar(
+            fiscalizacao_id,
+            TipoEventoFiscalizacao.ETAPA_INICIADA,
+            usuario_id=usuario_id,
+            valor_novo=EtapaFiscalizacaoEnum.SOBREVOO.value,
+        )
         self.db.commit()
+        invalidar_progresso(fiscalizacao_id)
         self.db.refresh(etapa)
         
         return etapa
     
-    def transicionar_etapa(self, fiscalizacao_id: int, etapa_nova: EtapaFiscalizacaoEnum, dados: Optional[Dict[str, Any]] = None) -> EtapaFiscalizacao:
+    def transicionar_etapa(
+        self,
+        fiscalizacao_id: int,
+        etapa_nova: EtapaFiscalizacaoEnum,
+        dados: Optional[Dict[str, Any]] = None,
+        usuario_id: Optional[int] = None,
+    ) -> EtapaFiscalizacao:
         """Transiciona de uma etapa para outra"""
         # Verificar se fiscalização existe
         fiscalizacao = self.db.query(Fiscalizacao).filter(
-            Fiscalizacao.id == fiscalizacao_id,
-            Fiscalizacao.deleted_at.is_(None)
+            Fiscalizacao.id == fiscalizacao_id
         ).first()
         
         if not fiscalizacao:
@@ -85,7 +214,15 @@ class EtapaFiscalizacaoService:
         )
         
         self.db.add(nova_etapa)
+        self.historico_repository.registrar(
+            fiscalizacao_id,
+            TipoEventoFiscalizacao.ETAPA_TRANSICIONADA,
+            usuario_id=usuario_id,
+            valor_anterior=etapa_atual.etapa.value,
+            valor_novo=etapa_nova.value,
+        )
         self.db.commit()
+        invalidar_progresso(fiscalizacao_id)
         self.db.refresh(nova_etapa)
         
         return nova_etapa
@@ -104,6 +241,7 @@ class EtapaFiscalizacaoService:
             etapa.resultado = resultado
         
         self.db.commit()
+        invalidar_progresso(etapa.fiscalizacao_id)
         self.db.refresh(etapa)
         
         return etapa
@@ -123,68 +261,82 @@ class EtapaFiscalizacaoService:
         
         return etapa
     
+    def _consultar_progresso(self, fiscalizacao_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        Progresso de várias fiscalizações em um único SELECT agregado.
+
+        Para cada fiscalização, subconsultas correlacionadas trazem as etapas concluídas
+        (array ordenado), a última etapa aberta com seu percentual e a contagem de arquivos.
+        """
+        etapas_concluidas = (
+            select(func.array_agg(aggregate_order_by(
+                cast(EtapaFiscalizacao.etapa, String),
+                EtapaFiscalizacao.created_at,
+            )))
+            .where(
+                EtapaFiscalizacao.fiscalizacao_id == Fiscalizacao.id,
+                EtapaFiscalizacao.concluida_em.isnot(None),
+            )
+            .correlate(Fiscalizacao)
+            .scalar_subquery()
+        )
+        ultima_aberta = (
+            select(EtapaFiscalizacao.id)
+            .where(
+                EtapaFiscalizacao.fiscalizacao_id == Fiscalizacao.id,
+                EtapaFiscalizacao.concluida_em.is_(None),
+            )
+            .order_by(EtapaFiscalizacao.created_at.desc(), EtapaFiscalizacao.id.desc())
+            .limit(1)
+            .correlate(Fiscalizacao)
+            .scalar_subquery()
+        )
+        arquivos = (
+            select(func.count(ArquivoFiscalizacao.id))
+            .where(ArquivoFiscalizacao.fiscalizacao_id == Fiscalizacao.id)
+            .correlate(Fiscalizacao)
+            .scalar_subquery()
+        )
+        aberta = aliased(EtapaFiscalizacao)
+        linhas = self.db.execute(
+            select(
+                Fiscalizacao.id,
+                etapas_concluidas,
+                aberta.etapa,
+                aberta.progresso_percentual,
+                arquivos,
+            )
+            .outerjoin(aberta, aberta.id == ultima_aberta)
+            .where(Fiscalizacao.id.in_(fiscalizacao_ids))
+        ).all()
+        return {
+            linha[0]: montar_progresso(linha[0], linha[1] or [], linha[2], linha[3], linha[4] or 0)
+            for linha in linhas
+        }
+
+    def obter_progresso_em_lote(self, fiscalizacao_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        Progresso de várias fiscalizações (ex.: grade do dashboard).
+
+        Itens em cache são servidos direto; os demais saem de uma única query.
+        IDs inexistentes ficam de fora do resultado.
+        """
+        ids = list(dict.fromkeys(fiscalizacao_ids))
+        progresso = _cache_progresso.obter_muitos(ids)
+        faltantes = [fid for fid in ids if fid not in progresso]
+        if faltantes:
+            consultados = self._consultar_progresso(faltantes)
+            for fid, valor in consultados.items():
+                _cache_progresso.definir(fid, valor)
+            progresso.update(consultados)
+        return {fid: progresso[fid] for fid in ids if fid in progresso}
+
     def obter_progresso_completo(self, fiscalizacao_id: int) -> Dict[str, Any]:
         """Obtém o progresso completo de uma fiscalização"""
-        fiscalizacao = self.db.query(Fiscalizacao).filter(
-            Fiscalizacao.id == fiscalizacao_id,
-            Fiscalizacao.deleted_at.is_(None)
-        ).first()
-        
-        if not fiscalizacao:
+        progresso = self.obter_progresso_em_lote([fiscalizacao_id])
+        if fiscalizacao_id not in progresso:
             raise ValueError(f"Fiscalização {fiscalizacao_id} não encontrada")
-        
-        # Buscar todas as etapas
-        etapas = self.db.query(EtapaFiscalizacao).filter(
-            EtapaFiscalizacao.fiscalizacao_id == fiscalizacao_id
-        ).order_by(EtapaFiscalizacao.created_at).all()
-        
-        if not etapas:
-            return {
-                "fiscalizacao_id": fiscalizacao_id,
-                "etapa_atual": None,
-                "etapas_concluidas": [],
-                "etapa_em_progresso": None,
-                "etapas_pendentes": list(EtapaFiscalizacaoEnum),
-                "progresso_geral_percentual": 0.0
-            }
-        
-        # Etapa em progresso é a última sem conclusão
-        etapa_em_progresso = None
-        etapas_concluidas = []
-        
-        for etapa in etapas:
-            if etapa.concluida_em:
-                etapas_concluidas.append(etapa)
-            else:
-                etapa_em_progresso = etapa
-        
-        # Calcular progresso geral
-        if etapas_concluidas:
-            progresso_geral = (len(etapas_concluidas) / 6) * 100  # 6 etapas principais
-        else:
-            progresso_geral = 0.0
-        
-        if etapa_em_progresso:
-            progresso_geral += (etapa_em_progresso.progresso_percentual / 6)
-        
-        # Etapas pendentes
-        etapas_realizadas = {e.etapa for e in etapas_concluidas}
-        etapas_pendentes = [e for e in EtapaFiscalizacaoEnum if e not in etapas_realizadas]
-        
-        # Contar arquivos
-        arquivos = self.db.query(ArquivoFiscalizacao).filter(
-            ArquivoFiscalizacao.fiscalizacao_id == fiscalizacao_id
-        ).count()
-        
-        return {
-            "fiscalizacao_id": fiscalizacao_id,
-            "etapa_atual": etapa_em_progresso.etapa.value if etapa_em_progresso else None,
-            "etapas_concluidas": [e.etapa.value for e in etapas_concluidas],
-            "etapa_em_progresso": etapa_em_progresso.etapa.value if etapa_em_progresso else None,
-            "etapas_pendentes": [e.value for e in etapas_pendentes],
-            "progresso_geral_percentual": min(progresso_geral, 100.0),
-            "arquivos_carregados": arquivos
-        }
+        return progresso[fiscalizacao_id]
     
     def registrar_arquivo(
         self, 
@@ -211,20 +363,232 @@ class EtapaFiscalizacaoService:
         
         self.db.add(arquivo)
         self.db.commit()
+        invalidar_progresso(fiscalizacao_id)
         self.db.refresh(arquivo)
         
         return arquivo
     
-    def obter_arquivos(self, fiscalizacao_id: int, tipo: Optional[str] = None) -> List[ArquivoFiscalizacao]:
-        """Obtém arquivos de uma fiscalização"""
+    def _obter_etapa_da_fiscalizacao(self, fiscalizacao_id: int, etapa_id: int) -> EtapaFiscalizacao:
+        etapa = self.db.query(EtapaFiscalizacao).filter(EtapaFiscalizacao.id == etapa_id).first()
+        if not etapa or etapa.fiscalizacao_id != fiscalizacao_id:
+            raise ValueError(f"Etapa {etapa_id} não encontrada na fiscalização {fiscalizacao_id}")
+        return etapa
+
+    async def _gravar_conteudo(self, upload, tipo_mime: str) -> ResultadoGravacao:
+        """
+        Grava o upload em streaming (memória constante, tamanho e SHA-256 calculados
+        durante a leitura) e o promove para a chave endereçada por conteúdo.
+        """
+        chave_temporaria = f"tmp/{uuid_lib.uuid4().hex}"
+        resultado = await gravar_upload(
+            self.storage,
+            upload,
+            chave_temporaria,
+            tipo_mime=tipo_mime,
+            tamanho_maximo_bytes=self.tamanho_maximo_bytes,
+            chunk_bytes=self.chunk_bytes,
+        )
+        chave = chave_conteudo(resultado.hash_sha256)
+        try:
+            if await self.storage.existe(chave):
+                await self.storage.deletar(chave_temporaria)
+            else:
+                await self.storage.mover(chave_temporaria, chave)
+        except Exception:
+            await self.storage.deletar(chave_temporaria)
+            raise
+        return ResultadoGravacao(chave=chave, tamanho_bytes=resultado.tamanho_bytes, hash_sha256=resultado.hash_sha256)
+
+    async def armazenar_arquivo(
+        self,
+        fiscalizacao_id: int,
+        etapa_id: int,
+        tipo: str,
+        upload,
+        nome_arquivo: str,
+        tipo_mime: Optional[str] = None,
+    ) -> ArquivoFiscalizacao:
+        """Grava o upload no storage (ver `_gravar_conteudo`) e registra o arquivo"""
+        self._obter_etapa_da_fiscalizacao(fiscalizacao_id, etapa_id)
+
+        tipo_mime = tipo_mime or mimetypes.guess_type(nome_arquivo)[0] or "application/octet-stream"
+        resultado = await self._gravar_conteudo(upload, tipo_mime)
+
+        return self.registrar_arquivo(
+            fiscalizacao_id=fiscalizacao_id,
+            etapa_id=etapa_id,
+            tipo=tipo,
+            nome_original=nome_arquivo[:255],
+            url_blob=resultado.chave,
+            tamanho_bytes=resultado.tamanho_bytes,
+            mime_type=tipo_mime,
+            metadados={'hash_sha256': resultado.hash_sha256},
+        )
+
+    async def armazenar_arquivos_em_lote(
+        self,
+        fiscalizacao_id: int,
+        etapa_id: int,
+        tipo: str,
+        uploads: List[Any],
+    ) -> List[Dict[str, Any]]:
+        """
+        Grava vários uploads (ex: imagens de um sobrevoo) com no máximo
+        `upload_lote_concorrencia` gravações simultâneas e registra todos os
+        arquivos aceitos em um único INSERT.
+
+        Args:
+            uploads: Objetos com `filename`, `content_type` e `async read(n)` (UploadFile)
+
+        Returns:
+            Um resultado por upload, na ordem recebida: os dados do arquivo ou `erro`
+        """
+        if not uploads:
+            raise ValueError("Nenhum arquivo enviado")
+        if len(uploads) > self.max_arquivos_lote:
+            raise ValueError(f"Máximo de {self.max_arquivos_lote} arquivos por lote")
+        self._obter_etapa_da_fiscalizacao(fiscalizacao_id, etapa_id)
+
+        limite = asyncio.Semaphore(self.concorrencia_lote)
+
+        async def gravar(upload) -> Dict[str, Any]:
+            nome_arquivo = (upload.filename or "arquivo")[:255]
+            tipo_mime = upload.content_type or mimetypes.guess_type(nome_arquivo)[0] or "application/octet-stream"
+            async with limite:
+                try:
+                    resultado = await self._gravar_conteudo(upload, tipo_mime)
+                except ValueError as err:
+                    return {'nome_original': nome_arquivo, 'erro': str(err)}
+                except Exception:
+                    # Falha de storage/rede em um arquivo não derruba o lote nem os já gravados
+                    logger.exception("Falha ao gravar '%s' da fiscalização %s", nome_arquivo, fiscalizacao_id)
+                    return {'nome_original': nome_arquivo, 'erro': "Falha ao gravar o arquivo no storage"}
+            return {
+                'uuid': uuid_lib.uuid4(),
+                'fiscalizacao_id': fiscalizacao_id,
+                'etapa_id': etapa_id,
+                'tipo': tipo,
+                'nome_original': nome_arquivo,
+                'url_blob': resultado.chave,
+                'tamanho_bytes': resultado.tamanho_bytes,
+                'mime_type': tipo_mime,
+                'metadados': {'hash_sha256': resultado.hash_sha256},
+            }
+
+        resultados = await asyncio.gather(*(gravar(u) for u in uploads))
+        linhas = [r for r in resultados if 'erro' not in r]
+        if not linhas:
+            return resultados
+
+        try:
+            ids = dict(self.db.execute(
+                insert(ArquivoFiscalizacao).returning(ArquivoFiscalizacao.uuid, ArquivoFiscalizacao.id),
+                linhas,
+            ).all())
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        invalidar_progresso(fiscalizacao_id)
+
+        for linha in linhas:
+            linha['id'] = ids.get(linha['uuid'])
+        return resultados
+
+    async def assinar_urls(self, arquivos: List[ArquivoFiscalizacao]) -> Dict[str, str]:
+        """URLs de leitura direta dos originais e derivados dos arquivos, assinadas em um único lote"""
+        chaves = []
+        for arquivo in arquivos:
+            chaves.append(arquivo.url_blob)
+            chaves.extend(((arquivo.metadados or {}).get('derivados') or {}).values())
+        if not chaves:
+            return {}
+        return await self.storage.urls_assinadas(chaves, self.validade_url_segundos)
+
+    def obter_chave_original(self, arquivo_id: int) -> Tuple[str, str]:
+        """Chave no storage e tipo MIME do arquivo enviado"""
+        arquivo = (
+            self.db.query(ArquivoFiscalizacao.url_blob, ArquivoFiscalizacao.mime_type)
+            .filter(ArquivoFiscalizacao.id == arquivo_id)
+            .first()
+        )
+        if not arquivo:
+            raise ValueError(f"Arquivo {arquivo_id} não encontrado")
+        return arquivo.url_blob, arquivo.mime_type
+
+    def obter_chave_derivado(self, arquivo_id: int, variante: str) -> str:
+        """Chave no storage da miniatura/prévia de um arquivo já ingerido"""
+        arquivo = self.db.query(ArquivoFiscalizacao).filter(ArquivoFiscalizacao.id == arquivo_id).first()
+        if not arquivo:
+            raise ValueError(f"Arquivo {arquivo_id} não encontrado")
+        chave = ((arquivo.metadados or {}).get('derivados') or {}).get(variante)
+        if not chave:
+            raise ValueError(f"Imagem {variante} do arquivo {arquivo_id} não encontrada (ingestão pendente)")
+        return chave
+
+    def obter_arquivos(
+        self,
+        fiscalizacao_id: int,
+        tipo: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[ArquivoFiscalizacao], Optional[str]]:
+        """
+        Lista os arquivos de uma fiscalização pelo catálogo, do mais recente para o
+        mais antigo, paginados por chave (created_at desc, id desc).
+
+        O custo de cada página vem do índice (fiscalizacao_id, [tipo,] created_at, id),
+        não do tamanho do voo nem do container do storage.
+
+        Returns:
+            (arquivos da página, cursor da próxima página ou None)
+        """
         query = self.db.query(ArquivoFiscalizacao).filter(
             ArquivoFiscalizacao.fiscalizacao_id == fiscalizacao_id
         )
         
         if tipo:
             query = query.filter(ArquivoFiscalizacao.tipo == tipo)
-        
-        return query.order_by(ArquivoFiscalizacao.created_at.desc()).all()
+
+        if cursor:
+            ultimo_created_at, ultimo_id = decodificar_cursor(cursor, 2)
+            try:
+                ultimo_created_at, ultimo_id = datetime.fromisoformat(ultimo_created_at), int(ultimo_id)
+            except (TypeError, ValueError) as err:
+                raise ValueError("Cursor de paginação inválido") from err
+            query = query.filter(
+                tuple_(ArquivoFiscalizacao.created_at, ArquivoFiscalizacao.id) < tuple_(ultimo_created_at, ultimo_id)
+            )
+
+        arquivos = query.order_by(
+            ArquivoFiscalizacao.created_at.desc(), ArquivoFiscalizacao.id.desc()
+        ).limit(limit + 1).all()
+
+        proximo_cursor = None
+        if len(arquivos) > limit:
+            arquivos = arquivos[:limit]
+            proximo_cursor = codificar_cursor(arquivos[-1].created_at.isoformat(), arquivos[-1].id)
+        return arquivos, proximo_cursor
+
+    def obter_imagens_para_analise(
+        self, fiscalizacao_id: int
+    ) -> Tuple[List[ArquivoFiscalizacao], List[ArquivoFiscalizacao]]:
+        """
+        Imagens da fiscalização a enviar para a IA e as quase-duplicatas puladas
+        (`duplicata_de` marcado na ingestão: o original já é analisado)
+        """
+        imagens = (
+            self.db.query(ArquivoFiscalizacao)
+            .filter(
+                ArquivoFiscalizacao.fiscalizacao_id == fiscalizacao_id,
+                ArquivoFiscalizacao.mime_type.like('image/%'),
+            )
+            .order_by(ArquivoFiscalizacao.id)
+            .all()
+        )
+        analisar = [a for a in imagens if 'duplicata_de' not in (a.metadados or {})]
+        duplicatas = [a for a in imagens if 'duplicata_de' in (a.metadados or {})]
+        return analisar, duplicatas
     
     def registrar_resultado_ia(
         self,
@@ -236,20 +600,12 @@ class EtapaFiscalizacaoService:
         tempo_processamento: Optional[float] = None
     ) -> ResultadoAnaliseIA:
         """Registra resultado da análise de IA"""
-        # Determinar classificação geral baseado em confiança
-        if confianca_media >= 0.8:
-            classificacao = "crítico"
-        elif confianca_media >= 0.6:
-            classificacao = "moderado"
-        else:
-            classificacao = "leve"
-        
         resultado = ResultadoAnaliseIA(
             etapa_id=etapa_id,
             job_id=job_id,
             deteccoes=deteccoes,
             confianca_media=confianca_media,
-            classificacao_geral=classificacao,
+            classificacao_geral=classificar_confianca(confianca_media),
             modelo_utilizado=modelo_utilizado or "modelo_padrao",
             status_processamento="concluído",
             tempo_processamento_segundos=tempo_processamento
@@ -265,7 +621,7 @@ class EtapaFiscalizacaoService:
         """Obtém resultado de IA de uma etapa"""
         return self.db.query(ResultadoAnaliseIA).filter(
             ResultadoAnaliseIA.etapa_id == etapa_id
-        ).first()
+        ).order_by(ResultadoAnaliseIA.id.desc()).first()
     
     def criar_relatorio(
         self,
@@ -0,0 +1,184 @@
+"""
+Executores da análise de IA: onde a inferência roda (CPU do próprio worker ou
+GPU provisionada pelo Skypilot). O worker da fila só conhece a interface.
+"""
+import asyncio
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from src.geobot_plataforma_backend.core.config import settings
+from src.geobot_plataforma_backend.core.skypilot_service import obter_skypilot_service
+from src.geobot_plataforma_backend.core.storage import StorageBackend, obter_storage_backend
+from src.geobot_plataforma_backend.domain.service.fila_jobs_service import ErroPermanenteJob
+
+# (percentual, mensagem)
+Progresso = Callable[[float, str], None]
+# caminho da imagem -> detecções ({"classe", "classe_nome", "confianca", "bbox"})
+Detector = Callable[[str], List[Dict[str, Any]]]
+
+
+@dataclass(frozen=True)
+class ImagemAnalise:
+    """Imagem a analisar: arquivo da fiscalização e sua chave no storage"""
+    arquivo_id: int
+    chave: str
+
+
+class ExecutorIA(ABC):
+    """Roda o modelo sobre um conjunto de imagens"""
+
+    @abstractmethod
+    async def analisar(
+        self,
+        imagens: Sequence[ImagemAnalise],
+        progresso: Progresso,
+        identificador: str,
+    ) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        Detecções de cada imagem, por arquivo_id
+
+        Args:
+            identificador: Nome estável do job (tentativas repetidas reaproveitam recursos)
+
+        Raises:
+            ErroPermanenteJob: falha que não adianta repetir
+        """
+
+
+_modelos: Dict[str, Any] = {}
+
+
+def _detector_yolo(modelo: str, confianca_minima: float) -> Detector:
+    """Detector com o YOLO (ultralytics), carregado uma vez por processo"""
+    try:
+        from ultralytics import YOLO
+    except ImportError as err:
+        raise ErroPermanenteJob("ultralytics não está instalado neste worker (ia_executor = local)") from err
+
+    if modelo not in _modelos:
+        _modelos[modelo] = YOLO(modelo)
+    yolo = _modelos[modelo]
+
+    def detectar(caminho: str) -> List[Dict[str, Any]]:
+        return [
+            {
+                "classe": int(box.cls[0]),
+                "classe_nome": resultado.names[int(box.cls[0])],
+                "confianca": float(box.conf[0]),
+                "bbox": box.xyxy[0].tolist(),
+            }
+            for resultado in yolo(caminho, conf=confianca_minima, verbose=False)
+            for box in resultado.boxes
+        ]
+
+    return detectar
+
+
+class ExecutorLocal(ExecutorIA):
+    """
+    Inferência na CPU do próprio worker, uma imagem por vez (o paralelismo vem
+    do número de workers). Serve para desenvolvimento, testes e volumes pequenos.
+    """
+
+    def __init__(
+        self,
+        storage: Optional[StorageBackend] = None,
+        detector: Optional[Detector] = None,
+        modelo: Optional[str] = None,
+        confianca_minima: Optional[float] = None,
+    ):
+        self.storage = storage or obter_storage_backend()
+        self._detector = detector
+        self.modelo = modelo or settings.get('ia_modelo', 'yolov8n.pt')
+        self.confianca_minima = float(confianca_minima or settings.get('ia_confianca_minima', 0.5))
+        self.chunk_bytes = settings.get('upload_chunk_size_kb', 1024) * 1024
+
+    async def _baixar(self, chave: str, destino) -> None:
+        async for chunk in self.storage.ler(chave, self.chunk_bytes):
+            await asyncio.to_thread(destino.write, chunk)
+        await asyncio.to_thread(destino.flush)
+
+    async def _detectar(self, detector: Detector, chave: str) -> List[Dict[str, Any]]:
+        caminho = self.storage.caminho_local(chave)
+        if caminho is not None:
+            return await asyncio.to_thread(detector, caminho)
+        with tempfile.NamedTemporaryFile(suffix=os.path.splitext(chave)[1]) as temporario:
+            await self._baixar(chave, temporario)
+            return await asyncio.to_thread(detector, temporario.name)
+
+    async def analisar(
+        self,
+        imagens: Sequence[ImagemAnalise],
+        progresso: Progresso,
+        identificador: str,
+    ) -> Dict[int, List[Dict[str, Any]]]:
+        if self._detector is None:
+            self._detector = _detector_yolo(self.modelo, self.confianca_minima)
+        deteccoes = {}
+        for indice, imagem in enumerate(imagens, start=1):
+            try:
+                deteccoes[imagem.arquivo_id] = await self._detectar(self._detector, imagem.chave)
+            except FileNotFoundError as err:
+                raise ErroPermanenteJob(f"Imagem do arquivo {imagem.arquivo_id} não encontrada no storage") from err
+            progresso(indice / len(imagens) * 100, f"{indice}/{len(imagens)} imagens analisadas")
+        return deteccoes
+
+
+class ExecutorSkypilot(ExecutorIA):
+    """
+    Inferência em GPU na nuvem: o cluster baixa as imagens por URLs assinadas do
+    storage e roda o modelo
+
+    Com `ia_skypilot_cluster` definido, todos os jobs usam esse cluster e ele
+    fica quente entre um lote e outro (derrubado após
+    `ia_skypilot_ociosidade_minutos` sem jobs); senão cada job sobe e derruba
+    o próprio cluster.
+    """
+
+    def __init__(self, storage: Optional[StorageBackend] = None, skypilot=None):
+        self.storage = storage or obter_storage_backend()
+        self.skypilot = skypilot or obter_skypilot_service()
+        self.modelo = settings.get('ia_modelo', 'yolov8n.pt')
+        self.confianca_minima = float(settings.get('ia_confianca_minima', 0.5))
+        self.timeout_segundos = float(settings.get('ia_skypilot_timeout_minutos', 60)) * 60
+        self.validade_url_segundos = int(settings.get('storage_url_assinada_minutos', 60)) * 60
+        self.cluster = settings.get('ia_skypilot_cluster', '')
+        self.ociosidade_minutos = int(settings.get('ia_skypilot_ociosidade_minutos', 15))
+
+    async def analisar(
+        self,
+        imagens: Sequence[ImagemAnalise],
+        progresso: Progresso,
+        identificador: str,
+    ) -> Dict[int, List[Dict[str, Any]]]:
+        # Validade cobre provisionamento + processamento
+        urls = await self.storage.urls_assinadas(
+            [i.chave for i in imagens], max(self.validade_url_segundos, int(self.timeout_segundos))
+        )
+        if any(i.chave not in urls for i in imagens):
+            raise ErroPermanenteJob(
+                "O storage configurado não gera URLs assinadas: o executor skypilot precisa do Azure Blob"
+            )
+        por_arquivo = await self.skypilot.executar_analise(
+            nome_cluster=self.cluster or identificador,
+            imagens=[{"arquivo_id": i.arquivo_id, "url": urls[i.chave]} for i in imagens],
+            modelo=self.modelo,
+            parametros={"confianca_minima": self.confianca_minima},
+            progresso=progresso,
+            timeout_segundos=self.timeout_segundos,
+            ociosidade_minutos=self.ociosidade_minutos if self.cluster else None,
+        )
+        return {int(arquivo_id): deteccoes for arquivo_id, deteccoes in por_arquivo.items()}
+
+
+def obter_executor_ia(storage: Optional[StorageBackend] = None) -> ExecutorIA:
+    """Executor configurado em `ia_executor` (local | skypilot)"""
+    tipo = settings.get('ia_executor', 'local')
+    if tipo == 'local':
+        return ExecutorLocal(storage)
+    elif tipo == 'skypilot':
+        return ExecutorSkypilot(storage)
+    raise ValueError(f"Executor de IA desconhecido: {tipo}")
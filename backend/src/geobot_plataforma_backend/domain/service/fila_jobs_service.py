@@ -0,0 +1,217 @@
+"""Fila durável de jobs no PostgreSQL, consumida com SELECT ... FOR UPDATE SKIP LOCKED"""
+import random
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.orm import Session
+
+from src.geobot_plataforma_backend.core.config import settings
+from src.geobot_plataforma_backend.domain.entity.job import Job, StatusJob
+
+
+class ErroPermanenteJob(Exception):
+    """Falha que não adianta repetir (dados inválidos, configuração ausente): o job vai direto para erro"""
+
+
+def atraso_tentativa(
+    tentativa: int,
+    base_segundos: float,
+    maximo_segundos: float,
+    sorteio: Callable[[], float] = random.random,
+) -> float:
+    """
+    Espera antes de repetir um job que falhou `tentativa` vezes: base·2^(tentativa-1),
+    limitada a `maximo_segundos`, com jitter de até 50% para que jobs que falharam
+    juntos (ex: storage fora do ar) não voltem todos no mesmo instante
+    """
+    atraso = min(base_segundos * 2 ** max(tentativa - 1, 0), maximo_segundos)
+    return atraso * (0.5 + sorteio() / 2)
+
+
+def _depois_de(segundos: float):
+    """now() + intervalo, calculado no banco: todos os workers usam o mesmo relógio"""
+    return func.now() + func.make_interval(0, 0, 0, 0, 0, 0, segundos)
+
+
+class FilaJobs:
+    """
+    Operações da fila sobre uma sessão. As operações do worker (reservar,
+    renovar, concluir, falhar) fazem commit na hora; `enfileirar` só adiciona
+    à sessão, para o job nascer na mesma transação do que ele referencia.
+
+    Toda alteração de um job em execução exige `bloqueado_por` igual ao worker:
+    se a reserva expirou e outro worker pegou o job, o primeiro não sobrescreve nada.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.reserva_segundos = int(settings.get('jobs_reserva_segundos', 300))
+        self.backoff_segundos = float(settings.get('jobs_backoff_segundos', 30))
+        self.backoff_maximo_segundos = float(settings.get('jobs_backoff_maximo_segundos', 1800))
+        self.max_tentativas = int(settings.get('jobs_max_tentativas', 3))
+
+    def enfileirar(
+        self,
+        tipo: str,
+        payload: Dict[str, Any],
+        prioridade: int = 0,
+        max_tentativas: Optional[int] = None,
+    ) -> Job:
+        """Adiciona o job à sessão (o commit fica com quem chama)"""
+        job = Job(
+            tipo=tipo,
+            payload=payload,
+            status=StatusJob.PENDENTE.value,
+            prioridade=prioridade,
+            tentativas=0,
+            max_tentativas=max_tentativas or self.max_tentativas,
+            progresso=0,
+        )
+        self.db.add(job)
+        self.db.flush()
+        return job
+
+    def obter(self, job_id: int) -> Job:
+        job = self.db.query(Job).filter(Job.id == job_id).first()
+        if not job:
+            raise ValueError(f"Job {job_id} não encontrado")
+        return job
+
+    def consulta_proximo(self, tipos: Sequence[str]):
+        """Próximo job pendente e disponível; linhas já travadas por outro worker são puladas"""
+        return (
+            select(Job.id)
+            .where(
+                Job.status == StatusJob.PENDENTE.value,
+                Job.tipo.in_(tipos),
+                Job.disponivel_em <= func.now(),
+            )
+            .order_by(Job.prioridade.desc(), Job.disponivel_em, Job.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+
+    def reservar(self, worker_id: str, tipos: Sequence[str]) -> Optional[Job]:
+        """
+        Reserva o próximo job para `worker_id` por `jobs_reserva_segundos`
+
+        Um único UPDATE ... WHERE id = (SELECT ... SKIP LOCKED): workers
+        concorrentes pegam jobs diferentes sem esperar uns pelos outros.
+        """
+        job = self.db.execute(
+            update(Job)
+            .where(Job.id == self.consulta_proximo(tipos).scalar_subquery())
+            .values(
+                status=StatusJob.EXECUTANDO.value,
+                tentativas=Job.tentativas + 1,
+                bloqueado_por=worker_id,
+                bloqueado_ate=_depois_de(self.reserva_segundos),
+                iniciado_em=func.now(),
+                erro=None,
+            )
+            .returning(Job)
+            .execution_options(synchronize_session=False)
+        ).scalars().first()
+        if job is not None:
+            self.db.expunge(job)  # Continua legível depois do commit, sem recarregar a linha
+        self.db.commit()
+        return job
+
+    def renovar(
+        self,
+        job_id: int,
+        worker_id: str,
+        progresso: Optional[float] = None,
+        mensagem: Optional[str] = None,
+    ) -> bool:
+        """Estende a reserva (e registra o progresso); False se o job não é mais deste worker"""
+        valores: Dict[str, Any] = {'bloqueado_ate': _depois_de(self.reserva_segundos)}
+        if progresso is not None:
+            valores['progresso'] = max(0.0, min(100.0, progresso))
+        if mensagem is not None:
+            valores['mensagem'] = mensagem
+        linhas = self.db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.bloqueado_por == worker_id, Job.status == StatusJob.EXECUTANDO.value)
+            .values(**valores)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        self.db.commit()
+        return linhas == 1
+
+    def concluir(self, job_id: int, worker_id: str, resultado: Optional[Dict[str, Any]] = None) -> bool:
+        """Marca o job como concluído; False se ele não é mais deste worker"""
+        linhas = self.db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.bloqueado_por == worker_id, Job.status == StatusJob.EXECUTANDO.value)
+            .values(
+                status=StatusJob.CONCLUIDO.value,
+                progresso=100,
+                resultado=resultado,
+                bloqueado_por=None,
+                bloqueado_ate=None,
+                concluido_em=func.now(),
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        self.db.commit()
+        return linhas == 1
+
+    def falhar(self, job_id: int, worker_id: str, erro: str, permanente: bool = False) -> Optional[str]:
+        """
+        Devolve o job à fila com backoff, ou o encerra com erro se as tentativas
+        acabaram (ou a falha é permanente)
+
+        Returns:
+            Novo status do job, ou None se ele não é mais deste worker
+        """
+        job = (
+            self.db.query(Job)
+            .filter(Job.id == job_id, Job.bloqueado_por == worker_id, Job.status == StatusJob.EXECUTANDO.value)
+            .with_for_update()
+            .first()
+        )
+        if not job:
+            self.db.rollback()
+            return None
+        job.erro = erro
+        job.bloqueado_por = None
+        job.bloqueado_ate = None
+        if permanente or job.tentativas >= job.max_tentativas:
+            job.status = StatusJob.ERRO.value
+            job.concluido_em = datetime.now(timezone.utc)
+        else:
+            job.status = StatusJob.PENDENTE.value
+            job.disponivel_em = _depois_de(
+                atraso_tentativa(job.tentativas, self.backoff_segundos, self.backoff_maximo_segundos)
+            )
+        status = job.status
+        self.db.commit()
+        return status
+
+    def liberar_expirados(self) -> List[Tuple[int, str, Dict[str, Any]]]:
+        """
+        Devolve à fila os jobs cuja reserva expirou (worker morreu ou travou);
+        os que já esgotaram as tentativas vão para erro
+
+        Returns:
+            (id, tipo, payload) dos jobs que foram para erro
+        """
+        esgotado = Job.tentativas >= Job.max_tentativas
+        linhas = self.db.execute(
+            update(Job)
+            .where(Job.status == StatusJob.EXECUTANDO.value, Job.bloqueado_ate < func.now())
+            .values(
+                status=case((esgotado, StatusJob.ERRO.value), else_=StatusJob.PENDENTE.value),
+                concluido_em=case((esgotado, func.now()), else_=None),
+                erro="Worker parou de responder antes de concluir o job",
+                bloqueado_por=None,
+                bloqueado_ate=None,
+                disponivel_em=func.now(),
+            )
+            .returning(Job.id, Job.status, Job.tipo, Job.payload)
+            .execution_options(synchronize_session=False)
+        ).all()
+        self.db.commit()
+        return [(job_id, tipo, payload) for job_id, status, tipo, payload in linhas if status == StatusJob.ERRO.value]
@@ -1,13 +1,24 @@
 """Serviço de fiscalização com controle de autorização"""
-from typing import Optional, List
-from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Dict, Optional, List, Set, Tuple
+from sqlalchemy import and_, case, insert, or_, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session, load_only, selectinload
 import uuid as uuid_lib
 
+from src.geobot_plataforma_backend.core.paginacao import codificar_cursor, decodificar_cursor
 from src.geobot_plataforma_backend.domain.entity.fiscalizacao import Fiscalizacao
 from src.geobot_plataforma_backend.domain.entity.denuncia import Denuncia
 from src.geobot_plataforma_backend.domain.entity.usuario import Usuario
 from src.geobot_plataforma_backend.domain.entity.usuario_fiscalizacao import UsuarioFiscalizacao
-from src.geobot_plataforma_backend.domain.entity.enums import StatusFiscalizacao
+from src.geobot_plataforma_backend.domain.entity.enums import StatusDenuncia, StatusFiscalizacao
+from src.geobot_plataforma_backend.domain.entity.historico_fiscalizacao import (
+    HistoricoFiscalizacao,
+    TipoEventoFiscalizacao,
+)
+from src.geobot_plataforma_backend.domain.repository.historico_fiscalizacao_repository import (
+    HistoricoFiscalizacaoRepository,
+)
 from src.geobot_plataforma_backend.domain.repository.usuario_repository import UsuarioRepository
 
 
@@ -15,12 +26,25 @@ class AutorizacaoError(Exception):
     """Erro de autorização"""
 
 
+def verificar_permissao_admin_fiscal(usuario: Usuario) -> bool:
+    """Verifica se usuário é admin ou fiscal (única regra, usada por todos os serviços)"""
+    # TODO: Implementar verificação real de grupos/roles quando disponível
+    # Por enquanto, retorna True para desenvolvimento
+    return True
+
+
 class FiscalizacaoService:
     """Serviço para operações de fiscalização"""
 
+    STATUS_ATIVOS = (StatusFiscalizacao.AGUARDANDO, StatusFiscalizacao.EM_ANDAMENTO)
+    STATUS_DENUNCIA_FISCALIZAVEL = (StatusDenuncia.PENDENTE, StatusDenuncia.EM_ANALISE)
+    # Fiscalizações abertas por transação em `criar_fiscalizacoes_em_lote`
+    MAX_ITENS_LOTE = 200
+
     def __init__(self, db: Session):
         self.db = db
         self.usuario_repository = UsuarioRepository(db)
+        self.historico_repository = HistoricoFiscalizacaoRepository(db)
 
     def _verificar_usuario_ativo(self, usuario: Usuario) -> None:
         """Verifica se o usuário está ativo"""
@@ -29,9 +53,16 @@ class FiscalizacaoService:
 
     def _verificar_permissao_admin_fiscal(self, usuario: Usuario) -> bool:
         """Verifica se usuário é admin ou fiscal"""
-        # TODO: Implementar verificação real de grupos/roles quando disponível
-        # Por enquanto, retorna True para desenvolvimento
-        return True
+        return verificar_permissao_admin_fiscal(usuario)
+
+    def _query_com_fiscais(self):
+        """
+        Query de fiscalizações com fiscais e usuários carregados via selectinload:
+        uma página custa 3 queries (fiscalizações, atribuições, usuários) em vez de 1 + N + N·M
+        """
+        return self.db.query(Fiscalizacao).options(
+            selectinload(Fiscalizacao.fiscais_atribuidos).selectinload(UsuarioFiscalizacao.usuario)
+        )
 
     def criar_fiscalizacao(
         self, 
@@ -42,6 +73,11 @@ class FiscalizacaoService:
     ) -> Fiscalizacao:
         """
         Cria uma nova fiscalização e atribui fiscais.
+
+        A denúncia é reservada com um UPDATE condicional (só sai de PENDENTE/EM_ANALISE
+        uma vez) e a fiscalização é inserida com ON CONFLICT sobre o índice único
+        parcial de fiscalizações ativas, então supervisores concorrentes não conseguem
+        abrir duas fiscalizações para a mesma denúncia.
         
         Args:
             denuncia_id: ID da denúncia
@@ -58,70 +94,209 @@ class FiscalizacaoService:
 
         self._verificar_usuario_ativo(usuario)
 
-        # Verificar se a denúncia existe
-        denuncia = self.db.query(Denuncia).filter(Denuncia.id == denuncia_id).first()
-        if not denuncia:
-            raise ValueError("Denúncia não encontrada")
+        # Sem fiscais especificados, o criador é o responsável
+        fiscais_ids = self._validar_fiscais(fiscais_ids) if fiscais_ids else [usuario_id]
 
-        # VALIDAÇÃO 1-PARA-1: Verificar se a denúncia já está em fiscalização ou foi concluída
-        from src.geobot_plataforma_backend.domain.entity.enums import StatusDenuncia
-        if denuncia.status not in [StatusDenuncia.PENDENTE, StatusDenuncia.EM_ANALISE]:
-            raise ValueError("Esta denúncia já está em processo de fiscalização ou foi concluída.")
+        try:
+            if not self._reservar_denuncias([denuncia_id]):
+                self._recusar_denuncias([denuncia_id])
 
-        # Verificar se já existe uma fiscalização ativa para esta denúncia
-        fiscalizacao_existente = self.db.query(Fiscalizacao).filter(
-            Fiscalizacao.denuncia_id == denuncia_id,
-            Fiscalizacao.status.in_([StatusFiscalizacao.AGUARDANDO, StatusFiscalizacao.EM_ANDAMENTO])
-        ).first()
-        if fiscalizacao_existente:
-            raise ValueError("Esta denúncia já possui uma fiscalização ativa.")
+            criadas = self._inserir_fiscalizacoes([(denuncia_id, observacoes)])
+            if not criadas:
+                raise ValueError("Esta denúncia já possui uma fiscalização ativa.")
+
+            fiscalizacao_id = criadas[denuncia_id]
+            self._inserir_atribuicoes(self._linhas_atribuicao(fiscalizacao_id, fiscais_ids))
+            self.historico_repository.registrar(
+                fiscalizacao_id,
+                TipoEventoFiscalizacao.CRIADA,
+                usuario_id=usuario_id,
+                valor_novo=StatusFiscalizacao.AGUARDANDO.value,
+                dados={'denuncia_id': denuncia_id, 'fiscais_ids': fiscais_ids},
+                observacoes=observacoes,
+            )
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        return self._query_com_fiscais().filter(Fiscalizacao.id == fiscalizacao_id).one()
+
+    def criar_fiscalizacoes_em_lote(
+        self,
+        itens: List[dict],
+        usuario_id: int,
+    ) -> List[Fiscalizacao]:
+        """
+        Abre fiscalizações para várias denúncias em uma única transação.
+
+        Cada item tem `denuncia_id`, `observacoes` e `fiscais_ids` (opcionais os dois
+        últimos). As denúncias são reservadas com um único UPDATE condicional e as
+        fiscalizações inseridas com um único INSERT ... ON CONFLICT; se qualquer
+        denúncia não puder ser fiscalizada, nada é gravado.
+
+        Returns:
+            Fiscalizações criadas, na ordem dos itens, com fiscais carregados
+        """
+        usuario = self.usuario_repository.buscar_por_id(usuario_id)
+        if not usuario:
+            raise ValueError("Usuário não encontrado")
+
+        self._verificar_usuario_ativo(usuario)
+
+        if not itens:
+            raise ValueError("Informe ao menos uma denúncia")
+        if len(itens) > self.MAX_ITENS_LOTE:
+            raise ValueError(f"O lote aceita no máximo {self.MAX_ITENS_LOTE} denúncias")
+
+        denuncia_ids = [item['denuncia_id'] for item in itens]
+        repetidas = sorted({d for d in denuncia_ids if denuncia_ids.count(d) > 1})
+        if repetidas:
+            raise ValueError(f"Denúncias repetidas no lote: {', '.join(map(str, repetidas))}")
+
+        # Uma única validação para a união de todos os fiscais do lote
+        self._validar_fiscais([f for item in itens for f in (item.get('fiscais_ids') or [])])
+
+        try:
+            reservadas = self._reservar_denuncias(denuncia_ids)
+            if len(reservadas) != len(denuncia_ids):
+                self._recusar_denuncias([d for d in denuncia_ids if d not in reservadas])
+
+            criadas = self._inserir_fiscalizacoes(
+                [(item['denuncia_id'], item.get('observacoes')) for item in itens]
+            )
+            if len(criadas) != len(denuncia_ids):
+                conflitos = [d for d in denuncia_ids if d not in criadas]
+                raise ValueError(f"Denúncias com fiscalização ativa: {', '.join(map(str, conflitos))}")
+
+            linhas = []
+            eventos = []
+            for item in itens:
+                fiscalizacao_id = criadas[item['denuncia_id']]
+                fiscais_ids = list(dict.fromkeys(item.get('fiscais_ids') or [usuario_id]))
+                linhas.extend(self._linhas_atribuicao(fiscalizacao_id, fiscais_ids))
+                eventos.append(HistoricoFiscalizacaoRepository.linha(
+                    fiscalizacao_id,
+                    TipoEventoFiscalizacao.CRIADA,
+                    usuario_id=usuario_id,
+                    valor_novo=StatusFiscalizacao.AGUARDANDO.value,
+                    dados={'denuncia_id': item['denuncia_id'], 'fiscais_ids': fiscais_ids, 'lote': True},
+                    observacoes=item.get('observacoes'),
+                ))
+            self._inserir_atribuicoes(linhas)
+            self.historico_repository.registrar_muitos(eventos)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        ids = [criadas[d] for d in denuncia_ids]
+        por_id = {f.id: f for f in self._query_com_fiscais().filter(Fiscalizacao.id.in_(ids))}
+        return [por_id[i] for i in ids]
+
+    def _reservar_denuncias(self, denuncia_ids: List[int]) -> Set[int]:
+        """
+        UPDATE condicional das denúncias para EM_FISCALIZACAO com RETURNING.
 
-        # Gerar código único
-        codigo = f"FISC-{uuid_lib.uuid4().hex[:8].upper()}"
+        Só denúncias ainda fiscalizáveis mudam de status; a trava de linha faz uma
+        transação concorrente esperar e, ao reavaliar o WHERE, não encontrar a linha.
 
-        fiscalizacao = Fiscalizacao(
-            denuncia_id=denuncia_id,
-            codigo=codigo,
-            observacoes=observacoes,
-            status=StatusFiscalizacao.AGUARDANDO
+        Returns:
+            IDs efetivamente reservados
+        """
+        stmt = (
+            update(Denuncia)
+            .where(
+                Denuncia.id.in_(denuncia_ids),
+                Denuncia.status.in_(self.STATUS_DENUNCIA_FISCALIZAVEL),
+            )
+            .values(status=StatusDenuncia.EM_FISCALIZACAO)
+            .returning(Denuncia.id)
+            .execution_options(synchronize_session=False)
         )
-        
-        # Atualizar status da denúncia para EM_FISCALIZACAO
-        from src.geobot_plataforma_backend.domain.entity.enums import StatusDenuncia
-        denuncia.status = StatusDenuncia.EM_FISCALIZACAO
-        
-        self.db.add(fiscalizacao)
-        self.db.flush()  # Flush para obter o ID da fiscalização
-        
-        # Atribuir fiscais
-        if fiscais_ids:
-            # Atribuir os fiscais especificados (primeiro como responsável, resto como auxiliares)
-            for idx, fiscal_id in enumerate(fiscais_ids):
-                fiscal = self.usuario_repository.buscar_por_id(fiscal_id)
-                if not fiscal:
-                    raise ValueError(f"Fiscal com ID {fiscal_id} não encontrado")
-                
-                papel = "responsavel" if idx == 0 else "auxiliar"
-                atribuicao = UsuarioFiscalizacao(
-                    usuario_id=fiscal_id,
-                    fiscalizacao_id=fiscalizacao.id,
-                    papel=papel
-                )
-                self.db.add(atribuicao)
-        else:
-            # Se nenhum fiscal especificado, atribuir o usuário criador como responsável
-            atribuicao = UsuarioFiscalizacao(
-                usuario_id=usuario_id,
-                fiscalizacao_id=fiscalizacao.id,
-                papel="responsavel"
+        return set(self.db.execute(stmt).scalars())
+
+    def _recusar_denuncias(self, denuncia_ids: List[int]) -> None:
+        """Explica por que as denúncias não foram reservadas (caminho de erro apenas)"""
+        existentes = {
+            d for (d,) in self.db.query(Denuncia.id).filter(Denuncia.id.in_(denuncia_ids))
+        }
+        faltando = [d for d in denuncia_ids if d not in existentes]
+
+        if len(denuncia_ids) == 1:
+            if faltando:
+                raise ValueError("Denúncia não encontrada")
+            raise ValueError("Esta denúncia já está em processo de fiscalização ou foi concluída.")
+
+        if faltando:
+            raise ValueError(f"Denúncias não encontradas: {', '.join(map(str, faltando))}")
+        raise ValueError(
+            "Denúncias já em processo de fiscalização ou concluídas: "
+            f"{', '.join(map(str, denuncia_ids))}"
+        )
+
+    def _inserir_fiscalizacoes(self, itens: List[Tuple[int, Optional[str]]]) -> Dict[int, int]:
+        """
+        INSERT ... ON CONFLICT DO NOTHING sobre o índice único parcial
+        `uq_fiscalizacoes_denuncia_ativa`.
+
+        Returns:
+            Mapa denuncia_id -> fiscalizacao_id apenas das linhas inseridas
+        """
+        stmt = (
+            pg_insert(Fiscalizacao)
+            .values([
+                {
+                    'denuncia_id': denuncia_id,
+                    'codigo': f"FISC-{uuid_lib.uuid4().hex[:8].upper()}",
+                    'observacoes': observacoes,
+                    'status': StatusFiscalizacao.AGUARDANDO,
+                }
+                for denuncia_id, observacoes in itens
+            ])
+            .on_conflict_do_nothing(
+                index_elements=[Fiscalizacao.denuncia_id],
+                index_where=Fiscalizacao.status.in_(self.STATUS_ATIVOS),
             )
-            self.db.add(atribuicao)
-        self.db.add(denuncia)
-        self.db.commit()
-        # Não fazer refresh para evitar problemas com relacionamentos
-        # O objeto já tem os atributos necessários após o commit
-        
-        return fiscalizacao
+            .returning(Fiscalizacao.denuncia_id, Fiscalizacao.id)
+        )
+        return {denuncia_id: fiscalizacao_id for denuncia_id, fiscalizacao_id in self.db.execute(stmt)}
+
+    def _validar_fiscais(self, fiscais_ids: List[int]) -> List[int]:
+        """
+        Confere a existência de todos os fiscais com um único SELECT ... IN.
+
+        Returns:
+            IDs sem repetição, na ordem informada (o primeiro é o responsável)
+        """
+        ids = list(dict.fromkeys(fiscais_ids))
+        if not ids:
+            return ids
+
+        encontrados = {i for (i,) in self.db.query(Usuario.id).filter(Usuario.id.in_(ids))}
+        faltando = [i for i in ids if i not in encontrados]
+        if len(faltando) == 1:
+            raise ValueError(f"Fiscal com ID {faltando[0]} não encontrado")
+        if faltando:
+            raise ValueError(f"Fiscais não encontrados: {', '.join(map(str, faltando))}")
+        return ids
+
+    @staticmethod
+    def _linhas_atribuicao(fiscalizacao_id: int, fiscais_ids: List[int]) -> List[dict]:
+        """Primeiro fiscal como responsável, demais como auxiliares"""
+        return [
+            {
+                'usuario_id': fiscal_id,
+                'fiscalizacao_id': fiscalizacao_id,
+                'papel': "responsavel" if idx == 0 else "auxiliar",
+            }
+            for idx, fiscal_id in enumerate(fiscais_ids)
+        ]
+
+    def _inserir_atribuicoes(self, linhas: List[dict]) -> None:
+        """INSERT em lote (executemany) das atribuições, sem passar pela unit of work"""
+        if linhas:
+            self.db.execute(insert(UsuarioFiscalizacao), linhas)
 
     def listar_fiscalizacoes(
         self,
@@ -138,7 +313,7 @@ class FiscalizacaoService:
 
         self._verificar_usuario_ativo(usuario)
 
-        query = self.db.query(Fiscalizacao)
+        query = self._query_com_fiscais()
         
         if status_filter:
             query = query.filter(Fiscalizacao.status == status_filter)
@@ -149,29 +324,97 @@ class FiscalizacaoService:
                 UsuarioFiscalizacao.usuario_id == fiscal_id_filter
             )
         
-        return query.limit(limit).offset(offset).all()
+        return query.order_by(Fiscalizacao.created_at.desc(), Fiscalizacao.id.desc()).limit(limit).offset(offset).all()
 
     def listar_minhas_fiscalizacoes(
         self,
         usuario_id: int,
-        status_filter: Optional[StatusFiscalizacao] = None
-    ) -> List[Fiscalizacao]:
-        """Lista fiscalizações onde o usuário está atribuído como fiscal."""
+        status_filter: Optional[StatusFiscalizacao] = None,
+        incluir_encerradas: bool = False,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        resumo: bool = False,
+    ) -> Tuple[List[Fiscalizacao], Optional[str]]:
+        """
+        Lista fiscalizações onde o usuário está atribuído como fiscal, paginadas por chave.
+
+        Sem `status_filter`, retorna apenas as ativas (aguardando/em andamento), a menos
+        que `incluir_encerradas` seja informado — nesse caso as ativas vêm primeiro.
+        Dentro de cada grupo a ordem é (updated_at desc, id desc), e o cursor guarda
+        a posição da última linha (sem OFFSET). Cada página ordena as atribuições
+        do fiscal lendo só índices e busca as linhas completas apenas da página.
+
+        Com `resumo`, só as colunas da listagem compacta são carregadas e os fiscais
+        atribuídos não são buscados.
+
+        Returns:
+            (fiscalizações da página, cursor da próxima página ou None)
+        """
         usuario = self.usuario_repository.buscar_por_id(usuario_id)
         if not usuario:
             raise ValueError("Usuário não encontrado")
 
         self._verificar_usuario_ativo(usuario)
 
-        # Query através da tabela de associação
-        query = self.db.query(Fiscalizacao).join(UsuarioFiscalizacao).filter(
+        if resumo:
+            query = self.db.query(Fiscalizacao).options(load_only(
+                Fiscalizacao.id,
+                Fiscalizacao.uuid,
+                Fiscalizacao.codigo,
+                Fiscalizacao.denuncia_id,
+                Fiscalizacao.status,
+                Fiscalizacao.updated_at,
+            ))
+        else:
+            query = self._query_com_fiscais()
+
+        # A página é escolhida só com índices: a PK de usuario_fiscalizacao
+        # (usuario_id, fiscalizacao_id) dá as fiscalizações do usuário e
+        # idx_fiscalizacoes_id_status_updated_at traz status e updated_at de cada uma
+        # sem ler a linha (index-only scan); as linhas completas são lidas só para
+        # os ids da página
+        pagina = select(Fiscalizacao.id).join(UsuarioFiscalizacao).where(
             UsuarioFiscalizacao.usuario_id == usuario_id
         )
-        
+
         if status_filter:
-            query = query.filter(Fiscalizacao.status == status_filter)
-        
-        return query.all()
+            pagina = pagina.where(Fiscalizacao.status == status_filter)
+        elif not incluir_encerradas:
+            pagina = pagina.where(Fiscalizacao.status.in_(self.STATUS_ATIVOS))
+
+        grupo = case((Fiscalizacao.status.in_(self.STATUS_ATIVOS), 0), else_=1)
+        ordem = (grupo, Fiscalizacao.updated_at.desc(), Fiscalizacao.id.desc())
+
+        if cursor:
+            ultimo_grupo, ultimo_updated_at, ultimo_id = decodificar_cursor(cursor, 3)
+            try:
+                ultimo_grupo, ultimo_id = int(ultimo_grupo), int(ultimo_id)
+                ultimo_updated_at = datetime.fromisoformat(ultimo_updated_at)
+            except (TypeError, ValueError) as err:
+                raise ValueError("Cursor de paginação inválido") from err
+            pagina = pagina.where(or_(
+                grupo > ultimo_grupo,
+                and_(
+                    grupo == ultimo_grupo,
+                    tuple_(Fiscalizacao.updated_at, Fiscalizacao.id) < tuple_(ultimo_updated_at, ultimo_id),
+                ),
+            ))
+
+        linhas = query.filter(
+            Fiscalizacao.id.in_(pagina.order_by(*ordem).limit(limit + 1))
+        ).order_by(*ordem).all()
+
+        proximo_cursor = None
+        if len(linhas) > limit:
+            linhas = linhas[:limit]
+            ultima = linhas[-1]
+            proximo_cursor = codificar_cursor(
+                0 if ultima.status in self.STATUS_ATIVOS else 1,
+                ultima.updated_at.isoformat(),
+                ultima.id,
+            )
+
+        return linhas, proximo_cursor
 
     def buscar_fiscalizacao(self, fiscalizacao_id: int, usuario_id: int) -> Fiscalizacao:
         """Busca uma fiscalização específica."""
@@ -181,17 +424,62 @@ class FiscalizacaoService:
 
         self._verificar_usuario_ativo(usuario)
 
-        fiscalizacao = self.db.query(Fiscalizacao).filter(Fiscalizacao.id == fiscalizacao_id).first()
+        fiscalizacao = self._query_com_fiscais().filter(Fiscalizacao.id == fiscalizacao_id).first()
         if not fiscalizacao:
             raise ValueError("Fiscalização não encontrada")
 
         # Verificar permissão: fiscal atribuído (qualquer papel) ou admin
-        fiscal_ids = [f.id for f in fiscalizacao.fiscais]
+        fiscal_ids = [uf.usuario_id for uf in fiscalizacao.fiscais_atribuidos]
         if usuario_id not in fiscal_ids and not self._verificar_permissao_admin_fiscal(usuario):
             raise AutorizacaoError("Usuário não tem permissão para visualizar esta fiscalização")
 
         return fiscalizacao
 
+    def listar_historico(
+        self,
+        fiscalizacao_id: int,
+        usuario_id: int,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[HistoricoFiscalizacao], Optional[str]]:
+        """
+        Lista os eventos de uma fiscalização, do mais recente para o mais antigo.
+
+        Returns:
+            (eventos da página, cursor da próxima página ou None)
+        """
+        usuario = self.usuario_repository.buscar_por_id(usuario_id)
+        if not usuario:
+            raise ValueError("Usuário não encontrado")
+
+        self._verificar_usuario_ativo(usuario)
+
+        if not self.db.query(Fiscalizacao.id).filter(Fiscalizacao.id == fiscalizacao_id).first():
+            raise ValueError("Fiscalização não encontrada")
+
+        # Verificar permissão: fiscal atribuído (qualquer papel) ou admin
+        fiscal_ids = {
+            i for (i,) in self.db.query(UsuarioFiscalizacao.usuario_id).filter(
+                UsuarioFiscalizacao.fiscalizacao_id == fiscalizacao_id
+            )
+        }
+        if usuario_id not in fiscal_ids and not self._verificar_permissao_admin_fiscal(usuario):
+            raise AutorizacaoError("Usuário não tem permissão para visualizar esta fiscalização")
+
+        antes_de_id = None
+        if cursor:
+            (antes_de_id,) = decodificar_cursor(cursor, 1)
+            if not isinstance(antes_de_id, int):
+                raise ValueError("Cursor de paginação inválido")
+
+        eventos = self.historico_repository.listar(fiscalizacao_id, limit + 1, antes_de_id)
+        proximo_cursor = None
+        if len(eventos) > limit:
+            eventos = eventos[:limit]
+            proximo_cursor = codificar_cursor(eventos[-1].id)
+
+        return eventos, proximo_cursor
+
     def adicionar_fiscal(
         self,
         fiscalizacao_id: int,
@@ -242,6 +530,12 @@ class FiscalizacaoService:
             papel=papel
         )
         self.db.add(atribuicao)
+        self.historico_repository.registrar(
+            fiscalizacao_id,
+            TipoEventoFiscalizacao.FISCAL_ADICIONADO,
+            usuario_id=usuario_id,
+            dados={'fiscal_id': novo_fiscal_id, 'papel': papel},
+        )
         self.db.commit()
         self.db.refresh(fiscalizacao)
 
@@ -288,6 +582,12 @@ class FiscalizacaoService:
             raise ValueError("Não é possível remover o único fiscal da fiscalização")
 
         self.db.delete(atribuicao)
+        self.historico_repository.registrar(
+            fiscalizacao_id,
+            TipoEventoFiscalizacao.FISCAL_REMOVIDO,
+            usuario_id=usuario_id,
+            dados={'fiscal_id': fiscal_id, 'papel': atribuicao.papel},
+        )
         self.db.commit()
         self.db.refresh(fiscalizacao)
 
@@ -315,13 +615,23 @@ class FiscalizacaoService:
             raise ValueError("Fiscalização não encontrada")
 
         # Verificar permissão: fiscal atribuído (qualquer papel) ou admin
-        fiscal_ids = [f.id for f in fiscalizacao.fiscais]
+        fiscal_ids = [uf.usuario_id for uf in fiscalizacao.fiscais_atribuidos]
         if usuario_id not in fiscal_ids and not self._verificar_permissao_admin_fiscal(usuario):
             raise AutorizacaoError("Usuário não tem permissão para atualizar esta fiscalização")
 
         # Atualizar status da fiscalização
+        status_anterior = fiscalizacao.status
         fiscalizacao.status = novo_status
         self.db.add(fiscalizacao)
+
+        if status_anterior != novo_status:
+            self.historico_repository.registrar(
+                fiscalizacao_id,
+                TipoEventoFiscalizacao.STATUS_ALTERADO,
+                usuario_id=usuario_id,
+                valor_anterior=getattr(status_anterior, 'value', status_anterior),
+                valor_novo=novo_status.value,
+            )
         
         # SINCRONIZAÇÃO: Se a fiscalização foi concluída, concluir a denúncia também
         if novo_status == StatusFiscalizacao.CONCLUIDA:
@@ -0,0 +1,206 @@
+"""Serviço de detecção de hotspots de denúncias para planejamento de sobrevoos"""
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import Float, and_, cast, select
+from sqlalchemy.orm import Session
+
+from src.geobot_plataforma_backend.core.clustering import RUIDO, dbscan_grade
+from src.geobot_plataforma_backend.core.config import settings
+from src.geobot_plataforma_backend.core.geo import projetar_km
+from src.geobot_plataforma_backend.domain.entity.denuncia import Denuncia
+from src.geobot_plataforma_backend.domain.entity.endereco import Endereco
+from src.geobot_plataforma_backend.domain.entity.enums import CategoriaDenuncia, StatusDenuncia
+from src.geobot_plataforma_backend.domain.entity.fiscalizacao import Fiscalizacao
+from src.geobot_plataforma_backend.domain.repository.usuario_repository import UsuarioRepository
+from src.geobot_plataforma_backend.domain.service.fiscalizacao_service import (
+    AutorizacaoError,
+    FiscalizacaoService,
+    verificar_permissao_admin_fiscal,
+)
+
+
+@dataclass
+class Hotspot:
+    """Agrupamento espacial de denúncias candidato a um sobrevoo"""
+    quantidade: int
+    centro_latitude: float
+    centro_longitude: float
+    raio_km: float
+    bbox: List[float]  # [lat_min, lon_min, lat_max, lon_max]
+    denuncia_ids: List[int]
+    fiscalizacao_ids: List[int] = field(default_factory=list)
+    categorias: dict = field(default_factory=dict)
+
+
+@dataclass
+class ResultadoHotspots:
+    """Hotspots encontrados e totais da análise"""
+    hotspots: List[Hotspot]
+    total_denuncias: int
+    total_ruido: int
+    raio_m: float
+    min_denuncias: int
+
+
+def agrupar_hotspots(
+    latitudes: np.ndarray,
+    longitudes: np.ndarray,
+    raio_m: float,
+    min_denuncias: int,
+) -> np.ndarray:
+    """Rótulo DBSCAN (ou RUIDO) de cada coordenada, com `raio_m` em metros"""
+    if len(latitudes) == 0:
+        return np.empty(0, dtype=np.int64)
+    pontos = projetar_km(latitudes, longitudes)
+    return dbscan_grade(pontos, raio_m / 1000.0, min_denuncias)
+
+
+class HotspotService:
+    """Serviço para propor hotspots de denúncias que um único sobrevoo pode cobrir"""
+
+    STATUS_PADRAO = (
+        StatusDenuncia.PENDENTE,
+        StatusDenuncia.EM_ANALISE,
+        StatusDenuncia.EM_FISCALIZACAO,
+    )
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.usuario_repository = UsuarioRepository(db)
+        self.max_ids_por_hotspot = int(settings.get('hotspot_max_ids', 1000))
+
+    def _carregar_pontos(
+        self,
+        categorias: Sequence[CategoriaDenuncia],
+        status: Sequence[StatusDenuncia],
+    ):
+        """
+        Coordenadas das denúncias filtradas, com a fiscalização ativa de cada uma.
+
+        Uma única query; as coordenadas já chegam como float para evitar Decimal.
+        """
+        consulta = (
+            select(
+                Denuncia.id,
+                cast(Endereco.latitude, Float),
+                cast(Endereco.longitude, Float),
+                Denuncia.categoria,
+                Fiscalizacao.id,
+            )
+            .join(Endereco, Endereco.id == Denuncia.endereco_id)
+            .outerjoin(
+                Fiscalizacao,
+                and_(
+                    Fiscalizacao.denuncia_id == Denuncia.id,
+                    Fiscalizacao.status.in_(FiscalizacaoService.STATUS_ATIVOS),
+                ),
+            )
+            .where(
+                Denuncia.status.in_(status),
+                Endereco.latitude.isnot(None),
+                Endereco.longitude.isnot(None),
+            )
+        )
+        if categorias:
+            consulta = consulta.where(Denuncia.categoria.in_(categorias))
+        return self.db.execute(consulta).all()
+
+    def detectar(
+        self,
+        usuario_id: int,
+        raio_m: Optional[float] = None,
+        min_denuncias: Optional[int] = None,
+        categorias: Optional[Sequence[CategoriaDenuncia]] = None,
+        status: Optional[Sequence[StatusDenuncia]] = None,
+        limite: int = 50,
+    ) -> ResultadoHotspots:
+        """
+        Detecta hotspots (clusters DBSCAN) sobre as coordenadas das denúncias.
+
+        Args:
+            usuario_id: ID do usuário solicitante
+            raio_m: Raio de vizinhança em metros (padrão: configuração)
+            min_denuncias: Denúncias mínimas na vizinhança de um núcleo
+            categorias: Filtra por categorias (padrão: todas)
+            status: Filtra por status (padrão: denúncias em aberto)
+            limite: Máximo de hotspots retornados, do maior para o menor
+        """
+        usuario = self.usuario_repository.buscar_por_id(usuario_id)
+        if not usuario:
+            raise ValueError("Usuário não encontrado")
+        if not usuario.ativo:
+            raise AutorizacaoError("Usuário inativo. Entre em contato com o administrador")
+        if not verificar_permissao_admin_fiscal(usuario):
+            raise AutorizacaoError("Apenas administradores e fiscais podem consultar hotspots")
+
+        return self.calcular(raio_m, min_denuncias, categorias, status, limite)
+
+    def calcular(
+        self,
+        raio_m: Optional[float] = None,
+        min_denuncias: Optional[int] = None,
+        categorias: Optional[Sequence[CategoriaDenuncia]] = None,
+        status: Optional[Sequence[StatusDenuncia]] = None,
+        limite: int = 50,
+    ) -> ResultadoHotspots:
+        """Detecção sem checagem de usuário (uso interno e CLI); ver `detectar`"""
+        raio_m = float(raio_m or settings.get('hotspot_raio_m', 150))
+        min_denuncias = int(min_denuncias or settings.get('hotspot_min_denuncias', 5))
+        if raio_m <= 0:
+            raise ValueError("Raio deve ser maior que zero")
+        if min_denuncias < 2:
+            raise ValueError("Mínimo de denúncias deve ser pelo menos 2")
+
+        linhas = self._carregar_pontos(categorias or [], status or self.STATUS_PADRAO)
+        return self.montar_resultado(linhas, raio_m, min_denuncias, limite)
+
+    def montar_resultado(self, linhas, raio_m: float, min_denuncias: int, limite: int) -> ResultadoHotspots:
+        """Agrupa as linhas (id, lat, lon, categoria, fiscalizacao_id) em hotspots"""
+        if not linhas:
+            return ResultadoHotspots([], 0, 0, raio_m, min_denuncias)
+
+        ids = np.fromiter((l[0] for l in linhas), dtype=np.int64, count=len(linhas))
+        lat = np.fromiter((l[1] for l in linhas), dtype=np.float64, count=len(linhas))
+        lon = np.fromiter((l[2] for l in linhas), dtype=np.float64, count=len(linhas))
+        rotulos = agrupar_hotspots(lat, lon, raio_m, min_denuncias)
+
+        agrupados = np.nonzero(rotulos != RUIDO)[0]
+        # Índices ordenados por cluster; cada cluster vira uma fatia contígua
+        ordem = agrupados[np.argsort(rotulos[agrupados], kind='stable')]
+        _, inicios, tamanhos = np.unique(rotulos[ordem], return_index=True, return_counts=True)
+        maiores = np.argsort(-tamanhos, kind='stable')[:limite]
+        pontos_km = projetar_km(lat, lon)
+
+        hotspots = []
+        for c in maiores:
+            membros = ordem[inicios[c]:inicios[c] + tamanhos[c]]
+            centro_km = pontos_km[membros].mean(axis=0)
+            raio_km = float(np.sqrt(((pontos_km[membros] - centro_km) ** 2).sum(axis=1)).max())
+            categorias: dict = {}
+            for i in membros:
+                categoria = linhas[i][3]
+                chave = categoria.value if hasattr(categoria, 'value') else str(categoria)
+                categorias[chave] = categorias.get(chave, 0) + 1
+            hotspots.append(Hotspot(
+                quantidade=int(len(membros)),
+                centro_latitude=round(float(lat[membros].mean()), 7),
+                centro_longitude=round(float(lon[membros].mean()), 7),
+                raio_km=round(raio_km, 3),
+                bbox=[
+                    float(lat[membros].min()), float(lon[membros].min()),
+                    float(lat[membros].max()), float(lon[membros].max()),
+                ],
+                denuncia_ids=ids[membros[:self.max_ids_por_hotspot]].tolist(),
+                fiscalizacao_ids=sorted(linhas[i][4] for i in membros if linhas[i][4] is not None),
+                categorias=categorias,
+            ))
+
+        return ResultadoHotspots(
+            hotspots=hotspots,
+            total_denuncias=len(linhas),
+            total_ruido=int(len(linhas) - len(agrupados)),
+            raio_m=raio_m,
+            min_denuncias=min_denuncias,
+        )
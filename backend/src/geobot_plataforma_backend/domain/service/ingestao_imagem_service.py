@@ -0,0 +1,424 @@
+"""
+Ingestão das imagens da fiscalização após o upload: GPS/altitude (EXIF/XMP),
+hash perceptual contra reenvios, miniaturas, prévias web e pirâmide de tiles
+(deep zoom) geradas em um pool de processos
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from sqlalchemy import Float, bindparam, cast, func, literal, or_, select, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Session
+
+from src.geobot_plataforma_backend.core.arvore_bk import ArvoreBK
+from src.geobot_plataforma_backend.core.config import settings
+from src.geobot_plataforma_backend.core.database import SessionLocal
+from src.geobot_plataforma_backend.core.imagem import processar_imagem
+from src.geobot_plataforma_backend.core.geo import matriz_haversine
+from src.geobot_plataforma_backend.core.piramide import gerar_piramide
+from src.geobot_plataforma_backend.core.storage import StorageBackend, obter_storage_backend
+from src.geobot_plataforma_backend.domain.entity.denuncia import Denuncia
+from src.geobot_plataforma_backend.domain.entity.endereco import Endereco
+from src.geobot_plataforma_backend.domain.entity.etapa_e_resultado import ArquivoFiscalizacao
+from src.geobot_plataforma_backend.domain.entity.fiscalizacao import Fiscalizacao
+
+logger = logging.getLogger(__name__)
+
+TIPOS_IMAGEM = ('image/jpeg', 'image/png', 'image/tiff', 'image/webp')
+VARIANTES = ('miniatura', 'previa')
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _obter_pool() -> ProcessPoolExecutor:
+    """Pool de processos compartilhado (decodificar JPEG de 30 MB é CPU pura)"""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=int(settings.get('ingestao_imagens_processos', 0)) or os.cpu_count() or 1,
+            # spawn: o processo da API tem threads (coalescedor, event loop) e fork não as copia com segurança
+            mp_context=multiprocessing.get_context('spawn'),
+        )
+    return _pool
+
+
+def encerrar_pool_imagens() -> None:
+    """Encerra o pool de processos no desligamento da aplicação"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def chave_derivado(chave_original: str, variante: str) -> str:
+    """Chave do derivado a partir da do original (endereçada por conteúdo, então também estável)"""
+    return f"derivados/{chave_original}/{variante}.jpg"
+
+
+def prefixo_piramide(chave_original: str) -> str:
+    """Prefixo dos tiles da pirâmide: `{prefixo}/{nivel}/{coluna}_{linha}.jpg`"""
+    return f"piramides/{chave_original}"
+
+
+def url_derivado(
+    arquivo: ArquivoFiscalizacao,
+    variante: str,
+    urls_assinadas: Optional[Dict[str, str]] = None,
+) -> Optional[str]:
+    """URL assinada do derivado no storage ou, sem ela, o caminho da API que o serve"""
+    chave = ((arquivo.metadados or {}).get('derivados') or {}).get(variante)
+    if not chave:
+        return None
+    return (urls_assinadas or {}).get(chave) or f"/api/etapas-fiscalizacao/arquivos/{arquivo.id}/{variante}"
+
+
+def url_piramide(arquivo: ArquivoFiscalizacao) -> Optional[str]:
+    """Descritor DZI da pirâmide (OpenSeadragon busca os tiles em `piramide_files/`)"""
+    if 'piramide' not in (arquivo.metadados or {}):
+        return None
+    return f"/api/etapas-fiscalizacao/arquivos/{arquivo.id}/piramide.dzi"
+
+
+async def _ingerir(chaves: List[str]) -> None:
+    try:
+        await IngestaoImagemService().processar(chaves)
+    except Exception:
+        logger.exception("Erro na ingestão de %d imagem(ns)", len(chaves))
+
+
+def agendar_ingestao(background_tasks, chaves: Sequence[str]) -> None:
+    """Agenda a ingestão para depois da resposta do upload (BackgroundTasks do FastAPI)"""
+    chaves = [c for c in dict.fromkeys(chaves) if c]
+    if chaves:
+        background_tasks.add_task(_ingerir, chaves)
+
+
+class IndiceDuplicatas:
+    """
+    dHashes indexados em uma árvore BK para achar quase-duplicatas (mesmo voo
+    reenviado, foto recomprimida) na mesma fiscalização ou em fiscalizações vizinhas.
+    """
+
+    def __init__(self, vizinhas: Dict[int, Set[int]], distancia_maxima: int):
+        self.arvore = ArvoreBK()
+        self.vizinhas = vizinhas
+        self.distancia_maxima = distancia_maxima
+
+    def adicionar(self, hash_hex: str, arquivo_id: int, fiscalizacao_id: int, chave: str) -> None:
+        self.arvore.inserir(int(hash_hex, 16), (arquivo_id, fiscalizacao_id, chave))
+
+    def original_de(self, hash_hex: str, fiscalizacao_id: int, chave: str) -> Optional[int]:
+        """Arquivo mais parecido já indexado de que este é duplicata, se houver"""
+        vizinhas = self.vizinhas.get(fiscalizacao_id, {fiscalizacao_id})
+        for _, (arquivo_id, outra_fiscalizacao, outra_chave) in self.arvore.buscar(
+            int(hash_hex, 16), self.distancia_maxima
+        ):
+            if outra_fiscalizacao not in vizinhas:
+                continue
+            # A mesma chave em outra fiscalização é a replicação do sobrevoo em lote, não um reenvio
+            if outra_chave == chave and outra_fiscalizacao != fiscalizacao_id:
+                continue
+            return arquivo_id
+        return None
+
+
+class IngestaoImagemService:
+    """
+    Processa cada imagem (chave no storage) uma única vez, ainda que ela esteja
+    registrada em várias fiscalizações (sobrevoo em lote), e grava o resultado em
+    `metadados` de todos os arquivos com um UPDATE em lote.
+
+    Quase-duplicatas não ganham prévia nem pirâmide e ficam fora da análise de IA.
+
+    Usa a própria sessão: roda depois que a requisição do upload já respondeu.
+    """
+
+    def __init__(
+        self,
+        fabrica_sessao: Callable[[], Session] = SessionLocal,
+        storage: Optional[StorageBackend] = None,
+        executor=None,
+    ):
+        self.fabrica_sessao = fabrica_sessao
+        self.storage = storage or obter_storage_backend()
+        self.executor = executor
+        lado_miniatura = int(settings.get('ingestao_miniatura_px', 256))
+        lado_previa = int(settings.get('ingestao_previa_px', 1600))
+        self.tamanhos = {
+            'miniatura': (lado_miniatura, lado_miniatura),
+            'previa': (lado_previa, lado_previa),
+        }
+        self.qualidade = int(settings.get('ingestao_qualidade_jpeg', 82))
+        self.piramide_min_pixels = float(settings.get('piramide_min_megapixels', 4)) * 1_000_000
+        self.piramide_tile_px = int(settings.get('piramide_tile_px', 254))
+        self.concorrencia_gravacao = int(settings.get('upload_lote_concorrencia', 8))
+        self.duplicatas_distancia_maxima = int(settings.get('duplicatas_distancia_maxima', 6))
+        self.duplicatas_raio_km = float(settings.get('duplicatas_raio_km', 0.3))
+        self.chunk_bytes = settings.get('upload_chunk_size_kb', 1024) * 1024
+
+    async def _gravar(self, destino: str, conteudo: bytes) -> None:
+        escrita = await self.storage.abrir_escrita(destino, 'image/jpeg')
+        try:
+            await escrita.escrever(conteudo)
+            await escrita.concluir()
+        except BaseException:
+            await escrita.abortar()
+            raise
+
+    async def _gerar_piramide(self, chave: str, caminho: str) -> Dict[str, Any]:
+        """Gera os tiles no pool (em disco, não em memória) e os envia ao storage"""
+        diretorio = tempfile.mkdtemp(prefix="piramide_")
+        try:
+            loop = asyncio.get_running_loop()
+            piramide = await loop.run_in_executor(
+                self.executor or _obter_pool(), gerar_piramide, caminho, diretorio, self.piramide_tile_px,
+            )
+            prefixo = prefixo_piramide(chave)
+            limite = asyncio.Semaphore(self.concorrencia_gravacao)
+
+            async def enviar(relativo: str):
+                async with limite:
+                    with open(os.path.join(diretorio, relativo), "rb") as tile:
+                        conteudo = await asyncio.to_thread(tile.read)
+                    await self._gravar(f"{prefixo}/{relativo}", conteudo)
+
+            await asyncio.gather(*(
+                enviar(f"{nivel}/{nome}")
+                for nivel in os.listdir(diretorio)
+                for nome in os.listdir(os.path.join(diretorio, nivel))
+            ))
+            return {**piramide, 'prefixo': prefixo}
+        finally:
+            shutil.rmtree(diretorio, ignore_errors=True)
+
+    def _fiscalizacoes_vizinhas(self, db: Session, fiscalizacao_ids: Sequence[int]) -> Dict[int, Set[int]]:
+        """Para cada fiscalização, ela própria e as com endereço a até `duplicatas_raio_km`"""
+        vizinhas = {fiscalizacao_id: {fiscalizacao_id} for fiscalizacao_id in fiscalizacao_ids}
+        if self.duplicatas_raio_km <= 0:
+            return vizinhas
+
+        enderecos = (
+            select(Fiscalizacao.id, cast(Endereco.latitude, Float), cast(Endereco.longitude, Float))
+            .join(Denuncia, Denuncia.id == Fiscalizacao.denuncia_id)
+            .join(Endereco, Endereco.id == Denuncia.endereco_id)
+        )
+        origens = [
+            linha for linha in db.execute(enderecos.where(Fiscalizacao.id.in_(list(fiscalizacao_ids)))).all()
+            if linha[1] is not None and linha[2] is not None
+        ]
+        if not origens:
+            return vizinhas
+
+        latitudes = np.array([linha[1] for linha in origens])
+        longitudes = np.array([linha[2] for linha in origens])
+        margem_lat = self.duplicatas_raio_km / 111.32
+        margem_lon = margem_lat / max(np.cos(np.radians(np.abs(latitudes).max())), 0.01)
+        candidatas = db.execute(
+            enderecos.where(
+                # Pré-filtro pelo retângulo envolvente; a distância exata é calculada em NumPy
+                Endereco.latitude.between(latitudes.min() - margem_lat, latitudes.max() + margem_lat),
+                Endereco.longitude.between(longitudes.min() - margem_lon, longitudes.max() + margem_lon),
+            )
+        ).all()
+        if not candidatas:
+            return vizinhas
+
+        proximas = matriz_haversine(
+            latitudes, longitudes, [c[1] for c in candidatas], [c[2] for c in candidatas]
+        ) <= self.duplicatas_raio_km
+        for origem, linha in zip(origens, proximas):
+            vizinhas[origem[0]].update(c[0] for c, perto in zip(candidatas, linha) if perto)
+        return vizinhas
+
+    def _carregar_indice(
+        self,
+        db: Session,
+        fiscalizacao_ids: Sequence[int],
+        ignorar_ids: Sequence[int],
+    ) -> IndiceDuplicatas:
+        """Índice com os hashes já ingeridos nas fiscalizações do lote e nas vizinhas"""
+        vizinhas = self._fiscalizacoes_vizinhas(db, fiscalizacao_ids)
+        indice = IndiceDuplicatas(vizinhas, self.duplicatas_distancia_maxima)
+        tabela = ArquivoFiscalizacao
+        linhas = db.execute(
+            select(tabela.id, tabela.fiscalizacao_id, tabela.url_blob, tabela.metadados['dhash'].astext)
+            .where(
+                tabela.fiscalizacao_id.in_(list(set().union(*vizinhas.values()))),
+                tabela.metadados.has_key('dhash'),
+                # Duplicatas apontam para o original, que já está no índice
+                ~tabela.metadados.has_key('duplicata_de'),
+                tabela.id.notin_(list(ignorar_ids)),
+            )
+        ).all()
+        for arquivo_id, fiscalizacao_id, chave, hash_hex in linhas:
+            indice.adicionar(hash_hex, arquivo_id, fiscalizacao_id, chave)
+        return indice
+
+    async def _processar_chave(
+        self,
+        chave: str,
+        arquivos: List[Tuple[int, int]],
+        indice: IndiceDuplicatas,
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        Baixa o original para um arquivo temporário, processa no pool e grava os derivados.
+
+        Arquivos que são quase-duplicatas de outro já ingerido recebem `duplicata_de`;
+        se todos os que usam a chave forem duplicatas, só a miniatura é gravada.
+
+        Returns:
+            Metadados de cada arquivo (id -> metadados) que referencia a chave
+        """
+        descritor, caminho = tempfile.mkstemp(prefix="ingestao_")
+        try:
+            with os.fdopen(descritor, "wb") as temporario:
+                async for chunk in self.storage.ler(chave, self.chunk_bytes):
+                    await asyncio.to_thread(temporario.write, chunk)
+
+            loop = asyncio.get_running_loop()
+            resultado = await loop.run_in_executor(
+                self.executor or _obter_pool(), processar_imagem, caminho, self.tamanhos, self.qualidade,
+            )
+
+            # Sem await entre a busca e a inserção: chaves processadas em paralelo não se perdem
+            originais = {}
+            for arquivo_id, fiscalizacao_id in arquivos:
+                original = indice.original_de(resultado.metadados['dhash'], fiscalizacao_id, chave)
+                if original is None:
+                    indice.adicionar(resultado.metadados['dhash'], arquivo_id, fiscalizacao_id, chave)
+                else:
+                    originais[arquivo_id] = original
+            duplicada = len(originais) == len(arquivos)
+
+            derivados = {}
+            for variante, conteudo in resultado.derivados.items():
+                if duplicada and variante != 'miniatura':
+                    continue
+                destino = chave_derivado(chave, variante)
+                await self._gravar(destino, conteudo)
+                derivados[variante] = destino
+
+            metadados = {
+                **resultado.metadados,
+                'largura': resultado.largura,
+                'altura': resultado.altura,
+                'derivados': derivados,
+                'ingestao': 'concluida',
+            }
+            # Imagens pequenas já cabem na prévia; a pirâmide só compensa nas grandes
+            if not duplicada and resultado.largura * resultado.altura >= self.piramide_min_pixels:
+                metadados['piramide'] = await self._gerar_piramide(chave, caminho)
+        except Exception as err:
+            logger.warning("Falha na ingestão da imagem %s: %s", chave, err)
+            erro = {'ingestao': 'erro', 'ingestao_erro': str(err)[:500]}
+            return {arquivo_id: erro for arquivo_id, _ in arquivos}
+        finally:
+            os.unlink(caminho)
+
+        return {
+            arquivo_id: {**metadados, 'duplicata_de': originais[arquivo_id]} if arquivo_id in originais else metadados
+            for arquivo_id, _ in arquivos
+        }
+
+    def _carregar_lote(self, chaves: Sequence[str]) -> Tuple[List[Tuple[int, str, int]], Optional[IndiceDuplicatas]]:
+        """Arquivos de imagem que referenciam as chaves e o índice de duplicatas (síncrono, em thread)"""
+        db = self.fabrica_sessao()
+        try:
+            linhas = (
+                db.query(ArquivoFiscalizacao.id, ArquivoFiscalizacao.url_blob, ArquivoFiscalizacao.fiscalizacao_id)
+                .filter(
+                    ArquivoFiscalizacao.url_blob.in_(list(set(chaves))),
+                    ArquivoFiscalizacao.mime_type.in_(TIPOS_IMAGEM),
+                )
+                .all()
+            )
+            if not linhas:
+                return [], None
+            return linhas, self._carregar_indice(db, {l[2] for l in linhas}, [l[0] for l in linhas])
+        finally:
+            db.close()
+
+    def _gravar_metadados(self, parametros: List[Dict[str, Any]]) -> None:
+        """UPDATE em lote dos metadados (síncrono, em thread)"""
+        tabela = ArquivoFiscalizacao.__table__
+        db = self.fabrica_sessao()
+        try:
+            # `||` preserva as chaves já existentes (hash, lote de sobrevoo, upload retomável...)
+            db.execute(
+                update(tabela)
+                .where(tabela.c.id == bindparam('b_id'))
+                .values(metadados=func.coalesce(tabela.c.metadados, literal({}, JSONB)).op('||')(
+                    bindparam('b_metadados', type_=JSONB)
+                )),
+                parametros,
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def processar(self, chaves: Sequence[str]) -> int:
+        """
+        Processa as imagens nas chaves informadas e atualiza os arquivos que as referenciam.
+
+        Roda no event loop da API (BackgroundTasks): o acesso ao banco, síncrono,
+        vai para threads para não travar as demais requisições.
+
+        Returns:
+            Quantidade de arquivos atualizados
+        """
+        linhas, indice = await asyncio.to_thread(self._carregar_lote, chaves)
+        if not linhas:
+            return 0
+
+        arquivos_por_chave: Dict[str, List[Tuple[int, int]]] = {}
+        for arquivo_id, chave, fiscalizacao_id in sorted(linhas):
+            arquivos_por_chave.setdefault(chave, []).append((arquivo_id, fiscalizacao_id))
+
+        # O pool já limita a CPU; o semáforo evita baixar originais demais de uma vez
+        limite = asyncio.Semaphore(int(settings.get('ingestao_imagens_processos', 0)) or os.cpu_count() or 1)
+
+        async def processar_chave(chave: str):
+            async with limite:
+                return await self._processar_chave(chave, arquivos_por_chave[chave], indice)
+
+        resultados: Dict[int, Dict[str, Any]] = {}
+        for por_arquivo in await asyncio.gather(*(processar_chave(c) for c in arquivos_por_chave)):
+            resultados.update(por_arquivo)
+
+        parametros = [
+            {'b_id': arquivo_id, 'b_metadados': metadados}
+            for arquivo_id, metadados in resultados.items()
+        ]
+        await asyncio.to_thread(self._gravar_metadados, parametros)
+        return len(parametros)
+
+    def pendentes(self, limite: int = 500) -> List[str]:
+        """Chaves de imagens ainda não processadas (backfill)"""
+        db = self.fabrica_sessao()
+        try:
+            linhas = (
+                db.query(ArquivoFiscalizacao.url_blob)
+                .filter(
+                    ArquivoFiscalizacao.mime_type.in_(TIPOS_IMAGEM),
+                    or_(
+                        ArquivoFiscalizacao.metadados.is_(None),
+                        ~ArquivoFiscalizacao.metadados.has_key('ingestao'),
+                    ),
+                )
+                .distinct()
+                .limit(limite)
+                .all()
+            )
+        finally:
+            db.close()
+        return [chave for (chave,) in linhas]
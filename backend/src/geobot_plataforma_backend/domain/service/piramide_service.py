@@ -0,0 +1,71 @@
+"""Serviço que serve a pirâmide de tiles (deep zoom) das imagens de drone"""
+from typing import Any, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from src.geobot_plataforma_backend.core.cache import CacheTTL
+from src.geobot_plataforma_backend.core.config import settings
+from src.geobot_plataforma_backend.core.piramide import grade_nivel
+from src.geobot_plataforma_backend.core.storage import StorageBackend, obter_storage_backend
+from src.geobot_plataforma_backend.domain.entity.etapa_e_resultado import ArquivoFiscalizacao
+
+# Tiles e pirâmides são endereçados pelo conteúdo do original: nunca ficam defasados,
+# então o TTL só serve para liberar memória de imagens que ninguém mais está vendo
+_cache_tiles = CacheTTL(
+    tamanho_maximo=int(settings.get('piramide_cache_tiles', 2048)),
+    ttl_segundos=float(settings.get('piramide_cache_ttl_segundos', 3600)),
+)
+_cache_piramides = CacheTTL(
+    tamanho_maximo=1024,
+    ttl_segundos=float(settings.get('piramide_cache_ttl_segundos', 3600)),
+)
+
+
+class PiramideService:
+    """
+    Entrega o descritor DZI e os tiles de uma imagem: ver uma região de uma foto de
+    100 MP busca só os poucos tiles de 256 px visíveis, e os mais acessados (zoom
+    inicial, áreas revisadas por vários fiscais) ficam em um cache LRU do processo.
+    """
+
+    def __init__(self, db: Session, storage: Optional[StorageBackend] = None):
+        self.db = db
+        self.storage = storage or obter_storage_backend()
+
+    def obter_piramide(self, arquivo_id: int) -> Dict[str, Any]:
+        """Metadados da pirâmide gravados na ingestão (largura, altura, níveis, tile...)"""
+        piramide = _cache_piramides.obter(arquivo_id)
+        if piramide is not None:
+            return piramide
+
+        linha = (
+            self.db.query(ArquivoFiscalizacao.metadados)
+            .filter(ArquivoFiscalizacao.id == arquivo_id)
+            .first()
+        )
+        if not linha:
+            raise ValueError(f"Arquivo {arquivo_id} não encontrado")
+        piramide = (linha.metadados or {}).get('piramide')
+        if not piramide:
+            raise ValueError(f"Pirâmide do arquivo {arquivo_id} não encontrada (ingestão pendente ou imagem pequena)")
+        _cache_piramides.definir(arquivo_id, piramide)
+        return piramide
+
+    async def obter_tile(self, arquivo_id: int, nivel: int, coluna: int, linha: int) -> bytes:
+        """JPEG do tile (`nivel` 0 é 1x1 px; o último é a resolução original)"""
+        piramide = self.obter_piramide(arquivo_id)
+        if not 0 <= nivel < piramide['niveis']:
+            raise ValueError(f"Nível {nivel} não encontrado")
+        colunas, linhas = grade_nivel(piramide['largura'], piramide['altura'], nivel, piramide['tamanho_tile'])
+        if not (0 <= coluna < colunas and 0 <= linha < linhas):
+            raise ValueError(f"Tile {coluna}_{linha} não encontrado no nível {nivel}")
+
+        chave = f"{piramide['prefixo']}/{nivel}/{coluna}_{linha}.{piramide['formato']}"
+        conteudo = _cache_tiles.obter(chave)
+        if conteudo is None:
+            try:
+                conteudo = b"".join([chunk async for chunk in self.storage.ler(chave)])
+            except FileNotFoundError as err:
+                raise ValueError(f"Tile {coluna}_{linha} não encontrado no nível {nivel}") from err
+            _cache_tiles.definir(chave, conteudo)
+        return conteudo
@@ -0,0 +1,231 @@
+"""
+Ingestão de progresso de alta frequência (workers de IA) com escrita coalescida
+"""
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import bindparam, func, update
+from sqlalchemy.orm import Session
+
+from src.geobot_plataforma_backend.core.config import settings
+from src.geobot_plataforma_backend.core.database import SessionLocal
+from src.geobot_plataforma_backend.domain.entity.etapa_e_resultado import EtapaFiscalizacao
+from src.geobot_plataforma_backend.domain.service.etapa_fiscalizacao_service import (
+    EtapaFiscalizacaoService,
+    invalidar_progresso,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _EstadoEtapa:
+    """O que o coalescedor sabe de uma etapa"""
+    fiscalizacao_id: int
+    persistido_em: float
+    progresso: Optional[float] = None  # Pendente de gravação
+    resultado: Optional[Dict[str, Any]] = None
+
+
+class CoalescedorProgresso:
+    """
+    Recebe atualizações de progresso a qualquer frequência e grava no banco no
+    máximo uma vez por `intervalo_segundos` por etapa.
+
+    - A primeira atualização de uma etapa (ou a primeira após o intervalo) é gravada
+      na hora, o que também valida que a etapa existe.
+    - 100% e erros são sempre gravados na hora.
+    - As demais ficam em memória (só a última vale) e uma thread de fundo grava todas
+      as pendentes com um único UPDATE em lote por ciclo.
+
+    O estado é por processo; com vários workers cada um coalesce as próprias requisições.
+    """
+
+    def __init__(
+        self,
+        fabrica_sessao: Callable[[], Session] = SessionLocal,
+        intervalo_segundos: float = 2.0,
+    ):
+        self.fabrica_sessao = fabrica_sessao
+        self.intervalo_segundos = intervalo_segundos
+        self._estados: Dict[int, _EstadoEtapa] = {}
+        self._lock = threading.Lock()
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def registrar(
+        self,
+        db: Session,
+        etapa_id: int,
+        progresso_percentual: float,
+        resultado: Optional[Dict[str, Any]] = None,
+        erro: Optional[str] = None,
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Registra uma atualização de progresso.
+
+        Returns:
+            (estado da etapa visto pelo cliente, se foi gravado agora)
+        """
+        progresso = max(0.0, min(float(progresso_percentual), 100.0))
+        agora = time.monotonic()
+        with self._lock:
+            estado = self._estados.get(etapa_id)
+            adiar = (
+                estado is not None
+                and erro is None
+                and progresso < 100.0
+                and agora - estado.persistido_em < self.intervalo_segundos
+            )
+            if adiar:
+                estado.progresso = progresso
+                if resultado:
+                    estado.resultado = resultado
+                resultado_visto = estado.resultado
+        if adiar:
+            self._garantir_thread()
+            return {'id': etapa_id, 'progresso_percentual': progresso, 'resultado': resultado_visto}, False
+
+        service = EtapaFiscalizacaoService(db)
+        with self._lock:
+            # Um resultado pendente não pode se perder ao gravar direto
+            pendente = self._estados.get(etapa_id)
+            if pendente is not None and not resultado:
+                resultado = pendente.resultado
+        etapa = service.atualizar_progresso(etapa_id, progresso, resultado)
+        if erro:
+            etapa = service.registrar_erro(etapa_id, erro)
+        with self._lock:
+            self._estados[etapa_id] = _EstadoEtapa(etapa.fiscalizacao_id, time.monotonic())
+        return {
+            'id': etapa.id,
+            'progresso_percentual': etapa.progresso_percentual,
+            'resultado': etapa.resultado,
+        }, True
+
+    def descarregar(self) -> int:
+        """
+        Grava todas as atualizações pendentes com um UPDATE em lote.
+
+        O UPDATE é monotônico: só avança o progresso gravado, então um valor
+        coalescido não rebaixa uma gravação imediata mais nova (100%, outro
+        processo). Com resultado, o mesmo percentual também grava.
+
+        Returns:
+            Quantidade de etapas gravadas
+        """
+        agora = time.monotonic()
+        with self._lock:
+            pendentes = {
+                etapa_id: (estado.progresso, estado.resultado, estado.fiscalizacao_id)
+                for etapa_id, estado in self._estados.items()
+                if estado.progresso is not None
+            }
+            for etapa_id, estado in list(self._estados.items()):
+                if estado.progresso is not None:
+                    estado.progresso = None
+                    estado.resultado = None
+                    estado.persistido_em = agora
+                elif agora - estado.persistido_em > 30 * self.intervalo_segundos:
+                    del self._estados[etapa_id]  # Etapa ociosa
+        if not pendentes:
+            return 0
+
+        tabela = EtapaFiscalizacao.__table__
+        # Os valores adiados são sempre < 100, então as condições também protegem o 100%
+        do_registro = tabela.c.id == bindparam('b_id')
+        sem_resultado = [
+            {'b_id': etapa_id, 'b_progresso': progresso}
+            for etapa_id, (progresso, resultado, _) in pendentes.items() if not resultado
+        ]
+        com_resultado = [
+            {'b_id': etapa_id, 'b_progresso': progresso, 'b_resultado': resultado}
+            for etapa_id, (progresso, resultado, _) in pendentes.items() if resultado
+        ]
+
+        db = self.fabrica_sessao()
+        try:
+            if sem_resultado:
+                db.execute(
+                    update(tabela)
+                    .where(do_registro, tabela.c.progresso_percentual < bindparam('b_progresso'))
+                    .values(progresso_percentual=bindparam('b_progresso'), updated_at=func.now()),
+                    sem_resultado,
+                )
+            if com_resultado:
+                db.execute(
+                    update(tabela)
+                    .where(do_registro, tabela.c.progresso_percentual <= bindparam('b_progresso'))
+                    .values(
+                        progresso_percentual=bindparam('b_progresso'),
+                        resultado=bindparam('b_resultado', type_=tabela.c.resultado.type),
+                        updated_at=func.now(),
+                    ),
+                    com_resultado,
+                )
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.exception("Falha ao gravar progresso coalescido de %d etapa(s)", len(pendentes))
+            self._devolver(pendentes)
+            return 0
+        finally:
+            db.close()
+
+        invalidar_progresso(*{fiscalizacao_id for _, _, fiscalizacao_id in pendentes.values()})
+        return len(pendentes)
+
+    def _devolver(self, pendentes: Dict[int, Tuple[float, Any, int]]) -> None:
+        """Recoloca na fila o que falhou, sem sobrescrever atualizações mais novas"""
+        with self._lock:
+            for etapa_id, (progresso, resultado, fiscalizacao_id) in pendentes.items():
+                estado = self._estados.setdefault(etapa_id, _EstadoEtapa(fiscalizacao_id, 0.0))
+                if estado.progresso is None:
+                    estado.progresso = progresso
+                    estado.resultado = estado.resultado or resultado
+
+    def _garantir_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._parar.clear()
+            self._thread = threading.Thread(target=self._laco, name="coalescedor-progresso", daemon=True)
+            self._thread.start()
+
+    def _laco(self) -> None:
+        while not self._parar.wait(self.intervalo_segundos):
+            try:
+                self.descarregar()
+            except Exception:  # pragma: no cover - nunca derrubar a thread
+                logger.exception("Erro no ciclo do coalescedor de progresso")
+
+    def encerrar(self) -> None:
+        """Para a thread de fundo e grava o que estiver pendente"""
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.intervalo_segundos * 2)
+        self.descarregar()
+
+
+_coalescedor: Optional[CoalescedorProgresso] = None
+
+
+def obter_coalescedor() -> CoalescedorProgresso:
+    """Coalescedor do processo, com o intervalo de `progresso_intervalo_gravacao_segundos`"""
+    global _coalescedor
+    if _coalescedor is None:
+        _coalescedor = CoalescedorProgresso(
+            intervalo_segundos=float(settings.get('progresso_intervalo_gravacao_segundos', 2.0)),
+        )
+    return _coalescedor
+
+
+def encerrar_coalescedor() -> None:
+    """Grava o progresso pendente no desligamento da aplicação"""
+    if _coalescedor is not None:
+        _coalescedor.encerrar()
@@ -0,0 +1,226 @@
+"""Serviço de roteirização diária dos fiscais"""
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from src.geobot_plataforma_backend.core.config import settings
+from src.geobot_plataforma_backend.core.geo import matriz_haversine
+from src.geobot_plataforma_backend.domain.entity.denuncia import Denuncia
+from src.geobot_plataforma_backend.domain.entity.endereco import Endereco
+from src.geobot_plataforma_backend.domain.entity.fiscalizacao import Fiscalizacao
+from src.geobot_plataforma_backend.domain.entity.usuario_fiscalizacao import UsuarioFiscalizacao
+from src.geobot_plataforma_backend.domain.repository.usuario_repository import UsuarioRepository
+from src.geobot_plataforma_backend.domain.service.fiscalizacao_service import (
+    AutorizacaoError,
+    FiscalizacaoService,
+    verificar_permissao_admin_fiscal,
+)
+
+
+def rota_vizinho_mais_proximo(distancias: np.ndarray, inicio: int = 0) -> np.ndarray:
+    """Ciclo guloso: a partir de `inicio`, sempre visita o nó não visitado mais próximo"""
+    n = distancias.shape[0]
+    visitado = np.zeros(n, dtype=bool)
+    rota = np.empty(n, dtype=np.int64)
+    atual = inicio
+    for posicao in range(n):
+        rota[posicao] = atual
+        visitado[atual] = True
+        if posicao == n - 1:
+            break
+        candidatos = np.where(visitado, np.inf, distancias[atual])
+        atual = int(np.argmin(candidatos))
+    return rota
+
+
+def melhorar_2opt(
+    rota: np.ndarray,
+    distancias: np.ndarray,
+    ciclo: bool = True,
+    max_passadas: int = 100,
+) -> np.ndarray:
+    """
+    Refina a rota com 2-opt mantendo o primeiro nó fixo.
+
+    Para cada aresta (i-1, i), avalia de uma vez (vetorizado) a inversão de todos
+    os trechos rota[i..j] e aplica a melhor; repete até não haver ganho. Com
+    `ciclo=False` a rota é um caminho aberto: inverter o trecho final não cria aresta.
+    """
+    rota = rota.copy()
+    n = len(rota)
+    if n < 4:
+        return rota
+
+    for _ in range(max_passadas):
+        melhorou = False
+        for i in range(1, n - 1):
+            j = np.arange(i + 1, n)
+            a, b = rota[i - 1], rota[i]
+            c, d = rota[j], rota[(j + 1) % n]
+            aresta_saida = distancias[c, d]
+            aresta_nova = distancias[b, d]
+            if not ciclo:
+                # Sem aresta de volta: o último trecho termina na própria parada c
+                aresta_saida = np.where(j == n - 1, 0.0, aresta_saida)
+                aresta_nova = np.where(j == n - 1, 0.0, aresta_nova)
+            ganho = distancias[a, b] + aresta_saida - distancias[a, c] - aresta_nova
+            melhor = int(np.argmax(ganho))
+            if ganho[melhor] > 1e-9:
+                k = j[melhor]
+                rota[i:k + 1] = rota[i:k + 1][::-1]
+                melhorou = True
+        if not melhorou:
+            break
+    return rota
+
+
+def ordenar_visitas(
+    distancias: np.ndarray,
+    com_origem: bool,
+    retornar: bool,
+) -> np.ndarray:
+    """
+    Ordem de visita (índices da matriz) por vizinho mais próximo + 2-opt.
+
+    - Com origem: a rota parte do índice 0 e, se `retornar`, volta a ele.
+    - Sem origem e sem retorno: as duas pontas são livres; resolve-se um ciclo
+      com um nó fictício de distância zero para todos, que ocupa a "emenda".
+
+    Args:
+        distancias: Matriz quadrada simétrica; se `com_origem`, o índice 0 é a origem
+        com_origem: Se o índice 0 é o ponto de partida
+        retornar: Se a rota fecha o ciclo
+    """
+    if com_origem or retornar:
+        rota = rota_vizinho_mais_proximo(distancias, 0)
+        return melhorar_2opt(rota, distancias, ciclo=retornar)
+
+    n = distancias.shape[0]
+    matriz = np.zeros((n + 1, n + 1))
+    matriz[1:, 1:] = distancias
+    rota = melhorar_2opt(rota_vizinho_mais_proximo(matriz, 0), matriz)
+    return rota[1:] - 1
+
+
+def comprimento_rota(rota: np.ndarray, distancias: np.ndarray, ciclo: bool) -> float:
+    """Soma das arestas da rota (com a volta ao início, se `ciclo`)"""
+    total = float(distancias[rota[:-1], rota[1:]].sum())
+    if ciclo and len(rota) > 1:
+        total += float(distancias[rota[-1], rota[0]])
+    return total
+
+
+@dataclass
+class ParadaRota:
+    """Parada da rota diária"""
+    fiscalizacao_id: int
+    codigo: str
+    denuncia_id: int
+    endereco: str
+    latitude: float
+    longitude: float
+    distancia_desde_anterior_km: Optional[float]
+
+
+@dataclass
+class RotaPlanejada:
+    """Rota diária de um fiscal"""
+    fiscal_id: int
+    paradas: List[ParadaRota]
+    distancia_total_km: float
+    retorna_a_origem: bool
+    sem_coordenadas: List[int] = field(default_factory=list)
+
+
+class RotaService:
+    """Serviço para planejar a ordem de visita das fiscalizações ativas de um fiscal"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.usuario_repository = UsuarioRepository(db)
+        self.max_paradas = int(settings.get('rota_max_paradas', 200))
+
+    def planejar(
+        self,
+        usuario_id: int,
+        fiscal_id: Optional[int] = None,
+        origem_latitude: Optional[float] = None,
+        origem_longitude: Optional[float] = None,
+        retornar: bool = False,
+    ) -> RotaPlanejada:
+        """
+        Planeja a rota do fiscal (padrão: o próprio usuário) pelas fiscalizações ativas.
+
+        Sem origem, o ponto de partida também é escolhido pelo algoritmo.
+        """
+        usuario = self.usuario_repository.buscar_por_id(usuario_id)
+        if not usuario:
+            raise ValueError("Usuário não encontrado")
+        if not usuario.ativo:
+            raise AutorizacaoError("Usuário inativo. Entre em contato com o administrador")
+
+        fiscal_id = fiscal_id or usuario_id
+        if fiscal_id != usuario_id and not verificar_permissao_admin_fiscal(usuario):
+            raise AutorizacaoError("Usuário não tem permissão para ver a rota de outro fiscal")
+
+        if (origem_latitude is None) != (origem_longitude is None):
+            raise ValueError("Informe latitude e longitude de origem juntas")
+        com_origem = origem_latitude is not None
+
+        linhas = (
+            self.db.query(
+                Fiscalizacao.id,
+                Fiscalizacao.codigo,
+                Denuncia.id,
+                Endereco.logradouro,
+                Endereco.numero,
+                Endereco.bairro,
+                Endereco.latitude,
+                Endereco.longitude,
+            )
+            .join(UsuarioFiscalizacao, UsuarioFiscalizacao.fiscalizacao_id == Fiscalizacao.id)
+            .join(Denuncia, Denuncia.id == Fiscalizacao.denuncia_id)
+            .join(Endereco, Endereco.id == Denuncia.endereco_id)
+            .filter(
+                UsuarioFiscalizacao.usuario_id == fiscal_id,
+                Fiscalizacao.status.in_(FiscalizacaoService.STATUS_ATIVOS),
+            )
+            .order_by(Fiscalizacao.id)
+            .limit(self.max_paradas)
+            .all()
+        )
+
+        paradas = [l for l in linhas if l.latitude is not None and l.longitude is not None]
+        sem_coordenadas = [l[0] for l in linhas if l.latitude is None or l.longitude is None]
+        if not paradas:
+            return RotaPlanejada(fiscal_id, [], 0.0, retornar, sem_coordenadas)
+
+        lat = np.array([float(p.latitude) for p in paradas])
+        lon = np.array([float(p.longitude) for p in paradas])
+        if com_origem:
+            lat = np.concatenate([[origem_latitude], lat])
+            lon = np.concatenate([[origem_longitude], lon])
+        distancias = matriz_haversine(lat, lon)
+
+        ordem = ordenar_visitas(distancias, com_origem, retornar)
+        total = comprimento_rota(ordem, distancias, ciclo=retornar)
+
+        resultado = []
+        for posicao, no in enumerate(ordem):
+            if com_origem and posicao == 0:
+                continue
+            p = paradas[int(no) - (1 if com_origem else 0)]
+            trecho = float(distancias[ordem[posicao - 1], no]) if posicao > 0 else None
+            resultado.append(ParadaRota(
+                fiscalizacao_id=p[0],
+                codigo=p.codigo,
+                denuncia_id=p[2],
+                endereco=", ".join(str(v) for v in (p.logradouro, p.numero, p.bairro) if v),
+                latitude=float(p.latitude),
+                longitude=float(p.longitude),
+                distancia_desde_anterior_km=round(trecho, 3) if trecho is not None else None,
+            ))
+
+        return RotaPlanejada(fiscal_id, resultado, round(total, 3), retornar, sem_coordenadas)
@@ -0,0 +1,458 @@
+"""Serviço de lotes de sobrevoo: um voo compartilhado por várias fiscalizações"""
+import asyncio
+import mimetypes
+import uuid as uuid_lib
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import Float, cast, func, insert, select, update
+from sqlalchemy.orm import Session, selectinload
+
+from src.geobot_plataforma_backend.core.cobertura import caminho_cobertura, comprimento_caminho
+from src.geobot_plataforma_backend.core.config import settings
+from src.geobot_plataforma_backend.core.geo import desprojetar_km, pontos_em_poligono, projetar_km
+from src.geobot_plataforma_backend.core.storage import StorageBackend, gravar_upload, obter_storage_backend
+from src.geobot_plataforma_backend.domain.entity.denuncia import Denuncia
+from src.geobot_plataforma_backend.domain.entity.endereco import Endereco
+from src.geobot_plataforma_backend.domain.entity.etapa_e_resultado import ArquivoFiscalizacao, EtapaFiscalizacao
+from src.geobot_plataforma_backend.domain.entity.etapa_fiscalizacao_enum import EtapaFiscalizacaoEnum
+from src.geobot_plataforma_backend.domain.entity.fiscalizacao import Fiscalizacao
+from src.geobot_plataforma_backend.domain.entity.historico_fiscalizacao import TipoEventoFiscalizacao
+from src.geobot_plataforma_backend.domain.entity.sobrevoo_lote import (
+    SobrevooLote,
+    SobrevooLoteFiscalizacao,
+    StatusSobrevooLote,
+)
+from src.geobot_plataforma_backend.domain.repository.historico_fiscalizacao_repository import (
+    HistoricoFiscalizacaoRepository,
+)
+from src.geobot_plataforma_backend.domain.repository.usuario_repository import UsuarioRepository
+from src.geobot_plataforma_backend.domain.service.arquivo_service import chave_conteudo
+from src.geobot_plataforma_backend.domain.service.etapa_fiscalizacao_service import invalidar_progresso
+from src.geobot_plataforma_backend.domain.service.fiscalizacao_service import (
+    AutorizacaoError,
+    FiscalizacaoService,
+    verificar_permissao_admin_fiscal,
+)
+
+
+class SobrevooService:
+    """Serviço para planejar um sobrevoo que atende várias fiscalizações de uma vez"""
+
+    # Etapas a partir das quais a fiscalização ainda pode entrar em um lote (SOBREVOO só se não concluída)
+    ETAPAS_ELEGIVEIS = (None, EtapaFiscalizacaoEnum.PENDENTE, EtapaFiscalizacaoEnum.SOBREVOO)
+    TIPO_ARQUIVO = "foto_sobrevoo"
+
+    def __init__(self, db: Session, storage: Optional[StorageBackend] = None):
+        self.db = db
+        self.storage = storage or obter_storage_backend()
+        self.usuario_repository = UsuarioRepository(db)
+        self.historico_repository = HistoricoFiscalizacaoRepository(db)
+        self.largura_faixa_m = float(settings.get('sobrevoo_largura_faixa_m', 80))
+        self.sobreposicao = float(settings.get('sobrevoo_sobreposicao', 0.3))
+        self.max_fiscalizacoes = int(settings.get('sobrevoo_max_fiscalizacoes', 500))
+        self.tamanho_maximo_bytes = settings.get('sobrevoo_max_file_size_mb', 50) * 1024 * 1024
+        self.chunk_bytes = settings.get('upload_chunk_size_kb', 1024) * 1024
+
+    def _verificar_usuario(self, usuario_id: int):
+        usuario = self.usuario_repository.buscar_por_id(usuario_id)
+        if not usuario:
+            raise ValueError("Usuário não encontrado")
+        if not usuario.ativo:
+            raise AutorizacaoError("Usuário inativo. Entre em contato com o administrador")
+        if not verificar_permissao_admin_fiscal(usuario):
+            raise AutorizacaoError("Apenas administradores e fiscais podem gerenciar sobrevoos")
+        return usuario
+
+    @staticmethod
+    def _validar_poligono(poligono: Sequence[Sequence[float]]) -> np.ndarray:
+        vertices = np.asarray(poligono, dtype=np.float64)
+        if vertices.ndim != 2 or vertices.shape[1] != 2 or len(vertices) < 3:
+            raise ValueError("Polígono deve ter ao menos 3 vértices [latitude, longitude]")
+        if (np.abs(vertices[:, 0]) > 90).any() or (np.abs(vertices[:, 1]) > 180).any():
+            raise ValueError("Polígono com coordenadas fora do intervalo válido")
+        return vertices
+
+    @staticmethod
+    def plano_de_voo(vertices: np.ndarray, largura_faixa_m: float, sobreposicao: float) -> Tuple[List[List[float]], float]:
+        """
+        Waypoints [lat, lon] do zigue-zague que cobre o polígono e a distância em km.
+
+        O espaçamento entre faixas é a largura coberta pela câmera descontada a sobreposição.
+        """
+        lat_referencia = float(vertices[:, 0].mean())
+        poligono_km = projetar_km(vertices[:, 0], vertices[:, 1], lat_referencia)
+        espacamento_km = largura_faixa_m * (1.0 - sobreposicao) / 1000.0
+        caminho = caminho_cobertura(poligono_km, espacamento_km)
+        lat, lon = desprojetar_km(caminho, lat_referencia)
+        waypoints = [[round(float(a), 7), round(float(b), 7)] for a, b in zip(lat, lon)]
+        return waypoints, round(comprimento_caminho(caminho), 3)
+
+    def _etapas_atuais(self, fiscalizacao_ids: Sequence[int]) -> Dict[int, EtapaFiscalizacao]:
+        """Etapa mais recente de cada fiscalização em uma única query"""
+        if not fiscalizacao_ids:
+            return {}
+        ultimas = (
+            select(func.max(EtapaFiscalizacao.id))
+            .where(EtapaFiscalizacao.fiscalizacao_id.in_(fiscalizacao_ids))
+            .group_by(EtapaFiscalizacao.fiscalizacao_id)
+        )
+        etapas = self.db.query(EtapaFiscalizacao).filter(EtapaFiscalizacao.id.in_(ultimas)).all()
+        return {e.fiscalizacao_id: e for e in etapas}
+
+    def _fiscalizacoes_no_poligono(
+        self,
+        vertices: np.ndarray,
+        fiscalizacao_ids: Optional[Sequence[int]],
+    ) -> List[int]:
+        """Fiscalizações ativas cujo endereço cai dentro do polígono"""
+        lat_min, lon_min = vertices.min(axis=0)
+        lat_max, lon_max = vertices.max(axis=0)
+        consulta = (
+            select(Fiscalizacao.id, cast(Endereco.latitude, Float), cast(Endereco.longitude, Float))
+            .join(Denuncia, Denuncia.id == Fiscalizacao.denuncia_id)
+            .join(Endereco, Endereco.id == Denuncia.endereco_id)
+            .where(
+                Fiscalizacao.status.in_(FiscalizacaoService.STATUS_ATIVOS),
+                # Pré-filtro pelo retângulo envolvente; o teste exato é feito em NumPy
+                Endereco.latitude.between(lat_min, lat_max),
+                Endereco.longitude.between(lon_min, lon_max),
+            )
+            .order_by(Fiscalizacao.id)
+        )
+        if fiscalizacao_ids:
+            consulta = consulta.where(Fiscalizacao.id.in_(fiscalizacao_ids))
+        linhas = self.db.execute(consulta).all()
+        if not linhas:
+            return []
+
+        dentro = pontos_em_poligono([l[1] for l in linhas], [l[2] for l in linhas], vertices)
+        return [l[0] for l, ok in zip(linhas, dentro) if ok]
+
+    def _elegivel(self, etapa: Optional[EtapaFiscalizacao]) -> bool:
+        if etapa is None:
+            return True
+        if etapa.etapa == EtapaFiscalizacaoEnum.SOBREVOO:
+            return etapa.concluida_em is None
+        return etapa.etapa in self.ETAPAS_ELEGIVEIS
+
+    def _travar_fiscalizacoes(self, fiscalizacao_ids: Sequence[int]) -> None:
+        """
+        SELECT ... FOR UPDATE nas fiscalizações, em ordem de id: dois planejamentos
+        concorrentes sobre as mesmas fiscalizações são serializados, e o segundo só
+        verifica os lotes abertos depois que o primeiro confirmou o seu
+        """
+        if fiscalizacao_ids:
+            self.db.execute(
+                select(Fiscalizacao.id)
+                .where(Fiscalizacao.id.in_(fiscalizacao_ids))
+                .order_by(Fiscalizacao.id)
+                .with_for_update()
+            )
+
+    def _em_lote_aberto(self, fiscalizacao_ids: Sequence[int]) -> set:
+        """Fiscalizações que já pertencem a um lote planejado ou em abastecimento"""
+        if not fiscalizacao_ids:
+            return set()
+        linhas = self.db.execute(
+            select(SobrevooLoteFiscalizacao.fiscalizacao_id)
+            .join(SobrevooLote, SobrevooLote.id == SobrevooLoteFiscalizacao.lote_id)
+            .where(
+                SobrevooLoteFiscalizacao.fiscalizacao_id.in_(fiscalizacao_ids),
+                SobrevooLote.status.in_([StatusSobrevooLote.PLANEJADO.value, StatusSobrevooLote.ABASTECIMENTO.value]),
+            )
+        ).all()
+        return {l[0] for l in linhas}
+
+    def obter_lote(self, lote_id: int, travar: bool = False) -> SobrevooLote:
+        """Carrega o lote; com `travar`, a linha fica bloqueada (FOR UPDATE) até o fim da transação"""
+        query = (
+            self.db.query(SobrevooLote)
+            .options(selectinload(SobrevooLote.fiscalizacoes))
+            .filter(SobrevooLote.id == lote_id)
+        )
+        if travar:
+            query = query.with_for_update()
+        lote = query.first()
+        if not lote:
+            raise ValueError(f"Lote de sobrevoo {lote_id} não encontrado")
+        return lote
+
+    def planejar_lote(
+        self,
+        usuario_id: int,
+        poligono: Sequence[Sequence[float]],
+        fiscalizacao_ids: Optional[Sequence[int]] = None,
+        largura_faixa_m: Optional[float] = None,
+        sobreposicao: Optional[float] = None,
+        observacoes: Optional[str] = None,
+    ) -> Tuple[SobrevooLote, List[int]]:
+        """
+        Cria um lote com todas as fiscalizações ativas dentro do polígono.
+
+        Fiscalizações sem etapa ou ainda PENDENTE ganham a etapa SOBREVOO apontando
+        para o lote (a PENDENTE é concluída); as que já passaram do sobrevoo ou estão
+        em outro lote aberto ficam de fora. As fiscalizações ficam travadas até o
+        commit, então nenhuma entra em dois lotes abertos.
+
+        Returns:
+            (lote, ids de fiscalizações no polígono que foram ignoradas)
+        """
+        self._verificar_usuario(usuario_id)
+        vertices = self._validar_poligono(poligono)
+        largura_faixa_m = float(largura_faixa_m or self.largura_faixa_m)
+        sobreposicao = self.sobreposicao if sobreposicao is None else float(sobreposicao)
+        if largura_faixa_m <= 0:
+            raise ValueError("Largura da faixa deve ser maior que zero")
+        if not 0 <= sobreposicao < 1:
+            raise ValueError("Sobreposição deve estar entre 0 e 1")
+
+        candidatas = self._fiscalizacoes_no_poligono(vertices, fiscalizacao_ids)
+        waypoints, distancia_km = self.plano_de_voo(vertices, largura_faixa_m, sobreposicao)
+
+        try:
+            self._travar_fiscalizacoes(candidatas)
+            etapas = self._etapas_atuais(candidatas)
+            em_lote = self._em_lote_aberto(candidatas)
+            cobertas = [fid for fid in candidatas if fid not in em_lote and self._elegivel(etapas.get(fid))]
+            ignoradas = sorted(set(candidatas) - set(cobertas))
+            if not cobertas:
+                raise ValueError("Nenhuma fiscalização elegível dentro do polígono")
+            if len(cobertas) > self.max_fiscalizacoes:
+                raise ValueError(f"Polígono cobre {len(cobertas)} fiscalizações (máximo {self.max_fiscalizacoes})")
+
+            lote = SobrevooLote(
+                codigo=f"SBV-{uuid_lib.uuid4().hex[:8].upper()}",
+                usuario_id=usuario_id,
+                status=StatusSobrevooLote.PLANEJADO.value,
+                poligono=vertices.tolist(),
+                plano_voo={
+                    'waypoints': waypoints,
+                    'espacamento_m': round(largura_faixa_m * (1 - sobreposicao), 2),
+                },
+                largura_faixa_m=largura_faixa_m,
+                sobreposicao=sobreposicao,
+                distancia_km=distancia_km,
+                observacoes=observacoes,
+            )
+            self.db.add(lote)
+            self.db.flush()
+
+            self.db.execute(
+                insert(SobrevooLoteFiscalizacao),
+                [{'lote_id': lote.id, 'fiscalizacao_id': fid} for fid in cobertas],
+            )
+
+            dados_etapa = {'sobrevoo_lote_id': lote.id, 'sobrevoo_lote_codigo': lote.codigo}
+            sem_etapa = [fid for fid in cobertas if fid not in etapas]
+            pendentes = [
+                etapas[fid] for fid in cobertas
+                if fid in etapas and etapas[fid].etapa == EtapaFiscalizacaoEnum.PENDENTE
+            ]
+            if pendentes:
+                self.db.execute(
+                    update(EtapaFiscalizacao)
+                    .where(EtapaFiscalizacao.id.in_([e.id for e in pendentes]))
+                    .values(concluida_em=datetime.now(timezone.utc), progresso_percentual=100.0)
+                    .execution_options(synchronize_session=False)
+                )
+            abrir_sobrevoo = sem_etapa + [e.fiscalizacao_id for e in pendentes]
+            if abrir_sobrevoo:
+                self.db.execute(insert(EtapaFiscalizacao), [
+                    {
+                        'uuid': uuid_lib.uuid4(),
+                        'fiscalizacao_id': fid,
+                        'etapa': EtapaFiscalizacaoEnum.SOBREVOO,
+                        'dados': dados_etapa,
+                        'progresso_percentual': 0.0,
+                    }
+                    for fid in abrir_sobrevoo
+                ])
+            self.historico_repository.registrar_muitos([
+                self.historico_repository.linha(
+                    fid,
+                    TipoEventoFiscalizacao.ETAPA_INICIADA,
+                    usuario_id=usuario_id,
+                    valor_novo=EtapaFiscalizacaoEnum.SOBREVOO.value,
+                    dados=dados_etapa,
+                )
+                for fid in sem_etapa
+            ] + [
+                self.historico_repository.linha(
+                    e.fiscalizacao_id,
+                    TipoEventoFiscalizacao.ETAPA_TRANSICIONADA,
+                    usuario_id=usuario_id,
+                    valor_anterior=EtapaFiscalizacaoEnum.PENDENTE.value,
+                    valor_novo=EtapaFiscalizacaoEnum.SOBREVOO.value,
+                    dados=dados_etapa,
+                )
+                for e in pendentes
+            ])
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        invalidar_progresso(*abrir_sobrevoo)
+
+        return self.obter_lote(lote.id), ignoradas
+
+    def concluir_voo(self, lote_id: int, usuario_id: int) -> SobrevooLote:
+        """
+        Encerra o voo: a etapa SOBREVOO de cada fiscalização coberta é concluída e a
+        etapa ABASTECIMENTO é aberta, tudo em uma transação e com inserts em lote.
+
+        O lote fica travado desde a leitura do status: duas conclusões simultâneas
+        não abrem o ABASTECIMENTO duas vezes (a segunda vê o lote já concluído).
+        """
+        self._verificar_usuario(usuario_id)
+        lote = self.obter_lote(lote_id, travar=True)
+        if lote.status != StatusSobrevooLote.PLANEJADO.value:
+            self.db.rollback()
+            raise ValueError(f"Lote de sobrevoo está '{lote.status}' e não pode ter o voo concluído")
+
+        etapas = self._etapas_atuais(lote.fiscalizacao_ids)
+        em_sobrevoo = [
+            e for e in etapas.values()
+            if e.etapa == EtapaFiscalizacaoEnum.SOBREVOO and e.concluida_em is None
+        ]
+        agora = datetime.now(timezone.utc)
+        dados_etapa = {'sobrevoo_lote_id': lote.id, 'sobrevoo_lote_codigo': lote.codigo}
+
+        try:
+            if em_sobrevoo:
+                self.db.execute(
+                    update(EtapaFiscalizacao)
+                    .where(EtapaFiscalizacao.id.in_([e.id for e in em_sobrevoo]))
+                    .values(concluida_em=agora, progresso_percentual=100.0)
+                    .execution_options(synchronize_session=False)
+                )
+                self.db.execute(insert(EtapaFiscalizacao), [
+                    {
+                        'uuid': uuid_lib.uuid4(),
+                        'fiscalizacao_id': e.fiscalizacao_id,
+                        'etapa': EtapaFiscalizacaoEnum.ABASTECIMENTO,
+                        'dados': dados_etapa,
+                        'progresso_percentual': 0.0,
+                    }
+                    for e in em_sobrevoo
+                ])
+                self.historico_repository.registrar_muitos([
+                    self.historico_repository.linha(
+                        e.fiscalizacao_id,
+                        TipoEventoFiscalizacao.ETAPA_TRANSICIONADA,
+                        usuario_id=usuario_id,
+                        valor_anterior=EtapaFiscalizacaoEnum.SOBREVOO.value,
+                        valor_novo=EtapaFiscalizacaoEnum.ABASTECIMENTO.value,
+                        dados=dados_etapa,
+                    )
+                    for e in em_sobrevoo
+                ])
+            lote.status = StatusSobrevooLote.ABASTECIMENTO.value
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        invalidar_progresso(*(e.fiscalizacao_id for e in em_sobrevoo))
+
+        self.db.refresh(lote)
+        return lote
+
+    def _destinos_da_imagem(self, lote_id: int, usuario_id: int) -> List[EtapaFiscalizacao]:
+        """Etapas ABASTECIMENTO abertas do lote que recebem a imagem"""
+        self._verificar_usuario(usuario_id)
+        lote = self.obter_lote(lote_id)
+        if lote.status != StatusSobrevooLote.ABASTECIMENTO.value:
+            raise ValueError("Lote de sobrevoo não está recebendo imagens (conclua o voo primeiro)")
+
+        etapas = self._etapas_atuais(lote.fiscalizacao_ids)
+        destinos = [
+            e for e in etapas.values()
+            if e.etapa == EtapaFiscalizacaoEnum.ABASTECIMENTO and e.concluida_em is None
+        ]
+        if not destinos:
+            raise ValueError("Nenhuma fiscalização do lote está na etapa de abastecimento")
+        return destinos
+
+    def _registrar_arquivos(
+        self,
+        destinos: List[EtapaFiscalizacao],
+        nome_arquivo: str,
+        chave: str,
+        tamanho_bytes: int,
+        tipo_mime: str,
+        metadados: Dict[str, Any],
+    ) -> None:
+        """Registra a mesma chave em cada etapa de destino, com um INSERT em lote"""
+        try:
+            self.db.execute(insert(ArquivoFiscalizacao), [
+                {
+                    'uuid': uuid_lib.uuid4(),
+                    'fiscalizacao_id': e.fiscalizacao_id,
+                    'etapa_id': e.id,
+                    'tipo': self.TIPO_ARQUIVO,
+                    'nome_original': nome_arquivo[:255],
+                    'url_blob': chave,
+                    'tamanho_bytes': tamanho_bytes,
+                    'mime_type': tipo_mime,
+                    'metadados': metadados,
+                }
+                for e in destinos
+            ])
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        invalidar_progresso(*(e.fiscalizacao_id for e in destinos))
+
+    async def registrar_imagem(
+        self,
+        lote_id: int,
+        usuario_id: int,
+        upload,
+        nome_arquivo: str,
+        tipo_mime: Optional[str] = None,
+        metadados: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[str, int, List[int]]:
+        """
+        Grava a imagem uma única vez (chave endereçada por conteúdo) e a registra na
+        etapa ABASTECIMENTO de cada fiscalização coberta pelo lote.
+
+        Chamado de uma rota assíncrona: o acesso ao banco (síncrono) roda no
+        threadpool, só o streaming para o storage fica no event loop.
+
+        Returns:
+            (chave no storage, tamanho em bytes, ids das fiscalizações que receberam a imagem)
+        """
+        destinos = await asyncio.to_thread(self._destinos_da_imagem, lote_id, usuario_id)
+
+        tipo_mime = tipo_mime or mimetypes.guess_type(nome_arquivo)[0] or "application/octet-stream"
+        chave_temporaria = f"tmp/{uuid_lib.uuid4().hex}"
+        resultado = await gravar_upload(
+            self.storage,
+            upload,
+            chave_temporaria,
+            tipo_mime=tipo_mime,
+            tamanho_maximo_bytes=self.tamanho_maximo_bytes,
+            chunk_bytes=self.chunk_bytes,
+        )
+        chave = chave_conteudo(resultado.hash_sha256)
+        try:
+            if await self.storage.existe(chave):
+                await self.storage.deletar(chave_temporaria)
+            else:
+                await self.storage.mover(chave_temporaria, chave)
+        except Exception:
+            await self.storage.deletar(chave_temporaria)
+            raise
+
+        metadados = {
+            **(metadados or {}),
+            'sobrevoo_lote_id': lote_id,
+            'hash_sha256': resultado.hash_sha256,
+        }
+        await asyncio.to_thread(
+            self._registrar_arquivos, destinos, nome_arquivo, chave, resultado.tamanho_bytes, tipo_mime, metadados,
+        )
+
+        return chave, resultado.tamanho_bytes, sorted(e.fiscalizacao_id for e in destinos)
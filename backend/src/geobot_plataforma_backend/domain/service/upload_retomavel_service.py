@@ -0,0 +1,265 @@
+"""Serviço de uploads retomáveis (estilo tus) para mídias grandes de drone"""
+import base64
+import hashlib
+import mimetypes
+import uuid as uuid_lib
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterable, Optional
+
+from sqlalchemy import String, cast, func, update
+from sqlalchemy.orm import Session
+
+from src.geobot_plataforma_backend.core.config import settings
+from src.geobot_plataforma_backend.core.storage import StorageBackend, obter_storage_backend
+from src.geobot_plataforma_backend.domain.entity.etapa_e_resultado import ArquivoFiscalizacao, EtapaFiscalizacao
+from src.geobot_plataforma_backend.domain.entity.upload_retomavel import StatusUploadRetomavel, UploadRetomavel
+from src.geobot_plataforma_backend.domain.repository.usuario_repository import UsuarioRepository
+from src.geobot_plataforma_backend.domain.service.etapa_fiscalizacao_service import EtapaFiscalizacaoService
+from src.geobot_plataforma_backend.domain.service.fiscalizacao_service import (
+    AutorizacaoError,
+    verificar_permissao_admin_fiscal,
+)
+
+
+def id_bloco(offset: int) -> str:
+    """
+    Bloco de uma tentativa de envio da parte que começa em `offset`
+
+    Cada tentativa grava um bloco próprio (duas requisições para o mesmo offset
+    nunca sobrescrevem o bloco uma da outra); só o da tentativa que avançou o
+    offset entra em `blocos` e é confirmado. Tamanho fixo, como o Azure exige.
+    """
+    return f"{offset:016d}-{uuid_lib.uuid4().hex}"
+
+
+class UploadRetomavelService:
+    """
+    Uploads em partes: o cliente cria o upload, envia partes (PATCH) a partir do
+    offset confirmado e, se a conexão cair, consulta o offset (HEAD) e reenvia só
+    o que falta. O estado fica no banco, então qualquer worker atende qualquer parte.
+    """
+
+    # Limite de blocos não confirmados por blob no Azure
+    MAX_BLOCOS = 50_000
+
+    def __init__(self, db: Session, storage: Optional[StorageBackend] = None):
+        self.db = db
+        self.storage = storage or obter_storage_backend()
+        self.usuario_repository = UsuarioRepository(db)
+        self.tamanho_maximo_bytes = settings.get('upload_retomavel_max_mb', 10240) * 1024 * 1024
+        self.tamanho_maximo_parte_bytes = settings.get('upload_retomavel_parte_max_mb', 16) * 1024 * 1024
+        self.validade = timedelta(hours=float(settings.get('upload_retomavel_validade_horas', 24)))
+
+    def _verificar_usuario(self, usuario_id: int):
+        usuario = self.usuario_repository.buscar_por_id(usuario_id)
+        if not usuario:
+            raise ValueError("Usuário não encontrado")
+        if not usuario.ativo:
+            raise AutorizacaoError("Usuário inativo. Entre em contato com o administrador")
+        return usuario
+
+    def criar(
+        self,
+        usuario_id: int,
+        fiscalizacao_id: int,
+        etapa_id: int,
+        tipo: str,
+        nome_arquivo: str,
+        tamanho_bytes: int,
+        tipo_mime: Optional[str] = None,
+    ) -> UploadRetomavel:
+        """Abre um upload retomável de `tamanho_bytes` para a etapa da fiscalização"""
+        usuario = self._verificar_usuario(usuario_id)
+        if not verificar_permissao_admin_fiscal(usuario):
+            raise AutorizacaoError("Usuário não tem permissão para enviar arquivos")
+
+        etapa = self.db.query(EtapaFiscalizacao).filter(EtapaFiscalizacao.id == etapa_id).first()
+        if not etapa or etapa.fiscalizacao_id != fiscalizacao_id:
+            raise ValueError(f"Etapa {etapa_id} não encontrada na fiscalização {fiscalizacao_id}")
+        if tamanho_bytes <= 0:
+            raise ValueError("Arquivo vazio")
+        if tamanho_bytes > self.tamanho_maximo_bytes:
+            raise ValueError(
+                f"Arquivo excede o tamanho máximo de {self.tamanho_maximo_bytes // (1024 * 1024)} MB"
+            )
+
+        identificador = uuid_lib.uuid4()
+        upload = UploadRetomavel(
+            uuid=identificador,
+            usuario_id=usuario_id,
+            fiscalizacao_id=fiscalizacao_id,
+            etapa_id=etapa_id,
+            tipo=tipo,
+            nome_original=nome_arquivo[:255],
+            mime_type=tipo_mime or mimetypes.guess_type(nome_arquivo)[0] or "application/octet-stream",
+            tamanho_bytes=tamanho_bytes,
+            recebido_bytes=0,
+            blocos=[],
+            chave_storage=f"retomaveis/{identificador.hex}",
+            status=StatusUploadRetomavel.EM_ANDAMENTO.value,
+            expira_em=datetime.now(timezone.utc) + self.validade,
+        )
+        self.db.add(upload)
+        self.db.commit()
+        self.db.refresh(upload)
+        return upload
+
+    def obter(self, upload_uuid, usuario_id: int) -> UploadRetomavel:
+        """Carrega o upload verificando que pertence ao usuário: só quem o criou envia, consulta ou cancela"""
+        self._verificar_usuario(usuario_id)
+        upload = self.db.query(UploadRetomavel).filter(UploadRetomavel.uuid == upload_uuid).first()
+        if not upload:
+            raise ValueError("Upload não encontrado")
+        if upload.usuario_id != usuario_id:
+            raise AutorizacaoError("Usuário não tem permissão para acessar este upload")
+        return upload
+
+    async def _ler_parte(self, fluxo: AsyncIterable[bytes], restante: int, vazia: bool = False) -> bytes:
+        """Lê o corpo da parte limitado ao tamanho máximo de parte e ao que falta do arquivo"""
+        limite = min(self.tamanho_maximo_parte_bytes, restante)
+        dados = bytearray()
+        async for chunk in fluxo:
+            dados.extend(chunk)
+            if len(dados) > limite:
+                if limite == restante:
+                    raise ValueError("Parte excede o tamanho declarado do arquivo")
+                raise ValueError(
+                    f"Parte excede o tamanho máximo de {self.tamanho_maximo_parte_bytes // (1024 * 1024)} MB"
+                )
+        if not dados and not vazia:
+            raise ValueError("Parte vazia")
+        return bytes(dados)
+
+    async def receber_parte(
+        self,
+        upload_uuid,
+        usuario_id: int,
+        offset: int,
+        fluxo: AsyncIterable[bytes],
+        checksum_sha256: Optional[str] = None,
+    ) -> UploadRetomavel:
+        """
+        Grava uma parte começando em `offset`, que precisa ser igual ao já recebido.
+
+        A parte vira um bloco no storage e o offset avança com um UPDATE condicional
+        (`recebido_bytes = offset`), então duas requisições concorrentes para o mesmo
+        offset não avançam o upload duas vezes. Ao receber a última parte, os blocos
+        são confirmados e o arquivo é registrado na etapa.
+
+        Se a conclusão falhar depois da última parte, uma parte vazia em
+        `offset == tamanho` conclui o upload de novo.
+
+        Args:
+            checksum_sha256: SHA-256 da parte em base64 (`Upload-Checksum`), opcional
+        """
+        upload = self.obter(upload_uuid, usuario_id)
+        if upload.concluido:
+            raise ValueError("Upload já concluído")
+        if offset == upload.recebido_bytes == upload.tamanho_bytes:
+            await self._ler_parte(fluxo, 0, vazia=True)
+            await self._concluir(upload)
+            return upload
+        if offset != upload.recebido_bytes:
+            raise ValueError(f"Offset {offset} não confere com o recebido ({upload.recebido_bytes})")
+        if len(upload.blocos) >= self.MAX_BLOCOS:
+            raise ValueError("Upload excede o limite de partes; envie partes maiores")
+
+        dados = await self._ler_parte(fluxo, upload.tamanho_bytes - offset)
+        if checksum_sha256 is not None:
+            if base64.b64encode(hashlib.sha256(dados).digest()).decode("ascii") != checksum_sha256:
+                raise ValueError("Checksum da parte não confere")
+
+        bloco = id_bloco(offset)
+        await self.storage.gravar_bloco(upload.chave_storage, bloco, dados)
+
+        recebido = offset + len(dados)
+        avancou = self.db.execute(
+            update(UploadRetomavel)
+            .where(
+                UploadRetomavel.id == upload.id,
+                UploadRetomavel.recebido_bytes == offset,
+                UploadRetomavel.status == StatusUploadRetomavel.EM_ANDAMENTO.value,
+            )
+            .values(
+                recebido_bytes=recebido,
+                blocos=UploadRetomavel.blocos.op('||')(func.jsonb_build_array(cast(bloco, String))),
+                expira_em=datetime.now(timezone.utc) + self.validade,
+                updated_at=func.now(),
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        self.db.commit()
+        if not avancou:
+            self.db.refresh(upload)
+            raise ValueError(f"Offset {offset} não confere com o recebido ({upload.recebido_bytes})")
+
+        self.db.refresh(upload)
+        if upload.recebido_bytes == upload.tamanho_bytes:
+            await self._concluir(upload)
+        return upload
+
+    async def _concluir(self, upload: UploadRetomavel) -> None:
+        """
+        Confirma os blocos, registra o arquivo e marca o upload como concluído
+
+        Idempotente: cada passo já feito por uma tentativa anterior interrompida
+        (blob confirmado, arquivo registrado) é reaproveitado em vez de repetido.
+        """
+        if not await self.storage.existe(upload.chave_storage):
+            await self.storage.confirmar_blocos(upload.chave_storage, list(upload.blocos), upload.mime_type)
+        arquivo = (
+            self.db.query(ArquivoFiscalizacao)
+            .filter(
+                ArquivoFiscalizacao.fiscalizacao_id == upload.fiscalizacao_id,
+                ArquivoFiscalizacao.url_blob == upload.chave_storage,
+            )
+            .first()
+        )
+        if arquivo is None:
+            arquivo = EtapaFiscalizacaoService(self.db, storage=self.storage).registrar_arquivo(
+                fiscalizacao_id=upload.fiscalizacao_id,
+                etapa_id=upload.etapa_id,
+                tipo=upload.tipo,
+                nome_original=upload.nome_original,
+                url_blob=upload.chave_storage,
+                tamanho_bytes=upload.tamanho_bytes,
+                mime_type=upload.mime_type,
+                metadados={'upload_retomavel': str(upload.uuid)},
+            )
+        upload.status = StatusUploadRetomavel.CONCLUIDO.value
+        upload.arquivo_id = arquivo.id
+        upload.blocos = []
+        self.db.commit()
+        self.db.refresh(upload)
+
+    async def cancelar(self, upload_uuid, usuario_id: int) -> None:
+        """Cancela um upload em andamento e descarta as partes já gravadas"""
+        upload = self.obter(upload_uuid, usuario_id)
+        if upload.concluido:
+            raise ValueError("Upload já concluído")
+        await self.storage.descartar_blocos(upload.chave_storage, list(upload.blocos))
+        self.db.delete(upload)
+        self.db.commit()
+
+    async def coletar_abandonados(self, limite: int = 500) -> int:
+        """
+        Remove uploads em andamento cuja validade expirou (cada parte recebida a renova).
+
+        Returns:
+            Quantidade de uploads removidos
+        """
+        abandonados = (
+            self.db.query(UploadRetomavel)
+            .filter(
+                UploadRetomavel.status == StatusUploadRetomavel.EM_ANDAMENTO.value,
+                UploadRetomavel.expira_em < datetime.now(timezone.utc),
+            )
+            .order_by(UploadRetomavel.expira_em)
+            .limit(limite)
+            .all()
+        )
+        for upload in abandonados:
+            await self.storage.descartar_blocos(upload.chave_storage, list(upload.blocos))
+            self.db.delete(upload)
+        self.db.commit()
+        return len(abandonados)
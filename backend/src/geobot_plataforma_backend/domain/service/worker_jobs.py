@@ -0,0 +1,238 @@
+"""
+Worker da fila de jobs: reserva um job por vez, executa o tratador do tipo,
+mantém a reserva viva enquanto ele roda e aplica as tentativas com backoff
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import time
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from sqlalchemy.orm import Session
+
+from src.geobot_plataforma_backend.core.config import settings
+from src.geobot_plataforma_backend.core.database import SessionLocal
+from src.geobot_plataforma_backend.core.storage import encerrar_storage_backend
+from src.geobot_plataforma_backend.domain.entity.job import Job, StatusJob
+from src.geobot_plataforma_backend.domain.service.analise_ia_service import TIPO_JOB as TIPO_ANALISE_IA
+from src.geobot_plataforma_backend.domain.service.analise_ia_service import AnaliseIAService
+from src.geobot_plataforma_backend.domain.service.fila_jobs_service import ErroPermanenteJob, FilaJobs
+
+logger = logging.getLogger(__name__)
+
+# Tipo do job -> classe construída com a sessão, com
+# `async processar(payload, progresso) -> resultado`, `falhou(payload, erro)` e,
+# opcionalmente, `agendar()`: chamado a cada `jobs_agendamento_segundos` para
+# transformar trabalho acumulado em jobs (ex: lotes de análises de IA)
+TRATADORES: Dict[str, Callable[[Session], Any]] = {
+    TIPO_ANALISE_IA: AnaliseIAService,
+}
+
+# Intervalo mínimo entre gravações de progresso de um mesmo job
+INTERVALO_PROGRESSO_SEGUNDOS = 1.0
+
+
+class _Execucao:
+    """Progresso mais recente do job em execução, gravado pelo heartbeat"""
+
+    def __init__(self):
+        self.progresso: Optional[float] = None
+        self.mensagem: Optional[str] = None
+        self.alterado = asyncio.Event()
+
+    def reportar(self, progresso: float, mensagem: str) -> None:
+        self.progresso, self.mensagem = progresso, mensagem
+        self.alterado.set()
+
+
+class WorkerJobs:
+    """
+    Consome a fila com um job por vez: o paralelismo vem de vários workers
+    (processos ou máquinas), que nunca pegam o mesmo job.
+    """
+
+    def __init__(
+        self,
+        worker_id: Optional[str] = None,
+        tipos: Optional[Sequence[str]] = None,
+        fabrica_sessao: Callable[[], Session] = SessionLocal,
+        tratadores: Optional[Dict[str, Callable[[Session], Any]]] = None,
+    ):
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.tratadores = tratadores or TRATADORES
+        self.tipos = list(tipos or self.tratadores)
+        self.fabrica_sessao = fabrica_sessao
+        self.intervalo_segundos = float(settings.get('jobs_intervalo_segundos', 2))
+        self.intervalo_agendamento = float(settings.get('jobs_agendamento_segundos', 15))
+        self._proximo_agendamento = 0.0
+        # Renova com folga: três chances antes de a reserva expirar
+        self.intervalo_renovacao = int(settings.get('jobs_reserva_segundos', 300)) / 3
+
+    def _na_fila(self, operacao: str, *args):
+        """Operação da fila com sessão própria (curta, separada da sessão do tratador)"""
+        db = self.fabrica_sessao()
+        try:
+            return getattr(FilaJobs(db), operacao)(*args)
+        finally:
+            db.close()
+
+    async def _manter_reserva(self, job: Job, execucao: _Execucao, tarefa: asyncio.Task) -> None:
+        """Renova a reserva e grava o progresso (no máximo 1x/s); cancela o job se a reserva foi perdida"""
+        ultima_renovacao = time.monotonic()
+        while True:
+            try:
+                await asyncio.wait_for(execucao.alterado.wait(), self.intervalo_renovacao)
+            except asyncio.TimeoutError:
+                pass
+            if not execucao.alterado.is_set() and time.monotonic() - ultima_renovacao < self.intervalo_renovacao:
+                continue
+            execucao.alterado.clear()
+            renovado = await asyncio.to_thread(
+                self._na_fila, 'renovar', job.id, self.worker_id, execucao.progresso, execucao.mensagem
+            )
+            ultima_renovacao = time.monotonic()
+            if not renovado:
+                logger.warning("Job %s: reserva perdida, interrompendo", job.id)
+                tarefa.cancel()
+                return
+            await asyncio.sleep(INTERVALO_PROGRESSO_SEGUNDOS)
+
+    async def _executar_tratador(self, job: Job, execucao: _Execucao) -> Any:
+        db = self.fabrica_sessao()
+        try:
+            return await self.tratadores[job.tipo](db).processar(job.payload, execucao.reportar)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _registrar_falha_definitiva(self, job: Job, erro: str) -> None:
+        db = self.fabrica_sessao()
+        try:
+            self.tratadores[job.tipo](db).falhou(job.payload, erro)
+        except Exception:
+            logger.exception("Job %s: falha ao registrar o erro no tratador", job.id)
+        finally:
+            db.close()
+
+    async def executar_proximo(self) -> bool:
+        """
+        Reserva e executa o próximo job
+
+        Returns:
+            False se a fila não tinha job disponível
+        """
+        job = await asyncio.to_thread(self._na_fila, 'reservar', self.worker_id, self.tipos)
+        if job is None:
+            return False
+
+        logger.info("Job %s (%s): tentativa %s/%s", job.id, job.tipo, job.tentativas, job.max_tentativas)
+        execucao = _Execucao()
+        tarefa = asyncio.create_task(self._executar_tratador(job, execucao))
+        manutencao = asyncio.create_task(self._manter_reserva(job, execucao, tarefa))
+        try:
+            resultado = await tarefa
+        except asyncio.CancelledError:
+            if not manutencao.done():
+                raise  # O próprio worker foi cancelado; a reserva expira e o job volta à fila
+            return True  # Reserva perdida: outro worker é o dono do job agora
+        except Exception as err:
+            manutencao.cancel()
+            permanente = isinstance(err, ErroPermanenteJob)
+            logger.exception("Job %s falhou%s", job.id, " (permanente)" if permanente else "")
+            status = await asyncio.to_thread(
+                self._na_fila, 'falhar', job.id, self.worker_id, f"{type(err).__name__}: {err}", permanente
+            )
+            if status == StatusJob.ERRO.value:
+                await asyncio.to_thread(self._registrar_falha_definitiva, job, str(err))
+            return True
+        finally:
+            manutencao.cancel()
+
+        await asyncio.to_thread(self._na_fila, 'concluir', job.id, self.worker_id, resultado)
+        logger.info("Job %s concluído", job.id)
+        return True
+
+    def _liberar_expirados(self) -> None:
+        """Devolve à fila jobs de workers mortos; os que esgotaram as tentativas são encerrados"""
+        for job_id, tipo, payload in self._na_fila('liberar_expirados'):
+            logger.warning("Job %s: reserva expirou na última tentativa", job_id)
+            tratador = self.tratadores.get(tipo)
+            if tratador is None:
+                continue
+            db = self.fabrica_sessao()
+            try:
+                tratador(db).falhou(payload, "Worker parou de responder")
+            finally:
+                db.close()
+
+    def _agendar(self) -> None:
+        """Deixa cada tratador montar os jobs do trabalho acumulado (lotes)"""
+        for tipo in self.tipos:
+            db = self.fabrica_sessao()
+            try:
+                agendar = getattr(self.tratadores[tipo](db), 'agendar', None)
+                if agendar is not None:
+                    for job in agendar():
+                        logger.info("Job %s (%s) agendado", job.id, tipo)
+            finally:
+                db.close()
+
+    async def executar(self, parar: Callable[[], bool]) -> None:
+        """Consome a fila até `parar()`; o job em andamento termina antes de sair"""
+        logger.info("Worker %s consumindo %s", self.worker_id, ", ".join(self.tipos))
+        try:
+            while not parar():
+                try:
+                    # Também com a fila cheia: lotes vencidos não podem esperar ela esvaziar
+                    if time.monotonic() >= self._proximo_agendamento:
+                        self._proximo_agendamento = time.monotonic() + self.intervalo_agendamento
+                        await asyncio.to_thread(self._agendar)
+                    if await self.executar_proximo():
+                        continue
+                    await asyncio.to_thread(self._liberar_expirados)
+                except Exception:
+                    logger.exception("Worker %s: erro ao acessar a fila", self.worker_id)
+                await asyncio.sleep(self.intervalo_segundos)
+        finally:
+            await encerrar_storage_backend()
+
+
+def _processo_worker(parar) -> None:
+    """Entrada de cada processo: SIGINT/SIGTERM ficam com o processo pai"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    logging.basicConfig(level=settings.get('log_level', 'INFO'), format=settings.get('log_format'))
+    asyncio.run(WorkerJobs().executar(parar.is_set))
+
+
+def iniciar_workers(processos: Optional[int] = None) -> None:
+    """
+    Sobe `processos` workers (padrão `ia_workers`) e espera todos terminarem
+
+    SIGINT/SIGTERM pedem a parada: cada worker conclui o job atual e sai.
+    """
+    processos = processos or int(settings.get('ia_workers', 2))
+    # spawn: cada worker abre as próprias conexões (banco, storage) do zero
+    contexto = multiprocessing.get_context('spawn')
+    parar = contexto.Event()
+
+    def pedir_parada(*_):
+        logger.info("Parada solicitada: aguardando os jobs em andamento")
+        parar.set()
+
+    signal.signal(signal.SIGINT, pedir_parada)
+    signal.signal(signal.SIGTERM, pedir_parada)
+
+    workers = [
+        contexto.Process(target=_processo_worker, args=(parar,), name=f"worker-ia-{i}")
+        for i in range(processos)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
@@ -0,0 +1,97 @@
+"""
+Testes unitários dos anexos de denúncia com deduplicação por conteúdo.
+"""
+import asyncio
+import hashlib
+import io
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.geobot_plataforma_backend.core.storage import MemoriaStorageBackend
+from src.geobot_plataforma_backend.domain.entity.enums import StatusDenuncia
+from src.geobot_plataforma_backend.domain.service.arquivo_service import ArquivoService, chave_conteudo
+
+
+class UploadFalso:
+    """Imita a interface assíncrona de leitura do UploadFile"""
+
+    def __init__(self, conteudo: bytes):
+        self._buffer = io.BytesIO(conteudo)
+
+    async def read(self, n: int = -1) -> bytes:
+        return self._buffer.read(n)
+
+
+@pytest.fixture
+def service():
+    service = ArquivoService(MagicMock(), storage=MemoriaStorageBackend())
+    service.extensoes_permitidas = {".jpg"}
+    service.usuario_repository = MagicMock()
+    service.usuario_repository.buscar_por_id.return_value = SimpleNamespace(id=5, ativo=True)
+    service.denuncia_repository = MagicMock()
+    service.denuncia_repository.buscar_por_id.return_value = SimpleNamespace(
+        id=3, usuario_id=5, status=StatusDenuncia.PENDENTE
+    )
+    service.repository = MagicMock()
+    service.repository.buscar_por_hash.return_value = None
+    service.repository.criar_ou_obter.side_effect = lambda arquivo: arquivo
+    return service
+
+
+def _anexar(service, conteudo):
+    return asyncio.run(service.anexar_upload(3, 5, UploadFalso(conteudo), "buraco.jpg"))
+
+
+def _chaves(service):
+    return sorted(service.storage._objetos)
+
+
+class TestAnexarUpload:
+    """Testes do ArquivoService.anexar_upload"""
+
+    def test_conteudo_novo_vai_para_a_chave_do_hash(self, service):
+        conteudo = b"\xff\xd8buraco" * 100
+        hash_sha256 = hashlib.sha256(conteudo).hexdigest()
+
+        arquivo, reaproveitado = _anexar(service, conteudo)
+
+        assert not reaproveitado
+        assert arquivo.chave_storage == chave_conteudo(hash_sha256)
+        assert arquivo.hash_checksum == hash_sha256
+        assert arquivo.tamanho_bytes == len(conteudo)
+        assert _chaves(service) == [chave_conteudo(hash_sha256)]
+        service.repository.vincular_denuncia.assert_called_once_with(arquivo, 3)
+
+    def test_mesmo_hash_reaproveita_a_chave(self, service):
+        conteudo = b"\xff\xd8buraco" * 100
+        chave = chave_conteudo(hashlib.sha256(conteudo).hexdigest())
+        service.storage._publicar(chave, conteudo, "image/jpeg")
+        existente = SimpleNamespace(id=9, chave_storage=chave)
+        service.repository.buscar_por_hash.return_value = existente
+
+        arquivo, reaproveitado = _anexar(service, conteudo)
+
+        assert reaproveitado
+        assert arquivo is existente
+        assert _chaves(service) == [chave]  # A cópia temporária foi descartada
+        service.repository.criar_ou_obter.assert_not_called()
+        service.repository.vincular_denuncia.assert_called_once_with(existente, 3)
+
+    def test_hash_diferente_grava_outro_objeto(self, service):
+        primeiro, _ = _anexar(service, b"\xff\xd8foto 1")
+        segundo, reaproveitado = _anexar(service, b"\xff\xd8foto 2")
+
+        assert not reaproveitado
+        assert segundo.chave_storage != primeiro.chave_storage
+        assert _chaves(service) == sorted([primeiro.chave_storage, segundo.chave_storage])
+
+    def test_falha_apos_gravar_remove_a_copia_temporaria(self, service):
+        service.repository.buscar_por_hash.side_effect = RuntimeError("banco fora")
+
+        with pytest.raises(RuntimeError):
+            _anexar(service, b"\xff\xd8buraco")
+
+        assert _chaves(service) == []
+        service.repository.vincular_denuncia.assert_not_called()
@@ -0,0 +1,106 @@
+"""
+Testes unitários da matriz de distâncias e do algoritmo de atribuição de fiscais.
+"""
+import time
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from src.geobot_plataforma_backend.core.geo import distancia_haversine, matriz_haversine
+from src.geobot_plataforma_backend.domain.service.atribuicao_service import (
+    SEM_FISCAL,
+    AtribuicaoService,
+    ResultadoAtribuicao,
+    resolver_atribuicao,
+)
+from src.geobot_plataforma_backend.domain.service.fiscalizacao_service import FiscalizacaoService
+
+
+class TestHaversine:
+    """Testes da distância de grande círculo"""
+
+    def test_distancia_conhecida(self):
+        # Salvador -> Feira de Santana: ~ 93 km em linha reta
+        assert 92 < distancia_haversine(-12.9714, -38.5014, -12.2664, -38.9663) < 95
+
+    def test_matriz_simetrica_com_diagonal_zero(self):
+        lat = np.array([-12.97, -12.95, -13.0])
+        lon = np.array([-38.50, -38.45, -38.52])
+        d = matriz_haversine(lat, lon)
+
+        assert d.shape == (3, 3)
+        assert np.allclose(d, d.T)
+        assert np.allclose(np.diag(d), 0.0)
+
+
+class TestResolverAtribuicao:
+    """Testes da designação de custo mínimo por blocos"""
+
+    def test_escolhe_fiscal_mais_proximo(self):
+        distancias = np.array([[1.0, 10.0], [10.0, 1.0]])
+
+        assert resolver_atribuicao(distancias, np.zeros(2), peso_carga_km=5.0).tolist() == [0, 1]
+
+    def test_carga_desvia_para_fiscal_livre(self):
+        distancias = np.array([[1.0, 3.0]])
+
+        # O fiscal 0 está mais perto, mas 2 fiscalizações ativas valem 10 km
+        assert resolver_atribuicao(distancias, np.array([2, 0]), peso_carga_km=5.0).tolist() == [1]
+
+    def test_respeita_carga_maxima(self):
+        distancias = np.zeros((3, 2))
+
+        escolhas = resolver_atribuicao(distancias, np.array([1, 2]), peso_carga_km=1.0, carga_maxima=2)
+
+        assert sorted(escolhas.tolist()) == [SEM_FISCAL, SEM_FISCAL, 0]
+
+    def test_usa_a_capacidade_livre_de_quem_ainda_tem_vaga(self):
+        # O fiscal 0 está lotado: todas as denúncias vão para o 1, que tem 20 vagas
+        escolhas = resolver_atribuicao(np.zeros((4, 2)), np.array([20, 0]), peso_carga_km=5.0, carga_maxima=20)
+
+        assert escolhas.tolist() == [1, 1, 1, 1]
+
+    def test_sobra_de_fiscal_com_pouca_vaga_vai_para_os_demais(self):
+        distancias = np.array([[0.0, 50.0, 50.0]] * 6)
+
+        escolhas = resolver_atribuicao(distancias, np.array([19, 0, 18]), peso_carga_km=1.0, carga_maxima=20)
+
+        assert np.bincount(escolhas, minlength=3).tolist() == [1, 3, 2]
+
+    def test_equilibra_entre_blocos(self):
+        distancias = np.zeros((40, 4))
+
+        escolhas = resolver_atribuicao(distancias, np.zeros(4), peso_carga_km=1.0, tamanho_bloco=7)
+
+        assert np.bincount(escolhas, minlength=4).tolist() == [10, 10, 10, 10]
+
+    def test_5k_denuncias_200_fiscais(self):
+        rng = np.random.default_rng(42)
+        inicio = time.perf_counter()
+        distancias = matriz_haversine(
+            rng.uniform(-13.1, -12.8, 5000), rng.uniform(-38.6, -38.3, 5000),
+            rng.uniform(-13.1, -12.8, 200), rng.uniform(-38.6, -38.3, 200),
+        )
+        escolhas = resolver_atribuicao(distancias, rng.integers(0, 5, 200), peso_carga_km=5.0)
+        decorrido = time.perf_counter() - inicio
+
+        assert (escolhas != SEM_FISCAL).all()
+        assert decorrido < 1.0
+
+
+class TestAtribuirAutomaticamente:
+    """Testes do limite de fiscalizações abertas por chamada"""
+
+    def test_limite_da_criacao_em_lote(self, monkeypatch):
+        service = AtribuicaoService(MagicMock())
+        limites = []
+        monkeypatch.setattr(
+            service, "sugerir",
+            lambda usuario_id, denuncia_ids, limite: limites.append(limite) or ResultadoAtribuicao([], [], []),
+        )
+
+        service.atribuir_automaticamente(1)
+        service.atribuir_automaticamente(1, limite=5000)
+        service.atribuir_automaticamente(1, limite=50)
+
+        assert limites == [FiscalizacaoService.MAX_ITENS_LOTE, FiscalizacaoService.MAX_ITENS_LOTE, 50]
@@ -0,0 +1,42 @@
+"""
+Testes unitários do cache TTL/LRU.
+"""
+from unittest.mock import patch
+
+from src.geobot_plataforma_backend.core.cache import CacheTTL
+
+
+class TestCacheTTL:
+    """Testes do CacheTTL"""
+
+    def test_expira_apos_ttl(self):
+        cache = CacheTTL(tamanho_maximo=10, ttl_segundos=5)
+        with patch("src.geobot_plataforma_backend.core.cache.time.monotonic", return_value=100.0):
+            cache.definir("a", 1)
+        with patch("src.geobot_plataforma_backend.core.cache.time.monotonic", return_value=104.0):
+            assert cache.obter("a") == 1
+        with patch("src.geobot_plataforma_backend.core.cache.time.monotonic", return_value=106.0):
+            assert cache.obter("a") is None
+        assert len(cache) == 0
+
+    def test_descarta_menos_usado(self):
+        cache = CacheTTL(tamanho_maximo=2, ttl_segundos=60)
+        cache.definir("a", 1)
+        cache.definir("b", 2)
+        cache.obter("a")
+        cache.definir("c", 3)
+
+        assert cache.obter_muitos(["a", "b", "c"]) == {"a": 1, "c": 3}
+
+    def test_invalidar_e_valor_falso(self):
+        cache = CacheTTL()
+        cache.definir("zero", 0)
+        assert cache.obter_muitos(["zero"]) == {"zero": 0}
+
+        cache.invalidar("zero", "inexistente")
+        assert cache.obter("zero", "padrao") == "padrao"
+
+    def test_tamanho_zero_desativa(self):
+        cache = CacheTTL(tamanho_maximo=0)
+        cache.definir("a", 1)
+        assert cache.obter("a") is None
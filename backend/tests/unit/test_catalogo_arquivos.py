@@ -0,0 +1,111 @@
+"""
+Testes unitários do catálogo de arquivos: paginação por cursor e reconciliação com o storage.
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.geobot_plataforma_backend.core.paginacao import decodificar_cursor
+from src.geobot_plataforma_backend.core.storage import LocalStorageBackend
+from src.geobot_plataforma_backend.domain.service.catalogo_arquivos_service import CatalogoArquivosService
+from src.geobot_plataforma_backend.domain.service.etapa_fiscalizacao_service import EtapaFiscalizacaoService
+
+
+def _arquivos(quantidade):
+    base = datetime(2025, 11, 20, 9, 0, tzinfo=timezone.utc)
+    return [MagicMock(id=100 - i, created_at=base - timedelta(minutes=i)) for i in range(quantidade)]
+
+
+class TestListagemPaginada:
+    """Testes de EtapaFiscalizacaoService.obter_arquivos"""
+
+    def _db(self, linhas):
+        db = MagicMock()
+        query = db.query.return_value.filter.return_value
+        query.filter.return_value = query
+        query.order_by.return_value.limit.return_value.all.return_value = linhas
+        return db, query
+
+    def test_pagina_cheia_devolve_cursor_da_ultima_linha(self):
+        db, query = self._db(_arquivos(4))
+
+        arquivos, cursor = EtapaFiscalizacaoService(db).obter_arquivos(7, limit=3)
+
+        assert [a.id for a in arquivos] == [100, 99, 98]
+        query.order_by.return_value.limit.assert_called_once_with(4)
+        assert decodificar_cursor(cursor, 2) == [arquivos[-1].created_at.isoformat(), 98]
+
+    def test_ultima_pagina_sem_cursor(self):
+        db, query = self._db(_arquivos(2))
+
+        arquivos, cursor = EtapaFiscalizacaoService(db).obter_arquivos(7, tipo='foto_sobrevoo', limit=3)
+
+        assert len(arquivos) == 2
+        assert cursor is None
+
+    def test_cursor_continua_depois_da_ultima_linha(self):
+        db, query = self._db(_arquivos(1))
+        _, cursor = EtapaFiscalizacaoService(self._db(_arquivos(2))[0]).obter_arquivos(7, limit=1)
+
+        EtapaFiscalizacaoService(db).obter_arquivos(7, limit=1, cursor=cursor)
+
+        filtro = str(query.filter.call_args[0][0])
+        assert filtro == "(geobot.arquivos_fiscalizacao.created_at, geobot.arquivos_fiscalizacao.id) < (:param_1, :param_2)"
+
+    def test_cursor_invalido(self):
+        db, _ = self._db([])
+
+        with pytest.raises(ValueError, match="Cursor de paginação inválido"):
+            EtapaFiscalizacaoService(db).obter_arquivos(7, cursor="invalido")
+
+
+class TestReconciliacaoCatalogo:
+    """Testes do CatalogoArquivosService"""
+
+    def test_marca_ausentes_e_consulta_cada_chave_uma_vez(self, tmp_path):
+        storage = LocalStorageBackend(str(tmp_path / "uploads"))
+
+        async def gravar():
+            escrita = await storage.abrir_escrita("conteudo/aa/presente")
+            await escrita.escrever(b"ok")
+            await escrita.concluir()
+        asyncio.run(gravar())
+
+        db = MagicMock()
+        db.query.return_value.order_by.return_value.limit.return_value.all.return_value = [
+            (1, "conteudo/aa/presente"),
+            (2, "conteudo/bb/sumiu"),
+            (3, "conteudo/aa/presente"),  # Mesma chave replicada pelo sobrevoo em lote
+        ]
+        consultas = []
+        existe = storage.existe
+
+        async def contar(chave):
+            consultas.append(chave)
+            return await existe(chave)
+
+        storage.existe = contar
+
+        resultado = asyncio.run(CatalogoArquivosService(db, storage=storage).reconciliar(limite=3))
+
+        assert resultado == {'verificados': 3, 'ausentes': 1}
+        assert sorted(consultas) == ["conteudo/aa/presente", "conteudo/bb/sumiu"]
+        presentes, ausentes = (c[0][0] for c in db.execute.call_args_list)
+        assert presentes.whereclause.right.value == [1, 3]
+        assert ausentes.whereclause.right.value == [2]
+        db.commit.assert_called_once()
+
+    def test_catalogo_vazio(self, tmp_path):
+        db = MagicMock()
+        db.query.return_value.filter.return_value.order_by.return_value.limit.return_value.all.return_value = []
+
+        resultado = asyncio.run(
+            CatalogoArquivosService(db, storage=LocalStorageBackend(str(tmp_path))).reconciliar(
+                verificados_antes_de=datetime.now(timezone.utc)
+            )
+        )
+
+        assert resultado == {'verificados': 0, 'ausentes': 0}
+        db.execute.assert_not_called()
@@ -0,0 +1,110 @@
+"""
+Testes unitários do DBSCAN por grade e da montagem de hotspots.
+"""
+from unittest.mock import MagicMock
+
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
+
+from src.geobot_plataforma_backend.core.clustering import RUIDO, dbscan_grade
+from src.geobot_plataforma_backend.core.geo import projetar_km
+from src.geobot_plataforma_backend.domain.entity.enums import CategoriaDenuncia
+from src.geobot_plataforma_backend.domain.service.hotspot_service import HotspotService
+
+
+def _dbscan_exato_nucleos(pontos, eps, min_pontos):
+    """Referência por força bruta: núcleos e componentes entre núcleos"""
+    contagem = cKDTree(pontos).query_ball_point(pontos, eps, return_length=True)
+    nucleos = np.nonzero(contagem >= min_pontos)[0]
+    pares = cKDTree(pontos[nucleos]).query_pairs(eps, output_type='ndarray')
+    grafo = coo_matrix((np.ones(len(pares)), (pares[:, 0], pares[:, 1])), shape=(len(nucleos),) * 2)
+    _, componentes = connected_components(grafo, directed=False)
+    return nucleos, componentes
+
+
+class TestDbscanGrade:
+    """Testes do dbscan_grade"""
+
+    def test_dois_grupos_e_ruido(self):
+        rng = np.random.default_rng(42)
+        grupo_a = rng.normal((0.0, 0.0), 0.05, (300, 2))
+        grupo_b = rng.normal((2.0, 2.0), 0.05, (300, 2))
+        ruido = np.array([[10.0, 10.0], [-10.0, 5.0]])
+        rotulos = dbscan_grade(np.vstack([grupo_a, grupo_b, ruido]), eps=0.1, min_pontos=5)
+
+        assert len(set(rotulos[:300])) == 1
+        assert len(set(rotulos[300:600])) == 1
+        assert rotulos[0] != rotulos[300]
+        assert (rotulos[600:] == RUIDO).all()
+        assert set(rotulos) == {0, 1, RUIDO}
+
+    def test_ponto_de_borda_herda_cluster(self):
+        nucleo = np.array([[0.0, 0.0]] * 5)
+        borda = np.array([[0.09, 0.0]])
+        longe = np.array([[0.25, 0.0]])
+        rotulos = dbscan_grade(np.vstack([nucleo, borda, longe]), eps=0.1, min_pontos=5)
+
+        assert rotulos[5] == rotulos[0] == 0
+        assert rotulos[6] == RUIDO
+
+    def test_concorda_com_dbscan_exato_nos_nucleos(self):
+        rng = np.random.default_rng(7)
+        pontos = np.vstack([
+            rng.normal((0, 0), 0.3, (1500, 2)),
+            rng.normal((3, 0), 0.3, (1500, 2)),
+            rng.uniform(-2, 5, (500, 2)),
+        ])
+        rotulos = dbscan_grade(pontos, eps=0.1, min_pontos=8)
+        nucleos, componentes = _dbscan_exato_nucleos(pontos, 0.1, 8)
+
+        assert (rotulos[nucleos] != RUIDO).all()
+        pares = set(zip(rotulos[nucleos].tolist(), componentes.tolist()))
+        assert len(pares) == len(set(componentes.tolist())) == len(set(rotulos[nucleos].tolist()))
+
+    def test_igual_ao_dbscan_exato_em_pontos_esparsos(self):
+        # Densidade em que os representantes das micro-células não bastam para ligar as células
+        for semente in range(200):
+            rng = np.random.default_rng(semente)
+            pontos = rng.uniform(0, 1, (400, 2))
+            rotulos = dbscan_grade(pontos, eps=0.08, min_pontos=4)
+            nucleos, componentes = _dbscan_exato_nucleos(pontos, 0.08, 4)
+
+            assert (rotulos[nucleos] != RUIDO).all()
+            pares = set(zip(rotulos[nucleos].tolist(), componentes.tolist()))
+            assert len(pares) == len(set(componentes.tolist())) == len(set(rotulos[nucleos].tolist())), semente
+
+    def test_vazio(self):
+        assert len(dbscan_grade(np.empty((0, 2)), eps=0.1, min_pontos=3)) == 0
+
+
+class TestProjecao:
+    """Testes da projeção local em km"""
+
+    def test_um_grau_de_latitude_tem_cerca_de_111_km(self):
+        xy = projetar_km([-12.0, -13.0], [-38.5, -38.5])
+        assert abs(abs(xy[1, 1] - xy[0, 1]) - 111.2) < 0.1
+
+
+class TestHotspotService:
+    """Testes da montagem de hotspots"""
+
+    def test_montar_resultado_ordena_por_tamanho_e_agrega(self):
+        service = HotspotService(MagicMock())
+        linhas = []
+        for i in range(8):
+            linhas.append((i + 1, -12.97 + i * 1e-5, -38.50, CategoriaDenuncia.LIXO_ENTULHO, 100 if i == 0 else None))
+        for i in range(5):
+            linhas.append((i + 20, -12.90 + i * 1e-5, -38.40, CategoriaDenuncia.RUA, None))
+        linhas.append((99, -13.50, -39.00, CategoriaDenuncia.RUA, None))
+
+        resultado = service.montar_resultado(linhas, raio_m=100, min_denuncias=4, limite=10)
+
+        assert [h.quantidade for h in resultado.hotspots] == [8, 5]
+        maior = resultado.hotspots[0]
+        assert maior.denuncia_ids == list(range(1, 9))
+        assert maior.fiscalizacao_ids == [100]
+        assert maior.categorias == {"lixo_entulho": 8}
+        assert resultado.total_ruido == 1
+        assert resultado.total_denuncias == 14
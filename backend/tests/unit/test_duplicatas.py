@@ -0,0 +1,125 @@
+"""
+Testes unitários da detecção de imagens quase-duplicadas (dHash + árvore BK).
+"""
+import asyncio
+import io
+import random
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from src.geobot_plataforma_backend.core.arvore_bk import ArvoreBK, distancia_hamming
+from src.geobot_plataforma_backend.core.imagem import dhash
+from src.geobot_plataforma_backend.core.storage import LocalStorageBackend
+from src.geobot_plataforma_backend.domain.service.ingestao_imagem_service import (
+    IndiceDuplicatas,
+    IngestaoImagemService,
+)
+
+
+def _cena(semente: int) -> Image.Image:
+    """Imagem com textura (uma cor sólida teria dHash zero)"""
+    gerador = np.random.default_rng(semente)
+    blocos = gerador.integers(0, 255, (12, 16, 3), dtype=np.uint8)
+    return Image.fromarray(blocos).resize((800, 600), Image.Resampling.BICUBIC)
+
+
+def _jpeg(imagem: Image.Image, qualidade: int = 90) -> bytes:
+    saida = io.BytesIO()
+    imagem.save(saida, format="JPEG", quality=qualidade)
+    return saida.getvalue()
+
+
+class TestArvoreBK:
+    """Testes de core.arvore_bk"""
+
+    def test_busca_por_raio_igual_a_forca_bruta(self):
+        aleatorio = random.Random(42)
+        hashes = [aleatorio.getrandbits(64) for _ in range(2000)]
+        arvore = ArvoreBK()
+        for indice, valor in enumerate(hashes):
+            arvore.inserir(valor, indice)
+        consulta = hashes[123] ^ 0b1011  # 3 bits trocados
+
+        encontrados = arvore.buscar(consulta, 8)
+
+        esperado = sorted(
+            (distancia_hamming(consulta, valor), indice)
+            for indice, valor in enumerate(hashes)
+            if distancia_hamming(consulta, valor) <= 8
+        )
+        assert sorted(encontrados) == esperado
+        assert encontrados[0] == (3, 123)
+        assert len(arvore) == 2000
+
+    def test_arvore_vazia(self):
+        assert ArvoreBK().buscar(0, 10) == []
+
+
+class TestDhash:
+    """Testes do hash perceptual"""
+
+    def test_resiste_a_recompressao_e_redimensionamento(self):
+        original = _cena(1)
+        reenviada = Image.open(io.BytesIO(_jpeg(original.resize((400, 300)), qualidade=40)))
+
+        assert distancia_hamming(dhash(original), dhash(reenviada)) <= 4
+
+    def test_cenas_diferentes_ficam_distantes(self):
+        assert distancia_hamming(dhash(_cena(1)), dhash(_cena(2))) > 16
+
+
+class TestIndiceDuplicatas:
+    """Testes das regras de vizinhança e da replicação do sobrevoo"""
+
+    def test_regras(self):
+        indice = IndiceDuplicatas({10: {10, 11}, 11: {10, 11}, 20: {20}}, distancia_maxima=6)
+        indice.adicionar("00000000000000ff", 1, 10, "conteudo/a")
+
+        assert indice.original_de("00000000000000fe", 10, "conteudo/b") == 1  # Mesma fiscalização
+        assert indice.original_de("00000000000000fe", 11, "conteudo/b") == 1  # Fiscalização vizinha
+        assert indice.original_de("00000000000000fe", 20, "conteudo/b") is None  # Longe
+        assert indice.original_de("00000000000000ff", 11, "conteudo/a") is None  # Sobrevoo em lote
+        assert indice.original_de("ffffffffffffff00", 10, "conteudo/c") is None  # Outra cena
+
+
+class TestIngestaoComDuplicatas:
+    """Testes da ingestão marcando duplicatas"""
+
+    @pytest.fixture
+    def storage(self, tmp_path):
+        return LocalStorageBackend(str(tmp_path / "uploads"))
+
+    def _gravar(self, storage, chave, conteudo):
+        async def gravar():
+            escrita = await storage.abrir_escrita(chave)
+            await escrita.escrever(conteudo)
+            await escrita.concluir()
+        asyncio.run(gravar())
+
+    def test_reenvio_da_mesma_pasta_e_marcado_como_duplicata(self, storage):
+        self._gravar(storage, "conteudo/aa/original", _jpeg(_cena(1)))
+        self._gravar(storage, "conteudo/bb/reenvio", _jpeg(_cena(1), qualidade=50))
+        self._gravar(storage, "conteudo/cc/outra", _jpeg(_cena(2)))
+        sessao = MagicMock()
+        sessao.query.return_value.filter.return_value.all.return_value = [
+            (1, "conteudo/aa/original", 10),
+            (2, "conteudo/bb/reenvio", 10),
+            (3, "conteudo/cc/outra", 10),
+        ]
+        service = IngestaoImagemService(fabrica_sessao=lambda: sessao, storage=storage, executor=ThreadPoolExecutor(1))
+        service.duplicatas_raio_km = 0
+
+        asyncio.run(service.processar(["conteudo/aa/original", "conteudo/bb/reenvio", "conteudo/cc/outra"]))
+
+        metadados = {p["b_id"]: p["b_metadados"] for p in sessao.execute.call_args[0][1]}
+        duplicatas = {i: m["duplicata_de"] for i, m in metadados.items() if "duplicata_de" in m}
+        # Uma das duas versões da cena 1 fica como original; a outra aponta para ela
+        assert duplicatas in ({2: 1}, {1: 2})
+        duplicada = next(iter(duplicatas))
+        assert set(metadados[duplicada]["derivados"]) == {"miniatura"}
+        assert "previa" in metadados[duplicatas[duplicada]]["derivados"]
+        assert "duplicata_de" not in metadados[3]
@@ -0,0 +1,208 @@
+"""
+Testes unitários da fila de jobs (reserva, tentativas com backoff) e do worker
+que processa a análise de IA com o executor local.
+"""
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.geobot_plataforma_backend.core.storage import MemoriaStorageBackend
+from src.geobot_plataforma_backend.domain.entity.job import StatusJob
+from src.geobot_plataforma_backend.domain.service import worker_jobs
+from src.geobot_plataforma_backend.domain.service.analise_ia_service import AnaliseIAService
+from src.geobot_plataforma_backend.domain.service.executores_ia import ExecutorLocal
+from src.geobot_plataforma_backend.domain.service.fila_jobs_service import (
+    ErroPermanenteJob,
+    FilaJobs,
+    atraso_tentativa,
+)
+
+
+def _sql(instrucao):
+    return str(instrucao.compile(dialect=postgresql.dialect()))
+
+
+class TestAtrasoTentativa:
+    """Testes do backoff exponencial com jitter"""
+
+    def test_dobra_a_cada_tentativa_ate_o_maximo(self):
+        atrasos = [atraso_tentativa(n, 30, 600, sorteio=lambda: 1.0) for n in range(1, 7)]
+
+        assert atrasos == [30, 60, 120, 240, 480, 600]
+
+    def test_jitter_fica_entre_metade_e_o_total(self):
+        assert atraso_tentativa(2, 30, 600, sorteio=lambda: 0.0) == 30
+        assert 30 <= atraso_tentativa(2, 30, 600) <= 60
+
+
+class TestFilaJobs:
+    """Testes das operações da fila sobre a sessão"""
+
+    def test_reserva_pula_linhas_travadas_por_outros_workers(self):
+        db = MagicMock()
+        db.execute.return_value.scalars.return_value.first.return_value = None
+
+        assert FilaJobs(db).reservar("worker-1", ["analise_ia"]) is None
+
+        sql = _sql(db.execute.call_args[0][0])
+        assert sql.startswith("UPDATE geobot.jobs SET")
+        assert "FOR UPDATE SKIP LOCKED" in sql
+        assert "ORDER BY geobot.jobs.prioridade DESC, geobot.jobs.disponivel_em, geobot.jobs.id" in sql
+        assert "RETURNING" in sql
+        db.commit.assert_called_once()
+
+    def _falhar(self, tentativas, permanente=False):
+        db = MagicMock()
+        job = SimpleNamespace(tentativas=tentativas, max_tentativas=3, status=StatusJob.EXECUTANDO.value)
+        db.query.return_value.filter.return_value.with_for_update.return_value.first.return_value = job
+        status = FilaJobs(db).falhar(7, "worker-1", "RuntimeError: sky launch falhou", permanente)
+        return status, job
+
+    def test_falha_com_tentativas_restantes_volta_para_a_fila(self):
+        status, job = self._falhar(tentativas=1)
+
+        assert status == StatusJob.PENDENTE.value
+        assert job.bloqueado_por is None
+        assert "make_interval" in _sql(job.disponivel_em)
+
+    def test_falha_na_ultima_tentativa_ou_permanente_encerra_com_erro(self):
+        assert self._falhar(tentativas=3)[0] == StatusJob.ERRO.value
+        assert self._falhar(tentativas=1, permanente=True)[0] == StatusJob.ERRO.value
+
+    def test_falha_de_job_que_nao_e_mais_do_worker_e_ignorada(self):
+        db = MagicMock()
+        db.query.return_value.filter.return_value.with_for_update.return_value.first.return_value = None
+
+        assert FilaJobs(db).falhar(7, "worker-1", "erro") is None
+        db.rollback.assert_called_once()
+
+
+class FilaFalsa:
+    """Fila em memória no lugar do PostgreSQL, compartilhada entre as sessões do worker"""
+
+    jobs = []
+    renovacoes = []
+    concluidos = {}
+    falhas = []
+    manter_reserva = True
+    status_falha = StatusJob.PENDENTE.value
+
+    def __init__(self, db):
+        pass
+
+    def reservar(self, worker_id, tipos):
+        return self.jobs.pop(0) if self.jobs else None
+
+    def renovar(self, job_id, worker_id, progresso, mensagem):
+        FilaFalsa.renovacoes.append((progresso, mensagem))
+        return self.manter_reserva
+
+    def concluir(self, job_id, worker_id, resultado):
+        FilaFalsa.concluidos[job_id] = resultado
+        return True
+
+    def falhar(self, job_id, worker_id, erro, permanente):
+        FilaFalsa.falhas.append((job_id, erro, permanente))
+        return self.status_falha
+
+
+class TestWorkerJobs:
+    """Testes do worker com o executor local e storage em memória"""
+
+    @pytest.fixture(autouse=True)
+    def fila(self, monkeypatch):
+        monkeypatch.setattr(worker_jobs, "FilaJobs", FilaFalsa)
+        FilaFalsa.jobs = [SimpleNamespace(
+            id=7, tipo="analise_ia", tentativas=1, max_tentativas=3,
+            payload={"resultados": [{"resultado_id": 3, "arquivo_ids": [1, 2]}]},
+        )]
+        FilaFalsa.renovacoes, FilaFalsa.concluidos, FilaFalsa.falhas = [], {}, []
+        FilaFalsa.manter_reserva, FilaFalsa.status_falha = True, StatusJob.PENDENTE.value
+
+    @pytest.fixture
+    def resultado(self):
+        return SimpleNamespace(id=3, status_processamento="pendente")
+
+    def _worker(self, resultado, detector):
+        self.sessoes = []
+        storage = MemoriaStorageBackend()
+        for chave in ("conteudo/aa/1", "conteudo/bb/2"):
+            storage._publicar(chave, chave.encode(), "image/jpeg")
+
+        def sessao():
+            db = MagicMock()
+            db.query.return_value.filter.return_value.all.return_value = [resultado]
+            db.query.return_value.filter.return_value.order_by.return_value.all.return_value = [
+                (1, "conteudo/aa/1"), (2, "conteudo/bb/2"),
+            ]
+            self.sessoes.append(db)
+            return db
+
+        executor = ExecutorLocal(storage, detector=detector, modelo="yolov8n.pt")
+        worker = worker_jobs.WorkerJobs(
+            worker_id="worker-1",
+            fabrica_sessao=sessao,
+            tratadores={"analise_ia": lambda db: AnaliseIAService(db, executor=executor)},
+        )
+        worker.intervalo_renovacao = 0.05
+        return worker
+
+    def test_processa_o_job_e_grava_as_deteccoes_por_arquivo(self, resultado):
+        def detector(caminho):
+            with open(caminho, "rb") as imagem:
+                conteudo = imagem.read()
+            return [{"classe": 0, "classe_nome": "buraco", "confianca": 0.9, "origem": conteudo.decode()}]
+
+        assert asyncio.run(self._worker(resultado, detector).executar_proximo()) is True
+
+        assert FilaFalsa.concluidos == {7: {"resultados": 1, "imagens": 2, "deteccoes": 2}}
+        assert [(d["arquivo_id"], d["origem"]) for d in resultado.deteccoes] == [
+            (1, "conteudo/aa/1"), (2, "conteudo/bb/2"),
+        ]
+        assert resultado.status_processamento == "concluído"
+        assert resultado.classificacao_geral == "crítico"
+        assert resultado.modelo_utilizado == "yolov8n.pt"
+        assert FilaFalsa.renovacoes[0][0] == 50.0
+
+    def test_fila_vazia(self, resultado):
+        FilaFalsa.jobs = []
+
+        assert asyncio.run(self._worker(resultado, lambda c: []).executar_proximo()) is False
+
+    def test_falha_devolve_o_job_a_fila(self, resultado):
+        def detector(caminho):
+            raise RuntimeError("GPU sem memória")
+
+        asyncio.run(self._worker(resultado, detector).executar_proximo())
+
+        assert FilaFalsa.falhas == [(7, "RuntimeError: GPU sem memória", False)]
+        assert FilaFalsa.concluidos == {}
+        assert resultado.status_processamento == "processando"
+
+    def test_falha_permanente_marca_o_resultado_com_erro(self, resultado):
+        def detector(caminho):
+            raise ErroPermanenteJob("modelo ausente")
+        FilaFalsa.status_falha = StatusJob.ERRO.value
+
+        asyncio.run(self._worker(resultado, detector).executar_proximo())
+
+        assert FilaFalsa.falhas[0][2] is True
+        atualizacao = self.sessoes[-1].execute.call_args[0][0]
+        assert _sql(atualizacao).startswith("UPDATE geobot.resultados_analise_ia SET status_processamento")
+        assert atualizacao.compile().params["status_processamento"] == "erro"
+
+    def test_reserva_perdida_interrompe_o_job(self, resultado):
+        def detector(caminho):
+            time.sleep(0.2)
+            return []
+        FilaFalsa.manter_reserva = False
+
+        asyncio.run(self._worker(resultado, detector).executar_proximo())
+
+        assert FilaFalsa.concluidos == {}
+        assert FilaFalsa.falhas == []
+        assert resultado.status_processamento == "processando"
@@ -0,0 +1,46 @@
+"""
+Testes unitários da validação e atribuição de fiscais em lote.
+"""
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.geobot_plataforma_backend.domain.service.fiscalizacao_service import FiscalizacaoService
+
+
+def _service_com_usuarios(*ids):
+    db = MagicMock()
+    db.query.return_value.filter.return_value = [(i,) for i in ids]
+    return FiscalizacaoService(db), db
+
+
+class TestValidarFiscais:
+    """Testes da validação de fiscais com uma única query"""
+
+    def test_remove_repetidos_mantendo_ordem(self):
+        service, db = _service_com_usuarios(3, 1)
+
+        assert service._validar_fiscais([3, 1, 3]) == [3, 1]
+        assert db.query.call_count == 1
+
+    def test_fiscal_inexistente(self):
+        service, _ = _service_com_usuarios(1)
+
+        with pytest.raises(ValueError, match="ID 2"):
+            service._validar_fiscais([1, 2])
+
+    def test_varios_fiscais_inexistentes(self):
+        service, _ = _service_com_usuarios()
+
+        with pytest.raises(ValueError, match="2, 5"):
+            service._validar_fiscais([2, 5])
+
+
+class TestLinhasAtribuicao:
+    """Testes da montagem das atribuições inseridas em lote"""
+
+    def test_primeiro_e_responsavel(self):
+        linhas = FiscalizacaoService._linhas_atribuicao(10, [4, 7])
+
+        assert [(l['usuario_id'], l['papel']) for l in linhas] == [(4, "responsavel"), (7, "auxiliar")]
+        assert all(l['fiscalizacao_id'] == 10 for l in linhas)
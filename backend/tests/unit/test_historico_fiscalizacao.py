@@ -0,0 +1,72 @@
+"""
+Testes unitários do registro e da paginação do histórico de fiscalizações.
+"""
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.geobot_plataforma_backend.core.paginacao import codificar_cursor
+from src.geobot_plataforma_backend.domain.entity.historico_fiscalizacao import (
+    HistoricoFiscalizacao,
+    TipoEventoFiscalizacao,
+)
+from src.geobot_plataforma_backend.domain.repository.historico_fiscalizacao_repository import (
+    HistoricoFiscalizacaoRepository,
+)
+from src.geobot_plataforma_backend.domain.service.fiscalizacao_service import FiscalizacaoService
+
+
+class TestHistoricoFiscalizacaoRepository:
+    """Testes do repository append-only"""
+
+    def test_registrar_nao_faz_commit(self):
+        db = MagicMock()
+        HistoricoFiscalizacaoRepository(db).registrar(
+            1, TipoEventoFiscalizacao.STATUS_ALTERADO, valor_anterior="aguardando", valor_novo="em_andamento"
+        )
+
+        db.execute.assert_called_once()
+        (linhas,) = db.execute.call_args.args[1:]
+        assert linhas[0]['tipo_evento'] == "status_alterado"
+        db.commit.assert_not_called()
+
+    def test_registrar_muitos_vazio(self):
+        db = MagicMock()
+        HistoricoFiscalizacaoRepository(db).registrar_muitos([])
+
+        db.execute.assert_not_called()
+
+
+class TestListarHistorico:
+    """Testes da paginação do histórico no serviço"""
+
+    def _service(self, eventos):
+        service = FiscalizacaoService(MagicMock())
+        service.usuario_repository = MagicMock()
+        service.historico_repository = MagicMock()
+        service.historico_repository.listar.return_value = eventos
+        return service
+
+    def test_proxima_pagina_a_partir_do_ultimo_id(self):
+        eventos = [HistoricoFiscalizacao(id=i) for i in (9, 8, 7)]
+        service = self._service(eventos)
+
+        pagina, cursor = service.listar_historico(1, usuario_id=1, limit=2)
+
+        assert [e.id for e in pagina] == [9, 8]
+        assert cursor == codificar_cursor(8)
+        service.historico_repository.listar.assert_called_once_with(1, 3, None)
+
+    def test_ultima_pagina_sem_cursor(self):
+        service = self._service([HistoricoFiscalizacao(id=3)])
+
+        _, cursor = service.listar_historico(1, usuario_id=1, limit=2, cursor=codificar_cursor(4))
+
+        assert cursor is None
+        service.historico_repository.listar.assert_called_once_with(1, 3, 4)
+
+    def test_cursor_invalido(self):
+        service = self._service([])
+
+        with pytest.raises(ValueError):
+            service.listar_historico(1, usuario_id=1, cursor=codificar_cursor("x"))
@@ -0,0 +1,137 @@
+"""
+Testes unitários da ingestão de imagens (GPS/EXIF/XMP, miniaturas e prévias).
+"""
+import asyncio
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import pytest
+from PIL import ExifTags, Image
+
+from src.geobot_plataforma_backend.core.imagem import extrair_xmp_drone, processar_imagem
+from src.geobot_plataforma_backend.core.storage import LocalStorageBackend
+from src.geobot_plataforma_backend.domain.service.ingestao_imagem_service import (
+    IngestaoImagemService,
+    chave_derivado,
+)
+
+TAMANHOS = {'miniatura': (64, 64), 'previa': (400, 400)}
+
+
+def _jpeg_de_drone(largura=1200, altura=800, orientacao=None) -> bytes:
+    exif = Image.Exif()
+    exif[ExifTags.Base.Model] = "FC3411"
+    exif[ExifTags.IFD.GPSInfo] = {
+        ExifTags.GPS.GPSLatitudeRef: "S",
+        ExifTags.GPS.GPSLatitude: (12.0, 58.0, 17.04),
+        ExifTags.GPS.GPSLongitudeRef: "W",
+        ExifTags.GPS.GPSLongitude: (38.0, 30.0, 5.04),
+        ExifTags.GPS.GPSAltitudeRef: b"\x00",
+        ExifTags.GPS.GPSAltitude: 98.5,
+    }
+    if orientacao:
+        exif[ExifTags.Base.Orientation] = orientacao
+    saida = io.BytesIO()
+    Image.new("RGB", (largura, altura), (40, 120, 60)).save(saida, format="JPEG", exif=exif)
+    return saida.getvalue()
+
+
+class TestProcessarImagem:
+    """Testes de core.imagem"""
+
+    def test_extrai_gps_e_gera_variantes(self, tmp_path):
+        caminho = tmp_path / "foto.jpg"
+        caminho.write_bytes(_jpeg_de_drone())
+
+        resultado = processar_imagem(str(caminho), TAMANHOS)
+
+        assert (resultado.largura, resultado.altura) == (1200, 800)
+        gps = resultado.metadados["gps"]
+        assert gps["latitude"] == pytest.approx(-12.971400, abs=1e-6)
+        assert gps["longitude"] == pytest.approx(-38.501400, abs=1e-6)
+        assert gps["altitude_m"] == pytest.approx(98.5)
+        assert resultado.metadados["camera"] == "FC3411"
+        assert Image.open(io.BytesIO(resultado.derivados["miniatura"])).size == (64, 43)
+        assert Image.open(io.BytesIO(resultado.derivados["previa"])).size == (400, 267)
+
+    def test_aplica_orientacao_exif(self, tmp_path):
+        caminho = tmp_path / "retrato.jpg"
+        caminho.write_bytes(_jpeg_de_drone(orientacao=6))  # Girada 90°
+
+        resultado = processar_imagem(str(caminho), TAMANHOS)
+
+        assert Image.open(io.BytesIO(resultado.derivados["previa"])).size == (267, 400)
+
+    def test_xmp_dji(self):
+        xmp = (
+            b'<rdf:Description drone-dji:AbsoluteAltitude="+152.31" '
+            b'drone-dji:RelativeAltitude="+60.10" drone-dji:GimbalPitchDegree="-90.00"/>'
+        )
+        assert extrair_xmp_drone(xmp) == {
+            "altitude_absoluta_m": 152.31,
+            "altitude_relativa_m": 60.10,
+            "gimbal_pitch_graus": -90.0,
+        }
+        assert extrair_xmp_drone(None) == {}
+
+
+class TestIngestaoImagemService:
+    """Testes do IngestaoImagemService"""
+
+    @pytest.fixture
+    def storage(self, tmp_path):
+        return LocalStorageBackend(str(tmp_path / "uploads"))
+
+    def _service(self, storage, linhas):
+        sessao = MagicMock()
+        sessao.query.return_value.filter.return_value.all.return_value = linhas
+        service = IngestaoImagemService(fabrica_sessao=lambda: sessao, storage=storage, executor=ThreadPoolExecutor(2))
+        service.tamanhos = TAMANHOS
+        service.sessao = sessao
+        return service
+
+    def _gravar(self, storage, chave, conteudo):
+        async def gravar():
+            escrita = await storage.abrir_escrita(chave)
+            await escrita.escrever(conteudo)
+            await escrita.concluir()
+        asyncio.run(gravar())
+
+    def test_processa_cada_chave_uma_vez_e_atualiza_todos_os_arquivos(self, storage):
+        self._gravar(storage, "conteudo/aa/bb/foto", _jpeg_de_drone())
+        # Mesma imagem replicada em 3 fiscalizações pelo sobrevoo em lote
+        service = self._service(storage, [(1, "conteudo/aa/bb/foto", 10), (2, "conteudo/aa/bb/foto", 20), (3, "conteudo/aa/bb/foto", 30)])
+
+        assert asyncio.run(service.processar(["conteudo/aa/bb/foto"])) == 3
+
+        parametros = service.sessao.execute.call_args[0][1]
+        assert [p["b_id"] for p in parametros] == [1, 2, 3]
+        metadados = parametros[0]["b_metadados"]
+        assert metadados["ingestao"] == "concluida"
+        assert metadados["derivados"]["miniatura"] == chave_derivado("conteudo/aa/bb/foto", "miniatura")
+        assert storage.caminho(metadados["derivados"]["miniatura"]).stat().st_size > 0
+        service.sessao.commit.assert_called_once()
+
+    def test_imagem_invalida_registra_erro(self, storage):
+        self._gravar(storage, "conteudo/cc/dd/corrompida", b"isto nao e um jpeg")
+        service = self._service(storage, [(9, "conteudo/cc/dd/corrompida", 10)])
+
+        asyncio.run(service.processar(["conteudo/cc/dd/corrompida"]))
+
+        metadados = service.sessao.execute.call_args[0][1][0]["b_metadados"]
+        assert metadados["ingestao"] == "erro"
+        assert metadados["ingestao_erro"]
+
+    def test_banco_acessado_fora_do_event_loop(self, storage):
+        self._gravar(storage, "conteudo/aa/bb/foto", _jpeg_de_drone())
+        service = self._service(storage, [(1, "conteudo/aa/bb/foto", 10)])
+        sessao, threads = service.sessao, []
+        service.fabrica_sessao = lambda: threads.append(threading.get_ident()) or sessao
+
+        asyncio.run(service.processar(["conteudo/aa/bb/foto"]))
+
+        # Leitura do lote/índice e UPDATE final: nenhum na thread do loop (a da API)
+        assert len(threads) == 2
+        assert threading.get_ident() not in threads
@@ -0,0 +1,266 @@
+"""
+Testes unitários dos lotes de análise de IA: agrupamento de pedidos de várias
+fiscalizações, distribuição das detecções de volta a cada resultado e reuso do
+cluster quente do Skypilot.
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.geobot_plataforma_backend.core import skypilot_service
+from src.geobot_plataforma_backend.core.skypilot_service import SkypilotIAService
+from src.geobot_plataforma_backend.domain.service.analise_ia_service import (
+    AnaliseIAService,
+    AnalisePendente,
+    agrupar_em_lotes,
+)
+from src.geobot_plataforma_backend.domain.service.executores_ia import ExecutorIA
+
+AGORA = datetime(2025, 11, 22, 9, 0, tzinfo=timezone.utc)
+
+
+def _pendente(resultado_id, imagens, minutos_atras=0):
+    return AnalisePendente(
+        resultado_id,
+        AGORA - timedelta(minutes=minutos_atras),
+        tuple(range(resultado_id * 100, resultado_id * 100 + imagens)),
+    )
+
+
+class TestAgruparEmLotes:
+    """Testes da regra de tamanho/idade dos lotes"""
+
+    def _ids(self, lotes):
+        return [[p.resultado_id for p in lote] for lote in lotes]
+
+    def test_poucas_imagens_recentes_continuam_acumulando(self):
+        assert agrupar_em_lotes([_pendente(1, 10), _pendente(2, 20)], 100, 300, AGORA) == []
+
+    def test_lote_cheio_sai_e_o_resto_espera(self):
+        pendentes = [_pendente(1, 60), _pendente(2, 30), _pendente(3, 30), _pendente(4, 20)]
+
+        assert self._ids(agrupar_em_lotes(pendentes, 100, 300, AGORA)) == [[1, 2]]
+
+    def test_pedido_antigo_libera_lote_incompleto(self):
+        pendentes = [_pendente(1, 10, minutos_atras=6), _pendente(2, 20)]
+
+        assert self._ids(agrupar_em_lotes(pendentes, 100, 300, AGORA)) == [[1, 2]]
+
+    def test_pedido_maior_que_o_lote_vai_sozinho(self):
+        pendentes = [_pendente(1, 250), _pendente(2, 120), _pendente(3, 10)]
+
+        assert self._ids(agrupar_em_lotes(pendentes, 100, 300, AGORA)) == [[1], [2]]
+
+
+class ExecutorFalso(ExecutorIA):
+    """Devolve uma detecção por imagem e registra cada chamada"""
+
+    modelo = "yolov8n.pt"
+
+    def __init__(self):
+        self.chamadas = []
+
+    async def analisar(self, imagens, progresso, identificador):
+        self.chamadas.append([i.arquivo_id for i in imagens])
+        return {i.arquivo_id: [{"classe_nome": "buraco", "confianca": 0.7}] for i in imagens}
+
+
+class TestProcessarLote:
+    """Testes do processamento de um job com pedidos de várias fiscalizações"""
+
+    def _db(self, resultados, arquivos):
+        db = MagicMock()
+        db.query.return_value.filter.return_value.all.return_value = resultados
+        db.query.return_value.filter.return_value.order_by.return_value.all.return_value = arquivos
+        return db
+
+    def test_uma_inferencia_e_deteccoes_devolvidas_a_cada_resultado(self):
+        resultados = [SimpleNamespace(id=1), SimpleNamespace(id=2)]
+        db = self._db(resultados, [(10, "a"), (11, "b"), (20, "c")])
+        executor = ExecutorFalso()
+        payload = {"resultados": [
+            {"resultado_id": 1, "arquivo_ids": [10, 11]},
+            {"resultado_id": 2, "arquivo_ids": [20]},
+        ]}
+
+        resumo = asyncio.run(AnaliseIAService(db, executor=executor).processar(payload, lambda p, m: None))
+
+        assert executor.chamadas == [[10, 11, 20]]
+        assert resumo == {"resultados": 2, "imagens": 3, "deteccoes": 3}
+        assert [d["arquivo_id"] for d in resultados[0].deteccoes] == [10, 11]
+        assert [d["arquivo_id"] for d in resultados[1].deteccoes] == [20]
+        assert all(r.status_processamento == "concluído" for r in resultados)
+        assert resultados[0].tempo_processamento_segundos == pytest.approx(
+            2 * resultados[1].tempo_processamento_segundos
+        )
+
+    def test_resultado_sem_imagens_restantes_fica_com_erro(self):
+        resultados = [SimpleNamespace(id=1), SimpleNamespace(id=2)]
+        db = self._db(resultados, [(10, "a")])
+        payload = {"resultados": [
+            {"resultado_id": 1, "arquivo_ids": [10]},
+            {"resultado_id": 2, "arquivo_ids": [20]},  # Arquivo apagado antes do lote rodar
+        ]}
+
+        asyncio.run(AnaliseIAService(db, executor=ExecutorFalso()).processar(payload, lambda p, m: None))
+
+        assert resultados[0].status_processamento == "concluído"
+        assert resultados[1].status_processamento == "erro"
+
+
+class TestAgendarLotes:
+    """Testes da montagem de lotes pelos workers"""
+
+    def test_outro_worker_montando_lotes(self):
+        db = MagicMock()
+        db.execute.return_value.scalar.return_value = False
+
+        assert AnaliseIAService(db).agendar() == []
+        db.rollback.assert_called_once()
+
+    def test_enfileira_um_job_por_lote_e_vincula_os_resultados(self, monkeypatch):
+        db = MagicMock()
+        db.execute.return_value.scalar.return_value = True
+        service = AnaliseIAService(db)
+        service.lote_max_imagens, service.lote_espera_max_segundos = 3, 300
+        agora = datetime.now(timezone.utc)
+        pendentes = [AnalisePendente(1, agora, (100, 101)), AnalisePendente(2, agora, (200,)),
+                     AnalisePendente(3, agora, (300,))]
+        monkeypatch.setattr(service, "_pendentes", lambda: pendentes)
+
+        jobs = service.agendar()
+
+        assert len(jobs) == 1
+        assert jobs[0].payload == {"resultados": [
+            {"resultado_id": 1, "arquivo_ids": [100, 101]},
+            {"resultado_id": 2, "arquivo_ids": [200]},
+        ]}
+        vinculo = db.execute.call_args_list[-1][0][0]
+        assert str(vinculo).startswith("UPDATE geobot.resultados_analise_ia SET job_id")
+        db.commit.assert_called_once()
+
+
+class ProcessoFalso:
+    """Processo do `sky` com a saída informada"""
+
+    def __init__(self, linhas, codigo=0):
+        self.returncode = None
+        self._codigo = codigo
+
+        async def saida():
+            for linha in linhas:
+                yield (linha + "\n").encode()
+
+        self.stdout = saida()
+
+    async def wait(self):
+        self.returncode = self._codigo
+        return self._codigo
+
+    def kill(self):
+        self.returncode = -9
+
+
+class TestClusterQuente:
+    """Testes do reuso do cluster compartilhado entre lotes"""
+
+    @pytest.fixture
+    def comandos(self, monkeypatch):
+        comandos, respostas = [], []
+
+        async def executar(*comando, **kwargs):
+            comandos.append(comando[:2])
+            return respostas.pop(0)
+
+        monkeypatch.setattr(skypilot_service.asyncio, "create_subprocess_exec", executar)
+        return comandos, respostas
+
+    def _sucesso(self):
+        return ProcessoFalso(["Job ID: 4", "PROGRESSO 1/1", 'RESULTADO_JSON {"7": []}'])
+
+    def _status(self, estado):
+        if estado is None:
+            return ProcessoFalso(["Cluster(s) not found: geobot-ia."])
+        return ProcessoFalso([
+            "NAME       LAUNCHED    RESOURCES                 STATUS   AUTOSTOP   COMMAND",
+            f"geobot-ia  1 hr ago    1x Azure(Standard_NC6)    {estado}       15m (down) sky exec geobot-ia",
+        ])
+
+    def _analisar(self, service):
+        return asyncio.run(service.executar_analise(
+            "geobot-ia", [{"arquivo_id": 7, "url": "https://x/7"}], ociosidade_minutos=15
+        ))
+
+    def test_primeiro_lote_sobe_o_cluster_e_os_seguintes_reusam(self, comandos):
+        executados, respostas = comandos
+        respostas.extend([self._status(None), self._sucesso(), self._sucesso()])
+        service = SkypilotIAService()
+
+        assert self._analisar(service) == {"7": []}
+        assert self._analisar(service) == {"7": []}
+        assert executados == [("sky", "status"), ("sky", "launch"), ("sky", "exec")]
+
+    def test_cluster_subido_por_outro_worker_e_reusado(self, comandos):
+        executados, respostas = comandos
+        respostas.extend([self._status("UP"), self._sucesso()])
+
+        assert self._analisar(SkypilotIAService()) == {"7": []}
+        assert executados == [("sky", "status"), ("sky", "exec")]
+
+    def test_cluster_derrubado_por_ociosidade_e_relancado(self, comandos):
+        executados, respostas = comandos
+        respostas.extend([
+            self._status(None),
+            self._sucesso(),
+            ProcessoFalso(["Cluster geobot-ia não existe"], codigo=1),
+            self._status("STOPPED"),
+            self._sucesso(),
+        ])
+        service = SkypilotIAService()
+
+        self._analisar(service)
+        assert self._analisar(service) == {"7": []}
+        assert executados == [
+            ("sky", "status"), ("sky", "launch"), ("sky", "exec"), ("sky", "status"), ("sky", "launch"),
+        ]
+
+    def test_falha_do_job_no_cluster_nao_relanca(self, comandos):
+        executados, respostas = comandos
+        respostas.extend([
+            self._status(None), self._sucesso(),
+            ProcessoFalso(["Job ID: 5", "PROGRESSO 1/2", "Traceback"], codigo=1),
+        ])
+        service = SkypilotIAService()
+
+        self._analisar(service)
+        with pytest.raises(RuntimeError, match="exec terminou com código 1"):
+            self._analisar(service)
+        assert executados == [("sky", "status"), ("sky", "launch"), ("sky", "exec")]
+
+    def test_falha_antes_do_job_com_cluster_no_ar_nao_relanca(self, comandos):
+        executados, respostas = comandos
+        respostas.extend([
+            self._status("UP"),
+            ProcessoFalso(["sky.exceptions.ResourcesUnavailableError: GPU ocupada"], codigo=1),
+            self._status("UP"),
+        ])
+
+        with pytest.raises(RuntimeError, match="exec terminou com código 1") as erro:
+            self._analisar(SkypilotIAService())
+        assert type(erro.value) is RuntimeError
+        assert executados == [("sky", "status"), ("sky", "exec"), ("sky", "status")]
+
+    def test_status_ilegivel_nao_relanca(self, comandos):
+        executados, respostas = comandos
+        respostas.extend([
+            self._status("UP"),
+            ProcessoFalso(["Cluster geobot-ia não existe"], codigo=1),
+            ProcessoFalso(["Erro de rede"], codigo=1),
+        ])
+
+        with pytest.raises(RuntimeError, match="exec terminou com código 1"):
+            self._analisar(SkypilotIAService())
+        assert executados == [("sky", "status"), ("sky", "exec"), ("sky", "status")]
@@ -0,0 +1,73 @@
+"""
+Testes unitários do hub de versões e do long-poll de progresso.
+"""
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+from src.geobot_plataforma_backend.api.routers import etapa_fiscalizacao_router as router
+from src.geobot_plataforma_backend.core.notificacoes import HubVersoes
+from src.geobot_plataforma_backend.domain.service import etapa_fiscalizacao_service as modulo
+
+
+class TestHubVersoes:
+    """Testes do HubVersoes"""
+
+    def test_publicacao_de_outra_thread_acorda_espera(self):
+        hub = HubVersoes()
+
+        async def cenario():
+            threading.Timer(0.05, hub.publicar, args=("f1",)).start()
+            inicio = time.monotonic()
+            versao = await hub.aguardar("f1", 0, timeout=5)
+            return versao, time.monotonic() - inicio
+
+        versao, duracao = asyncio.run(cenario())
+        assert versao == 1
+        assert duracao < 1
+        assert hub.aguardando("f1") == 0
+
+    def test_timeout_devolve_mesma_versao(self):
+        hub = HubVersoes()
+        assert asyncio.run(hub.aguardar("f1", 0, timeout=0.01)) == 0
+        assert hub.aguardando("f1") == 0
+
+    def test_versao_ja_diferente_retorna_sem_esperar(self):
+        hub = HubVersoes()
+        hub.publicar("f1")
+        assert asyncio.run(hub.aguardar("f1", 0, timeout=5)) == 1
+
+    def test_publicar_sem_espera_nao_falha(self):
+        hub = HubVersoes()
+        assert hub.publicar("x") == 1
+        assert hub.publicar("x") == 2
+
+
+class TestLongPollProgresso:
+    """Testes do endpoint de progresso com `desde`"""
+
+    def _progresso(self, percentual):
+        return modulo.montar_progresso(1, [], "SOBREVOO", percentual, 0)
+
+    def test_responde_quando_progresso_muda(self):
+        respostas = [self._progresso(10.0), self._progresso(20.0)]
+        versao_inicial = modulo.versao_progresso(respostas[0])
+
+        async def cenario():
+            threading.Timer(0.05, modulo.invalidar_progresso, args=(1,)).start()
+            return await router.obter_progresso(1, desde=versao_inicial, timeout=5, current_user=None, db=MagicMock())
+
+        with patch.object(modulo.EtapaFiscalizacaoService, "obter_progresso_completo", side_effect=respostas):
+            resultado = asyncio.run(cenario())
+
+        assert resultado["progresso_geral_percentual"] > 10.0 / 6
+        assert resultado["versao"] != versao_inicial
+
+    def test_timeout_sem_mudanca(self):
+        progresso = self._progresso(10.0)
+        versao = modulo.versao_progresso(progresso)
+        with patch.object(modulo.EtapaFiscalizacaoService, "obter_progresso_completo", return_value=progresso):
+            resultado = asyncio.run(router.obter_progresso(1, desde=versao, timeout=0.05, current_user=None, db=MagicMock()))
+
+        assert resultado["versao"] == versao
@@ -0,0 +1,57 @@
+"""
+Testes unitários dos cursores de paginação por chave e da listagem paginada
+de "minhas fiscalizações".
+"""
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.geobot_plataforma_backend.core.paginacao import codificar_cursor, decodificar_cursor
+from src.geobot_plataforma_backend.domain.entity.enums import StatusFiscalizacao
+from src.geobot_plataforma_backend.domain.service.fiscalizacao_service import FiscalizacaoService
+
+
+class TestCursorPaginacao:
+    """Testes de codificação e decodificação de cursores"""
+
+    def test_ida_e_volta(self):
+        cursor = codificar_cursor(0, "2025-11-15T09:00:00+00:00", 42)
+
+        assert "=" not in cursor
+        assert decodificar_cursor(cursor, 3) == [0, "2025-11-15T09:00:00+00:00", 42]
+
+    def test_cursor_malformado(self):
+        with pytest.raises(ValueError):
+            decodificar_cursor("não-é-base64!!", 3)
+
+    def test_quantidade_de_campos_diferente(self):
+        with pytest.raises(ValueError):
+            decodificar_cursor(codificar_cursor(1, 2), 3)
+
+
+class TestListarMinhasFiscalizacoes:
+    """Testes da consulta paginada de "minhas fiscalizações\""""
+
+    def test_pagina_escolhida_pelas_atribuicoes_do_usuario(self):
+        db = MagicMock()
+        service = FiscalizacaoService(db)
+        service.usuario_repository = MagicMock()
+        service.usuario_repository.buscar_por_id.return_value = SimpleNamespace(id=5, ativo=True)
+        consulta = db.query.return_value.options.return_value
+        consulta.filter.return_value.order_by.return_value.all.return_value = [
+            SimpleNamespace(id=i, status=StatusFiscalizacao.AGUARDANDO, updated_at=datetime(2025, 11, 15))
+            for i in (9, 8, 7)
+        ]
+
+        linhas, cursor = service.listar_minhas_fiscalizacoes(5, limit=2, resumo=True)
+
+        assert [f.id for f in linhas] == [9, 8]
+        assert decodificar_cursor(cursor, 3) == [0, "2025-11-15T00:00:00", 8]
+        sql = str(consulta.filter.call_args[0][0].compile(dialect=postgresql.dialect()))
+        assert sql.startswith("geobot.fiscalizacoes.id IN (SELECT geobot.fiscalizacoes.id")
+        assert "JOIN geobot.usuario_fiscalizacao" in sql
+        assert "WHERE geobot.usuario_fiscalizacao.usuario_id = %(usuario_id_1)s" in sql
+        assert sql.endswith("LIMIT %(param_3)s)")
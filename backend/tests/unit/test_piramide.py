@@ -0,0 +1,139 @@
+"""
+Testes unitários da pirâmide de tiles deep zoom (geração, ingestão e entrega com cache).
+"""
+import asyncio
+import io
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import pytest
+from PIL import Image
+
+from src.geobot_plataforma_backend.core.piramide import (
+    descritor_dzi,
+    gerar_piramide,
+    grade_nivel,
+    numero_niveis,
+    tamanho_nivel,
+)
+from src.geobot_plataforma_backend.core.storage import LocalStorageBackend
+from src.geobot_plataforma_backend.domain.service import piramide_service
+from src.geobot_plataforma_backend.domain.service.ingestao_imagem_service import (
+    IngestaoImagemService,
+    prefixo_piramide,
+)
+from src.geobot_plataforma_backend.domain.service.piramide_service import PiramideService
+
+
+def _jpeg(largura, altura) -> bytes:
+    saida = io.BytesIO()
+    Image.new("RGB", (largura, altura), (90, 140, 70)).save(saida, format="JPEG")
+    return saida.getvalue()
+
+
+class TestGerarPiramide:
+    """Testes de core.piramide"""
+
+    def test_niveis_seguem_o_dzi(self):
+        assert numero_niveis(1000, 600) == 11
+        assert tamanho_nivel(1000, 600, 10) == (1000, 600)
+        assert tamanho_nivel(1000, 600, 9) == (500, 300)
+        assert tamanho_nivel(1000, 600, 1) == (2, 2)
+        assert tamanho_nivel(1000, 600, 0) == (1, 1)
+
+    def test_gera_tiles_com_sobreposicao(self, tmp_path):
+        caminho = tmp_path / "foto.jpg"
+        caminho.write_bytes(_jpeg(1000, 600))
+
+        resumo = gerar_piramide(str(caminho), str(tmp_path / "tiles"), tamanho_tile=254)
+
+        assert resumo["niveis"] == 11
+        esperado = sum(
+            colunas * linhas
+            for colunas, linhas in (grade_nivel(1000, 600, nivel, 254) for nivel in range(11))
+        )
+        assert resumo["tiles"] == esperado
+        for nivel in range(11):
+            largura, altura = tamanho_nivel(1000, 600, nivel)
+            colunas, linhas = grade_nivel(1000, 600, nivel, 254)
+            for coluna in range(colunas):
+                for linha in range(linhas):
+                    assert (tmp_path / "tiles" / str(nivel) / f"{coluna}_{linha}.jpg").exists()
+        # Tile interno: 254 + 1 px de cada lado; a borda direita só tem a sobreposição da esquerda
+        assert Image.open(tmp_path / "tiles" / "10" / "1_1.jpg").size == (256, 256)
+        assert Image.open(tmp_path / "tiles" / "10" / "3_0.jpg").size == (1000 - 762 + 1, 255)
+        assert 'Overlap="1" TileSize="254"' in descritor_dzi(resumo)
+        assert '<Size Width="1000" Height="600"/>' in descritor_dzi(resumo)
+
+
+class TestPiramideService:
+    """Testes da ingestão da pirâmide e do PiramideService"""
+
+    @pytest.fixture
+    def storage(self, tmp_path):
+        return LocalStorageBackend(str(tmp_path / "uploads"))
+
+    @pytest.fixture(autouse=True)
+    def limpar_cache(self):
+        piramide_service._cache_tiles.limpar()
+        piramide_service._cache_piramides.limpar()
+
+    def _ingerir(self, storage, chave, conteudo):
+        async def gravar():
+            escrita = await storage.abrir_escrita(chave)
+            await escrita.escrever(conteudo)
+            await escrita.concluir()
+        asyncio.run(gravar())
+
+        sessao = MagicMock()
+        sessao.query.return_value.filter.return_value.all.return_value = [(7, chave, 10)]
+        service = IngestaoImagemService(fabrica_sessao=lambda: sessao, storage=storage, executor=ThreadPoolExecutor(1))
+        service.piramide_min_pixels = 500_000
+        asyncio.run(service.processar([chave]))
+        return sessao.execute.call_args[0][1][0]["b_metadados"]
+
+    def test_ingestao_grava_piramide_de_imagem_grande(self, storage):
+        metadados = self._ingerir(storage, "conteudo/ee/ff/orto", _jpeg(1000, 600))
+
+        piramide = metadados["piramide"]
+        assert piramide["prefixo"] == prefixo_piramide("conteudo/ee/ff/orto")
+        assert piramide["niveis"] == 11
+        assert storage.caminho(f"{piramide['prefixo']}/10/3_2.jpg").stat().st_size > 0
+        assert storage.caminho(f"{piramide['prefixo']}/0/0_0.jpg").stat().st_size > 0
+
+    def test_imagem_pequena_nao_gera_piramide(self, storage):
+        metadados = self._ingerir(storage, "conteudo/11/22/foto", _jpeg(400, 300))
+
+        assert metadados["ingestao"] == "concluida"
+        assert "piramide" not in metadados
+
+    def test_tile_e_servido_do_cache_depois_da_primeira_leitura(self, storage):
+        metadados = self._ingerir(storage, "conteudo/33/44/orto", _jpeg(1000, 600))
+        db = MagicMock()
+        db.query.return_value.filter.return_value.first.return_value = MagicMock(metadados=metadados)
+        service = PiramideService(db, storage=storage)
+
+        tile = asyncio.run(service.obter_tile(7, 10, 1, 1))
+        assert Image.open(io.BytesIO(tile)).size == (256, 256)
+
+        storage.caminho(f"{metadados['piramide']['prefixo']}/10/1_1.jpg").unlink()
+        assert asyncio.run(service.obter_tile(7, 10, 1, 1)) == tile
+        db.query.assert_called_once()
+
+    def test_tile_fora_da_grade(self, storage):
+        metadados = self._ingerir(storage, "conteudo/55/66/orto", _jpeg(1000, 600))
+        db = MagicMock()
+        db.query.return_value.filter.return_value.first.return_value = MagicMock(metadados=metadados)
+        service = PiramideService(db, storage=storage)
+
+        with pytest.raises(ValueError, match="não encontrado"):
+            asyncio.run(service.obter_tile(7, 10, 4, 0))
+        with pytest.raises(ValueError, match="não encontrado"):
+            asyncio.run(service.obter_tile(7, 11, 0, 0))
+
+    def test_arquivo_sem_piramide(self, storage):
+        db = MagicMock()
+        db.query.return_value.filter.return_value.first.return_value = MagicMock(metadados={'ingestao': 'concluida'})
+
+        with pytest.raises(ValueError, match="não encontrada"):
+            PiramideService(db, storage=storage).obter_piramide(8)
@@ -0,0 +1,106 @@
+"""
+Testes unitários da gravação coalescida de progresso.
+"""
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.geobot_plataforma_backend.domain.service.etapa_fiscalizacao_service import EtapaFiscalizacaoService
+from src.geobot_plataforma_backend.domain.service.progresso_coalescido import CoalescedorProgresso
+
+
+def _etapa(progresso, resultado=None):
+    return SimpleNamespace(id=1, fiscalizacao_id=10, progresso_percentual=progresso, resultado=resultado)
+
+
+@pytest.fixture
+def atualizar():
+    with patch.object(
+        EtapaFiscalizacaoService, "atualizar_progresso",
+        side_effect=lambda etapa_id, progresso, resultado=None: _etapa(progresso, resultado),
+    ) as mock:
+        yield mock
+
+
+@pytest.fixture
+def coalescedor():
+    sessao = MagicMock()
+    c = CoalescedorProgresso(fabrica_sessao=lambda: sessao, intervalo_segundos=60)
+    c._garantir_thread = MagicMock()  # ciclos controlados pelo teste
+    c.sessao = sessao
+    return c
+
+
+class TestCoalescedorProgresso:
+    """Testes do CoalescedorProgresso"""
+
+    def test_primeira_grava_e_seguintes_ficam_em_memoria(self, coalescedor, atualizar):
+        _, persistido = coalescedor.registrar(MagicMock(), 1, 5.0)
+        assert persistido
+
+        for p in range(6, 60):
+            etapa, persistido = coalescedor.registrar(MagicMock(), 1, float(p))
+            assert not persistido
+        assert etapa["progresso_percentual"] == 59.0
+        assert atualizar.call_count == 1
+
+    def test_descarregar_grava_apenas_o_ultimo_valor_em_lote(self, coalescedor, atualizar):
+        coalescedor.registrar(MagicMock(), 1, 5.0)
+        coalescedor.registrar(MagicMock(), 1, 30.0)
+        coalescedor.registrar(MagicMock(), 1, 40.0, resultado={"imagens": 4})
+
+        with patch("src.geobot_plataforma_backend.domain.service.progresso_coalescido.invalidar_progresso") as invalidar:
+            assert coalescedor.descarregar() == 1
+            assert coalescedor.descarregar() == 0
+
+        parametros = coalescedor.sessao.execute.call_args[0][1]
+        assert parametros == [{"b_id": 1, "b_progresso": 40.0, "b_resultado": {"imagens": 4}}]
+        coalescedor.sessao.commit.assert_called_once()
+        invalidar.assert_called_once_with(10)
+
+    def test_update_em_lote_so_avanca_o_progresso(self, coalescedor, atualizar):
+        # Outro processo pode ter gravado um valor maior depois do que ficou em memória
+        coalescedor.registrar(MagicMock(), 1, 5.0)
+        with patch("src.geobot_plataforma_backend.domain.service.progresso_coalescido.invalidar_progresso"):
+            coalescedor.registrar(MagicMock(), 1, 30.0)
+            coalescedor.descarregar()
+            coalescedor.registrar(MagicMock(), 1, 30.0, resultado={"imagens": 3})
+            coalescedor.descarregar()
+
+        sem_resultado, com_resultado = (
+            str(chamada[0][0].compile(dialect=postgresql.dialect()))
+            for chamada in coalescedor.sessao.execute.call_args_list
+        )
+        assert "geobot.etapas_fiscalizacao.progresso_percentual < %(b_progresso)s" in sem_resultado
+        # Resultado novo com o mesmo percentual ainda grava
+        assert "geobot.etapas_fiscalizacao.progresso_percentual <= %(b_progresso)s" in com_resultado
+
+    def test_cem_por_cento_e_erro_gravam_na_hora(self, coalescedor, atualizar):
+        coalescedor.registrar(MagicMock(), 1, 5.0)
+        _, persistido = coalescedor.registrar(MagicMock(), 1, 100.0)
+        assert persistido
+
+        with patch.object(EtapaFiscalizacaoService, "registrar_erro", return_value=_etapa(50.0)) as registrar_erro:
+            _, persistido = coalescedor.registrar(MagicMock(), 1, 50.0, erro="GPU indisponível")
+        assert persistido
+        registrar_erro.assert_called_once_with(1, "GPU indisponível")
+        assert atualizar.call_count == 3
+
+    def test_falha_na_gravacao_devolve_pendentes(self, coalescedor, atualizar):
+        coalescedor.registrar(MagicMock(), 1, 5.0)
+        coalescedor.registrar(MagicMock(), 1, 20.0)
+        coalescedor.sessao.execute.side_effect = RuntimeError("banco fora")
+
+        assert coalescedor.descarregar() == 0
+        coalescedor.sessao.rollback.assert_called_once()
+
+        coalescedor.sessao.execute.side_effect = None
+        with patch("src.geobot_plataforma_backend.domain.service.progresso_coalescido.invalidar_progresso"):
+            assert coalescedor.descarregar() == 1
+
+    def test_etapa_inexistente_propaga_erro(self, coalescedor):
+        with patch.object(EtapaFiscalizacaoService, "atualizar_progresso", side_effect=ValueError("Etapa 9 não encontrada")):
+            with pytest.raises(ValueError):
+                coalescedor.registrar(MagicMock(), 9, 10.0)
@@ -0,0 +1,88 @@
+"""
+Testes unitários do cálculo de progresso agregado das fiscalizações.
+"""
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.geobot_plataforma_backend.domain.entity.etapa_fiscalizacao_enum import EtapaFiscalizacaoEnum
+from src.geobot_plataforma_backend.domain.service import etapa_fiscalizacao_service as modulo
+from src.geobot_plataforma_backend.domain.service.etapa_fiscalizacao_service import (
+    EtapaFiscalizacaoService,
+    montar_progresso,
+)
+
+
+@pytest.fixture(autouse=True)
+def cache_limpo():
+    modulo._cache_progresso.limpar()
+    yield
+    modulo._cache_progresso.limpar()
+
+
+def _db_com_linhas(*linhas):
+    db = MagicMock()
+    db.execute.return_value.all.return_value = list(linhas)
+    return db
+
+
+class TestMontarProgresso:
+    """Testes da montagem do payload a partir das colunas agregadas"""
+
+    def test_sem_etapas(self):
+        progresso = montar_progresso(1, [], None, None, 0)
+
+        assert progresso["etapa_atual"] is None
+        assert progresso["progresso_geral_percentual"] == 0.0
+        assert progresso["etapas_pendentes"] == [e.value for e in EtapaFiscalizacaoEnum]
+
+    def test_aceita_nome_do_enum_vindo_do_banco(self):
+        progresso = montar_progresso(1, ["SOBREVOO"], EtapaFiscalizacaoEnum.ABASTECIMENTO, 60.0, 3)
+
+        assert progresso["etapas_concluidas"] == ["sobrevoo"]
+        assert progresso["etapa_em_progresso"] == "abastecimento"
+        assert progresso["progresso_geral_percentual"] == pytest.approx(100 / 6 + 10)
+        assert "sobrevoo" not in progresso["etapas_pendentes"]
+        assert progresso["arquivos_carregados"] == 3
+
+
+class TestProgressoEmLote:
+    """Testes da consulta em lote com cache"""
+
+    def test_uma_query_para_varias_fiscalizacoes(self):
+        db = _db_com_linhas((1, [], "SOBREVOO", 0.0, 0), (2, ["SOBREVOO"], "ABASTECIMENTO", 50.0, 4))
+        service = EtapaFiscalizacaoService(db)
+
+        progresso = service.obter_progresso_em_lote([2, 1, 99, 2])
+
+        assert list(progresso) == [2, 1]
+        assert progresso[2]["arquivos_carregados"] == 4
+        assert db.execute.call_count == 1
+
+    def test_cache_evita_nova_query_e_invalidacao_refaz(self):
+        db = _db_com_linhas((1, [], "SOBREVOO", 0.0, 0))
+        service = EtapaFiscalizacaoService(db)
+
+        service.obter_progresso_completo(1)
+        service.obter_progresso_completo(1)
+        assert db.execute.call_count == 1
+
+        modulo.invalidar_progresso(1)
+        service.obter_progresso_completo(1)
+        assert db.execute.call_count == 2
+
+    def test_fiscalizacao_inexistente(self):
+        service = EtapaFiscalizacaoService(_db_com_linhas())
+        with pytest.raises(ValueError, match="não encontrada"):
+            service.obter_progresso_completo(42)
+
+    def test_atualizar_progresso_invalida_cache(self):
+        db = _db_com_linhas((7, [], "SOBREVOO", 0.0, 0))
+        service = EtapaFiscalizacaoService(db)
+        service.obter_progresso_completo(7)
+
+        etapa = MagicMock(fiscalizacao_id=7)
+        db.query.return_value.filter.return_value.first.return_value = etapa
+        service.atualizar_progresso(etapa_id=1, progresso_percentual=40.0)
+
+        assert modulo._cache_progresso.obter(7) is None
@@ -0,0 +1,63 @@
+"""
+Testes unitários da roteirização (vizinho mais próximo + 2-opt).
+"""
+import itertools
+
+import numpy as np
+
+from src.geobot_plataforma_backend.core.geo import matriz_haversine
+from src.geobot_plataforma_backend.domain.service.rota_service import (
+    comprimento_rota,
+    melhorar_2opt,
+    ordenar_visitas,
+)
+
+
+def _pontos(n, semente=7):
+    rng = np.random.default_rng(semente)
+    return matriz_haversine(rng.uniform(-13.0, -12.9, n), rng.uniform(-38.5, -38.4, n))
+
+
+class TestOrdenarVisitas:
+    """Testes da ordem de visita"""
+
+    def test_pontos_em_linha(self):
+        lon = np.array([0.0, 0.3, 0.1, 0.4, 0.2])
+        distancias = matriz_haversine(np.zeros(5), lon)
+
+        ordem = ordenar_visitas(distancias, com_origem=False, retornar=False)
+
+        assert lon[ordem].tolist() in ([0.0, 0.1, 0.2, 0.3, 0.4], [0.4, 0.3, 0.2, 0.1, 0.0])
+
+    def test_origem_e_sempre_a_primeira(self):
+        distancias = _pontos(8)
+
+        for retornar in (False, True):
+            ordem = ordenar_visitas(distancias, com_origem=True, retornar=retornar)
+            assert ordem[0] == 0
+            assert sorted(ordem.tolist()) == list(range(8))
+
+    def test_proximo_do_otimo(self):
+        distancias = _pontos(7)
+        ordem = ordenar_visitas(distancias, com_origem=True, retornar=False)
+
+        otimo = min(
+            comprimento_rota(np.array((0,) + p), distancias, ciclo=False)
+            for p in itertools.permutations(range(1, 7))
+        )
+        assert comprimento_rota(ordem, distancias, ciclo=False) <= otimo * 1.1
+
+
+class TestMelhorar2opt:
+    """Testes do refinamento 2-opt"""
+
+    def test_desfaz_cruzamento(self):
+        # Quadrado percorrido em "laço" (0, 2, 1, 3) cruza as diagonais
+        lat = np.array([0.0, 0.0, 0.1, 0.1])
+        lon = np.array([0.0, 0.1, 0.1, 0.0])
+        distancias = matriz_haversine(lat, lon)
+        cruzada = np.array([0, 2, 1, 3])
+
+        melhorada = melhorar_2opt(cruzada, distancias)
+
+        assert comprimento_rota(melhorada, distancias, ciclo=True) < comprimento_rota(cruzada, distancias, ciclo=True)
@@ -0,0 +1,182 @@
+"""
+Testes unitários do plano de voo em zigue-zague e do lote de sobrevoo.
+"""
+import asyncio
+import threading
+import io
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from src.geobot_plataforma_backend.core.cobertura import caminho_cobertura, comprimento_caminho
+from src.geobot_plataforma_backend.core.geo import desprojetar_km, pontos_em_poligono, projetar_km
+from src.geobot_plataforma_backend.core.storage import LocalStorageBackend
+from src.geobot_plataforma_backend.domain.entity.etapa_fiscalizacao_enum import EtapaFiscalizacaoEnum
+from src.geobot_plataforma_backend.domain.entity.sobrevoo_lote import StatusSobrevooLote
+from src.geobot_plataforma_backend.domain.service.sobrevoo_service import SobrevooService
+
+
+class UploadFalso:
+    """Imita a interface assíncrona de leitura do UploadFile"""
+
+    def __init__(self, conteudo: bytes):
+        self._buffer = io.BytesIO(conteudo)
+
+    async def read(self, n: int = -1) -> bytes:
+        return self._buffer.read(n)
+
+
+class TestCaminhoCobertura:
+    """Testes do caminho em zigue-zague"""
+
+    def test_retangulo_largo_varre_faixas_horizontais_alternadas(self):
+        caminho = caminho_cobertura([[0, 0], [1, 0], [1, 0.3], [0, 0.3]], 0.1)
+
+        assert np.allclose(caminho, [
+            [0, 0.05], [1, 0.05], [1, 0.15], [0, 0.15], [0, 0.25], [1, 0.25],
+        ])
+        assert comprimento_caminho(caminho) == pytest.approx(3.2)
+
+    def test_retangulo_alto_varre_no_eixo_maior(self):
+        caminho = caminho_cobertura([[0, 0], [0.3, 0], [0.3, 1], [0, 1]], 0.1)
+
+        assert len(caminho) == 6
+        assert np.allclose(caminho[0::2, 0], caminho[1::2, 0])  # trechos verticais
+
+    def test_todo_ponto_interno_fica_a_meia_faixa_do_caminho(self):
+        poligono = np.array([[0, 0], [2, 0.5], [1.5, 2], [0.2, 1.5]])
+        espacamento = 0.2
+        caminho = caminho_cobertura(poligono, espacamento)
+
+        rng = np.random.default_rng(1)
+        amostra = rng.uniform(0, 2, (2000, 2))
+        internos = amostra[pontos_em_poligono(amostra[:, 1], amostra[:, 0], poligono[:, ::-1])]
+        faixas = np.unique(np.round(caminho[:, 1], 9))
+        distancia = np.abs(internos[:, 1][:, None] - faixas[None, :]).min(axis=1)
+        assert (distancia <= espacamento / 2 + 1e-9).all()
+
+    def test_espacamento_invalido(self):
+        with pytest.raises(ValueError):
+            caminho_cobertura([[0, 0], [1, 0], [1, 1]], 0)
+
+
+class TestGeometria:
+    """Testes de projeção e ponto em polígono"""
+
+    def test_projecao_ida_e_volta(self):
+        lat = np.array([-12.97, -12.95])
+        lon = np.array([-38.50, -38.47])
+        ida = projetar_km(lat, lon, -12.96)
+        volta_lat, volta_lon = desprojetar_km(ida, -12.96)
+        assert np.allclose(volta_lat, lat) and np.allclose(volta_lon, lon)
+
+    def test_ponto_em_poligono_concavo(self):
+        # "U": o vão central não pertence ao polígono
+        poligono = [[0, 0], [0, 3], [3, 3], [3, 2], [1, 2], [1, 1], [3, 1], [3, 0]]
+        dentro = pontos_em_poligono([0.5, 2.0, 2.0], [1.5, 1.5, 2.5], poligono)
+        assert dentro.tolist() == [True, False, True]
+
+
+class TestSobrevooService:
+    """Testes do serviço de lotes de sobrevoo"""
+
+    def test_plano_de_voo_em_graus(self):
+        vertices = np.array([[-12.970, -38.510], [-12.970, -38.500], [-12.965, -38.500], [-12.965, -38.510]])
+        waypoints, distancia = SobrevooService.plano_de_voo(vertices, largura_faixa_m=100, sobreposicao=0.0)
+
+        assert len(waypoints) % 2 == 0
+        assert all(-12.970 <= lat <= -12.965 and -38.510 <= lon <= -38.500 for lat, lon in waypoints)
+        assert distancia > 0
+
+    def test_imagem_replicada_para_cada_abastecimento(self, tmp_path):
+        db = MagicMock()
+        service = SobrevooService(db, storage=LocalStorageBackend(str(tmp_path)))
+        lote = SimpleNamespace(id=5, status=StatusSobrevooLote.ABASTECIMENTO.value, fiscalizacao_ids=[1, 2, 3])
+        etapas = {
+            1: SimpleNamespace(id=11, fiscalizacao_id=1, etapa=EtapaFiscalizacaoEnum.ABASTECIMENTO, concluida_em=None),
+            2: SimpleNamespace(id=12, fiscalizacao_id=2, etapa=EtapaFiscalizacaoEnum.ABASTECIMENTO, concluida_em=None),
+            3: SimpleNamespace(id=13, fiscalizacao_id=3, etapa=EtapaFiscalizacaoEnum.ANALISE_IA, concluida_em=None),
+        }
+        with patch.object(service, '_verificar_usuario'), \
+                patch.object(service, 'obter_lote', return_value=lote), \
+                patch.object(service, '_etapas_atuais', return_value=etapas):
+            chave, tamanho, destinos = asyncio.run(service.registrar_imagem(
+                lote_id=5, usuario_id=1, upload=UploadFalso(b"jpeg" * 100), nome_arquivo="a.jpg",
+            ))
+
+        assert destinos == [1, 2]
+        assert tamanho == 400
+        assert service.storage.caminho(chave).read_bytes() == b"jpeg" * 100
+        linhas = db.execute.call_args[0][1]
+        assert [l['etapa_id'] for l in linhas] == [11, 12]
+        assert {l['url_blob'] for l in linhas} == {chave}
+        assert all(l['metadados']['sobrevoo_lote_id'] == 5 for l in linhas)
+        db.commit.assert_called_once()
+
+    def test_banco_da_imagem_fora_do_event_loop(self, tmp_path):
+        db = MagicMock()
+        service = SobrevooService(db, storage=LocalStorageBackend(str(tmp_path)))
+        lote = SimpleNamespace(id=5, status=StatusSobrevooLote.ABASTECIMENTO.value, fiscalizacao_ids=[1])
+        etapas = {1: SimpleNamespace(id=11, fiscalizacao_id=1, etapa=EtapaFiscalizacaoEnum.ABASTECIMENTO, concluida_em=None)}
+        threads = []
+        db.commit.side_effect = lambda: threads.append(threading.get_ident())
+        with patch.object(service, '_verificar_usuario', side_effect=lambda _: threads.append(threading.get_ident())), \
+                patch.object(service, 'obter_lote', return_value=lote), \
+                patch.object(service, '_etapas_atuais', return_value=etapas):
+            asyncio.run(service.registrar_imagem(5, 1, UploadFalso(b"jpeg"), "a.jpg"))
+
+        assert len(threads) == 2
+        assert threading.get_ident() not in threads
+
+    def test_concluir_voo_trava_o_lote_antes_do_status(self, tmp_path):
+        db = MagicMock()
+        service = SobrevooService(db, storage=LocalStorageBackend(str(tmp_path)))
+        consulta = db.query.return_value.options.return_value.filter.return_value
+        # Outra requisição concluiu o voo enquanto esta esperava o lock
+        consulta.with_for_update.return_value.first.return_value = SimpleNamespace(
+            id=5, status=StatusSobrevooLote.ABASTECIMENTO.value
+        )
+        with patch.object(service, '_verificar_usuario'):
+            with pytest.raises(ValueError, match="não pode ter o voo concluído"):
+                service.concluir_voo(5, 1)
+
+        consulta.with_for_update.assert_called_once_with()
+        db.rollback.assert_called_once()
+        db.execute.assert_not_called()
+
+    def test_imagem_exige_voo_concluido(self, tmp_path):
+        service = SobrevooService(MagicMock(), storage=LocalStorageBackend(str(tmp_path)))
+        lote = SimpleNamespace(id=5, status=StatusSobrevooLote.PLANEJADO.value, fiscalizacao_ids=[1])
+        with patch.object(service, '_verificar_usuario'), patch.object(service, 'obter_lote', return_value=lote):
+            with pytest.raises(ValueError, match="conclua o voo"):
+                asyncio.run(service.registrar_imagem(5, 1, UploadFalso(b"x"), "a.jpg"))
+
+    def test_planejar_abre_sobrevoo_das_pendentes_e_trava_as_fiscalizacoes(self, tmp_path):
+        db = MagicMock()
+        service = SobrevooService(db, storage=LocalStorageBackend(str(tmp_path)))
+        etapas = {
+            2: SimpleNamespace(id=12, fiscalizacao_id=2, etapa=EtapaFiscalizacaoEnum.PENDENTE, concluida_em=None),
+            3: SimpleNamespace(id=13, fiscalizacao_id=3, etapa=EtapaFiscalizacaoEnum.SOBREVOO, concluida_em="ontem"),
+        }
+        poligono = [[-12.970, -38.510], [-12.970, -38.500], [-12.965, -38.500], [-12.965, -38.510]]
+        with patch.object(service, '_verificar_usuario'), \
+                patch.object(service, '_fiscalizacoes_no_poligono', return_value=[1, 2, 3, 4]), \
+                patch.object(service, '_etapas_atuais', return_value=etapas), \
+                patch.object(service, '_em_lote_aberto', return_value={4}), \
+                patch.object(service, 'obter_lote', side_effect=lambda i: i):
+            _, ignoradas = service.planejar_lote(usuario_id=1, poligono=poligono)
+
+        assert ignoradas == [3, 4]
+        instrucoes = [c[0] for c in db.execute.call_args_list]
+        assert "FOR UPDATE" in str(instrucoes[0][0])
+        assert [l['fiscalizacao_id'] for l in instrucoes[1][1]] == [1, 2]
+        assert str(instrucoes[2][0]).startswith("UPDATE geobot.etapas_fiscalizacao")
+        novas = instrucoes[3][1]
+        assert [(l['fiscalizacao_id'], l['etapa']) for l in novas] == [
+            (1, EtapaFiscalizacaoEnum.SOBREVOO), (2, EtapaFiscalizacaoEnum.SOBREVOO),
+        ]
+        historico = instrucoes[4][1]
+        assert [(l['fiscalizacao_id'], l['valor_anterior']) for l in historico] == [(1, None), (2, "pendente")]
+        db.commit.assert_called_once()
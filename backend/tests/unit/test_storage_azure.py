@@ -0,0 +1,178 @@
+"""
+Testes unitários das transferências em blocos paralelos do backend Azure.
+
+Um container em memória faz o papel do Azure (ou do Azurite), com atrasos
+aleatórios para que as requisições paralelas terminem fora de ordem.
+"""
+import asyncio
+import hashlib
+import io
+import random
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.geobot_plataforma_backend.core.storage import AzureBlobStorageBackend, gravar_upload
+from src.geobot_plataforma_backend.core.storage import azure as azure_backend
+
+
+class BlobNaoEncontrado(Exception):
+    """Equivalente ao ResourceNotFoundError do SDK"""
+
+
+class ContainerFalso:
+    """Blobs confirmados, blocos pendentes e o pico de requisições simultâneas"""
+
+    def __init__(self, falhar_bloco=None):
+        self.blobs = {}
+        self.blocos = {}
+        self.em_voo = 0
+        self.pico = 0
+        self.faixas = []
+        self.falhar_bloco = falhar_bloco
+        self.aleatorio = random.Random(7)
+
+    async def _requisicao(self):
+        self.em_voo += 1
+        self.pico = max(self.pico, self.em_voo)
+        try:
+            await asyncio.sleep(self.aleatorio.random() / 500)
+        finally:
+            self.em_voo -= 1
+
+
+class BlobFalso:
+    """Imita os métodos assíncronos usados do BlobClient (azure.storage.blob.aio)"""
+
+    def __init__(self, container: ContainerFalso, nome: str):
+        self.container = container
+        self.nome = nome
+
+    async def stage_block(self, id_bloco, dados, length=None):
+        await self.container._requisicao()
+        if id_bloco == self.container.falhar_bloco:
+            raise ConnectionError("conexão perdida")
+        self.container.blocos[(self.nome, id_bloco)] = dados
+
+    async def commit_block_list(self, ids_blocos, content_settings=None):
+        self.container.blobs[self.nome] = b"".join(self.container.blocos.pop((self.nome, i)) for i in ids_blocos)
+
+    async def download_blob(self, offset, length, etag=None, match_condition=None):
+        if self.nome not in self.container.blobs:
+            raise BlobNaoEncontrado(self.nome)
+        conteudo = self.container.blobs[self.nome]
+        self.container.faixas.append((offset, length, etag))
+        faixa = conteudo[offset:offset + length]
+        container = self.container
+
+        async def readall():
+            await container._requisicao()
+            return faixa
+
+        return SimpleNamespace(
+            properties=SimpleNamespace(
+                content_range=f"bytes {offset}-{offset + len(faixa) - 1}/{len(conteudo)}",
+                etag=f'"{len(conteudo)}"',
+            ),
+            readall=readall,
+        )
+
+
+@pytest.fixture
+def sdk(monkeypatch):
+    """Nomes do SDK usados pelo backend, dispensando o pacote azure-storage-blob"""
+    monkeypatch.setattr(azure_backend, "ResourceNotFoundError", BlobNaoEncontrado, raising=False)
+    monkeypatch.setattr(azure_backend, "ContentSettings", MagicMock(), raising=False)
+    monkeypatch.setattr(azure_backend, "MatchConditions", MagicMock(), raising=False)
+
+
+def _backend(container: ContainerFalso, bloco_bytes=4, concorrencia=3) -> AzureBlobStorageBackend:
+    backend = AzureBlobStorageBackend.__new__(AzureBlobStorageBackend)
+    backend.container = "fiscalizacoes"
+    backend.bloco_bytes = bloco_bytes
+    backend.concorrencia = concorrencia
+    backend.blob_service_client = MagicMock()
+    backend.blob_service_client.get_blob_client.side_effect = lambda **kwargs: BlobFalso(container, kwargs["blob"])
+    return backend
+
+
+class UploadFalso:
+    """Imita a interface assíncrona de leitura do UploadFile"""
+
+    def __init__(self, conteudo: bytes):
+        self._buffer = io.BytesIO(conteudo)
+
+    async def read(self, n: int = -1) -> bytes:
+        return self._buffer.read(n)
+
+
+class TestEscritaParalela:
+    """Testes do envio de blocos em paralelo"""
+
+    def test_monta_o_blob_na_ordem_com_envios_limitados(self, sdk):
+        container = ContainerFalso()
+        conteudo = bytes(range(256)) * 4
+
+        resultado = asyncio.run(gravar_upload(_backend(container), UploadFalso(conteudo), "conteudo/aa/video", chunk_bytes=3))
+
+        assert container.blobs["conteudo/aa/video"] == conteudo
+        assert resultado.hash_sha256 == hashlib.sha256(conteudo).hexdigest()
+        assert container.pico == 3  # Paralelo, mas nunca além da concorrência
+        assert not container.blocos
+
+    def test_falha_em_um_bloco_aborta_sem_confirmar(self, sdk):
+        container = ContainerFalso(falhar_bloco=azure_backend._id_bloco(5))
+
+        with pytest.raises(ConnectionError):
+            asyncio.run(gravar_upload(_backend(container), UploadFalso(b"x" * 100), "conteudo/aa/video", chunk_bytes=7))
+
+        assert "conteudo/aa/video" not in container.blobs
+
+
+class TestLeituraParalela:
+    """Testes do download de faixas em paralelo"""
+
+    def _ler(self, backend, chave, chunk_bytes):
+        async def ler():
+            return [chunk async for chunk in backend.ler(chave, chunk_bytes)]
+        return asyncio.run(ler())
+
+    def test_entrega_os_chunks_em_ordem(self, sdk):
+        container = ContainerFalso()
+        conteudo = bytes(random.Random(1).getrandbits(8) for _ in range(1001))
+        container.blobs["conteudo/bb/foto"] = conteudo
+
+        chunks = self._ler(_backend(container, bloco_bytes=64, concorrencia=4), "conteudo/bb/foto", 10)
+
+        assert b"".join(chunks) == conteudo
+        assert max(len(c) for c in chunks) == 10
+        assert container.pico <= 4
+        # Uma requisição por faixa, todas presas à versão lida na primeira
+        assert len(container.faixas) == 16
+        assert {etag for _, _, etag in container.faixas[1:]} == {'"1001"'}
+
+    def test_faixa_do_blob(self, sdk):
+        container = ContainerFalso()
+        conteudo = bytes(range(256)) * 4
+        container.blobs["conteudo/bb/video"] = conteudo
+        backend = _backend(container, bloco_bytes=64, concorrencia=4)
+
+        async def ler():
+            return b"".join([c async for c in backend.ler("conteudo/bb/video", 10, inicio=100, tamanho=300)])
+
+        assert asyncio.run(ler()) == conteudo[100:400]
+        assert [(inicio, tamanho) for inicio, tamanho, _ in container.faixas] == [
+            (100, 64), (164, 64), (228, 64), (292, 64), (356, 44),
+        ]
+
+    def test_blob_menor_que_um_bloco_faz_uma_requisicao(self, sdk):
+        container = ContainerFalso()
+        container.blobs["derivados/miniatura.jpg"] = b"abc"
+
+        assert self._ler(_backend(container, bloco_bytes=64), "derivados/miniatura.jpg", 1024) == [b"abc"]
+        assert len(container.faixas) == 1
+
+    def test_blob_inexistente(self, sdk):
+        with pytest.raises(FileNotFoundError):
+            self._ler(_backend(ContainerFalso()), "conteudo/zz/nada", 10)
@@ -0,0 +1,205 @@
+"""
+Testes unitários do contrato comum dos backends de storage (local e memória) e
+da entrega de objetos com suporte a Range.
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.geobot_plataforma_backend.core.storage import (
+    LocalStorageBackend,
+    MemoriaStorageBackend,
+    responder_objeto,
+)
+from src.geobot_plataforma_backend.core.storage.servir import RespostaArquivoLocal, interpretar_range
+
+CONTEUDO = bytes(range(256)) * 40  # 10 KiB
+
+
+@pytest.fixture(params=["local", "memoria"])
+def storage(request, tmp_path):
+    if request.param == "local":
+        return LocalStorageBackend(str(tmp_path / "uploads"))
+    return MemoriaStorageBackend()
+
+
+def _gravar(storage, chave, conteudo, tipo_mime=None):
+    async def gravar():
+        escrita = await storage.abrir_escrita(chave, tipo_mime)
+        await escrita.escrever(conteudo)
+        await escrita.concluir()
+    asyncio.run(gravar())
+
+
+def _ler(storage, chave, **kwargs):
+    async def ler():
+        return b"".join([chunk async for chunk in storage.ler(chave, **kwargs)])
+    return asyncio.run(ler())
+
+
+class TestContratoStorage:
+    """Mesmo comportamento em todos os backends"""
+
+    def test_le_faixa(self, storage):
+        _gravar(storage, "conteudo/aa/video", CONTEUDO)
+
+        assert _ler(storage, "conteudo/aa/video", chunk_bytes=100, inicio=1000, tamanho=2500) == CONTEUDO[1000:3500]
+        assert _ler(storage, "conteudo/aa/video", inicio=10000) == CONTEUDO[10000:]
+        assert _ler(storage, "conteudo/aa/video") == CONTEUDO
+
+    def test_propriedades(self, storage):
+        _gravar(storage, "derivados/conteudo/aa/miniatura.jpg", b"jpeg")
+
+        propriedades = asyncio.run(storage.propriedades("derivados/conteudo/aa/miniatura.jpg"))
+
+        assert propriedades.tamanho_bytes == 4
+        assert propriedades.tipo_mime == "image/jpeg"
+        assert propriedades.etag and propriedades.modificado_em
+
+        with pytest.raises(FileNotFoundError):
+            asyncio.run(storage.propriedades("conteudo/zz/nada"))
+
+    def test_lista_por_prefixo_em_paginas(self, storage):
+        for chave in ["conteudo/bb/2", "conteudo/aa/1", "conteudo/aa/3", "derivados/conteudo/aa/x.jpg"]:
+            _gravar(storage, chave, b"x")
+
+        primeira, continuacao = asyncio.run(storage.listar("conteudo/", limite=2))
+        segunda, fim = asyncio.run(storage.listar("conteudo/", limite=2, continuacao=continuacao))
+
+        assert [o.chave for o in primeira] == ["conteudo/aa/1", "conteudo/aa/3"]
+        assert [o.chave for o in segunda] == ["conteudo/bb/2"]
+        assert fim is None
+
+    def test_blocos_e_movimentacao(self, storage):
+        async def montar():
+            await storage.gravar_bloco("uploads/u1", "00000001", b"mundo")
+            await storage.gravar_bloco("uploads/u1", "00000000", b"ola ")
+            await storage.confirmar_blocos("uploads/u1", ["00000000", "00000001"])
+            await storage.mover("uploads/u1", "conteudo/cc/u1")
+        asyncio.run(montar())
+
+        assert _ler(storage, "conteudo/cc/u1") == b"ola mundo"
+        assert not asyncio.run(storage.existe("uploads/u1"))
+        assert [o.chave for o in asyncio.run(storage.listar())[0]] == ["conteudo/cc/u1"]
+
+
+class TestInterpretarRange:
+    """Testes do cabeçalho Range"""
+
+    @pytest.mark.parametrize("cabecalho, faixa", [
+        (None, None),
+        ("bytes=0-99", (0, 99)),
+        ("bytes=9000-", (9000, 10239)),
+        ("bytes=-240", (10000, 10239)),
+        ("bytes=10000-99999", (10000, 10239)),
+        ("bytes=0-1,5-9", None),   # Várias faixas: responde inteiro
+        ("bytes=abc", None),
+        ("itens=0-1", None),
+    ])
+    def test_faixas(self, cabecalho, faixa):
+        assert interpretar_range(cabecalho, 10240) == faixa
+
+    @pytest.mark.parametrize("cabecalho", ["bytes=10240-", "bytes=-0"])
+    def test_faixa_nao_atendivel(self, cabecalho):
+        with pytest.raises(ValueError):
+            interpretar_range(cabecalho, 10240)
+
+
+def _executar(resposta, metodo="GET"):
+    """Roda a resposta ASGI e junta status, cabeçalhos e corpo enviados"""
+    mensagens = []
+
+    async def receive():
+        await asyncio.Event().wait()  # Cliente nunca desconecta
+
+    async def send(mensagem):
+        mensagens.append(mensagem)
+
+    asyncio.run(resposta({"type": "http", "method": metodo, "extensions": {}}, receive, send))
+    return SimpleNamespace(
+        status_code=mensagens[0]["status"],
+        headers={k.decode(): v.decode() for k, v in mensagens[0]["headers"]},
+        content=b"".join(m.get("body", b"") for m in mensagens[1:]),
+    )
+
+
+class TestResponderObjeto:
+    """Testes da entrega HTTP com Range (disco local e streaming)"""
+
+    @pytest.fixture
+    def obter(self, storage):
+        _gravar(storage, "conteudo/aa/foto", CONTEUDO)
+
+        def obter(**cabecalhos):
+            cabecalhos = {k.replace("_", "-"): v for k, v in cabecalhos.items()}
+            return _executar(asyncio.run(
+                responder_objeto(storage, "conteudo/aa/foto", cabecalhos, media_type="image/jpeg")
+            ))
+
+        return obter
+
+    def test_objeto_inteiro(self, obter):
+        resposta = obter()
+
+        assert resposta.status_code == 200
+        assert resposta.content == CONTEUDO
+        assert resposta.headers["accept-ranges"] == "bytes"
+        assert resposta.headers["content-type"] == "image/jpeg"
+
+    def test_faixa(self, obter):
+        resposta = obter(range="bytes=1000-1999")
+
+        assert resposta.status_code == 206
+        assert resposta.content == CONTEUDO[1000:2000]
+        assert resposta.headers["content-range"] == "bytes 1000-1999/10240"
+        assert resposta.headers["content-length"] == "1000"
+
+    def test_faixa_fora_do_objeto(self, obter):
+        resposta = obter(range="bytes=20000-")
+
+        assert resposta.status_code == 416
+        assert resposta.headers["content-range"] == "bytes */10240"
+
+    def test_etag(self, obter):
+        etag = obter().headers["etag"]
+
+        assert obter(if_none_match=etag).status_code == 304
+        # If-Range com ETag antigo: a faixa é ignorada e o objeto vai inteiro
+        resposta = obter(range="bytes=0-9", if_range='"antigo"')
+        assert resposta.status_code == 200
+        assert resposta.content == CONTEUDO
+        assert obter(range="bytes=0-9", if_range=etag).status_code == 206
+
+
+class TestRespostaArquivoLocal:
+    """Testes do envio direto do disco"""
+
+    def _enviar(self, caminho, escopo):
+        mensagens = []
+
+        async def send(mensagem):
+            mensagens.append(mensagem)
+
+        resposta = RespostaArquivoLocal(str(caminho), 100, 50, 206, {"content-length": "50"}, "image/jpeg")
+        asyncio.run(resposta(escopo, None, send))
+        return mensagens
+
+    def test_usa_zero_copy_quando_o_servidor_oferece(self, tmp_path):
+        caminho = tmp_path / "foto"
+        caminho.write_bytes(CONTEUDO)
+
+        mensagens = self._enviar(caminho, {"type": "http", "extensions": {"http.response.zerocopysend": {}}})
+
+        envio = mensagens[1]
+        assert envio["type"] == "http.response.zerocopysend"
+        assert (envio["offset"], envio["count"]) == (100, 50)
+
+    def test_sem_extensao_le_com_pread(self, tmp_path):
+        caminho = tmp_path / "foto"
+        caminho.write_bytes(CONTEUDO)
+
+        mensagens = self._enviar(caminho, {"type": "http"})
+
+        assert mensagens[0]["status"] == 206
+        assert b"".join(m["body"] for m in mensagens[1:]) == CONTEUDO[100:150]
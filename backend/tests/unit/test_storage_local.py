@@ -0,0 +1,84 @@
+"""
+Testes unitários do backend de storage local e da gravação em streaming.
+"""
+import asyncio
+import hashlib
+import io
+
+import pytest
+
+from src.geobot_plataforma_backend.core.storage import LocalStorageBackend, gravar_upload
+from src.geobot_plataforma_backend.domain.service.arquivo_service import chave_conteudo
+
+
+class UploadFalso:
+    """Imita a interface assíncrona de leitura do UploadFile"""
+
+    def __init__(self, conteudo: bytes):
+        self._buffer = io.BytesIO(conteudo)
+
+    async def read(self, n: int = -1) -> bytes:
+        return self._buffer.read(n)
+
+
+@pytest.fixture
+def storage(tmp_path) -> LocalStorageBackend:
+    return LocalStorageBackend(str(tmp_path / "uploads"))
+
+
+class TestGravarUpload:
+    """Testes da gravação em streaming"""
+
+    def test_calcula_tamanho_e_hash(self, storage):
+        conteudo = b"foto" * 10_000
+        resultado = asyncio.run(gravar_upload(storage, UploadFalso(conteudo), "tmp/a", chunk_bytes=4096))
+
+        assert resultado.tamanho_bytes == len(conteudo)
+        assert resultado.hash_sha256 == hashlib.sha256(conteudo).hexdigest()
+        assert storage.caminho("tmp/a").read_bytes() == conteudo
+
+    def test_excede_tamanho_maximo_descarta_parcial(self, storage):
+        with pytest.raises(ValueError):
+            asyncio.run(gravar_upload(storage, UploadFalso(b"x" * 100), "tmp/b", tamanho_maximo_bytes=10, chunk_bytes=8))
+
+        assert not asyncio.run(storage.existe("tmp/b"))
+        assert list(storage.caminho("tmp").iterdir()) == []
+
+    def test_arquivo_vazio(self, storage):
+        with pytest.raises(ValueError):
+            asyncio.run(gravar_upload(storage, UploadFalso(b""), "tmp/c"))
+
+
+class TestLocalStorageBackend:
+    """Testes do backend local"""
+
+    def test_mover_para_chave_de_conteudo(self, storage):
+        resultado = asyncio.run(gravar_upload(storage, UploadFalso(b"abc"), "tmp/d"))
+        destino = chave_conteudo(resultado.hash_sha256)
+
+        asyncio.run(storage.mover("tmp/d", destino))
+
+        assert destino.startswith(f"conteudo/{resultado.hash_sha256[:2]}/")
+        assert asyncio.run(storage.existe(destino))
+        assert not asyncio.run(storage.existe("tmp/d"))
+
+    def test_chave_fora_da_raiz(self, storage):
+        with pytest.raises(ValueError):
+            storage.caminho("../../etc/passwd")
+
+    def test_blocos_montados_na_ordem_confirmada(self, storage):
+        asyncio.run(storage.gravar_bloco("video/a", "0002", b"C"))
+        asyncio.run(storage.gravar_bloco("video/a", "0000", b"A"))
+        asyncio.run(storage.gravar_bloco("video/a", "0001", b"x"))
+        asyncio.run(storage.gravar_bloco("video/a", "0001", b"B"))  # Parte reenviada
+
+        asyncio.run(storage.confirmar_blocos("video/a", ["0000", "0001", "0002"]))
+
+        assert storage.caminho("video/a").read_bytes() == b"ABC"
+        assert list(storage.caminho("video").iterdir()) == [storage.caminho("video/a")]
+
+    def test_descartar_blocos(self, storage):
+        asyncio.run(storage.gravar_bloco("video/b", "0000", b"A"))
+        asyncio.run(storage.descartar_blocos("video/b", ["0000"]))
+
+        assert list(storage.caminho("video").iterdir()) == []
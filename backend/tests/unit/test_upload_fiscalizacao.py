@@ -0,0 +1,148 @@
+"""
+Testes unitários do upload em streaming de arquivos de fiscalização.
+"""
+import asyncio
+import hashlib
+import io
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.geobot_plataforma_backend.core.storage import LocalStorageBackend
+from src.geobot_plataforma_backend.domain.service.arquivo_service import chave_conteudo
+from src.geobot_plataforma_backend.domain.service.etapa_fiscalizacao_service import EtapaFiscalizacaoService
+
+
+class UploadFalso:
+    """Imita a interface assíncrona de leitura do UploadFile"""
+
+    def __init__(self, conteudo: bytes):
+        self._buffer = io.BytesIO(conteudo)
+
+    async def read(self, n: int = -1) -> bytes:
+        return self._buffer.read(n)
+
+
+@pytest.fixture
+def storage(tmp_path) -> LocalStorageBackend:
+    return LocalStorageBackend(str(tmp_path / "uploads"))
+
+
+def _service(storage, etapa) -> EtapaFiscalizacaoService:
+    db = MagicMock()
+    db.query.return_value.filter.return_value.first.return_value = etapa
+    service = EtapaFiscalizacaoService(db, storage=storage)
+    service.chunk_bytes = 1024
+    return service
+
+
+class TestArmazenarArquivo:
+    """Testes do EtapaFiscalizacaoService.armazenar_arquivo"""
+
+    def test_grava_conteudo_e_registra_metadados_reais(self, storage):
+        service = _service(storage, SimpleNamespace(id=7, fiscalizacao_id=3))
+        conteudo = b"\xff\xd8drone" * 5000
+
+        with patch.object(EtapaFiscalizacaoService, "registrar_arquivo", side_effect=lambda **kw: kw) as registrar:
+            asyncio.run(service.armazenar_arquivo(3, 7, "foto_sobrevoo", UploadFalso(conteudo), "img_001.jpg"))
+
+        hash_sha256 = hashlib.sha256(conteudo).hexdigest()
+        dados = registrar.call_args.kwargs
+        assert dados["tamanho_bytes"] == len(conteudo)
+        assert dados["url_blob"] == chave_conteudo(hash_sha256)
+        assert dados["mime_type"] == "image/jpeg"
+        assert dados["metadados"] == {"hash_sha256": hash_sha256}
+        assert storage.caminho(dados["url_blob"]).read_bytes() == conteudo
+        assert list(storage.caminho("tmp").iterdir()) == []
+
+    def test_mesmo_conteudo_reaproveita_objeto(self, storage):
+        service = _service(storage, SimpleNamespace(id=7, fiscalizacao_id=3))
+
+        with patch.object(EtapaFiscalizacaoService, "registrar_arquivo", side_effect=lambda **kw: kw) as registrar:
+            for _ in range(2):
+                asyncio.run(service.armazenar_arquivo(3, 7, "foto", UploadFalso(b"igual"), "a.png"))
+
+        chaves = {c.kwargs["url_blob"] for c in registrar.call_args_list}
+        assert len(chaves) == 1
+        assert list(storage.caminho("tmp").iterdir()) == []
+
+    def test_etapa_de_outra_fiscalizacao(self, storage):
+        service = _service(storage, SimpleNamespace(id=7, fiscalizacao_id=99))
+
+        with pytest.raises(ValueError, match="não encontrada"):
+            asyncio.run(service.armazenar_arquivo(3, 7, "foto", UploadFalso(b"x"), "a.png"))
+
+    def test_arquivo_acima_do_limite_nao_e_registrado(self, storage):
+        service = _service(storage, SimpleNamespace(id=7, fiscalizacao_id=3))
+        service.tamanho_maximo_bytes = 10
+
+        with patch.object(EtapaFiscalizacaoService, "registrar_arquivo") as registrar:
+            with pytest.raises(ValueError):
+                asyncio.run(service.armazenar_arquivo(3, 7, "foto", UploadFalso(b"x" * 100), "a.png"))
+        registrar.assert_not_called()
+
+
+class UploadNomeado(UploadFalso):
+    """UploadFalso com os atributos de UploadFile usados no lote"""
+
+    def __init__(self, conteudo: bytes, filename: str, content_type=None):
+        super().__init__(conteudo)
+        self.filename = filename
+        self.content_type = content_type
+
+
+class TestArmazenarArquivosEmLote:
+    """Testes do EtapaFiscalizacaoService.armazenar_arquivos_em_lote"""
+
+    def test_insert_unico_e_resultado_por_arquivo(self, storage):
+        service = _service(storage, SimpleNamespace(id=7, fiscalizacao_id=3))
+        service.tamanho_maximo_bytes = 50
+        service.concorrencia_lote = 2
+        service.db.execute.side_effect = lambda stmt, linhas: MagicMock(
+            all=lambda: [(l["uuid"], i + 100) for i, l in enumerate(linhas)]
+        )
+        uploads = [
+            UploadNomeado(b"img-%d" % i, f"img_{i}.jpg") for i in range(5)
+        ] + [UploadNomeado(b"x" * 100, "grande.jpg"), UploadNomeado(b"", "vazio.jpg")]
+
+        with patch("src.geobot_plataforma_backend.domain.service.etapa_fiscalizacao_service.invalidar_progresso") as invalidar:
+            resultados = asyncio.run(service.armazenar_arquivos_em_lote(3, 7, "foto_sobrevoo", uploads))
+
+        assert [r["nome_original"] for r in resultados] == [u.filename for u in uploads]
+        assert [r["id"] for r in resultados[:5]] == [100, 101, 102, 103, 104]
+        assert all("erro" in r for r in resultados[5:])
+        assert resultados[0]["mime_type"] == "image/jpeg"
+        assert storage.caminho(resultados[2]["url_blob"]).read_bytes() == b"img-2"
+
+        service.db.execute.assert_called_once()
+        assert len(service.db.execute.call_args[0][1]) == 5
+        service.db.commit.assert_called_once()
+        invalidar.assert_called_once_with(3)
+
+    def test_limite_de_arquivos(self, storage):
+        service = _service(storage, SimpleNamespace(id=7, fiscalizacao_id=3))
+        service.max_arquivos_lote = 2
+
+        with pytest.raises(ValueError, match="Máximo"):
+            asyncio.run(service.armazenar_arquivos_em_lote(3, 7, "foto", [UploadNomeado(b"a", "a.png")] * 3))
+
+    def test_falha_de_storage_em_um_arquivo_nao_derruba_o_lote(self, storage):
+        service = _service(storage, SimpleNamespace(id=7, fiscalizacao_id=3))
+        service.db.execute.side_effect = lambda stmt, linhas: MagicMock(
+            all=lambda: [(l["uuid"], i + 100) for i, l in enumerate(linhas)]
+        )
+
+        class UploadInterrompido(UploadNomeado):
+            async def read(self, n: int = -1) -> bytes:
+                raise OSError("conexão com o storage perdida")
+
+        uploads = [UploadNomeado(b"img-0", "a.jpg"), UploadInterrompido(b"", "b.jpg"), UploadNomeado(b"img-2", "c.jpg")]
+
+        with patch("src.geobot_plataforma_backend.domain.service.etapa_fiscalizacao_service.invalidar_progresso"):
+            resultados = asyncio.run(service.armazenar_arquivos_em_lote(3, 7, "foto_sobrevoo", uploads))
+
+        assert [r.get("id") for r in resultados] == [100, None, 101]
+        assert resultados[1] == {"nome_original": "b.jpg", "erro": "Falha ao gravar o arquivo no storage"}
+        assert len(service.db.execute.call_args[0][1]) == 2
+        service.db.commit.assert_called_once()
@@ -0,0 +1,175 @@
+"""
+Testes unitários dos uploads retomáveis (estilo tus).
+"""
+import asyncio
+import base64
+import hashlib
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.geobot_plataforma_backend.core.storage import LocalStorageBackend
+from src.geobot_plataforma_backend.domain.entity.upload_retomavel import StatusUploadRetomavel, UploadRetomavel
+from src.geobot_plataforma_backend.domain.service.fiscalizacao_service import AutorizacaoError
+from src.geobot_plataforma_backend.domain.service.upload_retomavel_service import UploadRetomavelService
+
+
+async def _fluxo(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+def _upload(tamanho: int) -> UploadRetomavel:
+    return UploadRetomavel(
+        id=1, usuario_id=5, fiscalizacao_id=3, etapa_id=7, tipo="video_sobrevoo",
+        nome_original="voo.mp4", mime_type="video/mp4", tamanho_bytes=tamanho,
+        recebido_bytes=0, blocos=[], chave_storage="retomaveis/abc",
+        status=StatusUploadRetomavel.EM_ANDAMENTO.value, expira_em=datetime.now(timezone.utc),
+    )
+
+
+@pytest.fixture
+def service(tmp_path):
+    """Serviço com banco simulado: o UPDATE condicional é aplicado no próprio objeto"""
+    storage = LocalStorageBackend(str(tmp_path / "uploads"))
+    db = MagicMock()
+    db.query.return_value.filter.return_value.first.return_value = None  # Arquivo ainda não registrado
+    service = UploadRetomavelService(db, storage=storage)
+    service.upload = _upload(10)
+    service.obter = MagicMock(side_effect=lambda *_: service.upload)
+    pendente = {}
+
+    def executar(stmt):
+        params = stmt.compile().params
+        if service.upload.recebido_bytes != params["recebido_bytes_1"]:
+            return SimpleNamespace(rowcount=0)
+        pendente.update(recebido=params["recebido_bytes"], bloco=params["param_1"])
+        return SimpleNamespace(rowcount=1)
+
+    def refresh(obj):
+        if pendente:
+            obj.recebido_bytes = pendente["recebido"]
+            obj.blocos = obj.blocos + [pendente.pop("bloco")]
+            pendente.clear()
+
+    db.execute.side_effect = executar
+    db.refresh.side_effect = refresh
+    return service
+
+
+class TestUploadRetomavelService:
+    """Testes do UploadRetomavelService"""
+
+    def test_partes_em_sequencia_concluem_e_registram_arquivo(self, service):
+        registrar = MagicMock(return_value=SimpleNamespace(id=42))
+        with patch(
+            "src.geobot_plataforma_backend.domain.service.upload_retomavel_service.EtapaFiscalizacaoService"
+        ) as etapa_service:
+            etapa_service.return_value.registrar_arquivo = registrar
+            asyncio.run(service.receber_parte("u", 5, 0, _fluxo(b"0123")))
+            assert service.upload.recebido_bytes == 4
+            registrar.assert_not_called()
+
+            asyncio.run(service.receber_parte("u", 5, 4, _fluxo(b"45", b"6789")))
+
+        assert service.upload.status == StatusUploadRetomavel.CONCLUIDO.value
+        assert service.upload.arquivo_id == 42
+        assert service.storage.caminho("retomaveis/abc").read_bytes() == b"0123456789"
+        assert registrar.call_args.kwargs["tamanho_bytes"] == 10
+
+    def test_offset_divergente_nao_grava(self, service):
+        asyncio.run(service.receber_parte("u", 5, 0, _fluxo(b"0123")))
+
+        # Retentativa de uma parte já confirmada: o cliente deve consultar o offset
+        with pytest.raises(ValueError, match="Offset 0"):
+            asyncio.run(service.receber_parte("u", 5, 0, _fluxo(b"0123")))
+        assert service.upload.recebido_bytes == 4
+
+    def test_parte_alem_do_tamanho_declarado(self, service):
+        with pytest.raises(ValueError, match="excede"):
+            asyncio.run(service.receber_parte("u", 5, 0, _fluxo(b"0123456789", b"X")))
+        service.db.execute.assert_not_called()
+
+    def test_checksum_da_parte(self, service):
+        valido = base64.b64encode(hashlib.sha256(b"0123").digest()).decode()
+
+        with pytest.raises(ValueError, match="Checksum"):
+            asyncio.run(service.receber_parte("u", 5, 0, _fluxo(b"0124"), checksum_sha256=valido))
+        asyncio.run(service.receber_parte("u", 5, 0, _fluxo(b"0123"), checksum_sha256=valido))
+        assert service.upload.recebido_bytes == 4
+
+    def test_tentativas_concorrentes_no_mesmo_offset_nao_corrompem_o_blob(self, service):
+        async def concorrentes():
+            # A retentativa do cliente chega enquanto a original ainda grava o bloco
+            gravar = service.storage.gravar_bloco
+            retentativa = {}
+
+            async def gravar_e_deixar_a_outra_passar(chave, bloco, dados):
+                await gravar(chave, bloco, dados)
+                if dados == b"0123":
+                    retentativa["tarefa"] = asyncio.ensure_future(
+                        service.receber_parte("u", 5, 0, _fluxo(b"XXXX"))
+                    )
+                    await asyncio.sleep(0)
+
+            service.storage.gravar_bloco = gravar_e_deixar_a_outra_passar
+            await service.receber_parte("u", 5, 0, _fluxo(b"0123"))
+            with pytest.raises(ValueError, match="Offset 0"):
+                await retentativa["tarefa"]
+            service.storage.gravar_bloco = gravar
+            with patch(
+                "src.geobot_plataforma_backend.domain.service.upload_retomavel_service.EtapaFiscalizacaoService"
+            ) as etapa_service:
+                etapa_service.return_value.registrar_arquivo.return_value = SimpleNamespace(id=42)
+                await service.receber_parte("u", 5, 4, _fluxo(b"456789"))
+
+        asyncio.run(concorrentes())
+
+        assert service.storage.caminho("retomaveis/abc").read_bytes() == b"0123456789"
+
+    def test_conclusao_interrompida_e_repetida_com_parte_vazia(self, service):
+        registrar = MagicMock(return_value=SimpleNamespace(id=42))
+        with patch(
+            "src.geobot_plataforma_backend.domain.service.upload_retomavel_service.EtapaFiscalizacaoService"
+        ) as etapa_service:
+            etapa_service.return_value.registrar_arquivo = registrar
+            service.db.commit.side_effect = [None, OSError("conexão perdida")]
+            with pytest.raises(OSError):
+                asyncio.run(service.receber_parte("u", 5, 0, _fluxo(b"0123456789")))
+            # No banco o upload continua em andamento, com todas as partes recebidas
+            service.upload.status, service.upload.arquivo_id = StatusUploadRetomavel.EM_ANDAMENTO.value, None
+            assert service.upload.recebido_bytes == 10
+
+            # O arquivo chegou a ser registrado antes da falha: é reaproveitado
+            service.db.commit.side_effect = None
+            service.db.query.return_value.filter.return_value.first.return_value = SimpleNamespace(id=42)
+            with pytest.raises(ValueError, match="Offset 0"):
+                asyncio.run(service.receber_parte("u", 5, 0, _fluxo(b"0123456789")))
+            asyncio.run(service.receber_parte("u", 5, 10, _fluxo()))
+
+        assert service.upload.status == StatusUploadRetomavel.CONCLUIDO.value
+        assert service.upload.arquivo_id == 42
+        assert service.storage.caminho("retomaveis/abc").read_bytes() == b"0123456789"
+        registrar.assert_called_once()  # Só na primeira tentativa
+
+    def test_upload_de_outro_usuario(self, tmp_path):
+        db = MagicMock()
+        db.query.return_value.filter.return_value.first.return_value = _upload(10)
+        service = UploadRetomavelService(db, storage=LocalStorageBackend(str(tmp_path)))
+        service.usuario_repository = MagicMock()
+        service.usuario_repository.buscar_por_id.return_value = SimpleNamespace(id=6, ativo=True)
+
+        with pytest.raises(AutorizacaoError):
+            service.obter("u", 6)
+        assert service.obter("u", 5).usuario_id == 5
+
+    def test_coletar_abandonados_descarta_blocos(self, service):
+        asyncio.run(service.storage.gravar_bloco("retomaveis/abc", "0000", b"x"))
+        abandonado = _upload(10)
+        service.db.query.return_value.filter.return_value.order_by.return_value.limit.return_value.all.return_value = [abandonado]
+
+        assert asyncio.run(service.coletar_abandonados()) == 1
+        service.db.delete.assert_called_once_with(abandonado)
+        assert not service.storage.caminho("retomaveis/abc.blocos").exists()
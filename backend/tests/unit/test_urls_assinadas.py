@@ -0,0 +1,113 @@
+"""
+Testes unitários da assinatura de URLs em lote com cache (galeria de arquivos).
+"""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.geobot_plataforma_backend.core.cache import CacheTTL
+from src.geobot_plataforma_backend.core.storage import AzureBlobStorageBackend, LocalStorageBackend
+from src.geobot_plataforma_backend.core.storage import azure as azure_backend
+from src.geobot_plataforma_backend.domain.service.etapa_fiscalizacao_service import EtapaFiscalizacaoService
+from src.geobot_plataforma_backend.domain.service.ingestao_imagem_service import url_derivado
+
+
+@pytest.fixture
+def assinaturas(monkeypatch):
+    """Substitui as funções do SDK que geram o token SAS, registrando cada assinatura"""
+    chamadas = []
+
+    def gerar_blob_sas(**kwargs):
+        chamadas.append(kwargs)
+        return f"sig={kwargs['blob_name']}-{len(chamadas)}"
+
+    monkeypatch.setattr(azure_backend, "generate_blob_sas", gerar_blob_sas, raising=False)
+    monkeypatch.setattr(azure_backend, "BlobSasPermissions", MagicMock(), raising=False)
+    return chamadas
+
+
+def _backend(credencial) -> AzureBlobStorageBackend:
+    backend = AzureBlobStorageBackend.__new__(AzureBlobStorageBackend)
+    backend.container = "fiscalizacoes"
+    backend.blob_service_client = MagicMock(account_name="geobot", credential=credencial)
+    backend.blob_service_client.get_blob_client.side_effect = lambda container, blob: MagicMock(
+        blob_name=blob, url=f"https://geobot.blob.core.windows.net/{container}/{blob}"
+    )
+    backend.margem_url_segundos = 300
+    backend._urls = CacheTTL(tamanho_maximo=100)
+    return backend
+
+
+class TestUrlsAssinadasAzure:
+    """Testes de AzureBlobStorageBackend.urls_assinadas"""
+
+    def test_assina_em_lote_e_reaproveita_do_cache(self, assinaturas):
+        backend = _backend(MagicMock(account_key="segredo"))
+
+        urls = asyncio.run(backend.urls_assinadas(["conteudo/a", "conteudo/b", "conteudo/a"], 3600))
+
+        assert urls == {
+            "conteudo/a": "https://geobot.blob.core.windows.net/fiscalizacoes/conteudo/a?sig=conteudo/a-1",
+            "conteudo/b": "https://geobot.blob.core.windows.net/fiscalizacoes/conteudo/b?sig=conteudo/b-2",
+        }
+        assert {c["expiry"] for c in assinaturas} == {assinaturas[0]["expiry"]}  # Mesma expiração no lote
+        assert assinaturas[0]["account_key"] == "segredo"
+
+        de_novo = asyncio.run(backend.urls_assinadas(["conteudo/a", "conteudo/c"], 3600))
+
+        assert de_novo["conteudo/a"] == urls["conteudo/a"]
+        assert [c["blob_name"] for c in assinaturas] == ["conteudo/a", "conteudo/b", "conteudo/c"]
+
+    def test_validade_menor_que_a_margem_nao_vai_para_o_cache(self, assinaturas):
+        backend = _backend(MagicMock(account_key="segredo"))
+
+        asyncio.run(backend.urls_assinadas(["conteudo/a"], 120))
+        asyncio.run(backend.urls_assinadas(["conteudo/a"], 120))
+
+        assert len(assinaturas) == 2
+
+    def test_sem_chave_da_conta_usa_uma_chave_de_delegacao_por_lote(self, assinaturas):
+        backend = _backend(MagicMock(spec=[]))  # Credencial do Entra ID, sem account_key
+        backend.blob_service_client.get_user_delegation_key = AsyncMock(return_value="chave-delegacao")
+
+        asyncio.run(backend.urls_assinadas([f"conteudo/{i}" for i in range(50)], 3600))
+
+        backend.blob_service_client.get_user_delegation_key.assert_awaited_once()
+        assert {c["user_delegation_key"] for c in assinaturas} == {"chave-delegacao"}
+
+
+class TestUrlsAssinadasGaleria:
+    """Testes do uso das URLs assinadas na listagem de arquivos"""
+
+    def _arquivo(self):
+        return MagicMock(
+            id=5,
+            url_blob="conteudo/a",
+            metadados={'derivados': {'miniatura': 'derivados/conteudo/a/miniatura.jpg'}},
+        )
+
+    def test_assina_originais_e_derivados_juntos(self):
+        storage = MagicMock()
+
+        async def urls_assinadas(chaves, validade):
+            return {chave: f"https://assinada/{chave}" for chave in chaves}
+
+        storage.urls_assinadas.side_effect = urls_assinadas
+        arquivo = self._arquivo()
+
+        urls = asyncio.run(EtapaFiscalizacaoService(MagicMock(), storage=storage).assinar_urls([arquivo]))
+
+        storage.urls_assinadas.assert_called_once()
+        assert url_derivado(arquivo, 'miniatura', urls) == "https://assinada/derivados/conteudo/a/miniatura.jpg"
+        assert urls["conteudo/a"] == "https://assinada/conteudo/a"
+
+    def test_storage_local_cai_para_a_rota_da_api(self, tmp_path):
+        service = EtapaFiscalizacaoService(MagicMock(), storage=LocalStorageBackend(str(tmp_path)))
+        arquivo = self._arquivo()
+
+        urls = asyncio.run(service.assinar_urls([arquivo]))
+
+        assert urls == {}
+        assert url_derivado(arquivo, 'miniatura', urls) == "/api/etapas-fiscalizacao/arquivos/5/miniatura"
+        assert url_derivado(arquivo, 'previa', urls) is None
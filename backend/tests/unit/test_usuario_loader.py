@@ -0,0 +1,44 @@
+"""
+Testes unitários do carregador de usuários em lote.
+"""
+from unittest.mock import MagicMock
+
+from src.geobot_plataforma_backend.domain.entity.usuario import Usuario
+from src.geobot_plataforma_backend.domain.repository.usuario_loader import UsuarioLoader
+
+
+def _db_com_usuarios(*usuarios):
+    db = MagicMock()
+    db.query.return_value.filter.return_value.all.return_value = list(usuarios)
+    return db
+
+
+class TestUsuarioLoader:
+    """Testes do UsuarioLoader"""
+
+    def test_carregar_muitos_usa_um_unico_select(self):
+        db = _db_com_usuarios(Usuario(id=1, nome="Ana"), Usuario(id=2, nome="Bia"))
+        loader = UsuarioLoader(db)
+
+        usuarios = loader.carregar_muitos([2, 1, 3])
+
+        assert [u.nome if u else None for u in usuarios] == ["Bia", "Ana", None]
+        assert db.query.call_count == 1
+
+    def test_cache_evita_novas_queries(self):
+        db = _db_com_usuarios(Usuario(id=1, nome="Ana"))
+        loader = UsuarioLoader(db)
+
+        loader.carregar(1)
+        loader.carregar(1)
+        loader.carregar_muitos([1])
+
+        assert db.query.call_count == 1
+
+    def test_preparar_dispensa_query(self):
+        db = _db_com_usuarios()
+        loader = UsuarioLoader(db)
+        loader.preparar([Usuario(id=7, nome="Caio")])
+
+        assert loader.carregar(7).nome == "Caio"
+        db.query.assert_not_called()
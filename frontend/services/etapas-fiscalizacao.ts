@@ -50,6 +50,17 @@ export interface ProgressoFiscalizacao {
   arquivos_carregados: number;
   resultado_ia?: ResultadoAnaliseIA;
   relatorio?: any;
+  versao?: string;
+}
+
+export interface ArquivoEnviado {
+  id: number | null;
+  nome_original: string;
+  url_blob: string | null;
+  tamanho_bytes: number | null;
+  mime_type: string | null;
+  hash_sha256: string | null;
+  erro: string | null;
 }
 
 export const etapasFiscalizacaoService = {
@@ -63,6 +74,39 @@ export const etapasFiscalizacaoService = {
     return response.json();
   },
 
+  /**
+   * Long-poll: só responde quando o progresso deixa de ser `versao` (ou após `timeout` s).
+   * Use a `versao` retornada na chamada seguinte.
+   */
+  async aguardarProgresso(
+    fiscalizacaoId: number,
+    versao?: string,
+    timeout = 25
+  ): Promise<ProgressoFiscalizacao> {
+    const params = new URLSearchParams({ timeout: timeout.toString() });
+    if (versao) params.append("desde", versao);
+    const response = await fetch(
+      `/api/etapas-fiscalizacao/${fiscalizacaoId}/progresso?${params.toString()}`
+    );
+    return response.json();
+  },
+
+  /**
+   * Obtém o progresso de várias fiscalizações em uma única requisição
+   */
+  async obterProgressoEmLote(
+    fiscalizacaoIds: number[]
+  ): Promise<{ data: ProgressoFiscalizacao[]; nao_encontradas: number[] }> {
+    const response = await fetch(`/api/etapas-fiscalizacao/progresso`, {
+      method: "POST",
+      headers: {
+        "Content-Type": "application/json",
+      },
+      body: JSON.stringify({ fiscalizacao_ids: fiscalizacaoIds }),
+    });
+    return response.json();
+  },
+
   /**
    * Inicia uma fiscalização
    */
@@ -146,6 +190,31 @@ export const etapasFiscalizacaoService = {
     return response.json();
   },
 
+  /**
+   * Envia várias imagens (ex: um sobrevoo inteiro) em uma única requisição.
+   * Cada arquivo tem seu próprio resultado (`erro` preenchido se foi rejeitado).
+   */
+  async uploadArquivosEmLote(
+    fiscalizacaoId: number,
+    etapaId: number,
+    tipo: string,
+    arquivos: File[]
+  ): Promise<{ data: ArquivoEnviado[]; enviados: number; falhas: number }> {
+    const formData = new FormData();
+    formData.append("etapa_id", etapaId.toString());
+    formData.append("tipo", tipo);
+    arquivos.forEach((arquivo) => formData.append("files", arquivo));
+
+    const response = await fetch(
+      `/api/etapas-fiscalizacao/${fiscalizacaoId}/upload-lote`,
+      {
+        method: "POST",
+        body: formData,
+      }
+    );
+    return response.json();
+  },
+
   /**
    * Inicia análise de IA
    */
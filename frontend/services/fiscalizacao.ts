@@ -36,17 +36,85 @@ export interface FiscalizacaoResponse {
   data_atualizacao: string;
 }
 
+export interface FiscalizacaoResumo {
+  id: number;
+  uuid: string;
+  codigo: string;
+  complaint_id: number;
+  status_fiscalizacao: FiscalizacaoStatus;
+  data_atualizacao: string | null;
+}
+
+export interface PaginacaoCursor {
+  limit: number;
+  next_cursor: string | null;
+  has_next: boolean;
+}
+
+export interface PaginaFiscalizacoes<T> {
+  data: T[];
+  pagination: PaginacaoCursor;
+}
+
+export interface ParadaRota {
+  ordem: number;
+  fiscalizacao_id: number;
+  codigo: string;
+  complaint_id: number;
+  endereco: string;
+  latitude: number;
+  longitude: number;
+  distancia_desde_anterior_km: number | null;
+}
+
+export interface RotaFiscal {
+  fiscal_id: number;
+  paradas: ParadaRota[];
+  distancia_total_km: number;
+  retorna_a_origem: boolean;
+  sem_coordenadas: number[];
+}
+
+export interface Hotspot {
+  quantidade: number;
+  centro: { latitude: number; longitude: number };
+  raio_km: number;
+  bbox: [number, number, number, number]; // [lat_min, lon_min, lat_max, lon_max]
+  categorias: Record<string, number>;
+  complaint_ids: number[];
+  fiscalizacao_ids: number[];
+}
+
+export interface HotspotsResponse {
+  data: Hotspot[];
+  total_denuncias: number;
+  total_ruido: number;
+  raio_m: number;
+  min_denuncias: number;
+}
+
 export interface FiscalizacaoAdicionarFiscal {
   fiscal_id: number;
   papel?: "responsavel" | "auxiliar"; // Padrão: "auxiliar"
 }
 
+export type TipoEventoFiscalizacao =
+  | "criada"
+  | "status_alterado"
+  | "fiscal_adicionado"
+  | "fiscal_removido"
+  | "etapa_iniciada"
+  | "etapa_transicionada";
+
 export interface FiscalizacaoHistoricoResponse {
   id: number;
   fiscalizacao_id: number;
-  status_anterior?: string | null;
-  status_novo: string;
+  tipo_evento: TipoEventoFiscalizacao;
+  status_anterior?: string | null; // Status ou etapa anterior
+  status_novo?: string | null; // Status ou etapa nova
   usuario_id?: number | null;
+  usuario_nome?: string | null;
+  dados?: Record<string, unknown> | null;
   observacoes?: string | null;
   timestamp: string;
 }
@@ -66,6 +134,10 @@ export const fiscalizacaoService = {
   create: (data: FiscalizacaoCreate) => 
     api.post<FiscalizacaoResponse>("/api/fiscalizacao/", data),
 
+  // Criar fiscalizações para várias denúncias numa única transação (FISCAL/ADMIN)
+  createBatch: (itens: FiscalizacaoCreate[]) =>
+    api.post<{ data: FiscalizacaoResponse[] }>("/api/fiscalizacao/lote", { itens }),
+
   // Listar fiscalizações com filtros (FISCAL/ADMIN)
   getAll: (params?: {
     status_filter?: FiscalizacaoStatus;
@@ -83,9 +155,67 @@ export const fiscalizacaoService = {
     return api.get<FiscalizacaoResponse[]>(`/api/fiscalizacao/${query ? `?${query}` : ""}`);
   },
 
-  // Listar minhas fiscalizações (FISCAL)
-  getMy: () => 
-    api.get<FiscalizacaoResponse[]>("/api/fiscalizacao/minhas"),
+  // Listar minhas fiscalizações (FISCAL) - paginação por cursor, ativas por padrão
+  getMy: (params?: {
+    status_filter?: FiscalizacaoStatus;
+    incluir_encerradas?: boolean;
+    limit?: number;
+    cursor?: string;
+  }) => {
+    const queryParams = new URLSearchParams();
+    if (params?.status_filter) queryParams.append("status_filter", params.status_filter);
+    if (params?.incluir_encerradas) queryParams.append("incluir_encerradas", "true");
+    if (params?.limit) queryParams.append("limit", params.limit.toString());
+    if (params?.cursor) queryParams.append("cursor", params.cursor);
+
+    const query = queryParams.toString();
+    return api.get<PaginaFiscalizacoes<FiscalizacaoResponse>>(`/api/fiscalizacao/minhas${query ? `?${query}` : ""}`);
+  },
+
+  // Versão compacta de minhas fiscalizações, para painéis
+  getMyResumo: (params?: { incluir_encerradas?: boolean; limit?: number; cursor?: string }) => {
+    const queryParams = new URLSearchParams({ resumo: "true" });
+    if (params?.incluir_encerradas) queryParams.append("incluir_encerradas", "true");
+    if (params?.limit) queryParams.append("limit", params.limit.toString());
+    if (params?.cursor) queryParams.append("cursor", params.cursor);
+    return api.get<PaginaFiscalizacoes<FiscalizacaoResumo>>(`/api/fiscalizacao/minhas?${queryParams.toString()}`);
+  },
+
+  // Rota do dia pelas fiscalizações ativas (FISCAL), opcionalmente a partir da posição atual
+  getRoute: (params?: {
+    fiscal_id?: number;
+    origem_latitude?: number;
+    origem_longitude?: number;
+    retornar?: boolean;
+  }) => {
+    const queryParams = new URLSearchParams();
+    if (params?.fiscal_id) queryParams.append("fiscal_id", params.fiscal_id.toString());
+    if (params?.origem_latitude !== undefined) queryParams.append("origem_latitude", params.origem_latitude.toString());
+    if (params?.origem_longitude !== undefined) queryParams.append("origem_longitude", params.origem_longitude.toString());
+    if (params?.retornar) queryParams.append("retornar", "true");
+
+    const query = queryParams.toString();
+    return api.get<RotaFiscal>(`/api/fiscalizacao/rota${query ? `?${query}` : ""}`);
+  },
+
+  // Hotspots de denúncias para planejamento de sobrevoos (ADMIN/FISCAL)
+  getHotspots: (params?: {
+    raio_m?: number;
+    min_denuncias?: number;
+    categoria?: string[];
+    status?: string[];
+    limit?: number;
+  }) => {
+    const queryParams = new URLSearchParams();
+    if (params?.raio_m) queryParams.append("raio_m", params.raio_m.toString());
+    if (params?.min_denuncias) queryParams.append("min_denuncias", params.min_denuncias.toString());
+    params?.categoria?.forEach((c) => queryParams.append("categoria", c));
+    params?.status?.forEach((s) => queryParams.append("status", s));
+    if (params?.limit) queryParams.append("limit", params.limit.toString());
+
+    const query = queryParams.toString();
+    return api.get<HotspotsResponse>(`/api/fiscalizacao/hotspots${query ? `?${query}` : ""}`);
+  },
 
   // Obter detalhes de uma fiscalização
   getById: (id: number) => 
@@ -100,6 +230,14 @@ export const fiscalizacaoService = {
     api.delete<FiscalizacaoResponse>(`/api/fiscalizacao/${id}/fiscais/${fiscalId}`),
 
   // Obter histórico de uma fiscalização (FISCAL/ADMIN)
-  getHistory: (id: number) => 
-    api.get<FiscalizacaoHistoricoResponse[]>(`/api/fiscalizacao/${id}/historico`),
+  getHistory: (id: number, params?: { limit?: number; cursor?: string }) => {
+    const queryParams = new URLSearchParams();
+    if (params?.limit) queryParams.append("limit", params.limit.toString());
+    if (params?.cursor) queryParams.append("cursor", params.cursor);
+
+    const query = queryParams.toString();
+    return api.get<PaginaFiscalizacoes<FiscalizacaoHistoricoResponse>>(
+      `/api/fiscalizacao/${id}/historico${query ? `?${query}` : ""}`
+    );
+  },
 };
@@ -0,0 +1,64 @@
+import { api } from "./api";
+
+// Lotes de sobrevoo: um voo cobrindo várias fiscalizações
+
+export interface SobrevooLoteCreate {
+  poligono: [number, number][]; // [[lat, lon], ...]
+  fiscalizacao_ids?: number[];
+  largura_faixa_m?: number;
+  sobreposicao?: number; // 0-1
+  observacoes?: string;
+}
+
+export type SobrevooLoteStatus = "planejado" | "abastecimento" | "concluido" | "cancelado";
+
+export interface SobrevooLote {
+  id: number;
+  codigo: string;
+  status: SobrevooLoteStatus;
+  poligono: [number, number][];
+  plano_voo: { waypoints: [number, number][]; espacamento_m: number } | null;
+  largura_faixa_m: number;
+  sobreposicao: number;
+  distancia_km: number | null;
+  fiscalizacao_ids: number[];
+  fiscalizacoes_ignoradas?: number[];
+  observacoes: string | null;
+  usuario_id: number | null;
+  created_at: string | null;
+  updated_at: string | null;
+}
+
+export interface SobrevooImagemResponse {
+  lote_id: number;
+  chave_storage: string;
+  tamanho_bytes: number;
+  fiscalizacao_ids: number[];
+}
+
+export const sobrevooService = {
+  // Planejar lote a partir de um polígono (ex.: hotspot) (FISCAL/ADMIN)
+  create: (data: SobrevooLoteCreate) =>
+    api.post<SobrevooLote>("/api/sobrevoos/", data),
+
+  getById: (id: number) =>
+    api.get<SobrevooLote>(`/api/sobrevoos/${id}`),
+
+  // Concluir voo: fiscalizações do lote passam para ABASTECIMENTO
+  concluirVoo: (id: number) =>
+    api.post<SobrevooLote>(`/api/sobrevoos/${id}/concluir-voo`),
+
+  // Enviar imagem uma vez; ela é registrada em todas as fiscalizações do lote
+  uploadImagem: (
+    id: number,
+    arquivo: File,
+    posicao?: { latitude?: number; longitude?: number; altitude_m?: number }
+  ) => {
+    const formData = new FormData();
+    formData.append("file", arquivo);
+    if (posicao?.latitude !== undefined) formData.append("latitude", posicao.latitude.toString());
+    if (posicao?.longitude !== undefined) formData.append("longitude", posicao.longitude.toString());
+    if (posicao?.altitude_m !== undefined) formData.append("altitude_m", posicao.altitude_m.toString());
+    return api.postFormData<SobrevooImagemResponse>(`/api/sobrevoos/${id}/imagens`, formData);
+  },
+};
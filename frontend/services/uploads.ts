@@ -0,0 +1,102 @@
+import { api } from "./api";
+
+// Uploads retomáveis (estilo tus) para vídeos e imagens grandes de drone
+
+const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
+
+export interface UploadRetomavel {
+  id: string;
+  fiscalizacao_id: number;
+  etapa_id: number;
+  nome_original: string;
+  mime_type: string;
+  tamanho_bytes: number;
+  offset: number;
+  concluido: boolean;
+  arquivo_id: number | null;
+  expira_em: string;
+  tamanho_maximo_parte_bytes?: number;
+}
+
+const authHeaders = (): Record<string, string> => {
+  const token = typeof window === "undefined" ? null : localStorage.getItem("token");
+  return token ? { Authorization: `Bearer ${token}` } : {};
+};
+
+export const uploadsService = {
+  criar: async (
+    fiscalizacaoId: number,
+    etapaId: number,
+    tipo: string,
+    arquivo: File
+  ): Promise<UploadRetomavel> => {
+    return api.post<UploadRetomavel>("/api/uploads", {
+      fiscalizacao_id: fiscalizacaoId,
+      etapa_id: etapaId,
+      tipo,
+      nome_arquivo: arquivo.name,
+      tamanho_bytes: arquivo.size,
+      mime_type: arquivo.type || undefined,
+    });
+  },
+
+  /** Offset já recebido pelo servidor: a próxima parte começa nele */
+  consultarOffset: async (id: string): Promise<number> => {
+    const response = await fetch(`${API_BASE_URL}/api/uploads/${id}`, {
+      method: "HEAD",
+      headers: authHeaders(),
+    });
+    if (!response.ok) throw new Error(`Erro ${response.status}`);
+    return Number(response.headers.get("Upload-Offset"));
+  },
+
+  enviarParte: async (id: string, offset: number, parte: Blob): Promise<UploadRetomavel> => {
+    const response = await fetch(`${API_BASE_URL}/api/uploads/${id}`, {
+      method: "PATCH",
+      headers: {
+        ...authHeaders(),
+        "Content-Type": "application/offset+octet-stream",
+        "Upload-Offset": offset.toString(),
+      },
+      body: parte,
+    });
+    if (!response.ok) {
+      const erro: any = new Error(`Erro ${response.status}`);
+      erro.status = response.status;
+      throw erro;
+    }
+    return response.json();
+  },
+
+  /**
+   * Envia o arquivo inteiro em partes. Em falha de rede (ou 409), consulta o offset
+   * no servidor e reenvia só a partir dele, até `tentativas` falhas seguidas.
+   */
+  enviar: async (
+    upload: UploadRetomavel,
+    arquivo: File,
+    onProgresso?: (enviado: number, total: number) => void,
+    tentativas = 5
+  ): Promise<UploadRetomavel> => {
+    const tamanhoParte = Math.min(upload.tamanho_maximo_parte_bytes ?? 8 * 1024 * 1024, 8 * 1024 * 1024);
+    let atual = upload;
+    let falhas = 0;
+    while (!atual.concluido) {
+      try {
+        const parte = arquivo.slice(atual.offset, atual.offset + tamanhoParte);
+        atual = await uploadsService.enviarParte(atual.id, atual.offset, parte);
+        falhas = 0;
+        onProgresso?.(atual.offset, atual.tamanho_bytes);
+      } catch (erro: any) {
+        if (++falhas > tentativas || (erro.status && erro.status !== 409 && erro.status < 500)) throw erro;
+        await new Promise((r) => setTimeout(r, Math.min(1000 * 2 ** falhas, 30000)));
+        atual = { ...atual, offset: await uploadsService.consultarOffset(atual.id) };
+      }
+    }
+    return atual;
+  },
+
+  cancelar: async (id: string): Promise<void> => {
+    await fetch(`${API_BASE_URL}/api/uploads/${id}`, { method: "DELETE", headers: authHeaders() });
+  },
+};